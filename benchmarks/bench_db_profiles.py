@@ -0,0 +1,144 @@
+"""
+Benchmark SQLite performance profiles on a synthetic library.
+
+Builds a fresh library per profile (journal_mode is persistent, so the
+profiles cannot share a database file), populates it with N synthetic
+books, and reports:
+
+- bulk insert:    books/s when inserting in 1,000-row transactions
+- small commits:  commits/s for one-row UPDATE transactions (fsync bound)
+- point reads:    books/s for random Session.get() lookups with authors
+- page reads:     pages/s for ORDER BY title LIMIT 50 OFFSET k listings
+
+Usage:
+    python benchmarks/bench_db_profiles.py                 # 50k books
+    python benchmarks/bench_db_profiles.py --books 5000    # quick run
+    python benchmarks/bench_db_profiles.py --profiles balanced fast
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert, update
+
+from book_memex.db.models import Author, Book, PersonalMetadata, book_authors
+from book_memex.db.session import PERFORMANCE_PROFILES, close_db, get_session, init_db
+
+
+def _populate(session, n_books: int, batch: int = 1000) -> float:
+    """Insert synthetic books + authors; return books/s."""
+    rng = random.Random(42)
+    n_authors = max(1, n_books // 5)
+    session.execute(insert(Author.__table__), [
+        {"name": f"Author {i}", "sort_name": f"{i}, Author"} for i in range(n_authors)
+    ])
+    session.commit()
+
+    start = time.perf_counter()
+    for lo in range(0, n_books, batch):
+        hi = min(lo + batch, n_books)
+        session.execute(insert(Book.__table__), [
+            {
+                "id": i + 1,
+                "unique_id": f"bench{i:010d}",
+                "title": f"Synthetic Title {rng.randrange(10**9):09d}",
+                "sort_title": f"Synthetic Title {i}",
+                "language": rng.choice(["en", "de", "fr"]),
+                "description": "lorem ipsum " * 40,
+            }
+            for i in range(lo, hi)
+        ])
+        session.execute(insert(book_authors), [
+            {"book_id": i + 1, "author_id": rng.randrange(n_authors) + 1}
+            for i in range(lo, hi)
+        ])
+        session.execute(insert(PersonalMetadata.__table__), [
+            {"book_id": i + 1, "reading_status": "unread"} for i in range(lo, hi)
+        ])
+        session.commit()
+    return n_books / (time.perf_counter() - start)
+
+
+def _small_commits(session, n_books: int, n: int) -> float:
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(n):
+        session.execute(
+            update(PersonalMetadata)
+            .where(PersonalMetadata.book_id == rng.randrange(n_books) + 1)
+            .values(rating=rng.randrange(1, 6))
+        )
+        session.commit()
+    return n / (time.perf_counter() - start)
+
+
+def _point_reads(session, n_books: int, n: int) -> float:
+    rng = random.Random(11)
+    start = time.perf_counter()
+    for _ in range(n):
+        book = session.get(Book, rng.randrange(n_books) + 1)
+        _ = [a.name for a in book.authors]
+    elapsed = time.perf_counter() - start
+    session.rollback()
+    return n / elapsed
+
+
+def _page_reads(session, n_books: int, n: int) -> float:
+    rng = random.Random(13)
+    start = time.perf_counter()
+    for _ in range(n):
+        offset = rng.randrange(max(1, n_books - 50))
+        session.query(Book).order_by(Book.title).limit(50).offset(offset).all()
+    elapsed = time.perf_counter() - start
+    session.rollback()
+    return n / elapsed
+
+
+def run_profile(profile: str, n_books: int, n_commits: int, n_reads: int, n_pages: int) -> dict:
+    tmp = Path(tempfile.mkdtemp(prefix=f"bm-bench-{profile}-"))
+    try:
+        init_db(tmp, profile=profile)
+        session = get_session()
+        try:
+            result = {
+                "bulk insert (books/s)": _populate(session, n_books),
+                "small commits (/s)": _small_commits(session, n_books, n_commits),
+                "point reads (/s)": _point_reads(session, n_books, n_reads),
+                "page reads (/s)": _page_reads(session, n_books, n_pages),
+            }
+        finally:
+            session.close()
+            close_db()
+        return result
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--books", type=int, default=50_000)
+    parser.add_argument("--commits", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=5_000)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--profiles", nargs="+", default=list(PERFORMANCE_PROFILES))
+    args = parser.parse_args()
+
+    results = {}
+    for profile in args.profiles:
+        print(f"running profile {profile!r} on {args.books} books...", flush=True)
+        results[profile] = run_profile(profile, args.books, args.commits, args.reads, args.pages)
+
+    metrics = list(next(iter(results.values())))
+    width = max(len(m) for m in metrics) + 2
+    print()
+    print("".ljust(width) + "".join(p.rjust(12) for p in results))
+    for metric in metrics:
+        print(metric.ljust(width) + "".join(f"{results[p][metric]:12.0f}" for p in results))
+
+
+if __name__ == "__main__":
+    main()
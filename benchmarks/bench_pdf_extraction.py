@@ -0,0 +1,92 @@
+"""
+Benchmark PdfExtractor: pypdf vs PyMuPDF, sequential vs page-parallel.
+
+Extracts every page of a PDF (a synthetic text-heavy one by default, or
+--pdf) with:
+
+- pypdf:            the pure-Python path (PyMuPDF disabled)
+- pymupdf:          PyMuPDF in this process
+- pymupdf parallel: PyMuPDF over page ranges in a process pool
+
+and reports pages/s, the speed-up over pypdf, and whether each path
+yields the same segments (count, anchors and statuses) as pypdf.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py                   # 1,000 pages
+    python benchmarks/bench_pdf_extraction.py --pages 200
+    python benchmarks/bench_pdf_extraction.py --pdf book.pdf --workers 4
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from book_memex.services.content_extraction.pdf import PdfExtractor, pymupdf
+
+WORDS = (
+    "algorithm archive biology chemistry compiler database economics empire "
+    "galaxy geometry grammar history kernel language logic machine market "
+    "memory network novel ocean painting philosophy poetry protocol quantum "
+    "recursion river science society statistics theory topology travel war"
+).split()
+
+
+def make_pdf(path: Path, pages: int, seed: int = 42) -> Path:
+    """Write a PDF with ~50 lines of random words per page."""
+    rng = random.Random(seed)
+    with pymupdf.open() as doc:
+        for _ in range(pages):
+            page = doc.new_page()
+            text = "\n".join(" ".join(rng.choices(WORDS, k=10)) for _ in range(50))
+            page.insert_textbox(page.rect + (36, 36, -36, -36), text, fontsize=9)
+        doc.save(str(path))
+    return path
+
+
+def _shape(segments):
+    return [(s.segment_index, s.anchor, s.extraction_status) for s in segments]
+
+
+def run(extractor: PdfExtractor, pdf: Path):
+    start = time.perf_counter()
+    segments = list(extractor.extract(pdf))
+    return segments, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=1_000)
+    parser.add_argument("--pdf", type=Path, help="Benchmark this PDF instead of a synthetic one")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bm-bench-pdf-"))
+    try:
+        pdf = args.pdf
+        if pdf is None:
+            print(f"writing a {args.pages}-page PDF...", flush=True)
+            pdf = make_pdf(tmp / "bench.pdf", args.pages)
+
+        reference, base = run(PdfExtractor(use_pymupdf=False), pdf)
+        rows = [("pypdf", reference, base)]
+        for name, extractor in (
+            ("pymupdf", PdfExtractor(workers=1)),
+            ("pymupdf parallel", PdfExtractor(workers=args.workers)),
+        ):
+            segments, seconds = run(extractor, pdf)
+            rows.append((name, segments, seconds))
+
+        print()
+        print(f"{'path':<18}{'pages/s':>10}{'speed-up':>10}  same segments")
+        for name, segments, seconds in rows:
+            print(f"{name:<18}{len(segments) / seconds:>10.0f}{base / seconds:>9.1f}x"
+                  f"  {_shape(segments) == _shape(reference)}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
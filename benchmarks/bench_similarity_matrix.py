@@ -0,0 +1,111 @@
+"""
+Benchmark BookSimilarity.similarity_matrix against the per-pair path.
+
+Builds N synthetic (unsaved) books with descriptions, authors, subjects,
+years, languages and publishers, fits a preset, then:
+
+- times the vectorized similarity_matrix()
+- times the per-pair reference (similarity() for every i < j)
+- checks that both matrices are bit-for-bit identical
+
+The per-pair path is quadratic in Python, so it only runs up to
+--pairwise-limit books; above that its time is extrapolated from a
+sample of pairs.
+
+Usage:
+    python benchmarks/bench_similarity_matrix.py                  # 300 books
+    python benchmarks/bench_similarity_matrix.py --books 5000
+    python benchmarks/bench_similarity_matrix.py --preset metadata_only
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from book_memex.db.models import Author, Book, Subject
+from book_memex.similarity import BookSimilarity
+
+WORDS = (
+    "algorithm archive biology chemistry compiler database economics empire "
+    "galaxy geometry grammar history kernel language logic machine market "
+    "memory network novel ocean painting philosophy poetry protocol quantum "
+    "recursion river science society statistics theory topology travel war"
+).split()
+
+
+def make_books(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    authors = [Author(name=f"Author {i}") for i in range(max(1, n // 4))]
+    subjects = [Subject(name=f"Subject {i}") for i in range(60)]
+    books = []
+    for i in range(n):
+        book = Book(
+            id=i + 1,
+            unique_id=f"bench{i}",
+            title=f"Synthetic {i}",
+            description=" ".join(rng.choice(WORDS) for _ in range(rng.randrange(20, 120))),
+            publication_date=str(rng.randrange(1900, 2025)) if rng.random() < 0.9 else None,
+            language=rng.choice(["en", "en", "en", "de", "fr"]),
+            publisher=rng.choice(["Penguin", "O'Reilly", "Springer", None]),
+            page_count=rng.randrange(80, 1200),
+        )
+        book.files = []
+        book.authors = rng.sample(authors, rng.randrange(1, 3))
+        book.subjects = rng.sample(subjects, rng.randrange(0, 5))
+        books.append(book)
+    return books
+
+
+def pairwise(sim: BookSimilarity, books) -> np.ndarray:
+    n = len(books)
+    matrix = np.zeros((n, n))
+    np.fill_diagonal(matrix, 1.0)
+    for i in range(n):
+        for j in range(i + 1, n):
+            matrix[i][j] = matrix[j][i] = sim.similarity(books[i], books[j])
+    return matrix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--books", type=int, default=300)
+    parser.add_argument("--preset", default="balanced",
+                        choices=["balanced", "metadata_only", "sparse_friendly", "content_only"])
+    parser.add_argument("--pairwise-limit", type=int, default=300)
+    parser.add_argument("--sample-pairs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    books = make_books(args.books)
+    sim = getattr(BookSimilarity(), args.preset)()
+    sim.fit(books)
+
+    start = time.perf_counter()
+    matrix = sim.similarity_matrix(books)
+    vectorized = time.perf_counter() - start
+
+    n_pairs = args.books * (args.books - 1) // 2
+    if args.books <= args.pairwise_limit:
+        start = time.perf_counter()
+        reference = pairwise(sim, books)
+        per_pair = time.perf_counter() - start
+        identical = np.array_equal(matrix, reference)
+        note = "measured"
+    else:
+        rng = random.Random(0)
+        sample = [tuple(rng.sample(range(args.books), 2)) for _ in range(args.sample_pairs)]
+        start = time.perf_counter()
+        identical = all(matrix[i][j] == sim.similarity(books[i], books[j]) for i, j in sample)
+        per_pair = (time.perf_counter() - start) * n_pairs / len(sample)
+        note = f"extrapolated from {len(sample)} sampled pairs"
+
+    print(f"preset {args.preset!r}, {args.books} books, {n_pairs} pairs")
+    print(f"  vectorized:  {vectorized:10.3f} s")
+    print(f"  per-pair:    {per_pair:10.3f} s  ({note})")
+    print(f"  speedup:     {per_pair / vectorized:10.1f}x")
+    print(f"  identical:   {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark typeahead suggestions (/api/suggest).
+
+Builds a synthetic library (books with authors, subjects and tags, inserted
+with raw SQL for speed), then reports:
+
+- rebuild s: time to rebuild the suggestions table after an edit
+- p50/p95 ms per prefix: suggest() latency with the index fresh, which is
+  what the search box sees while typing (target: well under 10 ms)
+
+Usage:
+    python benchmarks/bench_suggest.py                 # 100k books
+    python benchmarks/bench_suggest.py --books 20000 --runs 500
+"""
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+from book_memex.db.models import utc_now
+from book_memex.library_db import Library
+from book_memex.services.suggest_service import SuggestService
+
+SYLLABLES = (
+    "al an ar be ca co da de el en er fa ga ha in ka la le li lo ma me mi mo "
+    "na ne no or pa pe ra re ri ro sa se si so ta te ti to ur va ve vi wa ya"
+).split()
+WORDS = (
+    "history science art theory mathematics introduction guide practical modern "
+    "programming systems language world war philosophy design data network "
+    "economics physics biology music novel poems letters essays handbook"
+).split()
+PREFIXES = ["a", "hi", "pro", "prog", "mod sys", "ka", "intro da", "xq"]
+
+
+def name(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choices(SYLLABLES, k=syllables)).capitalize()
+
+
+def build(path: Path, books: int) -> None:
+    rng = random.Random(42)
+    now = utc_now()
+    lib = Library.open(path, profile="fast")
+    try:
+        conn = lib.session.connection()
+        authors = sorted({f"{name(rng, 2)} {name(rng, 3)}" for _ in range(books // 3)})
+        subjects = sorted({" ".join(rng.sample(WORDS, 2)).title() for _ in range(500)})
+        tags = sorted({f"{rng.choice(WORDS).title()}/{name(rng, 2)}" for _ in range(300)})
+        conn.execute(text("INSERT INTO authors (id, name) VALUES (:id, :name)"),
+                     [{"id": i, "name": n} for i, n in enumerate(authors, 1)])
+        conn.execute(text("INSERT INTO subjects (id, name) VALUES (:id, :name)"),
+                     [{"id": i, "name": n} for i, n in enumerate(subjects, 1)])
+        conn.execute(text("INSERT INTO tags (id, name, path, created_at) "
+                          "VALUES (:id, :name, :path, :now)"),
+                     [{"id": i, "name": p.split("/")[-1], "path": p, "now": now}
+                      for i, p in enumerate(tags, 1)])
+        conn.execute(
+            text("INSERT INTO books (id, unique_id, title, created_at, updated_at) "
+                 "VALUES (:id, :uid, :title, :now, :now)"),
+            [{"id": i, "uid": f"bench-{i:08d}", "now": now,
+              "title": f"{' '.join(rng.choices(WORDS, k=rng.randint(1, 4))).title()} {name(rng, 3)}"}
+             for i in range(1, books + 1)],
+        )
+        # Skewed picks, so a few authors/subjects/tags lead to many books
+        pick = lambda n: min(n, int(rng.paretovariate(1.2)))  # noqa: E731
+        conn.execute(text("INSERT OR IGNORE INTO book_authors (book_id, author_id) VALUES (:b, :a)"),
+                     [{"b": b, "a": rng.randint(1, len(authors)) if rng.random() < 0.7
+                       else pick(len(authors))} for b in range(1, books + 1)])
+        conn.execute(text("INSERT OR IGNORE INTO book_subjects (book_id, subject_id) VALUES (:b, :s)"),
+                     [{"b": b, "s": pick(len(subjects))} for b in range(1, books + 1)])
+        conn.execute(text("INSERT OR IGNORE INTO book_tags (book_id, tag_id) VALUES (:b, :t)"),
+                     [{"b": b, "t": pick(len(tags))} for b in range(1, books + 1, 3)])
+        lib.session.commit()
+    finally:
+        lib.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=200, help="Lookups per prefix")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bm-bench-suggest-"))
+    try:
+        print(f"building {args.books} books...", flush=True)
+        build(tmp, args.books)
+
+        lib = Library.open(tmp)
+        try:
+            service = SuggestService(lib.session)
+            start = time.perf_counter()
+            count = service.rebuild()
+            print(f"rebuild: {count} suggestions in {time.perf_counter() - start:.2f} s\n")
+
+            print(f"{'prefix':<12}{'hits':>6}{'p50 ms':>9}{'p95 ms':>9}")
+            for prefix in PREFIXES:
+                timings = []
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    hits = lib.suggest(prefix)
+                    timings.append((time.perf_counter() - start) * 1000)
+                p95 = statistics.quantiles(timings, n=20)[-1]
+                print(f"{prefix!r:<12}{len(hits):>6}{statistics.median(timings):>9.2f}{p95:>9.2f}")
+        finally:
+            lib.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark stored-text compression: none vs zlib vs zstd.
+
+Builds one library per codec with the same synthetic books (a full-text
+extracted_texts row plus per-chapter book_content rows each), then reports:
+
+- db MB:     library.db size after a VACUUM
+- write s:   time to insert all the text through the ORM
+- read ms:   mean time to load one book's full text through the ORM
+- search ms: mean time of a book_content FTS query with snippets
+             (the server's /api/search/content path)
+
+Usage:
+    python benchmarks/bench_text_compression.py                 # 300 books
+    python benchmarks/bench_text_compression.py --books 1000 --chapters 30
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+from book_memex.db.compression import zstandard
+from book_memex.db.models import Book, BookContent, ExtractedText, File
+from book_memex.library_db import Library
+from book_memex.server import _run_content_search
+
+WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are "
+    "or his from at which but have an they you were her she there been one "
+    "algorithm archive biology chemistry compiler database economics empire "
+    "galaxy geometry grammar history kernel language logic machine market "
+    "memory network novel ocean painting philosophy poetry protocol quantum "
+    "recursion river science society statistics theory topology travel war"
+).split()
+# Common words first, so sampling is skewed like real prose
+WEIGHTS = [1.0 / (rank + 1) for rank in range(len(WORDS))]
+QUERIES = ["quantum topology", "river", "compiler memory", "philosophy poetry", "galaxy"]
+
+
+def chapter(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        n = rng.randint(6, 20)
+        sentence = " ".join(rng.choices(WORDS, WEIGHTS, k=n))
+        sentences.append(sentence.capitalize() + ".")
+        words -= n
+    return " ".join(sentences)
+
+
+def build(path: Path, codec: str, books: int, chapters: int, words: int) -> float:
+    rng = random.Random(42)
+    lib = Library.open(path, profile="fast", text_compression=codec)
+    try:
+        start = time.perf_counter()
+        for i in range(books):
+            book = Book(title=f"Book {i}", unique_id=f"bench-{i:06d}")
+            lib.session.add(book)
+            lib.session.flush()
+            f = File(book_id=book.id, path=f"{i}.txt", format="txt", file_hash=f"{i:064x}")
+            lib.session.add(f)
+            lib.session.flush()
+            parts = [chapter(rng, words) for _ in range(chapters)]
+            lib.session.add(ExtractedText(file_id=f.id, content="\n\n".join(parts),
+                                          content_hash=f"{i:064x}"))
+            for n, part in enumerate(parts):
+                lib.session.add(BookContent(
+                    file_id=f.id, content=part, segment_type="chapter", segment_index=n,
+                    anchor={}, extractor_version="bench", extraction_status="ok",
+                ))
+            if i % 50 == 49:
+                lib.session.commit()
+        lib.session.commit()
+        return time.perf_counter() - start
+    finally:
+        lib.close()
+
+
+def measure(path: Path, codec: str):
+    lib = Library.open(path, text_compression=codec)
+    try:
+        lib.compact(codec)  # no-op rewrite; VACUUMs so sizes compare fairly
+        db_bytes = (path / "library.db").stat().st_size
+
+        ids = [row[0] for row in lib.session.execute(text("SELECT id FROM extracted_texts"))]
+        sample = random.Random(7).sample(ids, min(100, len(ids)))
+        start = time.perf_counter()
+        for et_id in sample:
+            lib.session.expire_all()
+            assert lib.session.get(ExtractedText, et_id).content
+        read_ms = (time.perf_counter() - start) / len(sample) * 1000
+
+        start = time.perf_counter()
+        for q in QUERIES:
+            _run_content_search(lib.session, q, None, 20)
+        search_ms = (time.perf_counter() - start) / len(QUERIES) * 1000
+        return db_bytes, read_ms, search_ms
+    finally:
+        lib.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--books", type=int, default=300)
+    parser.add_argument("--chapters", type=int, default=20)
+    parser.add_argument("--words", type=int, default=2_000, help="Words per chapter")
+    args = parser.parse_args()
+
+    codecs = ["none", "zlib"] + (["zstd"] if zstandard is not None else [])
+    tmp = Path(tempfile.mkdtemp(prefix="bm-bench-compression-"))
+    try:
+        rows = []
+        for codec in codecs:
+            print(f"building {args.books} books with {codec}...", flush=True)
+            path = tmp / codec
+            write_s = build(path, codec, args.books, args.chapters, args.words)
+            rows.append((codec, write_s, *measure(path, codec)))
+
+        base = rows[0][2]
+        print()
+        print(f"{'codec':<8}{'db MB':>9}{'ratio':>8}{'write s':>10}{'read ms':>10}{'search ms':>11}")
+        for codec, write_s, db_bytes, read_ms, search_ms in rows:
+            print(f"{codec:<8}{db_bytes / 2**20:>9.1f}{base / db_bytes:>7.2f}x"
+                  f"{write_s:>10.2f}{read_ms:>10.2f}{search_ms:>11.2f}")
+        if zstandard is None:
+            print("\n(zstd skipped: pip install book-memex[compression])")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
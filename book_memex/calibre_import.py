@@ -2,27 +2,192 @@
 Calibre library import functionality.
 
 Provides functions to import books from a Calibre library into a book-memex library.
+
+Calibre keeps every book's metadata in ``metadata.db`` (SQLite). When it is
+present, books are read from it in chunks with one query per table rather
+than by parsing each book's ``metadata.opf``; the OPF files remain the
+fallback for libraries without a database.
 """
 
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator, List
 import logging
+import sqlite3
 
 logger = logging.getLogger(__name__)
 
+# Formats imported from a Calibre book, in order of preference for the
+# primary (text- and cover-extracted) file
+CALIBRE_FORMATS = ("pdf", "epub", "mobi", "azw3", "txt")
+
+# Books read from metadata.db per round of queries
+_CHUNK = 500
+
+# Calibre's placeholder for an unknown publication date
+_UNDEFINED_DATE = "0101-01-01"
+
+
+@dataclass
+class CalibreBook:
+    """A book read from Calibre's metadata.db."""
+    calibre_id: int
+    metadata: Dict[str, Any]
+    files: List[Path] = field(default_factory=list)  # existing files, preferred format first
+
+
+def has_calibre_db(calibre_path: Path) -> bool:
+    """Whether a Calibre library has a metadata.db to read."""
+    return (Path(calibre_path) / "metadata.db").is_file()
+
+
+def _connect(calibre_path: Path) -> sqlite3.Connection:
+    """Open metadata.db read-only (Calibre may have it open)."""
+    db_path = (Path(calibre_path) / "metadata.db").resolve()
+    return sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+
+
+def count_calibre_books(calibre_path: Path, limit: Optional[int] = None) -> int:
+    """Number of books in a Calibre library's metadata.db (at most ``limit``)."""
+    conn = _connect(calibre_path)
+    try:
+        total = conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+    finally:
+        conn.close()
+    return min(total, limit) if limit else total
+
+
+def read_calibre_db(calibre_path: Path, limit: Optional[int] = None) -> Iterator[CalibreBook]:
+    """
+    Stream books from a Calibre library's metadata.db.
+
+    Books are read in chunks of ids; each chunk takes one query per related
+    table (authors, tags, identifiers, formats, ...), so the number of
+    queries grows with the number of chunks rather than books.
+
+    Args:
+        calibre_path: Calibre library folder
+        limit: Maximum number of books
+
+    Yields:
+        CalibreBook with metadata in the shape of ``extract_metadata_from_opf``
+    """
+    calibre_path = Path(calibre_path)
+    conn = _connect(calibre_path)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        query = ("SELECT id, title, path, pubdate, series_index, uuid, isbn "
+                 "FROM books ORDER BY id")
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        books = conn.execute(query)
+
+        while True:
+            rows = books.fetchmany(_CHUNK)
+            if not rows:
+                break
+            ids = [row[0] for row in rows]
+            related = _read_related(conn, tables, ids)
+
+            for book_id, title, path, pubdate, series_index, uuid, isbn in rows:
+                identifiers = dict(related["identifiers"].get(book_id, []))
+                if isbn and "isbn" not in identifiers:
+                    identifiers["isbn"] = isbn
+                if uuid:
+                    identifiers.setdefault("uuid", uuid)
+
+                series = related["series"].get(book_id)
+                metadata = {
+                    "title": title,
+                    "creators": [name for name, in related["authors"].get(book_id, [])] or None,
+                    "subjects": [name for name, in related["tags"].get(book_id, [])] or None,
+                    "description": next(iter(related["comments"].get(book_id, [])), (None,))[0],
+                    "publisher": next(iter(related["publishers"].get(book_id, [])), (None,))[0],
+                    "date": pubdate if pubdate and not pubdate.startswith(_UNDEFINED_DATE) else None,
+                    "identifiers": identifiers,
+                    "series": series[0][0] if series else None,
+                    "series_index": series_index if series else None,
+                }
+                languages = related["languages"].get(book_id)
+                if languages:
+                    metadata["language"] = languages[0][0]
+
+                book_dir = calibre_path / path
+                files = [
+                    book_dir / f"{name}.{fmt.lower()}"
+                    for fmt, name in related["formats"].get(book_id, [])
+                ]
+                files = [
+                    f for f in sorted(files, key=lambda f: CALIBRE_FORMATS.index(f.suffix[1:]))
+                    if f.is_file()
+                ]
+                yield CalibreBook(book_id, metadata, files)
+    finally:
+        conn.close()
+
+
+# (key, required table, SELECT returning (book_id, values...) for "IN ({ids})")
+_RELATED_QUERIES = [
+    ("authors", "books_authors_link",
+     "SELECT l.book, a.name FROM books_authors_link l JOIN authors a ON a.id = l.author "
+     "WHERE l.book IN ({ids}) ORDER BY l.id"),
+    ("tags", "books_tags_link",
+     "SELECT l.book, t.name FROM books_tags_link l JOIN tags t ON t.id = l.tag "
+     "WHERE l.book IN ({ids}) ORDER BY t.name"),
+    ("identifiers", "identifiers",
+     "SELECT book, type, val FROM identifiers WHERE book IN ({ids})"),
+    ("comments", "comments",
+     "SELECT book, text FROM comments WHERE book IN ({ids})"),
+    ("publishers", "books_publishers_link",
+     "SELECT l.book, p.name FROM books_publishers_link l JOIN publishers p ON p.id = l.publisher "
+     "WHERE l.book IN ({ids})"),
+    ("languages", "books_languages_link",
+     "SELECT l.book, g.lang_code FROM books_languages_link l JOIN languages g ON g.id = l.lang_code "
+     "WHERE l.book IN ({ids}) ORDER BY l.item_order"),
+    ("series", "books_series_link",
+     "SELECT l.book, s.name FROM books_series_link l JOIN series s ON s.id = l.series "
+     "WHERE l.book IN ({ids})"),
+    ("formats", "data",
+     "SELECT book, format, name FROM data WHERE book IN ({ids}) "
+     "AND lower(format) IN (" + ", ".join(f"'{fmt}'" for fmt in CALIBRE_FORMATS) + ")"),
+]
+
+
+def _read_related(conn: sqlite3.Connection, tables: set, ids: List[int]) -> Dict[str, Dict[int, list]]:
+    """Rows of each related table for a chunk of book ids, grouped by book."""
+    placeholders = ", ".join("?" * len(ids))
+    related: Dict[str, Dict[int, list]] = {}
+    for key, table, sql in _RELATED_QUERIES:
+        grouped: Dict[int, list] = {}
+        if table in tables:
+            for book_id, *values in conn.execute(sql.format(ids=placeholders), ids):
+                grouped.setdefault(book_id, []).append(tuple(values))
+        related[key] = grouped
+    return related
+
 
 def import_calibre_library(
     calibre_path: Path,
     library,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    ingest_mode: str = "copy",
+    batch_size: int = 100,
+    on_book: Optional[Callable[[], None]] = None,
 ) -> Dict[str, Any]:
     """
     Import books from a Calibre library.
 
+    Reads metadata.db when the library has one, else each book's
+    metadata.opf.
+
     Args:
         calibre_path: Path to the Calibre library folder
         library: An open book-memex Library instance
         limit: Maximum number of books to import
+        ingest_mode: How files are placed in the library (copy, hardlink,
+                     reflink or move)
+        batch_size: Books per transaction when reading metadata.db
+        on_book: Called after each Calibre book is processed (progress)
 
     Returns:
         Dictionary with import results:
@@ -38,6 +203,10 @@ def import_calibre_library(
         "errors": []
     }
 
+    if has_calibre_db(calibre_path):
+        return _import_from_db(calibre_path, library, limit, ingest_mode, batch_size,
+                               on_book, results)
+
     # Find all metadata.opf files
     opf_files = list(calibre_path.rglob("metadata.opf"))
 
@@ -52,7 +221,7 @@ def import_calibre_library(
 
     for opf_path in opf_files:
         try:
-            book = library.add_calibre_book(opf_path)
+            book = library.add_calibre_book(opf_path, ingest_mode=ingest_mode)
             if book:
                 results["imported"] += 1
             else:
@@ -62,5 +231,42 @@ def import_calibre_library(
             results["failed"] += 1
             results["errors"].append(f"{opf_path.parent.name}: {str(e)}")
             logger.debug(f"Failed to import {opf_path.parent.name}: {e}")
+        if on_book:
+            on_book()
+
+    return results
+
+
+def _import_from_db(calibre_path: Path, library, limit: Optional[int], ingest_mode: str,
+                    batch_size: int, on_book: Optional[Callable[[], None]],
+                    results: Dict[str, Any]) -> Dict[str, Any]:
+    """Import the books listed in metadata.db, committing in batches."""
+    from .services.import_service import ImportBatch
+
+    results["total"] = count_calibre_books(calibre_path, limit)
+    if results["total"] == 0:
+        results["errors"].append("No books found in the Calibre library's metadata.db.")
+        return results
+
+    with ImportBatch(library.import_service, batch_size) as batch:
+        for calibre_book in read_calibre_db(calibre_path, limit):
+            title = calibre_book.metadata.get("title")
+            if not calibre_book.files:
+                results["failed"] += 1
+                results["errors"].append(f"No ebook files found for: {title}")
+            else:
+                # First file is the primary format; others are added as formats
+                book = batch.import_file(calibre_book.files[0], calibre_book.metadata,
+                                         ingest_mode=ingest_mode)
+                for extra in calibre_book.files[1:]:
+                    batch.import_file(extra, calibre_book.metadata, extract_text=False,
+                                      extract_cover=False, ingest_mode=ingest_mode)
+                if book:
+                    results["imported"] += 1
+                else:
+                    results["failed"] += 1
+                    results["errors"].append(f"Failed to import: {title}")
+            if on_book:
+                on_book()
 
     return results
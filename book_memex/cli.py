@@ -65,6 +65,20 @@ def resolve_library_path(library_path: Optional[Path]) -> Path:
     return library_path
 
 
+def check_ingest_mode(mode: str) -> str:
+    """Validate an --ingest-mode value, exiting with an error if unknown."""
+    from .services.ingest import validate_ingest_mode
+
+    try:
+        return validate_ingest_mode(mode)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+
+
+INGEST_MODE_HELP = "How files enter the library: copy, hardlink, reflink or move"
+
+
 # Main app
 app = typer.Typer()
 
@@ -77,7 +91,7 @@ note_app = typer.Typer(help="Manage marginalia (notes, highlights, cross-book ob
 tag_app = typer.Typer(help="Manage hierarchical tags for organizing books")
 queue_app = typer.Typer(help="Manage reading queue")
 view_app = typer.Typer(help="Manage views (composable, named subsets of the library)")
-lib_app = typer.Typer(help="Library management (init, migrate, backup, restore, check)")
+lib_app = typer.Typer(help="Library management (init, migrate, backup, restore, check, build-neighbors)")
 query_app = typer.Typer(help="Query and discover books (search, list, stats, sql)")
 
 # Register command groups
@@ -144,6 +158,7 @@ def about():
     console.print("")
     console.print("[bold]Interactive:[/bold]")
     console.print("  book-memex serve                    Start web server")
+    console.print("  book-memex worker                   Run queued extraction jobs")
     console.print("")
     console.print("[bold]Getting Started:[/bold]")
     console.print("  1. Initialize: book-memex lib init ~/my-library")
@@ -311,6 +326,10 @@ def backup(
 
         console.print(f"[cyan]Creating backup of {library_path}...[/cyan]")
 
+        # Fold the WAL into library.db so the archived copy is complete
+        from .db.session import checkpoint_db
+        checkpoint_db(library_path)
+
         # Determine archive type
         output_str = str(output).lower()
         is_tar = output_str.endswith('.tar.gz') or output_str.endswith('.tgz')
@@ -458,6 +477,7 @@ def check(
     library_path: Optional[Path] = typer.Argument(None, help="Path to library (uses config default if not specified)"),
     fix: bool = typer.Option(False, "--fix", help="Attempt to fix issues (remove orphan DB entries)"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Show all files, not just issues"),
+    rehash: bool = typer.Option(False, "--rehash", help="Re-read every file instead of trusting cached hashes"),
 ):
     """
     Check library integrity and report issues.
@@ -468,14 +488,18 @@ def check(
     - Books without files: Book entries with no associated files
     - Hash mismatches: Files whose content doesn't match stored hash
 
+    Hashes come from the library's hash cache, so only files whose size,
+    mtime or inode changed since they were last hashed are read; use
+    --rehash to read everything (e.g. to detect silent disk corruption).
+
     Examples:
         book-memex lib check                    # Check default library
         book-memex lib check ~/my-library       # Check specific library
         book-memex lib check --fix              # Remove orphan DB entries
         book-memex lib check --verbose          # Show all checked files
+        book-memex lib check --rehash           # Verify every file's content
     """
     from .library_db import Library
-    import hashlib
     import os
 
     library_path = resolve_library_path(library_path)
@@ -498,8 +522,9 @@ def check(
         db_files = lib.session.query(File).all()
         db_file_paths = {f.path for f in db_files}
 
-        # Check for missing files
+        # Check for missing files and hash mismatches
         console.print("[bold]Checking for missing files...[/bold]")
+        hash_cache = lib.import_service.hash_cache
         for f in db_files:
             file_path = library_path / f.path
             if not file_path.exists():
@@ -509,8 +534,21 @@ def check(
                     "book_id": f.book_id,
                 })
                 console.print(f"  [red]✗ Missing: {f.path}[/red]")
+                continue
+
+            actual_hash = hash_cache.hash_file(file_path, refresh=rehash)
+            if actual_hash != f.file_hash:
+                issues["hash_mismatches"].append({
+                    "id": f.id,
+                    "path": f.path,
+                    "expected": f.file_hash,
+                    "actual": actual_hash,
+                })
+                console.print(f"  [red]✗ Hash mismatch: {f.path}[/red]")
             elif verbose:
                 console.print(f"  [green]✓ {f.path}[/green]")
+        if verbose:
+            console.print(f"  [dim]Hashed {hash_cache.misses} file(s), {hash_cache.hits} from cache[/dim]")
 
         # Check for orphan files on disk
         console.print("\n[bold]Checking for orphan files...[/bold]")
@@ -578,6 +616,108 @@ def check(
         raise typer.Exit(code=1)
 
 
+@lib_app.command(name="build-neighbors")
+def build_neighbors(
+    library_path: Optional[Path] = typer.Argument(None, help="Path to library (uses config default if not specified)"),
+    presets: str = typer.Option("balanced,sparse_friendly", "--presets", "-p",
+                                help="Comma-separated presets: balanced, metadata_only, sparse_friendly, content_only"),
+    top_k: int = typer.Option(20, "--top-k", "-k", help="Similar books to store per book"),
+    full: bool = typer.Option(False, "--full", help="Recompute every book instead of only changed ones"),
+):
+    """
+    Precompute similar books for every book.
+
+    Stores each book's top-k most similar books (same language) in the
+    book_neighbors table, so 'book similar' and the server's
+    /api/books/{id}/similar answer with a single lookup. Re-running only
+    recomputes books whose data changed since the last build.
+
+    Examples:
+        book-memex lib build-neighbors
+        book-memex lib build-neighbors --presets metadata_only --top-k 50
+        book-memex lib build-neighbors --full
+    """
+    from .library_db import Library
+
+    library_path = resolve_library_path(library_path)
+    preset_names = [p.strip() for p in presets.split(",") if p.strip()]
+
+    try:
+        lib = Library.open(library_path)
+        console.print(f"[cyan]Building neighbor lists for {library_path}...[/cyan]")
+        try:
+            results = lib.build_neighbors(preset_names, top_k=top_k, full=full)
+        finally:
+            lib.close()
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+    except Exception as e:
+        console.print(f"[red]Error building neighbors: {e}[/red]")
+        raise typer.Exit(code=1)
+
+    for preset, stats in results.items():
+        console.print(
+            f"[green]✓ {preset}:[/green] {stats['books']} books, "
+            f"{stats['recomputed']} recomputed, {stats['updated']} updated"
+        )
+
+
+@lib_app.command()
+def compact(
+    library_path: Optional[Path] = typer.Argument(None, help="Path to library (uses config default if not specified)"),
+    codec: Optional[str] = typer.Option(None, "--codec", "-c",
+                                        help="none, zlib or zstd (default: database.text_compression from config)"),
+    no_vacuum: bool = typer.Option(False, "--no-vacuum", help="Skip the VACUUM that returns freed space"),
+):
+    """
+    Rewrite stored extracted text with a compression codec.
+
+    New text is compressed with the 'database.text_compression' config
+    setting; this re-encodes text that is already in the library, then
+    VACUUMs the database. Search keeps working throughout.
+
+    Examples:
+        book-memex lib compact
+        book-memex lib compact --codec zstd
+        book-memex lib compact --codec none     # Store plain text again
+    """
+    from .library_db import Library
+    from .config import load_config
+
+    library_path = resolve_library_path(library_path)
+
+    try:
+        lib = Library.open(library_path)
+        try:
+            with console.status("[cyan]Compacting extracted text...[/cyan]"):
+                result = lib.compact(codec, vacuum=not no_vacuum)
+        finally:
+            lib.close()
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+    except Exception as e:
+        console.print(f"[red]Error compacting library: {e}[/red]")
+        raise typer.Exit(code=1)
+
+    for table, stats in result["tables"].items():
+        console.print(
+            f"[green]✓ {table}:[/green] {stats['rows']} rows, "
+            f"{stats['bytes_before'] / (1024**2):.1f} MB → {stats['bytes_after'] / (1024**2):.1f} MB"
+        )
+    console.print(
+        f"  Database: {result['db_bytes_before'] / (1024**2):.1f} MB → "
+        f"{result['db_bytes_after'] / (1024**2):.1f} MB"
+    )
+    configured = load_config().database.text_compression
+    if result["codec"] != configured:
+        console.print(
+            f"[yellow]New text is still stored with '{configured}'; run "
+            f"'book-memex config --text-compression {result['codec']}' to match.[/yellow]"
+        )
+
+
 @import_app.command(name="add")
 def import_add(
     file_path: Path = typer.Argument(..., help="Path to ebook file"),
@@ -588,7 +728,9 @@ def import_add(
     language: str = typer.Option("en", "--language", "-l", help="Language code"),
     no_text: bool = typer.Option(False, "--no-text", help="Skip text extraction"),
     no_cover: bool = typer.Option(False, "--no-cover", help="Skip cover extraction"),
-    auto_metadata: bool = typer.Option(True, "--auto-metadata/--no-auto-metadata", help="Extract metadata from file")
+    auto_metadata: bool = typer.Option(True, "--auto-metadata/--no-auto-metadata", help="Extract metadata from file"),
+    background: bool = typer.Option(False, "--background", help="Queue text/cover extraction for 'book-memex worker'"),
+    ingest_mode: str = typer.Option("copy", "--ingest-mode", help=INGEST_MODE_HELP),
 ):
     """
     Import a single ebook file into the library.
@@ -601,6 +743,8 @@ def import_add(
         book-memex import add book.pdf                    # Uses config default
         book-memex import add book.pdf ~/my-library
         book-memex import add book.epub --title "My Book" --authors "Author Name"
+        book-memex import add big.pdf --background        # Extract later via 'book-memex worker'
+        book-memex import add book.pdf --ingest-mode hardlink   # No second copy on disk
     """
     from .library_db import Library
     from .extract_metadata import extract_metadata
@@ -608,6 +752,7 @@ def import_add(
     if not file_path.exists():
         console.print(f"[red]Error: File not found: {file_path}[/red]")
         raise typer.Exit(code=1)
+    check_ingest_mode(ingest_mode)
 
     library_path = resolve_library_path(library_path)
 
@@ -641,7 +786,9 @@ def import_add(
             file_path,
             metadata,
             extract_text=not no_text,
-            extract_cover=not no_cover
+            extract_cover=not no_cover,
+            defer=background,
+            ingest_mode=ingest_mode,
         )
 
         if book:
@@ -649,6 +796,8 @@ def import_add(
             console.print(f"  ID: {book.id}")
             console.print(f"  Authors: {', '.join(a.name for a in book.authors)}")
             console.print(f"  Files: {len(book.files)}")
+            if background:
+                console.print("  [dim]Extraction queued; run 'book-memex worker' to process it[/dim]")
         else:
             console.print("[yellow]Import failed or book already exists[/yellow]")
 
@@ -664,19 +813,33 @@ def import_add(
 def import_calibre(
     calibre_path: Path = typer.Argument(..., help="Path to Calibre library"),
     library_path: Path = typer.Argument(..., help="Path to book-memex library"),
-    limit: Optional[int] = typer.Option(None, "--limit", help="Limit number of books to import")
+    limit: Optional[int] = typer.Option(None, "--limit", help="Limit number of books to import"),
+    ingest_mode: str = typer.Option("copy", "--ingest-mode", help=INGEST_MODE_HELP),
+    batch_size: Optional[int] = typer.Option(None, "--batch-size", help="Books per transaction (default from config: 100)"),
 ):
     """
     Import books from a Calibre library.
 
-    Reads Calibre's metadata.opf files and imports ebooks with full metadata.
-    Supports all Calibre-managed formats (PDF, EPUB, MOBI, etc.).
+    Reads book metadata in bulk from Calibre's metadata.db (falling back to
+    each book's metadata.opf) and imports ebooks with full metadata.
+    Supports PDF, EPUB, MOBI, AZW3 and TXT formats.
 
     Examples:
         book-memex import calibre ~/Calibre/Library ~/my-library
         book-memex import calibre ~/Calibre/Library ~/my-library --limit 100
+        book-memex import calibre ~/Calibre/Library ~/my-library --ingest-mode reflink
     """
     from .library_db import Library
+    from .calibre_import import count_calibre_books, has_calibre_db, import_calibre_library
+    from .config import load_config
+
+    check_ingest_mode(ingest_mode)
+
+    if batch_size is None:
+        batch_size = load_config().library.import_batch_size
+    if batch_size < 1:
+        console.print("[red]Error: --batch-size must be at least 1[/red]")
+        raise typer.Exit(code=1)
 
     if not calibre_path.exists():
         console.print(f"[red]Error: Calibre library not found: {calibre_path}[/red]")
@@ -690,43 +853,36 @@ def import_calibre(
     try:
         lib = Library.open(library_path)
 
-        # Find all metadata.opf files
         console.print(f"Scanning Calibre library...")
-        opf_files = list(calibre_path.rglob("metadata.opf"))
-
-        if limit:
-            opf_files = opf_files[:limit]
+        if has_calibre_db(calibre_path):
+            total = count_calibre_books(calibre_path, limit)
+        else:
+            # No metadata.db: fall back to each book's metadata.opf
+            total = len(list(calibre_path.rglob("metadata.opf")))
+            if limit:
+                total = min(total, limit)
 
-        console.print(f"Found {len(opf_files)} books in Calibre library")
+        console.print(f"Found {total} books in Calibre library")
 
-        if len(opf_files) == 0:
+        if total == 0:
             console.print("[yellow]No books found. Make sure this is a Calibre library directory.[/yellow]")
             lib.close()
             raise typer.Exit(code=0)
 
-        imported = 0
-        failed = 0
-
         with Progress() as progress:
-            task = progress.add_task("[green]Importing...", total=len(opf_files))
-
-            for opf_path in opf_files:
-                try:
-                    book = lib.add_calibre_book(opf_path)
-                    if book:
-                        imported += 1
-                    else:
-                        failed += 1
-                except Exception as e:
-                    failed += 1
-                    logger.debug(f"Failed to import {opf_path.parent.name}: {e}")
+            task = progress.add_task("[green]Importing...", total=total)
+            results = import_calibre_library(
+                calibre_path, lib, limit=limit, ingest_mode=ingest_mode,
+                batch_size=batch_size, on_book=lambda: progress.advance(task),
+            )
 
-                progress.advance(task)
+        for error in results["errors"]:
+            logger.debug(error)
 
         console.print(f"[green]✓ Import complete[/green]")
-        console.print(f"  Successfully imported: {imported}")
-        if failed > 0:
-            console.print(f"  Failed: {failed}")
+        console.print(f"  Successfully imported: {results['imported']}")
+        if results["failed"] > 0:
+            console.print(f"  Failed: {results['failed']}")
 
         lib.close()
 
@@ -748,6 +904,10 @@ def import_folder(
     dry_run: bool = typer.Option(False, "--dry-run", help="Show what would be imported without importing"),
     resume: bool = typer.Option(True, "--resume/--no-resume", help="Skip files already in library (by hash)"),
     log_failures: Optional[Path] = typer.Option(None, "--log-failures", help="Log failed imports to file for retry"),
+    workers: int = typer.Option(1, "--workers", "-w", help="Processes for hashing and extraction (1 = sequential)"),
+    background: bool = typer.Option(False, "--background", help="Queue text/cover extraction for 'book-memex worker'"),
+    ingest_mode: str = typer.Option("copy", "--ingest-mode", help=INGEST_MODE_HELP),
+    batch_size: Optional[int] = typer.Option(None, "--batch-size", help="Files per transaction (default from config: 100)"),
 ):
     """
     Import all ebook files from a folder (batch import).
@@ -757,8 +917,14 @@ def import_folder(
 
     Features:
     - Progress bar with ETA
-    - Automatic resume (skips files already imported by hash)
+    - Automatic resume (skips files already imported by hash; hashes of
+      unchanged files are cached, so re-runs do not reread them)
     - Failure logging for later retry
+    - Parallel hashing/extraction with --workers (same result as sequential)
+    - --background: import metadata only and queue extraction jobs
+    - --ingest-mode hardlink/reflink/move: avoid a second copy on disk
+    - Commits --batch-size files per transaction; a failing file only rolls
+      back itself (the summary reports commits/sec)
 
     Examples:
         book-memex import folder ~/Downloads/Books ~/my-library
@@ -766,20 +932,31 @@ def import_folder(
         book-memex import folder ~/Books ~/my-library --extensions pdf,epub --limit 100
         book-memex import folder ~/Books ~/my-library --dry-run      # Preview only
         book-memex import folder ~/Books ~/my-library --log-failures failed.txt
+        book-memex import folder ~/Books ~/my-library --workers 8
+        book-memex import folder ~/Books ~/my-library --ingest-mode move
     """
     from .library_db import Library
+    from .db.models import Book
     from .extract_metadata import extract_metadata
-    import hashlib
+    from .services.import_service import ImportBatch
+    from .config import load_config
     import time
 
     if not folder_path.exists():
         console.print(f"[red]Error: Folder not found: {folder_path}[/red]")
         raise typer.Exit(code=1)
+    check_ingest_mode(ingest_mode)
 
     if not folder_path.is_dir():
         console.print(f"[red]Error: Not a directory: {folder_path}[/red]")
         raise typer.Exit(code=1)
 
+    if batch_size is None:
+        batch_size = load_config().library.import_batch_size
+    if batch_size < 1:
+        console.print("[red]Error: --batch-size must be at least 1[/red]")
+        raise typer.Exit(code=1)
+
     library_path = resolve_library_path(library_path)
 
     if not library_path.exists():
@@ -787,6 +964,9 @@ def import_folder(
         console.print(f"[yellow]Initialize a library first with: book-memex init {library_path}[/yellow]")
         raise typer.Exit(code=1)
 
+    from .services.content_extraction.pdf import enable_process_pool
+    enable_process_pool()
+
     try:
         lib = Library.open(library_path)
 
@@ -851,53 +1031,87 @@ def import_folder(
         ) as progress:
             task = progress.add_task("[cyan]Importing...", total=len(ebook_files), eta="calculating...")
 
-            for idx, file_path in enumerate(ebook_files):
-                # Calculate ETA
-                elapsed = time.time() - start_time
-                if idx > 0:
-                    per_file = elapsed / idx
-                    remaining = (len(ebook_files) - idx) * per_file
-                    eta = f"{int(remaining // 60)}m {int(remaining % 60)}s"
-                else:
-                    eta = "calculating..."
-
-                progress.update(task, description=f"[cyan]{file_path.name[:40]}", eta=eta)
-
-                try:
-                    # Check if already imported (by hash) for resume
-                    if resume and existing_hashes:
-                        file_hash = hashlib.sha256(file_path.read_bytes()).hexdigest()
-                        if file_hash in existing_hashes:
-                            skipped += 1
-                            progress.advance(task)
-                            continue
-
-                    # Extract metadata
-                    metadata = extract_metadata(str(file_path))
-
-                    # Ensure title exists
-                    if 'title' not in metadata or not metadata['title']:
-                        metadata['title'] = file_path.stem
-
-                    # Import book
-                    book = lib.add_book(
-                        file_path,
-                        metadata,
-                        extract_text=not no_text,
-                        extract_cover=not no_cover
-                    )
-
-                    if book:
+            if workers > 1:
+                # Workers hash and extract; this process writes, in file order
+                results = lib.import_service.import_prepared(
+                    ((fp, None) for fp in ebook_files),
+                    workers=workers,
+                    extract_text=not no_text,
+                    extract_cover=not no_cover,
+                    skip_hashes=existing_hashes if resume else (),
+                    batch_size=batch_size,
+                    defer=background,
+                    ingest_mode=ingest_mode,
+                )
+                for idx, (file_path, result) in enumerate(results, start=1):
+                    if isinstance(result, Exception):
+                        failed += 1
+                        failed_files.append((str(file_path), str(result)))
+                        logger.debug(f"Failed to import {file_path}: {result}")
+                    elif isinstance(result, Book):
                         imported += 1
                     else:
-                        skipped += 1  # Already exists
-
-                except Exception as e:
-                    failed += 1
-                    failed_files.append((str(file_path), str(e)))
-                    logger.debug(f"Failed to import {file_path}: {e}")
+                        skipped += 1  # Already in library, or import failed
 
-                progress.advance(task)
+                    elapsed = time.time() - start_time
+                    remaining = (len(ebook_files) - idx) * elapsed / idx
+                    progress.update(task, description=f"[cyan]{file_path.name[:40]}",
+                                    eta=f"{int(remaining // 60)}m {int(remaining % 60)}s")
+                    progress.advance(task)
+                stats = lib.import_service.last_stats
+            else:
+                batch = ImportBatch(lib.import_service, batch_size)
+                stats = batch.stats
+                with batch:
+                    for idx, file_path in enumerate(ebook_files):
+                        # Calculate ETA
+                        elapsed = time.time() - start_time
+                        if idx > 0:
+                            per_file = elapsed / idx
+                            remaining = (len(ebook_files) - idx) * per_file
+                            eta = f"{int(remaining // 60)}m {int(remaining % 60)}s"
+                        else:
+                            eta = "calculating..."
+
+                        progress.update(task, description=f"[cyan]{file_path.name[:40]}", eta=eta)
+
+                        try:
+                            # Check if already imported (by hash) for resume
+                            if resume and existing_hashes:
+                                file_hash = lib.import_service.hash_cache.hash_file(file_path)
+                                if file_hash in existing_hashes:
+                                    skipped += 1
+                                    progress.advance(task)
+                                    continue
+
+                            # Extract metadata
+                            metadata = extract_metadata(str(file_path))
+
+                            # Ensure title exists
+                            if 'title' not in metadata or not metadata['title']:
+                                metadata['title'] = file_path.stem
+
+                            # Import book (committed with the rest of its batch)
+                            book = batch.import_file(
+                                file_path,
+                                metadata,
+                                extract_text=not no_text,
+                                extract_cover=not no_cover,
+                                defer=background,
+                                ingest_mode=ingest_mode,
+                            )
+
+                            if book:
+                                imported += 1
+                            else:
+                                skipped += 1  # Already exists
+
+                        except Exception as e:
+                            failed += 1
+                            failed_files.append((str(file_path), str(e)))
+                            logger.debug(f"Failed to import {file_path}: {e}")
+
+                        progress.advance(task)
 
         elapsed = time.time() - start_time
 
@@ -908,6 +1122,10 @@ def import_folder(
         if failed > 0:
             console.print(f"  ✗ Failed: [red]{failed}[/red]")
         console.print(f"  Time: {int(elapsed // 60)}m {int(elapsed % 60)}s")
+        if stats.commits:
+            console.print(f"  Commits: {stats.commits} of up to {batch_size} files "
+                          f"({stats.commits_per_second:.1f} commits/s, "
+                          f"{stats.commit_seconds:.2f}s committing)")
 
         # Log failures to file if requested
         if log_failures and failed_files:
@@ -924,6 +1142,102 @@ def import_folder(
         raise typer.Exit(code=1)
 
 
+@import_app.command(name="watch")
+def import_watch(
+    folder_path: Path = typer.Argument(..., help="Folder to watch for ebooks"),
+    library_path: Optional[Path] = typer.Argument(None, help="Path to book-memex library (uses config default if not specified)"),
+    recursive: bool = typer.Option(True, "--recursive/--no-recursive", "-r", help="Watch subdirectories too"),
+    extensions: Optional[str] = typer.Option("pdf,epub,mobi,azw3,txt", "--extensions", "-e", help="File extensions to import (comma-separated)"),
+    settle: float = typer.Option(5.0, "--settle", help="Seconds a file must be unmodified before it is imported"),
+    poll_interval: float = typer.Option(2.0, "--poll-interval", help="Seconds between folder checks"),
+    once: bool = typer.Option(False, "--once", help="Sync once and exit"),
+    no_text: bool = typer.Option(False, "--no-text", help="Skip text extraction"),
+    no_cover: bool = typer.Option(False, "--no-cover", help="Skip cover extraction"),
+    background: bool = typer.Option(False, "--background", help="Queue text/cover extraction for 'book-memex worker'"),
+    ingest_mode: str = typer.Option("copy", "--ingest-mode", help=INGEST_MODE_HELP),
+    batch_size: Optional[int] = typer.Option(None, "--batch-size", help="Files per transaction (default from config: 100)"),
+):
+    """
+    Keep a library in sync with a folder.
+
+    Remembers the size and mtime of every file it has handled (in the
+    library's cache/watch.db), so each check is a stat walk and only new and
+    changed files are imported. Files are imported once they have not been
+    modified for --settle seconds, so half-written downloads are skipped
+    until they are complete. Removed files are forgotten; their books stay
+    in the library.
+
+    With the optional watchdog package (pip install book-memex[watch])
+    filesystem events trigger checks instead of polling.
+
+    Examples:
+        book-memex import watch ~/Downloads/Books ~/my-library
+        book-memex import watch ~/Inbox ~/my-library --ingest-mode move
+        book-memex import watch ~/Books ~/my-library --once   # cron-friendly
+    """
+    from .library_db import Library
+    from .services.folder_watch import FolderWatcher
+    from .config import load_config
+
+    if not folder_path.is_dir():
+        console.print(f"[red]Error: Not a directory: {folder_path}[/red]")
+        raise typer.Exit(code=1)
+    check_ingest_mode(ingest_mode)
+
+    if batch_size is None:
+        batch_size = load_config().library.import_batch_size
+    if batch_size < 1:
+        console.print("[red]Error: --batch-size must be at least 1[/red]")
+        raise typer.Exit(code=1)
+
+    library_path = resolve_library_path(library_path)
+
+    if not library_path.exists():
+        console.print(f"[red]Error: Library not found: {library_path}[/red]")
+        console.print(f"[yellow]Initialize a library first with: book-memex init {library_path}[/yellow]")
+        raise typer.Exit(code=1)
+
+    lib = Library.open(library_path)
+    watcher = FolderWatcher(
+        lib, folder_path,
+        extensions=[f".{ext.strip().lower()}" for ext in extensions.split(",")],
+        recursive=recursive,
+        settle=settle,
+        batch_size=batch_size,
+        extract_text=not no_text,
+        extract_cover=not no_cover,
+        defer=background,
+        ingest_mode=ingest_mode,
+    )
+
+    def report(result):
+        if result.imported or result.failed or result.removed:
+            line = f"Imported [green]{result.imported}[/green]"
+            if result.failed:
+                line += f", failed [red]{result.failed}[/red]"
+            if result.removed:
+                line += f", removed {result.removed}"
+            console.print(line)
+        if once and result.waiting:
+            console.print(f"[dim]{result.waiting} file(s) still being written; not imported yet[/dim]")
+
+    try:
+        if once:
+            report(watcher.sync())
+        else:
+            console.print(f"[cyan]Watching {folder_path} (Ctrl+C to stop)...[/cyan]")
+            watcher.run(poll_interval=poll_interval, on_sync=report)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Stopped watching[/yellow]")
+    except Exception as e:
+        console.print(f"[red]Error watching folder: {e}[/red]")
+        logger.exception("Folder watch error details:")
+        raise typer.Exit(code=1)
+    finally:
+        watcher.close()
+        lib.close()
+
+
 @import_app.command(name="url")
 def import_url(
     url: str = typer.Argument(..., help="URL to download ebook from"),
@@ -1489,10 +1803,11 @@ def sql(
         book-memex query sql "SELECT title, language FROM books WHERE language = 'en'"
         book-memex query sql "SELECT COUNT(*) as count FROM books" --format json
         book-memex query sql "SELECT a.name, COUNT(*) as books FROM authors a JOIN book_authors ba ON a.id = ba.author_id GROUP BY a.name ORDER BY books DESC" --limit 10
-        book-memex query sql "SELECT * FROM books_fts WHERE books_fts MATCH 'python'" --format csv
+        book-memex query sql "SELECT rowid AS book_id, title FROM books_fts WHERE books_fts MATCH 'python'" --format csv
     """
     import io
     import sqlite3
+    from .db.compression import register_functions
 
     library_path = resolve_library_path(library_path)
     db_path = library_path / 'library.db'
@@ -1522,6 +1837,7 @@ def sql(
     try:
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
+        register_functions(conn)  # bm_decompress() for compressed text columns
         cursor = conn.cursor()
 
         cursor.execute(query)
@@ -4550,7 +4866,9 @@ def serve(
     host: Optional[str] = typer.Option(None, "--host", help="Host to bind to (defaults from config)"),
     port: Optional[int] = typer.Option(None, "--port", help="Port to bind to (defaults from config)"),
     reload: bool = typer.Option(False, "--reload", help="Enable auto-reload for development"),
-    no_open: bool = typer.Option(False, "--no-open", help="Don't auto-open browser")
+    no_open: bool = typer.Option(False, "--no-open", help="Don't auto-open browser"),
+    jobs: Optional[bool] = typer.Option(None, "--jobs/--no-jobs",
+                                        help="Run background extraction jobs in the server (defaults from config)"),
 ):
     """
     Start the web server for library management.
@@ -4622,7 +4940,7 @@ def serve(
             webbrowser.open(url)
 
         # Create app with library
-        app_instance = create_app(library_path)
+        app_instance = create_app(library_path, background_jobs=jobs)
 
         # Run server
         uvicorn.run(
@@ -4642,6 +4960,61 @@ def serve(
         raise typer.Exit(code=1)
 
 
+@app.command()
+def worker(
+    library_path: Optional[Path] = typer.Argument(None, help="Path to library (uses config default if not specified)"),
+    once: bool = typer.Option(False, "--once", help="Exit when no jobs are due instead of polling"),
+    poll_interval: float = typer.Option(2.0, "--poll-interval", help="Seconds between queue checks when idle"),
+    max_jobs: Optional[int] = typer.Option(None, "--max-jobs", help="Exit after running this many jobs"),
+):
+    """
+    Run queued background extraction jobs.
+
+    Imports made with --background (and uploads to a server running with
+    background jobs) only store metadata; this worker then extracts text,
+    covers and thumbnails, highest priority first. Failed jobs are retried
+    with backoff. Several workers can share one library. Job status is
+    visible from the server at /api/jobs.
+
+    Examples:
+        book-memex worker                       # Run until interrupted
+        book-memex worker ~/my-library --once   # Drain the queue and exit
+    """
+    from .library_db import Library
+    from .services.job_service import JobService, default_worker_id
+    import time
+
+    library_path = resolve_library_path(library_path)
+
+    lib = Library.open(library_path)
+    service = JobService(lib.session, lib.library_path)
+    worker_id = default_worker_id()
+    totals = {"done": 0, "failed": 0}
+    try:
+        service.recover()
+        console.print(f"[cyan]Worker {worker_id} processing jobs for {library_path}[/cyan]")
+        while max_jobs is None or sum(totals.values()) < max_jobs:
+            remaining = None if max_jobs is None else max_jobs - sum(totals.values())
+            results = service.run_pending(worker_id, max_jobs=remaining)
+            for key, value in results.items():
+                totals[key] += value
+            if results["done"] or results["failed"]:
+                console.print(f"  [dim]{totals['done']} done, {totals['failed']} failed[/dim]")
+            if once:
+                break
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Worker stopped[/yellow]")
+    finally:
+        counts = service.counts()
+        lib.close()
+
+    console.print(f"[green]✓ Ran {totals['done'] + totals['failed']} job(s): "
+                  f"{totals['done']} done, {totals['failed']} failed[/green]")
+    console.print(f"  Queue: {counts['pending']} pending, {counts['running']} running, "
+                  f"{counts['failed']} failed")
+
+
 @app.command()
 def config(
     show: bool = typer.Option(False, "--show", help="Show current configuration"),
@@ -4652,9 +5025,13 @@ def config(
     set_auto_open: Optional[bool] = typer.Option(None, "--server-auto-open/--no-server-auto-open", help="Auto-open browser on server start"),
     # Library settings
     set_library_path: Optional[str] = typer.Option(None, "--library-path", help="Set default library path"),
+    set_import_batch_size: Optional[int] = typer.Option(None, "--import-batch-size", help="Set files per transaction in folder and Calibre imports"),
     # CLI settings
     set_verbose: Optional[bool] = typer.Option(None, "--cli-verbose/--no-cli-verbose", help="Enable verbose output by default"),
     set_color: Optional[bool] = typer.Option(None, "--cli-color/--no-cli-color", help="Enable colored output by default"),
+    # Database settings
+    set_db_profile: Optional[str] = typer.Option(None, "--db-profile", help="Set SQLite performance profile (safe, balanced, fast)"),
+    set_text_compression: Optional[str] = typer.Option(None, "--text-compression", help="Set codec for stored extracted text (none, zlib, zstd)"),
 ):
     """
     View or edit book-memex configuration.
@@ -4676,6 +5053,12 @@ def config(
 
         # Set multiple values
         book-memex config --library-path ~/my-library --server-port 9000
+
+        # Use the bulk-import SQLite profile
+        book-memex config --db-profile fast
+
+        # Compress newly extracted text (then 'book-memex lib compact' for existing text)
+        book-memex config --text-compression zstd
     """
     from book_memex.config import (
         load_config, save_config, ensure_config_exists,
@@ -4692,7 +5075,8 @@ def config(
     # Check if any settings provided
     has_settings = any([
         set_server_host, set_server_port, set_auto_open is not None,
-        set_library_path, set_verbose is not None, set_color is not None
+        set_library_path, set_import_batch_size, set_verbose is not None,
+        set_color is not None, set_db_profile, set_text_compression,
     ])
 
     # Handle --show or no args (default to show)
@@ -4708,6 +5092,7 @@ def config(
             console.print(f"  Default Path: {config.library.default_path}")
         else:
             console.print(f"  Default Path: [dim]not set[/dim]")
+        console.print(f"  Import Batch Size: {config.library.import_batch_size}")
 
         console.print("\n[bold cyan]Server Settings:[/bold cyan]")
         console.print(f"  Host:        {config.server.host}")
@@ -4720,6 +5105,10 @@ def config(
         console.print(f"  Color:       {config.cli.color}")
         console.print(f"  Page Size:   {config.cli.page_size}")
 
+        console.print("\n[bold cyan]Database Settings:[/bold cyan]")
+        console.print(f"  Profile:     {config.database.profile}")
+        console.print(f"  Compression: {config.database.text_compression}")
+
         console.print(f"\n[dim]Edit with: book-memex config --library-path <path> --server-port <port> etc.[/dim]")
         console.print(f"[dim]Or edit directly: {config_path}[/dim]\n")
         return
@@ -4735,10 +5124,31 @@ def config(
         changes.append(f"Server auto-open: {set_auto_open}")
     if set_library_path is not None:
         changes.append(f"Library path: {set_library_path}")
+    if set_import_batch_size is not None:
+        if set_import_batch_size < 1:
+            console.print("[red]Error: Import batch size must be at least 1[/red]")
+            raise typer.Exit(code=1)
+        changes.append(f"Import batch size: {set_import_batch_size}")
     if set_verbose is not None:
         changes.append(f"CLI verbose: {set_verbose}")
     if set_color is not None:
         changes.append(f"CLI color: {set_color}")
+    if set_db_profile is not None:
+        from book_memex.db.session import PERFORMANCE_PROFILES
+        if set_db_profile not in PERFORMANCE_PROFILES:
+            console.print(f"[red]Error: Unknown database profile: {set_db_profile}[/red]")
+            console.print(f"[yellow]Choose one of: {', '.join(PERFORMANCE_PROFILES)}[/yellow]")
+            raise typer.Exit(code=1)
+        changes.append(f"Database profile: {set_db_profile}")
+
+    if set_text_compression is not None:
+        from book_memex.db.compression import validate_codec
+        try:
+            validate_codec(set_text_compression)
+        except ValueError as e:
+            console.print(f"[red]Error: {e}[/red]")
+            raise typer.Exit(code=1)
+        changes.append(f"Text compression: {set_text_compression}")
 
     if changes:
         console.print("[blue]Updating configuration:[/blue]")
@@ -4750,8 +5160,11 @@ def config(
             server_port=set_server_port,
             server_auto_open=set_auto_open,
             library_default_path=set_library_path,
+            library_import_batch_size=set_import_batch_size,
             cli_verbose=set_verbose,
             cli_color=set_color,
+            database_profile=set_db_profile,
+            database_text_compression=set_text_compression,
         )
         console.print("[green]✓ Configuration updated![/green]")
         console.print("[dim]Use 'book-memex config --show' to view current settings[/dim]")
@@ -6062,7 +6475,7 @@ def extract_cmd(
             raise typer.Exit(code=1)
         from book_memex.services.content_indexer import ContentIndexer
         indexer = ContentIndexer(lib.session, library_path=lib.library_path)
-        result = indexer.index_file(pf)
+        result = indexer.index_file(pf, force=True)
         typer.echo(
             f"status={result.status} "
             f"segments_written={result.segments_written} "
@@ -6076,45 +6489,82 @@ def extract_cmd(
 def reindex_content_cmd(
     book_id: Optional[int] = typer.Option(None, "--book", help="Specific book ID"),
     all_books: bool = typer.Option(False, "--all", help="Reindex every book"),
+    force: bool = typer.Option(
+        False, "--force", help="Re-extract files whose hash and extractor version are unchanged"
+    ),
+    workers: int = typer.Option(1, "--workers", "-w", help="Processes for extraction (1 = sequential)"),
+    resume: bool = typer.Option(
+        False, "--resume", help="Continue an interrupted --all run from its checkpoint"
+    ),
+    batch_size: int = typer.Option(50, "--batch-size", help="Files per transaction and checkpoint"),
     library_path: Optional[Path] = typer.Option(
         None, "--library-path", "-L", help="Library directory"
     ),
 ):
-    """Re-extract segment content for one book or the whole library."""
+    """Re-extract segment content for one book or the whole library.
+
+    Files already indexed from the same file hash by the same extractor
+    version are skipped unless --force is given. --all runs record a
+    checkpoint with every committed batch; after an interruption, --resume
+    continues after the last committed file.
+    """
     if not book_id and not all_books:
         typer.echo("error: specify --book <id> or --all", err=True)
         raise typer.Exit(code=2)
+    if batch_size < 1:
+        typer.echo("error: --batch-size must be at least 1", err=True)
+        raise typer.Exit(code=2)
 
     from .library_db import Library
     from book_memex.db.models import Book
+    from book_memex.services.content_extraction.pdf import enable_process_pool
+    from book_memex.services.reindex_service import ReindexService
 
+    enable_process_pool()
     lib = Library.open(resolve_library_path(library_path))
     try:
-        from book_memex.services.content_indexer import ContentIndexer
-        indexer = ContentIndexer(lib.session, library_path=lib.library_path)
+        service = ReindexService(lib.session, lib.library_path)
 
-        if all_books:
-            books_iter = lib.session.query(Book).all()
-        else:
-            b = lib.session.get(Book, book_id)
-            if b is None:
+        if not all_books:
+            if lib.session.get(Book, book_id) is None:
                 typer.echo(f"Book {book_id} not found", err=True)
                 raise typer.Exit(code=1)
-            books_iter = [b]
+            stats = service.run(workers=1, force=force, book_id=book_id)
+        else:
+            with Progress(
+                "[progress.description]{task.description}",
+                "[progress.percentage]{task.percentage:>3.0f}%",
+                "•",
+                "[progress.completed]{task.completed}/{task.total}",
+                "•",
+                "[cyan]{task.fields[rate]}[/cyan]",
+                "•",
+                "ETA: [cyan]{task.fields[eta]}[/cyan]",
+            ) as progress:
+                task = progress.add_task("[cyan]Reindexing...", total=None,
+                                         rate="-", eta="calculating...")
+
+                def on_progress(stats):
+                    eta = stats.eta_seconds
+                    progress.update(
+                        task,
+                        total=stats.total,
+                        completed=stats.processed,
+                        rate=f"{stats.files_per_second:.1f} files/s",
+                        eta="calculating..." if eta is None else f"{int(eta // 60)}m {int(eta % 60)}s",
+                    )
 
-        books_processed = 0
-        segments_written = 0
-        for book in books_iter:
-            pf = book.primary_file
-            if pf is None:
-                continue
-            result = indexer.index_file(pf)
-            books_processed += 1
-            segments_written += result.segments_written
+                stats = service.run(workers=workers, force=force, resume=resume,
+                                    batch_size=batch_size, on_progress=on_progress)
+            if stats.resumed_from:
+                typer.echo(f"resumed after file_id={stats.resumed_from}")
 
         typer.echo(
-            f"books_processed={books_processed} segments_written={segments_written}"
+            f"books_processed={stats.processed} books_unchanged={stats.unchanged} "
+            f"segments_written={stats.segments_written}"
         )
+        if stats.failed:
+            typer.echo(f"extraction_errors={stats.failed}")
     finally:
         lib.close()
 
@@ -20,6 +20,8 @@ class ServerConfig:
     port: int = 8000
     auto_open_browser: bool = False
     page_size: int = 50
+    worker_threads: int = 8
+    background_jobs: bool = True  # run extraction jobs inside `serve`
 
 
 @dataclass
@@ -34,6 +36,22 @@ class CLIConfig:
 class LibraryConfig:
     """Library-related settings."""
     default_path: Optional[str] = None
+    import_batch_size: int = 100  # files per transaction in folder and Calibre imports
+
+
+@dataclass
+class DatabaseConfig:
+    """SQLite tuning settings.
+
+    ``profile`` names one of the PRAGMA bundles in
+    ``book_memex.db.session.PERFORMANCE_PROFILES`` (safe, balanced, fast).
+    It is applied to every connection the library opens.
+
+    ``text_compression`` is the codec for newly written extracted text
+    (none, zlib, zstd); see ``book_memex.db.compression``.
+    """
+    profile: str = "balanced"
+    text_compression: str = "none"
 
 
 @dataclass
@@ -42,6 +60,7 @@ class EBKConfig:
     server: ServerConfig = field(default_factory=ServerConfig)
     cli: CLIConfig = field(default_factory=CLIConfig)
     library: LibraryConfig = field(default_factory=LibraryConfig)
+    database: DatabaseConfig = field(default_factory=DatabaseConfig)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -49,6 +68,7 @@ class EBKConfig:
             "server": asdict(self.server),
             "cli": asdict(self.cli),
             "library": asdict(self.library),
+            "database": asdict(self.database),
         }
 
     @classmethod
@@ -57,10 +77,12 @@ class EBKConfig:
         server_data = data.get("server", {})
         cli_data = data.get("cli", {})
         library_data = data.get("library", {})
+        database_data = data.get("database", {})
         return cls(
             server=ServerConfig(**server_data),
             cli=CLIConfig(**cli_data),
             library=LibraryConfig(**library_data),
+            database=DatabaseConfig(**database_data),
         )
 
 
@@ -157,6 +179,10 @@ def update_config(
     cli_page_size: Optional[int] = None,
     # Library settings
     library_default_path: Optional[str] = None,
+    library_import_batch_size: Optional[int] = None,
+    # Database settings
+    database_profile: Optional[str] = None,
+    database_text_compression: Optional[str] = None,
 ) -> None:
     """
     Update configuration.
@@ -186,5 +212,13 @@ def update_config(
     # Update library config
     if library_default_path is not None:
         config.library.default_path = library_default_path
+    if library_import_batch_size is not None:
+        config.library.import_batch_size = library_import_batch_size
+
+    # Update database config
+    if database_profile is not None:
+        config.database.profile = database_profile
+    if database_text_compression is not None:
+        config.database.text_compression = database_text_compression
 
     save_config(config)
@@ -9,7 +9,10 @@ from .models import (
     BookContent, TextChunk, Cover, Concept, BookConcept, ConceptRelation,
     ReadingSession, Marginalia, PersonalMetadata, Tag
 )
-from .session import get_session, init_db, close_db
+from .session import (
+    get_session, init_db, close_db, checkpoint_db, PERFORMANCE_PROFILES
+)
+from .compression import TEXT_CODECS
 from .migrations import run_all_migrations, check_migrations
 
 __all__ = [
@@ -33,6 +36,9 @@ __all__ = [
     'get_session',
     'init_db',
     'close_db',
+    'checkpoint_db',
+    'PERFORMANCE_PROFILES',
+    'TEXT_CODECS',
     'run_all_migrations',
     'check_migrations'
 ]
@@ -0,0 +1,217 @@
+"""
+Transparent compression for the large text columns.
+
+``extracted_texts.content`` and ``book_content.content`` hold most of a
+library's bytes. With ``database.text_compression`` set to ``zlib`` or
+``zstd``, new values are stored as BLOBs (one codec tag byte followed by
+the compressed UTF-8 text); with ``none`` they stay plain TEXT. The two
+forms can be mixed freely, so switching codecs never needs a rewrite;
+``book-memex lib compact`` rewrites existing rows in the current codec.
+
+Compression happens inside SQLite: every library connection gets two SQL
+functions,
+
+- ``bm_compress(text)``: compress with the connection's codec
+- ``bm_decompress(value)``: return the text of a stored value
+
+:class:`CompressedText` wraps bound values in ``bm_compress()`` and
+decompresses results in Python, so ORM attributes are always ``str``. Once
+a library stores compressed text, the FTS triggers and the books_fts_source
+view index ``bm_decompress(content)``, which keeps the external-content FTS
+tables searchable; writing to books, files, extracted_texts or book_content
+then needs these functions, so tools without them (the sqlite3 shell) can
+only read the library. With ``none`` and no compressed values the triggers
+use no custom functions (see ``migrations.sync_text_decompression``). Raw
+SQL reading these columns must select ``bm_decompress(content)`` itself.
+
+zstd needs the optional ``zstandard`` package.
+"""
+
+import zlib
+from typing import Callable, Dict, Optional, Union
+
+from sqlalchemy import Text, event, func, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+TEXT_CODECS = ('none', 'zlib', 'zstd')
+DEFAULT_CODEC = 'none'
+
+# Columns stored through CompressedText, as (table, column)
+COMPRESSED_COLUMNS = (('extracted_texts', 'content'), ('book_content', 'content'))
+
+# Values shorter than this (in UTF-8 bytes) are never worth compressing
+MIN_COMPRESS_BYTES = 256
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 6
+
+_TAGS = {'zlib': b'z', 'zstd': b's'}
+
+
+def validate_codec(codec: str) -> str:
+    """
+    Check a codec name.
+
+    Raises:
+        ValueError: If the codec is unknown, or is zstd without zstandard
+    """
+    if codec not in TEXT_CODECS:
+        raise ValueError(
+            f"Unknown text compression {codec!r}; expected one of: {', '.join(TEXT_CODECS)}"
+        )
+    if codec == 'zstd' and zstandard is None:
+        raise ValueError(
+            "zstd text compression needs the zstandard package: "
+            "pip install book-memex[compression]"
+        )
+    return codec
+
+
+def get_text_codec(name: Optional[str] = None) -> str:
+    """
+    Resolve the text compression codec.
+
+    Args:
+        name: Codec name. If None, the ``database.text_compression`` value
+              from the user config is used.
+
+    Raises:
+        ValueError: If the codec is unknown or unavailable
+    """
+    if name is None:
+        from ..config import load_config
+        name = load_config().database.text_compression or DEFAULT_CODEC
+    return validate_codec(name)
+
+
+def compress_text(value: Union[str, bytes, None], codec: str) -> Union[str, bytes, None]:
+    """
+    Encode text for storage with ``codec``.
+
+    Returns the text unchanged for ``none``, for short values and for values
+    that do not shrink. Already-encoded values (bytes) are passed through.
+    """
+    if value is None or codec == 'none' or not isinstance(value, str):
+        return value
+    raw = value.encode('utf-8')
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return value
+    if codec == 'zlib':
+        payload = zlib.compress(raw, ZLIB_LEVEL)
+    else:
+        payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    if len(payload) + 1 >= len(raw):
+        return value
+    return _TAGS[codec] + payload
+
+
+def decompress_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """
+    Decode a stored value to text.
+
+    Raises:
+        ValueError: If a BLOB carries an unknown codec tag
+        RuntimeError: If a zstd value is read without zstandard installed
+    """
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    tag, payload = value[:1], value[1:]
+    if tag == _TAGS['zlib']:
+        return zlib.decompress(payload).decode('utf-8')
+    if tag == _TAGS['zstd']:
+        if zstandard is None:
+            raise RuntimeError(
+                "This library holds zstd-compressed text; install zstandard "
+                "(pip install book-memex[compression]) to read it"
+            )
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    raise ValueError(f"Unknown text compression tag {tag!r}")
+
+
+def register_functions(dbapi_conn, codec: str = DEFAULT_CODEC) -> None:
+    """Register bm_compress() and bm_decompress() on a raw SQLite connection."""
+    dbapi_conn.create_function(
+        'bm_compress', 1, lambda value: compress_text(value, codec), deterministic=True
+    )
+    dbapi_conn.create_function('bm_decompress', 1, decompress_text, deterministic=True)
+
+
+def install_functions(engine: Engine, codec: str = DEFAULT_CODEC) -> None:
+    """Register the compression SQL functions on every connection of ``engine``."""
+
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_conn, connection_record):
+        register_functions(dbapi_conn, codec)
+
+
+class CompressedText(TypeDecorator):
+    """TEXT column stored through bm_compress(); always loads as ``str``."""
+
+    impl = Text
+    cache_ok = True
+
+    def bind_expression(self, bindvalue):
+        return func.bm_compress(bindvalue, type_=Text)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+
+def compact_text(engine: Engine, codec: str, batch_size: int = 1000,
+                 on_progress: Optional[Callable[[str, int, int], None]] = None
+                 ) -> Dict[str, Dict[str, int]]:
+    """
+    Rewrite every compressed-text column value with ``codec``.
+
+    Rows are rewritten in id ranges of ``batch_size``, one transaction
+    each. The book_content FTS update trigger only fires when the text
+    itself changes, so the FTS index is left alone.
+
+    Args:
+        engine: Library engine
+        codec: Target codec (``none`` stores plain text again)
+        batch_size: Rows per transaction
+        on_progress: Called with (table, rows done, total rows)
+
+    Returns:
+        Dict mapping table name to ``rows``/``bytes_before``/``bytes_after``
+
+    Raises:
+        ValueError: If the codec is unknown or unavailable
+    """
+    validate_codec(codec)
+    results = {}
+    for table, column in COMPRESSED_COLUMNS:
+        size_sql = text(f"SELECT COUNT(*), COALESCE(SUM(length(CAST({column} AS BLOB))), 0), "
+                        f"COALESCE(MAX(id), 0) FROM {table}")
+        with engine.connect() as conn:
+            rows, bytes_before, max_id = conn.execute(size_sql).one()
+
+        done = 0
+        for lo in range(0, max_id, batch_size):
+            with engine.begin() as conn:
+                conn.connection.driver_connection.create_function(
+                    'bm_recompress', 1,
+                    lambda value: compress_text(decompress_text(value), codec),
+                    deterministic=True,
+                )
+                result = conn.execute(
+                    text(f"UPDATE {table} SET {column} = bm_recompress({column}) "
+                         f"WHERE id > :lo AND id <= :hi"),
+                    {"lo": lo, "hi": lo + batch_size},
+                )
+                done += result.rowcount
+            if on_progress is not None:
+                on_progress(table, done, rows)
+
+        with engine.connect() as conn:
+            bytes_after = conn.execute(size_sql).one()[1]
+        results[table] = {"rows": rows, "bytes_before": bytes_before, "bytes_after": bytes_after}
+    return results
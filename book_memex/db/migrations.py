@@ -18,10 +18,12 @@ from typing import Set
 
 import logging
 
+from .compression import COMPRESSED_COLUMNS, install_functions
+
 logger = logging.getLogger(__name__)
 
 # Current schema version - increment when adding new migrations
-CURRENT_SCHEMA_VERSION = 12
+CURRENT_SCHEMA_VERSION = 20
 
 
 def get_engine(library_path: Path) -> Engine:
@@ -31,7 +33,10 @@ def get_engine(library_path: Path) -> Engine:
         raise FileNotFoundError(f"Database not found at {db_path}")
 
     db_url = f'sqlite:///{db_path}'
-    return create_engine(db_url, echo=False)
+    engine = create_engine(db_url, echo=False)
+    # The FTS triggers may call bm_decompress() (see sync_text_decompression)
+    install_functions(engine)
+    return engine
 
 
 def table_exists(engine: Engine, table_name: str) -> bool:
@@ -921,6 +926,699 @@ def migrate_add_book_content_fts(library_path: Path, dry_run: bool = False) -> b
     return True
 
 
+def migrate_add_book_neighbors(library_path: Path, dry_run: bool = False) -> bool:
+    """
+    Add book_neighbors and book_neighbor_state tables.
+
+    These hold precomputed top-k similar books per similarity preset,
+    filled by ``book-memex lib build-neighbors``.
+
+    Args:
+        library_path: Path to library directory
+        dry_run: If True, only check if migration is needed
+
+    Returns:
+        True if migration was applied (or would be applied in dry_run),
+        False if already up-to-date
+    """
+    engine = get_engine(library_path)
+
+    if table_exists(engine, 'book_neighbors') and table_exists(engine, 'book_neighbor_state'):
+        logger.debug("Neighbor tables already exist, skipping migration")
+        return False
+
+    if dry_run:
+        logger.debug("Migration needed: neighbor tables do not exist")
+        return True
+
+    logger.debug("Applying migration: Adding book_neighbors tables")
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS book_neighbors (
+                book_id INTEGER NOT NULL,
+                preset VARCHAR(50) NOT NULL,
+                rank INTEGER NOT NULL,
+                neighbor_id INTEGER NOT NULL,
+                score FLOAT NOT NULL,
+                PRIMARY KEY (book_id, preset, rank),
+                FOREIGN KEY(book_id) REFERENCES books (id) ON DELETE CASCADE
+            )
+        """))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_book_neighbors_neighbor "
+            "ON book_neighbors (preset, neighbor_id)"
+        ))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS book_neighbor_state (
+                book_id INTEGER NOT NULL,
+                preset VARCHAR(50) NOT NULL,
+                token TEXT NOT NULL,
+                fit_id VARCHAR(32) NOT NULL,
+                top_k INTEGER NOT NULL,
+                computed_at DATETIME NOT NULL,
+                PRIMARY KEY (book_id, preset),
+                FOREIGN KEY(book_id) REFERENCES books (id) ON DELETE CASCADE
+            )
+        """))
+
+        logger.debug("Migration completed successfully")
+
+    return True
+
+
+def migrate_add_jobs(library_path: Path, dry_run: bool = False) -> bool:
+    """
+    Add the jobs table.
+
+    Holds background text, cover and thumbnail extraction jobs queued by
+    imports with deferred extraction and run by ``book-memex worker``.
+
+    Args:
+        library_path: Path to library directory
+        dry_run: If True, only check if migration is needed
+
+    Returns:
+        True if migration was applied (or would be applied in dry_run),
+        False if already up-to-date
+    """
+    engine = get_engine(library_path)
+
+    if table_exists(engine, 'jobs'):
+        logger.debug("Jobs table already exists, skipping migration")
+        return False
+
+    if dry_run:
+        logger.debug("Migration needed: jobs table does not exist")
+        return True
+
+    logger.debug("Applying migration: Adding jobs table")
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER NOT NULL PRIMARY KEY,
+                kind VARCHAR(20) NOT NULL,
+                file_id INTEGER NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                priority INTEGER NOT NULL,
+                attempts INTEGER NOT NULL,
+                max_attempts INTEGER NOT NULL,
+                run_after DATETIME,
+                last_error TEXT,
+                worker VARCHAR(100),
+                created_at DATETIME NOT NULL,
+                started_at DATETIME,
+                finished_at DATETIME,
+                FOREIGN KEY(file_id) REFERENCES files (id) ON DELETE CASCADE
+            )
+        """))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_file_id ON jobs (file_id)"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, priority, id)"
+        ))
+
+        logger.debug("Migration completed successfully")
+
+    return True
+
+
+def migrate_add_partial_hash(library_path: Path, dry_run: bool = False) -> bool:
+    """
+    Add the partial_hash column to the files table.
+
+    Imports compare partial hashes (size plus first/last 64 KiB) before
+    computing a full SHA256. Existing rows are backfilled from their library
+    copies; rows whose copy is missing stay NULL, which imports treat as a
+    possible match.
+
+    Args:
+        library_path: Path to library directory
+        dry_run: If True, only check if migration is needed
+
+    Returns:
+        True if migration was applied (or would be applied in dry_run),
+        False if already up-to-date
+    """
+    from ..services.hash_cache import partial_hash
+
+    engine = get_engine(library_path)
+    inspector = inspect(engine)
+
+    if 'files' not in inspector.get_table_names():
+        logger.error("Files table does not exist")
+        return False
+
+    columns = [col['name'] for col in inspector.get_columns('files')]
+    if 'partial_hash' in columns:
+        logger.debug("Files.partial_hash column already exists, skipping migration")
+        return False
+
+    if dry_run:
+        logger.debug("Migration needed: files.partial_hash column does not exist")
+        return True
+
+    logger.debug("Applying migration: Adding partial_hash column to files table")
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE files ADD COLUMN partial_hash VARCHAR(64)"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_files_partial_hash ON files (partial_hash)"
+        ))
+
+        rows = conn.execute(text("SELECT id, path FROM files")).fetchall()
+        for file_id, path in rows:
+            file_path = Path(library_path) / path
+            if not file_path.exists():
+                continue
+            conn.execute(
+                text("UPDATE files SET partial_hash = :h WHERE id = :id"),
+                {"h": partial_hash(file_path), "id": file_id},
+            )
+
+        logger.debug(f"Migration completed successfully ({len(rows)} files backfilled)")
+
+    return True
+
+
+def migrate_add_content_fingerprint(library_path: Path, dry_run: bool = False) -> bool:
+    """
+    Add the content_fingerprint column to the files table.
+
+    ContentIndexer records "<file_hash>:<extractor version>" there after
+    writing a file's BookContent rows, and reindex-content skips files whose
+    fingerprint is unchanged. Files whose existing rows all come from one
+    (non-legacy) extractor version are backfilled with that version.
+
+    Args:
+        library_path: Path to library directory
+        dry_run: If True, only check if migration is needed
+
+    Returns:
+        True if migration was applied (or would be applied in dry_run),
+        False if already up-to-date
+    """
+    engine = get_engine(library_path)
+    inspector = inspect(engine)
+
+    if 'files' not in inspector.get_table_names():
+        logger.error("Files table does not exist")
+        return False
+
+    columns = [col['name'] for col in inspector.get_columns('files')]
+    if 'content_fingerprint' in columns:
+        logger.debug("Files.content_fingerprint column already exists, skipping migration")
+        return False
+
+    if dry_run:
+        logger.debug("Migration needed: files.content_fingerprint column does not exist")
+        return True
+
+    logger.debug("Applying migration: Adding content_fingerprint column to files table")
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE files ADD COLUMN content_fingerprint VARCHAR(100)"))
+
+        if 'book_content' in inspector.get_table_names():
+            result = conn.execute(text("""
+                UPDATE files
+                SET content_fingerprint = file_hash || ':' || (
+                    SELECT MIN(extractor_version) FROM book_content
+                    WHERE book_content.file_id = files.id
+                )
+                WHERE id IN (
+                    SELECT file_id FROM book_content
+                    GROUP BY file_id
+                    HAVING COUNT(DISTINCT extractor_version) = 1
+                       AND MIN(extractor_version) != 'legacy'
+                )
+            """))
+            logger.debug(f"Migration completed successfully ({result.rowcount} files backfilled)")
+
+    return True
+
+
+def migrate_add_reindex_checkpoints(library_path: Path, dry_run: bool = False) -> bool:
+    """
+    Add the reindex_checkpoints table.
+
+    Records the last file a library-wide ``reindex-content`` run committed,
+    so an interrupted run can be resumed with ``--resume``.
+
+    Args:
+        library_path: Path to library directory
+        dry_run: If True, only check if migration is needed
+
+    Returns:
+        True if migration was applied (or would be applied in dry_run),
+        False if already up-to-date
+    """
+    engine = get_engine(library_path)
+
+    if table_exists(engine, 'reindex_checkpoints'):
+        logger.debug("Reindex checkpoints table already exists, skipping migration")
+        return False
+
+    if dry_run:
+        logger.debug("Migration needed: reindex_checkpoints table does not exist")
+        return True
+
+    logger.debug("Applying migration: Adding reindex_checkpoints table")
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS reindex_checkpoints (
+                name VARCHAR(50) NOT NULL PRIMARY KEY,
+                last_file_id INTEGER NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                force BOOLEAN NOT NULL,
+                files_done INTEGER NOT NULL,
+                started_at DATETIME NOT NULL,
+                updated_at DATETIME NOT NULL
+            )
+        """))
+
+        logger.debug("Migration completed successfully")
+
+    return True
+
+
+def _stored_text(column: str, decompress: bool) -> str:
+    """SQL reading a compressed-text ``column`` as text."""
+    return f"bm_decompress({column})" if decompress else column
+
+
+def _has_compressed_text(conn) -> bool:
+    """Whether any compressed-text column holds a compressed (BLOB) value."""
+    tables = {row[0] for row in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type='table'"
+    ))}
+    return any(
+        conn.execute(text(
+            f"SELECT EXISTS (SELECT 1 FROM {table} WHERE typeof({column}) = 'blob')"
+        )).scalar()
+        for table, column in COMPRESSED_COLUMNS if table in tables
+    )
+
+
+def _create_book_content_fts_triggers(conn, decompress: bool) -> None:
+    """(Re)create the book_content triggers that keep book_content_fts in sync."""
+    old_text, new_text = _stored_text('old.content', decompress), _stored_text('new.content', decompress)
+    for trigger in ('book_content_ai', 'book_content_au', 'book_content_ad'):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+
+    conn.execute(text(f"""
+        CREATE TRIGGER book_content_ai AFTER INSERT ON book_content BEGIN
+            INSERT INTO book_content_fts (rowid, text, title, book_id, content_id)
+            VALUES (new.id, {new_text}, COALESCE(new.title, ''),
+                    (SELECT book_id FROM files WHERE id = new.file_id), new.id);
+        END
+    """))
+
+    conn.execute(text(f"""
+        CREATE TRIGGER book_content_au AFTER UPDATE OF content, title, file_id ON book_content
+        WHEN old.title IS NOT new.title
+          OR old.file_id IS NOT new.file_id
+          OR {old_text} IS NOT {new_text}
+        BEGIN
+            INSERT INTO book_content_fts (book_content_fts, rowid, text, title, book_id, content_id)
+            VALUES ('delete', old.id, {old_text}, COALESCE(old.title, ''),
+                    (SELECT book_id FROM files WHERE id = old.file_id), old.id);
+            INSERT INTO book_content_fts (rowid, text, title, book_id, content_id)
+            VALUES (new.id, {new_text}, COALESCE(new.title, ''),
+                    (SELECT book_id FROM files WHERE id = new.file_id), new.id);
+        END
+    """))
+
+    conn.execute(text(f"""
+        CREATE TRIGGER book_content_ad AFTER DELETE ON book_content BEGIN
+            INSERT INTO book_content_fts (book_content_fts, rowid, text, title, book_id, content_id)
+            VALUES ('delete', old.id, {old_text}, COALESCE(old.title, ''),
+                    (SELECT book_id FROM files WHERE id = old.file_id), old.id);
+        END
+    """))
+
+
+def migrate_decompress_book_content_fts(library_path: Path, dry_run: bool = False) -> bool:
+    """
+    Make the book_content FTS triggers index decompressed text.
+
+    book_content.content may hold compressed BLOBs (see
+    ``book_memex.db.compression``), so once a library stores compressed
+    text the triggers feed ``bm_decompress(content)`` to book_content_fts
+    (see :func:`sync_text_decompression`). The update trigger now only
+    fires when the text, title or file changes, which lets ``lib compact``
+    rewrite stored values without touching the index.
+
+    Args:
+        library_path: Path to library directory
+        dry_run: If True, only check if migration is needed
+
+    Returns:
+        True if migration was applied (or would be applied in dry_run),
+        False if already up-to-date
+    """
+    engine = get_engine(library_path)
+
+    if not table_exists(engine, 'book_content_fts'):
+        logger.debug("No book_content_fts table, skipping migration")
+        return False
+
+    # The update trigger of migration 12 has no WHEN clause
+    with engine.connect() as conn:
+        trigger_sql = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type='trigger' AND name='book_content_au'"
+        )).scalar()
+    if trigger_sql and 'WHEN' in trigger_sql:
+        logger.debug("book_content FTS triggers already recreated, skipping migration")
+        return False
+
+    if dry_run:
+        logger.debug("Migration needed: book_content FTS triggers index raw content")
+        return True
+
+    logger.debug("Applying migration: Recreating book_content FTS triggers")
+
+    with engine.begin() as conn:
+        _create_book_content_fts_triggers(conn, _has_compressed_text(conn))
+
+        logger.debug("Migration completed successfully")
+
+    return True
+
+
+# Characters of a book's extracted text indexed in books_fts
+BOOKS_FTS_TEXT_CHARS = 50000
+
+
+def _books_fts_delete(book_ids: str) -> str:
+    """Statement removing the books_fts rows of ``book_ids`` (an SQL set)."""
+    return f"""
+        INSERT INTO books_fts (books_fts, rowid, title, description, extracted_text)
+        SELECT 'delete', book_id, title, description, extracted_text
+        FROM books_fts_source WHERE book_id IN ({book_ids});"""
+
+
+def _books_fts_insert(book_ids: str) -> str:
+    """Statement indexing the current books_fts_source rows of ``book_ids``."""
+    return f"""
+        INSERT INTO books_fts (rowid, title, description, extracted_text)
+        SELECT book_id, title, description, extracted_text
+        FROM books_fts_source WHERE book_id IN ({book_ids});"""
+
+
+def _create_books_fts_source(conn, decompress: bool) -> None:
+    """
+    (Re)create the books_fts_source view and the extracted_texts update triggers.
+
+    These are the parts of the books_fts sync that read extracted text, so
+    they only call bm_decompress() when ``decompress`` is set.
+    """
+    extracted = _stored_text('et.content', decompress)
+    conn.execute(text("DROP VIEW IF EXISTS books_fts_source"))
+    conn.execute(text(f"""
+        CREATE VIEW books_fts_source AS
+        SELECT b.id AS book_id,
+               COALESCE(b.title, '') AS title,
+               COALESCE(b.description, '') AS description,
+               COALESCE((
+                   SELECT substr({extracted}, 1, {BOOKS_FTS_TEXT_CHARS})
+                   FROM extracted_texts et
+                   JOIN files f ON f.id = et.file_id
+                   WHERE f.book_id = b.id
+                   ORDER BY et.id DESC
+                   LIMIT 1
+               ), '') AS extracted_text
+        FROM books b
+    """))
+
+    # Skipped when only the stored encoding changes (lib compact)
+    changed = (f"old.file_id IS NOT new.file_id OR "
+               f"{_stored_text('old.content', decompress)} IS NOT {_stored_text('new.content', decompress)}")
+    book_ids = 'SELECT book_id FROM files WHERE id IN (old.file_id, new.file_id)'
+    triggers = {
+        "books_fts_texts_bu": f"""
+            BEFORE UPDATE OF content, file_id ON extracted_texts WHEN {changed}
+            BEGIN {_books_fts_delete(book_ids)} END""",
+        "books_fts_texts_au": f"""
+            AFTER UPDATE OF content, file_id ON extracted_texts WHEN {changed}
+            BEGIN {_books_fts_insert(book_ids)} END""",
+    }
+    for name, body in triggers.items():
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        conn.execute(text(f"CREATE TRIGGER {name} {body}"))
+
+
+def migrate_books_fts_external_content(library_path: Path, dry_run: bool = False) -> bool:
+    """
+    Rebuild books_fts as an external-content FTS5 table kept in sync by triggers.
+
+    books_fts used to be a standalone FTS5 table holding its own copy of
+    each book's title, description and extracted text, written only when
+    text was extracted. It now indexes the ``books_fts_source`` view (one
+    row per book; rowid = book id) and triggers on books, files and
+    extracted_texts keep it current, so title-only books are searchable
+    and metadata edits show up immediately.
+
+    A book's indexed text is the first BOOKS_FTS_TEXT_CHARS characters of
+    its most recently added extracted text. External-content deletes must
+    repeat the indexed values exactly, so every change first removes the
+    affected books' rows in a BEFORE trigger (while the view still shows
+    the old values) and re-indexes them from the view in an AFTER trigger.
+    Cascaded deletes are no-ops: once a book or file is gone the view no
+    longer returns it. The view reads text through bm_decompress() only
+    while the library stores compressed text (see
+    :func:`sync_text_decompression`).
+
+    Args:
+        library_path: Path to library directory
+        dry_run: If True, only check if migration is needed
+
+    Returns:
+        True if migration was applied (or would be applied in dry_run),
+        False if already up-to-date
+    """
+    engine = get_engine(library_path)
+
+    with engine.connect() as conn:
+        fts_sql = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='books_fts'"
+        )).scalar()
+    if fts_sql and 'books_fts_source' in fts_sql:
+        logger.debug("books_fts already uses external content, skipping migration")
+        return False
+
+    if dry_run:
+        logger.debug("Migration needed: books_fts is a standalone FTS table")
+        return True
+
+    logger.debug("Applying migration: Rebuilding books_fts over books_fts_source")
+
+    book_of = "SELECT book_id FROM files WHERE id = {}.file_id"
+    has_file = "EXISTS (SELECT 1 FROM files WHERE id = {}.file_id)"
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS books_fts"))
+        _create_books_fts_source(conn, _has_compressed_text(conn))
+
+        conn.execute(text("""
+            CREATE VIRTUAL TABLE books_fts USING fts5(
+                title,
+                description,
+                extracted_text,
+                content='books_fts_source',
+                content_rowid='book_id',
+                tokenize='porter unicode61'
+            )
+        """))
+        conn.execute(text("INSERT INTO books_fts (books_fts) VALUES ('rebuild')"))
+
+        triggers = {
+            # books: new rows, title/description edits, deletes
+            "books_fts_books_ai": f"""
+                AFTER INSERT ON books BEGIN {_books_fts_insert('new.id')} END""",
+            "books_fts_books_bu": f"""
+                BEFORE UPDATE OF title, description ON books
+                WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+                BEGIN {_books_fts_delete('old.id')} END""",
+            "books_fts_books_au": f"""
+                AFTER UPDATE OF title, description ON books
+                WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+                BEGIN {_books_fts_insert('new.id')} END""",
+            "books_fts_books_bd": f"""
+                BEFORE DELETE ON books BEGIN {_books_fts_delete('old.id')} END""",
+
+            # files: deleting a file drops its text; moving it (merges) moves its text
+            "books_fts_files_bd": f"""
+                BEFORE DELETE ON files BEGIN {_books_fts_delete('old.book_id')} END""",
+            "books_fts_files_ad": f"""
+                AFTER DELETE ON files BEGIN {_books_fts_insert('old.book_id')} END""",
+            "books_fts_files_bu": f"""
+                BEFORE UPDATE OF book_id ON files WHEN old.book_id IS NOT new.book_id
+                BEGIN {_books_fts_delete('old.book_id, new.book_id')} END""",
+            "books_fts_files_au": f"""
+                AFTER UPDATE OF book_id ON files WHEN old.book_id IS NOT new.book_id
+                BEGIN {_books_fts_insert('old.book_id, new.book_id')} END""",
+
+            # extracted_texts: skipped when the file is already gone (a
+            # cascade from files, handled by the files triggers); updates
+            # are handled by _create_books_fts_source
+            "books_fts_texts_bi": f"""
+                BEFORE INSERT ON extracted_texts WHEN {has_file.format('new')}
+                BEGIN {_books_fts_delete(book_of.format('new'))} END""",
+            "books_fts_texts_ai": f"""
+                AFTER INSERT ON extracted_texts WHEN {has_file.format('new')}
+                BEGIN {_books_fts_insert(book_of.format('new'))} END""",
+            "books_fts_texts_bd": f"""
+                BEFORE DELETE ON extracted_texts WHEN {has_file.format('old')}
+                BEGIN {_books_fts_delete(book_of.format('old'))} END""",
+            "books_fts_texts_ad": f"""
+                AFTER DELETE ON extracted_texts WHEN {has_file.format('old')}
+                BEGIN {_books_fts_insert(book_of.format('old'))} END""",
+        }
+        for name, body in triggers.items():
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(f"CREATE TRIGGER {name} {body}"))
+
+        logger.debug("Migration completed successfully")
+
+    return True
+
+
+# Prefix lengths indexed by the FTS5 tables, so "ab*", "abc*" and "abcd*"
+# queries read one doclist instead of merging every matching term
+FTS_PREFIXES = '2 3 4'
+
+# (table, trigger event) pairs that can change the typeahead suggestions
+_SUGGESTION_SOURCES = [
+    ('books', 'INSERT'), ('books', 'DELETE'), ('books', 'UPDATE OF title, archived_at'),
+    ('authors', 'DELETE'), ('authors', 'UPDATE OF name, archived_at'),
+    ('subjects', 'DELETE'), ('subjects', 'UPDATE OF name, archived_at'),
+    ('tags', 'DELETE'), ('tags', 'UPDATE OF path, archived_at'),
+    ('book_authors', 'INSERT'), ('book_authors', 'DELETE'),
+    ('book_subjects', 'INSERT'), ('book_subjects', 'DELETE'),
+    ('book_tags', 'INSERT'), ('book_tags', 'DELETE'),
+]
+
+
+def migrate_add_suggestions(library_path: Path, dry_run: bool = False) -> bool:
+    """
+    Add FTS5 prefix indexes and the typeahead suggestion index.
+
+    - books_fts and book_content_fts are rebuilt with ``prefix='2 3 4'``.
+    - suggestions / suggestion_state tables plus ``suggestions_fts``, a
+      prefix-indexed external-content FTS5 table over suggestion labels.
+      The suggestions themselves are built by ``SuggestService``.
+    - Triggers on books, authors, subjects, tags and their link tables mark
+      the suggestions stale.
+
+    Args:
+        library_path: Path to library directory
+        dry_run: If True, only check if migration is needed
+
+    Returns:
+        True if migration was applied (or would be applied in dry_run),
+        False if already up-to-date
+    """
+    engine = get_engine(library_path)
+
+    with engine.connect() as conn:
+        fts_sql = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='books_fts'"
+        )).scalar() or ''
+    if table_exists(engine, 'suggestions_fts') and 'prefix' in fts_sql:
+        logger.debug("Suggestion index and FTS prefixes already exist, skipping migration")
+        return False
+
+    if dry_run:
+        logger.debug("Migration needed: suggestion index or FTS prefixes missing")
+        return True
+
+    logger.debug("Applying migration: Adding FTS prefix indexes and suggestions")
+
+    has_book_content_fts = table_exists(engine, 'book_content_fts')
+    with engine.begin() as conn:
+        # books_fts: triggers on other tables refer to it by name and keep working
+        conn.execute(text("DROP TABLE IF EXISTS books_fts"))
+        conn.execute(text(f"""
+            CREATE VIRTUAL TABLE books_fts USING fts5(
+                title,
+                description,
+                extracted_text,
+                content='books_fts_source',
+                content_rowid='book_id',
+                tokenize='porter unicode61',
+                prefix='{FTS_PREFIXES}'
+            )
+        """))
+        conn.execute(text("INSERT INTO books_fts (books_fts) VALUES ('rebuild')"))
+
+        if has_book_content_fts:
+            # Column names differ from book_content, so no 'rebuild' here
+            conn.execute(text("DROP TABLE book_content_fts"))
+            conn.execute(text(f"""
+                CREATE VIRTUAL TABLE book_content_fts USING fts5(
+                    text,
+                    title,
+                    book_id UNINDEXED,
+                    content_id UNINDEXED,
+                    content='book_content',
+                    content_rowid='id',
+                    tokenize='porter unicode61',
+                    prefix='{FTS_PREFIXES}'
+                )
+            """))
+            conn.execute(text("""
+                INSERT INTO book_content_fts (rowid, text, title, book_id, content_id)
+                SELECT bc.id, bm_decompress(bc.content), COALESCE(bc.title, ''),
+                       (SELECT book_id FROM files WHERE id = bc.file_id), bc.id
+                FROM book_content bc
+            """))
+
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS suggestions (
+                id INTEGER NOT NULL PRIMARY KEY,
+                kind VARCHAR(20) NOT NULL,
+                label VARCHAR(500) NOT NULL,
+                ref_id INTEGER NOT NULL,
+                weight INTEGER NOT NULL
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS suggestion_state (
+                id INTEGER NOT NULL PRIMARY KEY,
+                stale BOOLEAN NOT NULL,
+                built_at DATETIME
+            )
+        """))
+        conn.execute(text("DROP TABLE IF EXISTS suggestions_fts"))
+        conn.execute(text(f"""
+            CREATE VIRTUAL TABLE suggestions_fts USING fts5(
+                label,
+                content='suggestions',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='{FTS_PREFIXES}'
+            )
+        """))
+        conn.execute(text("INSERT INTO suggestions_fts (suggestions_fts) VALUES ('rebuild')"))
+        conn.execute(text("INSERT OR IGNORE INTO suggestion_state (id, stale) VALUES (1, 1)"))
+        conn.execute(text("UPDATE suggestion_state SET stale = 1"))
+
+        for table, event in _SUGGESTION_SOURCES:
+            name = f"suggestions_stale_{table}_{event.split()[0].lower()}"
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(f"""
+                CREATE TRIGGER {name} AFTER {event} ON {table} BEGIN
+                    UPDATE suggestion_state SET stale = 1 WHERE id = 1 AND stale = 0;
+                END
+            """))
+
+        logger.debug("Migration completed successfully")
+
+    return True
+
+
 # Migration registry: (version, name, function)
 # Add new migrations here with incrementing version numbers
 MIGRATIONS = [
@@ -936,6 +1634,14 @@ MIGRATIONS = [
     (10, 'add_uri_columns', migrate_add_uri_columns),
     (11, 'rename_text_chunks_to_book_content', migrate_rename_text_chunks_to_book_content),
     (12, 'add_book_content_fts', migrate_add_book_content_fts),
+    (13, 'add_book_neighbors', migrate_add_book_neighbors),
+    (14, 'add_jobs', migrate_add_jobs),
+    (15, 'add_partial_hash', migrate_add_partial_hash),
+    (16, 'add_content_fingerprint', migrate_add_content_fingerprint),
+    (17, 'add_reindex_checkpoints', migrate_add_reindex_checkpoints),
+    (18, 'decompress_book_content_fts', migrate_decompress_book_content_fts),
+    (19, 'books_fts_external_content', migrate_books_fts_external_content),
+    (20, 'add_suggestions', migrate_add_suggestions),
 ]
 
 
@@ -996,3 +1702,49 @@ def check_migrations(library_path: Path) -> dict:
         Dict mapping migration name to whether it's needed
     """
     return run_all_migrations(library_path, dry_run=True)
+
+
+def sync_text_decompression(library_path: Path, codec: str) -> bool:
+    """
+    Make the FTS triggers read extracted text through bm_decompress() only when needed.
+
+    The books_fts_source view and the book_content FTS triggers run on
+    every write to books, files, extracted_texts and book_content. With
+    compression off they read text as stored, so tools that open
+    library.db without the book-memex SQL functions (the sqlite3 shell,
+    DB browsers) can still edit it. They call bm_decompress() once
+    ``codec`` compresses new text or compressed values are stored; the
+    switch back only happens when no compressed value is left (after
+    ``lib compact --codec none``).
+
+    Args:
+        library_path: Path to library directory
+        codec: Codec the library is opened with
+
+    Returns:
+        True if the view and triggers were recreated
+    """
+    engine = get_engine(library_path)
+    with engine.begin() as conn:
+        current = dict(conn.execute(text(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE name IN ('books_fts_source', 'book_content_au')"
+        )).all())
+        decompressing = {name: 'bm_decompress' in sql for name, sql in current.items()}
+        if codec != 'none':
+            decompress = True
+        elif not any(decompressing.values()):
+            return False
+        else:
+            decompress = _has_compressed_text(conn)
+
+        changed = False
+        if decompressing.get('books_fts_source', decompress) != decompress:
+            _create_books_fts_source(conn, decompress)
+            changed = True
+        if decompressing.get('book_content_au', decompress) != decompress:
+            _create_book_content_fts_triggers(conn, decompress)
+            changed = True
+    if changed:
+        logger.debug(f"FTS triggers {'now' if decompress else 'no longer'} decompress text")
+    return changed
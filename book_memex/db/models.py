@@ -19,10 +19,15 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from book_memex.core import uri as _uri
+from book_memex.db.compression import CompressedText
 
 Base = declarative_base()
 
 
+# Format preference for a book's primary file (lower wins, others rank 99)
+PRIMARY_FORMAT_PRIORITY = {'pdf': 0, 'epub': 1, 'mobi': 2, 'azw3': 3}
+
+
 def utc_now():
     """Return current UTC time as timezone-naive datetime for SQLite compatibility."""
     return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -126,10 +131,9 @@ class Book(Base):
         if not self.files:
             return None
         # Sort by preference
-        format_priority = {'pdf': 0, 'epub': 1, 'mobi': 2, 'azw3': 3}
         sorted_files = sorted(
             self.files,
-            key=lambda f: format_priority.get(f.format.lower(), 99)
+            key=lambda f: PRIMARY_FORMAT_PRIORITY.get(f.format.lower(), 99)
         )
         return sorted_files[0] if sorted_files else None
 
@@ -308,6 +312,7 @@ class File(Base):
     format = Column(String(20), nullable=False, index=True)  # pdf, epub, mobi
     size_bytes = Column(Integer)
     file_hash = Column(String(64), unique=True, nullable=False, index=True)  # SHA256
+    partial_hash = Column(String(64), index=True)  # SHA256 of size + first/last 64 KiB (dedup prefilter)
 
     # File metadata
     mime_type = Column(String(100))  # Full MIME type (e.g., application/pdf)
@@ -318,6 +323,7 @@ class File(Base):
     # Text extraction status
     text_extracted = Column(Boolean, default=False)
     extraction_date = Column(DateTime)
+    content_fingerprint = Column(String(100))  # "<file_hash>:<extractor version>" of the BookContent rows
 
     archived_at = Column(DateTime, nullable=True)
 
@@ -345,7 +351,7 @@ class ExtractedText(Base):
     id = Column(Integer, primary_key=True)
     file_id = Column(Integer, ForeignKey('files.id', ondelete='CASCADE'), unique=True, nullable=False)
 
-    content = Column(Text, nullable=False)  # Full text - will use FTS5 virtual table
+    content = Column(CompressedText, nullable=False)  # Full text (optionally compressed, see db.compression)
     content_hash = Column(String(64), nullable=False)
     extracted_at = Column(DateTime, default=utc_now, nullable=False)
 
@@ -368,8 +374,8 @@ class BookContent(Base):
     id = Column(Integer, primary_key=True)
     file_id = Column(Integer, ForeignKey('files.id', ondelete='CASCADE'), nullable=False)
 
-    # Legacy column preserved.
-    content = Column(Text, nullable=False)
+    # Legacy column preserved; optionally compressed (see db.compression).
+    content = Column(CompressedText, nullable=False)
     start_page = Column(Integer)
     end_page = Column(Integer)
 
@@ -760,14 +766,166 @@ class Review(Base):
         return f"<Review(id={self.id}, book_id={self.book_id}, type='{self.review_type}')>"
 
 
+# ============================================================================
+# Precomputed Similarity
+# ============================================================================
+
+class BookNeighbor(Base):
+    """One entry of a book's precomputed top-k similar books.
+
+    Built by ``book-memex lib build-neighbors`` for a BookSimilarity preset,
+    so "similar books" is a single indexed lookup. ``neighbor_id`` is a
+    plain column (no foreign key) so deleting a book doesn't block on the
+    lists that mention it; the next build drops such entries.
+    """
+    __tablename__ = 'book_neighbors'
+
+    book_id = Column(Integer, ForeignKey('books.id', ondelete='CASCADE'), primary_key=True)
+    preset = Column(String(50), primary_key=True)  # balanced, metadata_only, ...
+    rank = Column(Integer, primary_key=True)  # 1 = most similar
+    neighbor_id = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index('idx_book_neighbors_neighbor', 'preset', 'neighbor_id'),
+    )
+
+    def __repr__(self):
+        return f"<BookNeighbor(book_id={self.book_id}, preset='{self.preset}', rank={self.rank}, neighbor_id={self.neighbor_id})>"
+
+
+class BookNeighborState(Base):
+    """What a book's neighbour list was computed from.
+
+    Lets incremental builds skip books whose similarity inputs, model fit
+    and list size are unchanged since the last run.
+    """
+    __tablename__ = 'book_neighbor_state'
+
+    book_id = Column(Integer, ForeignKey('books.id', ondelete='CASCADE'), primary_key=True)
+    preset = Column(String(50), primary_key=True)
+    token = Column(Text, nullable=False)  # fingerprint of the book's similarity inputs
+    fit_id = Column(String(32), nullable=False)  # SimilarityIndex fit the scores came from
+    top_k = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, default=utc_now, nullable=False)
+
+    def __repr__(self):
+        return f"<BookNeighborState(book_id={self.book_id}, preset='{self.preset}')>"
+
+
+class Job(Base):
+    """A background extraction job for one file.
+
+    Imports with deferred extraction commit the book and file rows, then
+    queue ``text``, ``cover`` and ``thumbnail`` jobs that ``book-memex
+    worker`` (or the worker inside ``serve``) runs later. Jobs with a higher
+    ``priority`` run first; failed jobs are retried up to ``max_attempts``.
+    """
+    __tablename__ = 'jobs'
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)  # text, cover, thumbnail
+    file_id = Column(Integer, ForeignKey('files.id', ondelete='CASCADE'), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default='pending')  # pending, running, done, failed
+    priority = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=True)  # retry backoff
+    last_error = Column(Text, nullable=True)
+    worker = Column(String(100), nullable=True)  # worker that claimed it
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    file = relationship('File')
+
+    __table_args__ = (
+        Index('idx_jobs_queue', 'status', 'priority', 'id'),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind='{self.kind}', file_id={self.file_id}, status='{self.status}')>"
+
+
+class ReindexCheckpoint(Base):
+    """Progress of a library-wide ``reindex-content`` run.
+
+    Updated in the same transaction as each batch of reindexed files, so
+    ``reindex-content --all --resume`` carries on after the last committed
+    file when a run was interrupted. Files are visited in id order.
+    """
+    __tablename__ = 'reindex_checkpoints'
+
+    name = Column(String(50), primary_key=True)  # 'content'
+    last_file_id = Column(Integer, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default='running')  # running, done
+    force = Column(Boolean, nullable=False, default=False)
+    files_done = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=utc_now, nullable=False)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False)
+
+    def __repr__(self):
+        return (f"<ReindexCheckpoint(name='{self.name}', last_file_id={self.last_file_id}, "
+                f"status='{self.status}')>")
+
+
+# ============================================================================
+# Typeahead Suggestions
+# ============================================================================
+
+class Suggestion(Base):
+    """One typeahead completion: a book title, author, subject or tag path.
+
+    The table is rebuilt as a whole by ``SuggestService`` in rank order, so
+    the id doubles as the rank (1 = leads to the most books). The
+    ``suggestions_fts`` index (migration 20) matches word prefixes.
+    """
+    __tablename__ = 'suggestions'
+
+    id = Column(Integer, primary_key=True)  # rank
+    kind = Column(String(20), nullable=False)  # author, subject, tag, title
+    label = Column(String(500), nullable=False)
+    ref_id = Column(Integer, nullable=False)  # author/subject/tag id, or a book id for titles
+    weight = Column(Integer, nullable=False)  # number of books it leads to
+
+    def __repr__(self):
+        return f"<Suggestion(id={self.id}, kind='{self.kind}', label='{self.label}')>"
+
+
+class SuggestionState(Base):
+    """Whether the suggestions table is out of date (single row, id 1).
+
+    Triggers on books, authors, subjects, tags and their link tables set
+    ``stale``; lookups keep serving the old rows until
+    ``SuggestService.ensure_fresh`` rebuilds the table (the job worker,
+    ``serve`` or ``Library.refresh_suggestions``). ``built_at`` is NULL
+    until the first build.
+    """
+    __tablename__ = 'suggestion_state'
+
+    id = Column(Integer, primary_key=True)
+    stale = Column(Boolean, nullable=False, default=True)
+    built_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<SuggestionState(stale={self.stale}, built_at={self.built_at})>"
+
+
 # Full-Text Search Virtual Table (SQLite FTS5)
-# This will be created separately as it's SQLite-specific
+# Created by migrations 19/20 as it's SQLite-specific; triggers on books,
+# files and extracted_texts keep it in sync. rowid is the book id.
+# While the library stores compressed text, books_fts_source and these
+# triggers call bm_decompress(), so writes from tools without the
+# book-memex SQL functions fail with "no such function"
+# (see migrations.sync_text_decompression).
 """
 CREATE VIRTUAL TABLE books_fts USING fts5(
-    book_id UNINDEXED,
     title,
     description,
-    content='extracted_texts',
-    content_rowid='id'
+    extracted_text,
+    content='books_fts_source',
+    content_rowid='book_id',
+    tokenize='porter unicode61',
+    prefix='2 3 4'
 );
 """
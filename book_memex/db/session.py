@@ -5,27 +5,144 @@ Provides session factory and initialization utilities.
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, event, text
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.engine import Engine
 
 from .models import Base
+from .compression import get_text_codec, register_functions
 
 # Global session factory
 _SessionFactory: Optional[sessionmaker] = None
 _engine: Optional[Engine] = None
 
+DEFAULT_PROFILE = 'balanced'
+
+# Named SQLite PRAGMA bundles applied on every new connection.
+#
+# - safe:     rollback journal + FULL fsync; the pre-profile behaviour, for
+#             libraries on network filesystems where WAL is unsupported.
+# - balanced: WAL so the server, CLI and MCP server can read while one of
+#             them writes; NORMAL sync is durable across app crashes and
+#             only risks the last commit on power loss.
+# - fast:     bulk-import setting; larger caches and no fsync at all.
+#
+# cache_size is negative, i.e. KiB rather than pages.
+PERFORMANCE_PROFILES: Dict[str, Dict[str, Any]] = {
+    'safe': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -256000,
+        'mmap_size': 1024 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+}
+
+
+def get_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Look up a performance profile by name.
+
+    Args:
+        name: Profile name. If None, the ``database.profile`` value from
+              the user config is used.
+
+    Returns:
+        Dict of PRAGMA name -> value
+
+    Raises:
+        ValueError: If the profile name is unknown
+    """
+    if name is None:
+        from ..config import load_config
+        name = load_config().database.profile or DEFAULT_PROFILE
+
+    profile = PERFORMANCE_PROFILES.get(name)
+    if profile is None:
+        raise ValueError(
+            f"Unknown database profile {name!r}; "
+            f"expected one of: {', '.join(PERFORMANCE_PROFILES)}"
+        )
+    return profile
+
+
+def apply_pragmas(dbapi_conn, profile: Dict[str, Any]) -> None:
+    """Apply foreign-key enforcement plus a performance profile to a raw connection."""
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    # busy_timeout first so that switching journal_mode waits for other
+    # processes instead of failing with "database is locked".
+    cursor.execute(f"PRAGMA busy_timeout={int(profile['busy_timeout'])}")
+    cursor.execute(f"PRAGMA journal_mode={profile['journal_mode']}")
+    cursor.execute(f"PRAGMA synchronous={profile['synchronous']}")
+    cursor.execute(f"PRAGMA cache_size={int(profile['cache_size'])}")
+    cursor.execute(f"PRAGMA mmap_size={int(profile['mmap_size'])}")
+    cursor.execute(f"PRAGMA temp_store={profile['temp_store']}")
+    cursor.close()
+
+
+def create_library_engine(library_path: Path, echo: bool = False,
+                          profile: Optional[str] = None,
+                          text_compression: Optional[str] = None) -> Engine:
+    """
+    Create an engine for a library database with a performance profile applied.
+
+    Every connection also gets the bm_compress()/bm_decompress() SQL
+    functions used by the compressed text columns.
+
+    Args:
+        library_path: Path to library directory
+        echo: If True, log all SQL statements (debug mode)
+        profile: Performance profile name (default: from config)
+        text_compression: Codec for newly written text (default: from config)
+
+    Returns:
+        SQLAlchemy engine
+    """
+    pragmas = get_profile(profile)
+    codec = get_text_codec(text_compression)
+    db_url = f'sqlite:///{Path(library_path) / "library.db"}'
+    engine = create_engine(db_url, echo=echo)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_conn, connection_record):
+        apply_pragmas(dbapi_conn, pragmas)
+        register_functions(dbapi_conn, codec)
+
+    return engine
+
 
-def init_db(library_path: Path, echo: bool = False) -> Engine:
+def init_db(library_path: Path, echo: bool = False,
+            profile: Optional[str] = None,
+            text_compression: Optional[str] = None) -> Engine:
     """
     Initialize database and create all tables.
 
     Args:
         library_path: Path to library directory
         echo: If True, log all SQL statements (debug mode)
+        profile: Performance profile name (default: from config)
+        text_compression: Codec for newly written text (default: from config)
 
     Returns:
         SQLAlchemy engine
@@ -35,39 +152,14 @@ def init_db(library_path: Path, echo: bool = False) -> Engine:
     library_path = Path(library_path)
     library_path.mkdir(parents=True, exist_ok=True)
 
-    db_path = library_path / 'library.db'
-    db_url = f'sqlite:///{db_path}'
+    codec = get_text_codec(text_compression)
+    _engine = create_library_engine(library_path, echo=echo, profile=profile,
+                                    text_compression=codec)
 
-    _engine = create_engine(db_url, echo=echo)
-
-    # Enable foreign keys for SQLite
-    @event.listens_for(_engine, "connect")
-    def set_sqlite_pragma(dbapi_conn, connection_record):
-        cursor = dbapi_conn.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
-
-    # Create all tables
+    # Create all tables. The FTS5 tables (books_fts, book_content_fts) and
+    # their sync triggers are created by migrations 12 and 19.
     Base.metadata.create_all(_engine)
 
-    # Create FTS5 virtual table for full-text search
-    with _engine.connect() as conn:
-        # Check if FTS table exists
-        result = conn.execute(
-            text("SELECT name FROM sqlite_master WHERE type='table' AND name='books_fts'")
-        )
-        if not result.fetchone():
-            conn.execute(text("""
-                CREATE VIRTUAL TABLE books_fts USING fts5(
-                    book_id UNINDEXED,
-                    title,
-                    description,
-                    extracted_text,
-                    tokenize='porter unicode61'
-                )
-            """))
-            conn.commit()
-
     # Create session factory
     _SessionFactory = sessionmaker(bind=_engine)
 
@@ -79,8 +171,9 @@ def init_db(library_path: Path, echo: bool = False) -> Engine:
     # Imported lazily to avoid a circular import at module load time
     # (migrations.py does not import session, but keeping this local is
     # defensive against future changes and keeps import order obvious).
-    from .migrations import run_all_migrations
+    from .migrations import run_all_migrations, sync_text_decompression
     run_all_migrations(library_path)
+    sync_text_decompression(library_path, codec)
 
     return _engine
 
@@ -123,6 +216,26 @@ def session_scope():
         session.close()
 
 
+def checkpoint_db(library_path: Path) -> None:
+    """
+    Fold the WAL file back into library.db.
+
+    Call before copying library.db on its own (backups, exports) so the
+    copy contains every committed transaction. No-op for libraries in
+    rollback-journal mode.
+    """
+    import sqlite3
+
+    db_path = Path(library_path) / 'library.db'
+    if not db_path.exists():
+        return
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
 def close_db():
     """Close database connection and cleanup."""
     global _engine, _SessionFactory
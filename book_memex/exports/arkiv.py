@@ -16,6 +16,13 @@ Record URI scheme::
 
 Only non-archived rows (``archived_at IS NULL``) are emitted.
 
+Records are streamed: rows are read in batches through a session of the
+exporter's own (cleared after every batch) and written
+straight into ``records.jsonl``, so memory use does not grow with the size
+of the library. ``schema.yaml`` and ``README.md`` are written last, once the
+counts are known. A ``.tar.gz`` member needs its size up front, so there the
+JSONL is spooled through a temporary file next to the output.
+
 Compression choice prioritises longevity: ``.zip`` and ``.tar.gz`` are
 both ubiquitous on every OS (30+ years of universal tooling). Modern
 compressors like ``zstd`` are deliberately avoided so the bundle still
@@ -27,13 +34,15 @@ from __future__ import annotations
 import io
 import json
 import tarfile
+import tempfile
 import zipfile
 from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator
+from typing import IO, Any, Dict, Iterable, Iterator
 
 import yaml
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
 from ..db.models import Book, Marginalia, ReadingSession
 
@@ -147,16 +156,30 @@ def _iso(dt: datetime | None) -> str | None:
 # ---------------------------------------------------------------------------
 
 
-def _records_to_jsonl_bytes(records: Iterable[Dict[str, Any]]) -> tuple[bytes, Dict[str, int]]:
-    """Serialise records to JSONL bytes and return live per-kind counts."""
+# Rows read per batch, and bytes of JSONL buffered per write
+BATCH_SIZE = 500
+_WRITE_CHUNK = 1 << 20
+
+
+def _write_jsonl(records: Iterable[Dict[str, Any]], fp: IO[bytes]) -> Dict[str, int]:
+    """Stream records to *fp* as JSONL and return live per-kind counts."""
     counts: Dict[str, int] = {"book": 0, "marginalia": 0, "reading": 0}
-    buf = io.StringIO()
+    chunk = []
+    size = 0
     for rec in records:
-        buf.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        line = (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+        chunk.append(line)
+        size += len(line)
+        if size >= _WRITE_CHUNK:
+            fp.write(b"".join(chunk))
+            chunk.clear()
+            size = 0
         kind = rec.get("kind")
         if kind in counts:
             counts[kind] += 1
-    return buf.getvalue().encode("utf-8"), counts
+    if chunk:
+        fp.write(b"".join(chunk))
+    return counts
 
 
 def _schema_yaml_bytes(counts: Dict[str, int]) -> bytes:
@@ -237,33 +260,10 @@ def _readme_bytes(counts: Dict[str, int]) -> bytes:
     return "\n".join(lines).encode("utf-8")
 
 
-def _write_file(path: Path, data: bytes) -> None:
-    path.write_bytes(data)
-
-
-def _write_zip(
-    path: Path, jsonl: bytes, schema_yaml: bytes, readme: bytes
-) -> None:
-    """Write the three bundle files into a single .zip archive."""
-    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("records.jsonl", jsonl)
-        zf.writestr("schema.yaml", schema_yaml)
-        zf.writestr("README.md", readme)
-
-
-def _write_tar_gz(
-    path: Path, jsonl: bytes, schema_yaml: bytes, readme: bytes
-) -> None:
-    """Write the three bundle files into a single .tar.gz archive."""
-    with tarfile.open(path, "w:gz") as tf:
-        for name, data in (
-            ("records.jsonl", jsonl),
-            ("schema.yaml", schema_yaml),
-            ("README.md", readme),
-        ):
-            info = tarfile.TarInfo(name=name)
-            info.size = len(data)
-            tf.addfile(info, io.BytesIO(data))
+def _add_tar_member(tf: tarfile.TarFile, name: str, fp: IO[bytes], size: int) -> None:
+    info = tarfile.TarInfo(name=name)
+    info.size = size
+    tf.addfile(info, fp)
 
 
 # ---------------------------------------------------------------------------
@@ -286,10 +286,11 @@ class ArkivExporter:
     - ``path.tar.gz``/``.tgz`` -> single gzip-compressed tarball
     """
 
-    def __init__(self, library) -> None:
+    def __init__(self, library, batch_size: int = BATCH_SIZE) -> None:
         # Avoid a circular import by typing `library` loosely.
         self.library = library
         self.session: Session = library.session
+        self.batch_size = batch_size
 
     # -- public API ---------------------------------------------------
 
@@ -304,25 +305,34 @@ class ArkivExporter:
         out_path = Path(out_path)
         fmt = _detect_compression(out_path)
 
-        # Build records once; serialise into the chosen format.
-        records = list(self._iter_records())
-        jsonl_bytes, counts = _records_to_jsonl_bytes(records)
-        schema_bytes = _schema_yaml_bytes(counts)
-        readme_bytes = _readme_bytes(counts)
-
         if fmt == "zip":
             out_path.parent.mkdir(parents=True, exist_ok=True)
-            _write_zip(out_path, jsonl_bytes, schema_bytes, readme_bytes)
+            with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                with zf.open("records.jsonl", "w", force_zip64=True) as fp:
+                    counts = _write_jsonl(self._iter_records(), fp)
+                zf.writestr("schema.yaml", _schema_yaml_bytes(counts))
+                zf.writestr("README.md", _readme_bytes(counts))
             records_path = schema_path = str(out_path)
         elif fmt == "tar.gz":
             out_path.parent.mkdir(parents=True, exist_ok=True)
-            _write_tar_gz(out_path, jsonl_bytes, schema_bytes, readme_bytes)
+            with tempfile.TemporaryFile(dir=out_path.parent) as spool:
+                counts = _write_jsonl(self._iter_records(), spool)
+                size = spool.tell()
+                spool.seek(0)
+                with tarfile.open(out_path, "w:gz") as tf:
+                    _add_tar_member(tf, "records.jsonl", spool, size)
+                    for name, data in (
+                        ("schema.yaml", _schema_yaml_bytes(counts)),
+                        ("README.md", _readme_bytes(counts)),
+                    ):
+                        _add_tar_member(tf, name, io.BytesIO(data), len(data))
             records_path = schema_path = str(out_path)
         else:
             out_path.mkdir(parents=True, exist_ok=True)
-            _write_file(out_path / "records.jsonl", jsonl_bytes)
-            _write_file(out_path / "schema.yaml", schema_bytes)
-            _write_file(out_path / "README.md", readme_bytes)
+            with open(out_path / "records.jsonl", "wb") as fp:
+                counts = _write_jsonl(self._iter_records(), fp)
+            (out_path / "schema.yaml").write_bytes(_schema_yaml_bytes(counts))
+            (out_path / "README.md").write_bytes(_readme_bytes(counts))
             records_path = str(out_path / "records.jsonl")
             schema_path = str(out_path / "schema.yaml")
 
@@ -337,81 +347,104 @@ class ArkivExporter:
     # -- record generation -------------------------------------------
 
     def _iter_records(self) -> Iterator[Dict[str, Any]]:
-        yield from self._iter_books()
-        yield from self._iter_marginalia()
-        yield from self._iter_reading_sessions()
-
-    def _iter_books(self) -> Iterable[Dict[str, Any]]:
-        q = (
-            self.session.query(Book)
-            .filter(Book.archived_at.is_(None))
-            .order_by(Book.id.asc())
+        # A private session (reading committed rows) keeps the caller's
+        # identity map untouched and is cleared after each batch, so loaded
+        # rows never accumulate.
+        with Session(bind=self.session.get_bind(), autoflush=False) as session:
+            yield from self._iter_books(session)
+            yield from self._iter_marginalia(session)
+            yield from self._iter_reading_sessions(session)
+
+    def _batches(self, session: Session, model, stmt) -> Iterator[list]:
+        """Yield the ORM rows of *stmt* ``batch_size`` at a time, by ascending id.
+
+        Each batch is its own keyset query (``id > last``), so the session
+        can be cleared between batches.
+        """
+        last_id = 0
+        while True:
+            batch = session.scalars(
+                stmt.where(model.id > last_id).order_by(model.id.asc()).limit(self.batch_size)
+            ).all()
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1].id
+            session.expunge_all()
+
+    def _iter_books(self, session: Session) -> Iterable[Dict[str, Any]]:
+        stmt = (
+            select(Book)
+            .where(Book.archived_at.is_(None))
+            .options(selectinload(Book.identifiers))
         )
-        for book in q:
-            yield {
-                "kind": "book",
-                "uri": book.uri,
-                "unique_id": book.unique_id,
-                "title": book.title,
-                "subtitle": book.subtitle,
-                "authors": [a.name for a in book.authors],
-                "language": book.language,
-                "publisher": book.publisher,
-                "publication_date": book.publication_date,
-                "description": book.description,
-                "subjects": [s.name for s in book.subjects],
-                "series": book.series,
-                "series_index": book.series_index,
-                "identifiers": {
-                    i.scheme: i.value for i in book.identifiers
-                },
-                "tags": [t.full_path for t in book.tags] if book.tags else [],
-                "created_at": _iso(book.created_at),
-                "updated_at": _iso(book.updated_at),
-            }
-
-    def _iter_marginalia(self) -> Iterable[Dict[str, Any]]:
-        q = (
-            self.session.query(Marginalia)
-            .filter(Marginalia.archived_at.is_(None))
-            .order_by(Marginalia.id.asc())
+        for batch in self._batches(session, Book, stmt):
+            for book in batch:
+                yield {
+                    "kind": "book",
+                    "uri": book.uri,
+                    "unique_id": book.unique_id,
+                    "title": book.title,
+                    "subtitle": book.subtitle,
+                    "authors": [a.name for a in book.authors],
+                    "language": book.language,
+                    "publisher": book.publisher,
+                    "publication_date": book.publication_date,
+                    "description": book.description,
+                    "subjects": [s.name for s in book.subjects],
+                    "series": book.series,
+                    "series_index": book.series_index,
+                    "identifiers": {
+                        i.scheme: i.value for i in book.identifiers
+                    },
+                    "tags": [t.full_path for t in book.tags] if book.tags else [],
+                    "created_at": _iso(book.created_at),
+                    "updated_at": _iso(book.updated_at),
+                }
+
+    def _iter_marginalia(self, session: Session) -> Iterable[Dict[str, Any]]:
+        stmt = (
+            select(Marginalia)
+            .where(Marginalia.archived_at.is_(None))
         )
-        for m in q:
-            yield {
-                "kind": "marginalia",
-                "uri": m.uri,
-                "uuid": m.uuid,
-                "content": m.content,
-                "highlighted_text": m.highlighted_text,
-                "page_number": m.page_number,
-                "position": m.position,
-                "category": m.category,
-                "color": m.color,
-                "pinned": bool(m.pinned),
-                "scope": m.scope,
-                "book_uris": [b.uri for b in m.books],
-                "created_at": _iso(m.created_at),
-                "updated_at": _iso(m.updated_at),
-            }
-
-    def _iter_reading_sessions(self) -> Iterable[Dict[str, Any]]:
-        q = (
-            self.session.query(ReadingSession)
-            .filter(ReadingSession.archived_at.is_(None))
-            .order_by(ReadingSession.id.asc())
+        for batch in self._batches(session, Marginalia, stmt):
+            for m in batch:
+                yield {
+                    "kind": "marginalia",
+                    "uri": m.uri,
+                    "uuid": m.uuid,
+                    "content": m.content,
+                    "highlighted_text": m.highlighted_text,
+                    "page_number": m.page_number,
+                    "position": m.position,
+                    "category": m.category,
+                    "color": m.color,
+                    "pinned": bool(m.pinned),
+                    "scope": m.scope,
+                    "book_uris": [b.uri for b in m.books],
+                    "created_at": _iso(m.created_at),
+                    "updated_at": _iso(m.updated_at),
+                }
+
+    def _iter_reading_sessions(self, session: Session) -> Iterable[Dict[str, Any]]:
+        stmt = (
+            select(ReadingSession)
+            .where(ReadingSession.archived_at.is_(None))
+            .options(selectinload(ReadingSession.book))
         )
-        for rs in q:
-            yield {
-                "kind": "reading",
-                "uri": rs.uri,
-                "uuid": rs.uuid,
-                "book_uri": rs.book.uri if rs.book else None,
-                "start_time": _iso(rs.start_time),
-                "end_time": _iso(rs.end_time),
-                "start_anchor": rs.start_anchor,
-                "end_anchor": rs.end_anchor,
-                "pages_read": rs.pages_read,
-            }
+        for batch in self._batches(session, ReadingSession, stmt):
+            for rs in batch:
+                yield {
+                    "kind": "reading",
+                    "uri": rs.uri,
+                    "uuid": rs.uuid,
+                    "book_uri": rs.book.uri if rs.book else None,
+                    "start_time": _iso(rs.start_time),
+                    "end_time": _iso(rs.end_time),
+                    "start_anchor": rs.start_anchor,
+                    "end_anchor": rs.end_anchor,
+                    "pages_read": rs.pages_read,
+                }
 
 
 def export_arkiv(library, out_path: Path) -> Dict[str, Any]:
@@ -51,6 +51,9 @@ def export_echo(
     # Copy database
     db_included = False
     if db_path and db_path.exists():
+        # Fold any WAL frames into the main file so the copy is complete.
+        from ..db.session import checkpoint_db
+        checkpoint_db(db_path.parent)
         shutil.copy2(db_path, output_path / "library.db")
         db_included = True
 
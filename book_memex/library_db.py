@@ -4,12 +4,14 @@ Database-backed Library class for book-memex.
 Provides a fluent API for managing ebook libraries using SQLAlchemy + SQLite.
 """
 
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 import logging
+import threading
 
-from sqlalchemy import func, or_, and_, text, update
+from sqlalchemy import func, or_, and_, text, update, literal, table, column, bindparam
 from sqlalchemy.orm import Session
 
 from .db.models import Book, Author, Subject, File, PersonalMetadata
@@ -20,6 +22,24 @@ from .search_parser import parse_search_query
 
 logger = logging.getLogger(__name__)
 
+# Lightweight handle on the FTS5 table (not an ORM model) so it can be
+# joined and ordered by rank in ORM queries. Its rowid is the book id.
+_books_fts = table("books_fts", column("rowid"), column("rank"))
+
+
+def _encode_search_cursor(rank: Optional[float], book_id: int) -> str:
+    """Encode the last (rank, id) of a search page as an opaque cursor."""
+    return f"{'' if rank is None else repr(rank)}:{book_id}"
+
+
+def _decode_search_cursor(cursor: str) -> Tuple[Optional[float], int]:
+    """Decode a cursor produced by :func:`_encode_search_cursor`."""
+    try:
+        rank, _, book_id = cursor.rpartition(":")
+        return (float(rank) if rank else None), int(book_id)
+    except ValueError:
+        raise ValueError(f"Invalid search cursor: {cursor!r}") from None
+
 
 class Library:
     """
@@ -38,6 +58,10 @@ class Library:
         self.session = session
         self.import_service = ImportService(library_path, session)
         self.text_service = TextExtractionService(library_path)
+        # Fitted similarity indexes by config signature; scoped() shares
+        # these with its per-request Libraries, guarded by the lock
+        self._similarity_indexes: Dict[str, Any] = {}
+        self._similarity_lock = threading.RLock()
 
     @property
     def db_path(self) -> Path:
@@ -45,26 +69,58 @@ class Library:
         return self.library_path / "library.db"
 
     @classmethod
-    def open(cls, library_path: Path, echo: bool = False) -> 'Library':
+    def open(cls, library_path: Path, echo: bool = False,
+             profile: Optional[str] = None,
+             text_compression: Optional[str] = None) -> 'Library':
         """
         Open or create a library.
 
         Args:
             library_path: Path to library directory
             echo: If True, log all SQL statements
+            profile: SQLite performance profile (safe, balanced, fast);
+                     defaults to the ``database.profile`` config value
+            text_compression: Codec for newly written extracted text (none,
+                              zlib, zstd); defaults to the
+                              ``database.text_compression`` config value
 
         Returns:
             Library instance
         """
         library_path = Path(library_path)
-        init_db(library_path, echo=echo)
+        init_db(library_path, echo=echo, profile=profile,
+                text_compression=text_compression)
         session = get_session()
 
         logger.debug(f"Opened library at {library_path}")
         return cls(library_path, session)
 
+    @contextmanager
+    def scoped(self) -> Iterator['Library']:
+        """
+        Yield a Library bound to a fresh Session on the same engine.
+
+        Used by the web server to give each request its own session (and
+        pooled connection) instead of sharing ``self.session`` across
+        threads. The scoped session is rolled back on error and closed on
+        exit; the engine is left alone, unlike :meth:`close`.
+        """
+        session = Session(bind=self.session.get_bind())
+        scoped = type(self)(self.library_path, session)
+        scoped._similarity_indexes = self._similarity_indexes
+        scoped._similarity_lock = self._similarity_lock
+        try:
+            yield scoped
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            scoped.import_service.hash_cache.close()
+            session.close()
+
     def close(self):
         """Close library and cleanup database connection."""
+        self.import_service.hash_cache.close()
         if self.session:
             self.session.close()
         close_db()
@@ -112,7 +168,9 @@ class Library:
         return _do_export(self, Path(out_path))
 
     def add_book(self, file_path: Path, metadata: Dict[str, Any],
-                 extract_text: bool = True, extract_cover: bool = True) -> Optional[Book]:
+                 extract_text: bool = True, extract_cover: bool = True,
+                 defer: bool = False, priority: int = 0,
+                 ingest_mode: str = "copy") -> Optional[Book]:
         """
         Add a book to the library.
 
@@ -121,6 +179,11 @@ class Library:
             metadata: Metadata dictionary (title, creators, subjects, etc.)
             extract_text: Whether to extract full text
             extract_cover: Whether to extract cover image
+            defer: Queue text and cover extraction as background jobs for
+                   ``book-memex worker`` instead of doing them now
+            priority: Priority of the queued jobs (higher runs first)
+            ingest_mode: How the file is placed in the library: copy,
+                         hardlink, reflink or move
 
         Returns:
             Book instance or None if import failed
@@ -129,7 +192,10 @@ class Library:
             file_path,
             metadata,
             extract_text=extract_text,
-            extract_cover=extract_cover
+            extract_cover=extract_cover,
+            defer=defer,
+            priority=priority,
+            ingest_mode=ingest_mode,
         )
 
         if book:
@@ -137,26 +203,32 @@ class Library:
 
         return book
 
-    def add_calibre_book(self, metadata_opf_path: Path) -> Optional[Book]:
+    def add_calibre_book(self, metadata_opf_path: Path, ingest_mode: str = "copy") -> Optional[Book]:
         """
         Add book from Calibre metadata.opf file.
 
         Args:
             metadata_opf_path: Path to metadata.opf
+            ingest_mode: How files are placed in the library (see :meth:`add_book`)
 
         Returns:
             Book instance or None
         """
-        return self.import_service.import_calibre_book(metadata_opf_path)
+        return self.import_service.import_calibre_book(metadata_opf_path, ingest_mode=ingest_mode)
 
     def batch_import(self, files_and_metadata: List[Tuple[Path, Dict[str, Any]]],
-                    show_progress: bool = True) -> List[Book]:
+                    show_progress: bool = True, workers: int = 1,
+                    ingest_mode: str = "copy", batch_size: int = 100) -> List[Book]:
         """
         Import multiple books with progress tracking.
 
         Args:
             files_and_metadata: List of (file_path, metadata) tuples
             show_progress: Whether to show progress bar
+            workers: Worker processes for hashing and extraction (1 = sequential)
+            ingest_mode: How files are placed in the library (see :meth:`add_book`)
+            batch_size: Files per transaction; each file gets a savepoint, so
+                        one bad file does not lose the batch
 
         Returns:
             List of imported Book instances
@@ -167,9 +239,25 @@ class Library:
         return self.import_service.batch_import(
             file_paths,
             metadata_list,
-            show_progress=show_progress
+            show_progress=show_progress,
+            workers=workers,
+            ingest_mode=ingest_mode,
+            batch_size=batch_size,
         )
 
+    def run_jobs(self, max_jobs: Optional[int] = None) -> Dict[str, int]:
+        """
+        Run queued background extraction jobs in this process.
+
+        Args:
+            max_jobs: Stop after this many jobs (default: until none are due)
+
+        Returns:
+            Dict with ``done`` and ``failed`` counts
+        """
+        from .services.job_service import JobService
+        return JobService(self.session, self.library_path).run_pending(max_jobs=max_jobs)
+
     def get_book(self, book_id: int) -> Optional[Book]:
         """Get book by ID."""
         return self.session.get(Book, book_id)
@@ -207,69 +295,9 @@ class Library:
             List of matching books
         """
         try:
-            # Parse the query
             parsed = parse_search_query(query)
-
-            # If no FTS terms and no filters, return empty
-            if not parsed.has_fts_terms() and not parsed.has_filters():
-                return []
-
-            # Build the query
-            book_ids = []
-
-            # If we have FTS terms, search FTS5 first
-            if parsed.has_fts_terms():
-                result = self.session.execute(
-                    text("""
-                    SELECT book_id, rank
-                    FROM books_fts
-                    WHERE books_fts MATCH :query
-                    ORDER BY rank
-                    LIMIT :limit OFFSET :offset
-                    """),
-                    {"query": parsed.fts_query, "limit": limit + offset + limit, "offset": 0}  # Get more for filtering
-                )
-                book_ids = [row[0] for row in result]
-
-                if not book_ids:
-                    return []
-
-            # Build filter conditions
-            from .search_parser import SearchQueryParser
-            parser = SearchQueryParser()
-            where_clause, params = parser.to_sql_conditions(parsed)
-
-            # If we have both FTS and filters, combine them
-            if book_ids and where_clause:
-                # Start with FTS results and apply filters
-                books_query = self.session.query(Book).filter(
-                    Book.id.in_(book_ids)
-                )
-
-                # Apply additional SQL filters
-                books_query = books_query.filter(text(where_clause).bindparams(**params))
-
-                books = books_query.all()
-
-                # Maintain FTS ranking order and apply offset/limit
-                books_dict = {b.id: b for b in books}
-                ordered = [books_dict[bid] for bid in book_ids if bid in books_dict]
-                return ordered[offset:offset + limit]
-
-            # If only FTS (no additional filters)
-            elif book_ids:
-                books = self.session.query(Book).filter(Book.id.in_(book_ids)).all()
-                books_dict = {b.id: b for b in books}
-                ordered = [books_dict[bid] for bid in book_ids if bid in books_dict]
-                return ordered[offset:offset + limit]
-
-            # If only filters (no FTS)
-            elif where_clause:
-                books_query = self.session.query(Book)
-                books_query = books_query.filter(text(where_clause).bindparams(**params))
-                return books_query.offset(offset).limit(limit).all()
-
-            return []
+            rows = self._search_rows(parsed, limit, offset=offset)
+            return [book for book, _ in rows]
 
         except Exception as e:
             logger.error(f"Search error: {e}")
@@ -278,7 +306,7 @@ class Library:
             try:
                 result = self.session.execute(
                     text("""
-                    SELECT book_id, rank
+                    SELECT rowid, rank
                     FROM books_fts
                     WHERE books_fts MATCH :query
                     ORDER BY rank
@@ -296,6 +324,108 @@ class Library:
                 logger.error(f"Fallback search also failed: {fallback_error}")
                 return []
 
+    def search_page(self, query: str, limit: int = 50,
+                    cursor: Optional[str] = None) -> Tuple[List[Book], Optional[str]]:
+        """
+        Keyset-paginated variant of :meth:`search`.
+
+        Instead of an offset, pass the ``next_cursor`` returned by the
+        previous call; the statement resumes after that row, so deep pages
+        cost the same as the first one.
+
+        Args:
+            query: Search query (same syntax as :meth:`search`)
+            limit: Maximum number of results
+            cursor: Opaque cursor from a previous page, or None for the first
+
+        Returns:
+            Tuple of (books, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = _decode_search_cursor(cursor) if cursor else None
+        parsed = parse_search_query(query)
+        rows = self._search_rows(parsed, limit, after=after)
+        if len(rows) < limit:
+            return [book for book, _ in rows], None
+        last_book, last_rank = rows[-1]
+        return [book for book, _ in rows], _encode_search_cursor(last_rank, last_book.id)
+
+    def _search_rows(self, parsed, limit: int, offset: int = 0,
+                     after: Optional[Tuple[Optional[float], int]] = None) -> List[Tuple[Book, Optional[float]]]:
+        """
+        Run a parsed search as a single statement.
+
+        The FTS MATCH, the parser's filter conditions, bm25 ordering and
+        LIMIT/OFFSET are all applied in SQL. Results are ordered by
+        (rank, id) for text searches and by id for filter-only searches,
+        so ``after`` (a decoded cursor) can resume with a keyset predicate.
+
+        Returns:
+            List of (book, rank) pairs; rank is None for filter-only searches
+        """
+        if not parsed.has_fts_terms() and not parsed.has_filters():
+            return []
+
+        from .search_parser import SearchQueryParser
+        where_clause, params = SearchQueryParser().to_sql_conditions(parsed)
+
+        if parsed.has_fts_terms():
+            rank = _books_fts.c.rank
+            q = (self.session.query(Book, rank)
+                 .join(_books_fts, _books_fts.c.rowid == Book.id)
+                 .filter(text("books_fts MATCH :fts_query").bindparams(fts_query=parsed.fts_query)))
+            if after is not None:
+                after_rank, after_id = after
+                if after_rank is None:
+                    raise ValueError("Cursor does not belong to a text search")
+                q = q.filter(or_(rank > after_rank, and_(rank == after_rank, Book.id > after_id)))
+            q = q.order_by(rank, Book.id)
+        else:
+            q = self.session.query(Book, literal(None))
+            if after is not None:
+                q = q.filter(Book.id > after[1])
+            q = q.order_by(Book.id)
+
+        if where_clause:
+            q = q.filter(text(where_clause).bindparams(**params))
+
+        return [tuple(row) for row in q.offset(offset).limit(limit).all()]
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Typeahead completions for a partly typed search.
+
+        Matches book titles, author names, subjects and tag paths whose
+        words start with the typed words, most-used first. Serves the
+        suggestions as last built, building them first if the library
+        never had them; later edits only show up after
+        :meth:`refresh_suggestions`.
+
+        Args:
+            query: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of dicts with kind, label, ref_id and weight
+        """
+        from book_memex.services.suggest_service import SuggestService
+        service = SuggestService(self.session)
+        if not service.is_built():
+            service.rebuild()
+        return service.suggest(query, limit=limit)
+
+    def refresh_suggestions(self) -> bool:
+        """
+        Rebuild the typeahead suggestions if the library changed since.
+
+        Returns:
+            True if a rebuild happened
+        """
+        from book_memex.services.suggest_service import SuggestService
+        return SuggestService(self.session).ensure_fresh()
+
     def stats(self) -> Dict[str, Any]:
         """
         Get library statistics.
@@ -1173,7 +1303,12 @@ class Library:
         """
         Find books similar to the given book.
 
-        Uses semantic similarity based on content, metadata, etc.
+        Uses semantic similarity based on content, metadata, etc. Reads the
+        precomputed book_neighbors list when one is current for the book
+        (see :meth:`build_neighbors`). Otherwise uses the fitted model kept
+        in ``cache/similarity/``, updated incrementally as books are added
+        or changed, so a query is a vector lookup plus a top-k scan rather
+        than a refit of the library.
 
         Args:
             book_id: ID of the query book
@@ -1191,6 +1326,7 @@ class Library:
             ...     print(f"{book.title}: {score:.2f}")
         """
         from book_memex.similarity import BookSimilarity
+        from book_memex.services.neighbor_service import NeighborService, preset_name
 
         # Get query book
         query_book = self.get_book(book_id)
@@ -1198,16 +1334,6 @@ class Library:
             logger.warning(f"Book {book_id} not found")
             return []
 
-        # Get candidate books
-        candidates_query = self.query()
-        if filter_language and query_book.language:
-            candidates_query = candidates_query.filter_by_language(query_book.language)
-
-        candidates = candidates_query.all()
-
-        if not candidates:
-            return []
-
         # Configure similarity - auto-detect sparse data
         if similarity_config is None:
             # Check if query book has extracted text
@@ -1225,11 +1351,18 @@ class Library:
                 similarity_config = BookSimilarity().sparse_friendly()
                 logger.debug(f"Using sparse_friendly preset for book without extracted text")
 
-        # Fit on all candidates for performance
-        similarity_config.fit(candidates)
+        # Precomputed lists (lib build-neighbors) hold the language-filtered top-k
+        preset = preset_name(similarity_config)
+        if filter_language and preset:
+            precomputed = NeighborService(self.session).get(book_id, preset, limit=top_k)
+            if precomputed is not None:
+                return precomputed
 
-        # Find similar books
-        results = similarity_config.find_similar(query_book, candidates, top_k=top_k)
+        language = query_book.language if filter_language and query_book.language else None
+        # Held across the lookup so another request can't refresh the index mid-scan
+        with self._similarity_lock:
+            index = self.similarity_index(similarity_config)
+            results = index.top_k(self.session, book_id, k=top_k, language=language)
 
         logger.debug(
             f"Found {len(results)} similar books to '{query_book.title}'"
@@ -1237,6 +1370,123 @@ class Library:
 
         return results
 
+    def build_neighbors(
+        self,
+        presets: Optional[List[str]] = None,
+        top_k: int = 20,
+        full: bool = False,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Precompute each book's top-k similar books into book_neighbors.
+
+        Incremental by default: only books whose similarity inputs changed
+        since the last build (and lists those changes affect) are redone.
+
+        Args:
+            presets: BookSimilarity preset names (default: balanced and
+                     sparse_friendly, the two find_similar picks from)
+            top_k: Neighbours to store per book (default 20)
+            full: If True, recompute every list
+
+        Returns:
+            Dict mapping preset name to ``books``/``recomputed``/``updated`` counts
+
+        Raises:
+            ValueError: If a preset name is unknown
+        """
+        from book_memex.services.neighbor_service import NeighborService, preset_config
+
+        configs = [(p, preset_config(p)) for p in presets or ["balanced", "sparse_friendly"]]
+        service = NeighborService(self.session)
+        return {
+            preset: service.build(preset, self.similarity_index(config), top_k=top_k, full=full)
+            for preset, config in configs
+        }
+
+    def compact(self, codec: Optional[str] = None, vacuum: bool = True,
+                batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Rewrite stored extracted text with a compression codec.
+
+        Existing extracted_texts and book_content rows keep whatever form
+        they were written in; this re-encodes them all (``none`` turns them
+        back into plain text). Full-text search is unaffected. With
+        ``vacuum`` the freed pages are then returned to the filesystem.
+        After compacting to ``none``, the FTS triggers stop calling
+        bm_decompress() the next time the library is opened with ``none``.
+
+        Args:
+            codec: none, zlib or zstd (default: the ``database.text_compression``
+                   config value)
+            vacuum: If True, VACUUM the database afterwards
+            batch_size: Rows rewritten per transaction
+
+        Returns:
+            Dict with ``codec``, per-table ``tables`` byte counts and the
+            database size before and after (``db_bytes_before``/``db_bytes_after``)
+
+        Raises:
+            ValueError: If the codec is unknown or unavailable
+        """
+        from .db.compression import compact_text, get_text_codec
+        from .db.migrations import sync_text_decompression
+
+        codec = get_text_codec(codec)
+        self.session.commit()
+        engine = self.session.get_bind()
+        db_bytes_before = self._db_size(engine)
+
+        # The FTS triggers must decompress before the first BLOB is written
+        sync_text_decompression(self.library_path, codec)
+        tables = compact_text(engine, codec, batch_size=batch_size)
+        if vacuum:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM"))
+
+        result = {
+            "codec": codec,
+            "tables": tables,
+            "db_bytes_before": db_bytes_before,
+            "db_bytes_after": self._db_size(engine),
+        }
+        logger.debug(f"Compacted extracted text with {codec}: {result}")
+        return result
+
+    @staticmethod
+    def _db_size(engine) -> int:
+        """Bytes used by the database pages (excluding any WAL file)."""
+        with engine.connect() as conn:
+            page_count = conn.execute(text("PRAGMA page_count")).scalar()
+            page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        return page_count * page_size
+
+    def similarity_index(self, similarity_config: Any) -> Any:
+        """
+        Get the up-to-date fitted similarity index for a configuration.
+
+        Loads it from ``cache/similarity/`` (or builds it on first use),
+        folds in any books added or changed since it was saved, and keeps
+        it in memory for later calls on this Library and the Libraries
+        made by :meth:`scoped`.
+
+        Args:
+            similarity_config: BookSimilarity instance
+
+        Returns:
+            SimilarityIndex
+        """
+        from book_memex.similarity.index import SimilarityIndex
+
+        signature = similarity_config.signature()
+        with self._similarity_lock:
+            index = self._similarity_indexes.get(signature)
+            if index is None:
+                index = SimilarityIndex.open(self.session, self.library_path, similarity_config)
+                self._similarity_indexes[signature] = index
+            elif index.refresh(self.session):
+                index.save(SimilarityIndex.path_for(self.library_path, similarity_config))
+        return index
+
     def compute_similarity_matrix(
         self,
         book_ids: Optional[List[int]] = None,
@@ -1290,6 +1540,7 @@ class QueryBuilder:
     def __init__(self, session: Session):
         self.session = session
         self._query = session.query(Book)
+        self._text_search = False
 
     def filter_by_title(self, title: str, exact: bool = False) -> 'QueryBuilder':
         """Filter by title."""
@@ -1342,6 +1593,8 @@ class QueryBuilder:
         """Filter by full-text search.
 
         Uses FTS5 to search across title, description, and extracted text.
+        The MATCH is joined into the book query itself, so no id list is
+        built in Python, and ``order_by('relevance')`` can sort by bm25 rank.
 
         Args:
             search_text: Text to search for
@@ -1349,26 +1602,15 @@ class QueryBuilder:
         Returns:
             Self for chaining
         """
-        from sqlalchemy import text as sql_text
-
-        # Query FTS5 table for matching book IDs
-        result = self.session.execute(
-            sql_text("""
-            SELECT book_id
-            FROM books_fts
-            WHERE books_fts MATCH :query
-            ORDER BY rank
-            """),
-            {"query": search_text}
+        if not self._text_search:
+            self._query = self._query.join(_books_fts, _books_fts.c.rowid == Book.id)
+            self._text_search = True
+        self._query = self._query.filter(
+            # unique=True so chained calls each keep their own term (ANDed)
+            text("books_fts MATCH :fts_text").bindparams(
+                bindparam("fts_text", search_text, unique=True)
+            )
         )
-        book_ids = [row[0] for row in result]
-
-        if book_ids:
-            self._query = self._query.filter(Book.id.in_(book_ids))
-        else:
-            # No matches - ensure query returns empty
-            self._query = self._query.filter(Book.id == -1)
-
         return self
 
     def filter_by_reading_status(self, status: str) -> 'QueryBuilder':
@@ -1419,7 +1661,8 @@ class QueryBuilder:
         Order results.
 
         Args:
-            field: Field name (title, created_at, publication_date)
+            field: Field name (title, created_at, publication_date, or
+                   relevance after filter_by_text; best matches first)
             desc: Descending order if True
         """
         field_map = {
@@ -1427,6 +1670,8 @@ class QueryBuilder:
             'created_at': Book.created_at,
             'publication_date': Book.publication_date,
         }
+        if self._text_search:
+            field_map['relevance'] = _books_fts.c.rank
 
         if field in field_map:
             order_field = field_map[field]
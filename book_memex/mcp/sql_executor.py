@@ -4,6 +4,8 @@ import sqlite3
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from ..db.compression import register_functions
+
 _AUTHORIZER_ALLOWED = frozenset({
     sqlite3.SQLITE_SELECT,
     sqlite3.SQLITE_READ,
@@ -43,6 +45,8 @@ class ReadOnlySQLExecutor:
             # Layer 2: Read-only connection
             conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
             try:
+                # bm_decompress() reads compressed extracted text
+                register_functions(conn)
                 # Layer 3: Authorizer callback
                 conn.set_authorizer(_sqlite_authorizer)
                 cursor = conn.execute(sql, params or [])
@@ -647,7 +647,7 @@ def _run_fts_search(
                 bc.segment_index,
                 bc.title,
                 bc.anchor,
-                bc.content AS text_content,
+                bm_decompress(bc.content) AS text_content,
                 bm25(book_content_fts) AS rank
             FROM book_content_fts
             JOIN book_content bc ON bc.id = book_content_fts.rowid
@@ -672,7 +672,7 @@ def _run_fts_search(
                 bc.segment_index,
                 bc.title,
                 bc.anchor,
-                bc.content AS text_content,
+                bm_decompress(bc.content) AS text_content,
                 bm25(book_content_fts) AS rank
             FROM book_content_fts
             JOIN book_content bc ON bc.id = book_content_fts.rowid
@@ -13,10 +13,10 @@ OPDS Spec: https://specs.opds.io/opds-1.2
 
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 from urllib.parse import quote
 
-from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import Response, FileResponse
 
 from .library_db import Library
@@ -209,18 +209,23 @@ def get_library() -> Library:
     return _library
 
 
+def get_request_library() -> Iterator[Library]:
+    """Yield a Library with its own Session for the duration of a request."""
+    with get_library().scoped() as lib:
+        yield lib
+
+
 def get_base_url(request: Request) -> str:
     """Get base URL from request."""
     return str(request.base_url).rstrip("/")
 
 
 @router.get("/", response_class=Response)
-async def opds_root(request: Request):
+def opds_root(request: Request, lib: Library = Depends(get_request_library)):
     """
     OPDS root catalog - navigation feed with links to browse the library.
     """
     base_url = get_base_url(request)
-    lib = get_library()
     stats = lib.stats()
 
     entries = f"""
@@ -294,14 +299,14 @@ async def opensearch_description(request: Request):
 
 
 @router.get("/all", response_class=Response)
-async def opds_all_books(
+def opds_all_books(
     request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    lib: Library = Depends(get_request_library),
 ):
     """All books - acquisition feed with pagination."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     offset = (page - 1) * limit
     total = lib.query().count()
@@ -331,13 +336,13 @@ async def opds_all_books(
 
 
 @router.get("/recent", response_class=Response)
-async def opds_recent(
+def opds_recent(
     request: Request,
     limit: int = Query(50, ge=1, le=100),
+    lib: Library = Depends(get_request_library),
 ):
     """Recently added books."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     books = lib.query().order_by('created_at', desc=True).limit(limit).all()
     entries = "".join(build_entry(book, base_url) for book in books)
@@ -354,15 +359,15 @@ async def opds_recent(
 
 
 @router.get("/search", response_class=Response)
-async def opds_search(
+def opds_search(
     request: Request,
     q: str = Query(..., min_length=1),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    lib: Library = Depends(get_request_library),
 ):
     """Search books - returns acquisition feed."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     offset = (page - 1) * limit
     books = lib.search(q, limit=limit, offset=offset)
@@ -390,14 +395,14 @@ async def opds_search(
 
 
 @router.get("/authors", response_class=Response)
-async def opds_authors(
+def opds_authors(
     request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    lib: Library = Depends(get_request_library),
 ):
     """List all authors - navigation feed."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     from .db.models import Author
     offset = (page - 1) * limit
@@ -439,15 +444,15 @@ async def opds_authors(
 
 
 @router.get("/author/{author_id}", response_class=Response)
-async def opds_author_books(
+def opds_author_books(
     request: Request,
     author_id: int,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    lib: Library = Depends(get_request_library),
 ):
     """Books by a specific author."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     from .db.models import Author
     author = lib.session.query(Author).filter(Author.id == author_id).first()
@@ -483,14 +488,14 @@ async def opds_author_books(
 
 
 @router.get("/subjects", response_class=Response)
-async def opds_subjects(
+def opds_subjects(
     request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    lib: Library = Depends(get_request_library),
 ):
     """List all subjects - navigation feed."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     from .db.models import Subject
     offset = (page - 1) * limit
@@ -532,15 +537,15 @@ async def opds_subjects(
 
 
 @router.get("/subject/{subject_id}", response_class=Response)
-async def opds_subject_books(
+def opds_subject_books(
     request: Request,
     subject_id: int,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    lib: Library = Depends(get_request_library),
 ):
     """Books in a specific subject."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     from .db.models import Subject
     subject = lib.session.query(Subject).filter(Subject.id == subject_id).first()
@@ -576,10 +581,9 @@ async def opds_subject_books(
 
 
 @router.get("/languages", response_class=Response)
-async def opds_languages(request: Request):
+def opds_languages(request: Request, lib: Library = Depends(get_request_library)):
     """List all languages - navigation feed."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     from .db.models import Book
     from sqlalchemy import func
@@ -614,15 +618,15 @@ async def opds_languages(request: Request):
 
 
 @router.get("/language/{lang}", response_class=Response)
-async def opds_language_books(
+def opds_language_books(
     request: Request,
     lang: str,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    lib: Library = Depends(get_request_library),
 ):
     """Books in a specific language."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     offset = (page - 1) * limit
     total = lib.query().filter_by_language(lang).count()
@@ -652,10 +656,9 @@ async def opds_language_books(
 
 
 @router.get("/book/{book_id}", response_class=Response)
-async def opds_book_detail(request: Request, book_id: int):
+def opds_book_detail(request: Request, book_id: int, lib: Library = Depends(get_request_library)):
     """Single book detail - acquisition feed."""
     base_url = get_base_url(request)
-    lib = get_library()
 
     book = lib.get_book(book_id)
     if not book:
@@ -674,10 +677,8 @@ async def opds_book_detail(request: Request, book_id: int):
 
 
 @router.get("/download/{book_id}/{format}")
-async def opds_download(book_id: int, format: str):
+def opds_download(book_id: int, format: str, lib: Library = Depends(get_request_library)):
     """Download a book file."""
-    lib = get_library()
-
     book = lib.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
@@ -709,10 +710,8 @@ async def opds_download(book_id: int, format: str):
 
 
 @router.get("/cover/{book_id}")
-async def opds_cover(book_id: int):
+def opds_cover(book_id: int, lib: Library = Depends(get_request_library)):
     """Get book cover image."""
-    lib = get_library()
-
     book = lib.get_book(book_id)
     if not book or not book.covers:
         raise HTTPException(status_code=404, detail="Cover not found")
@@ -741,8 +740,8 @@ async def opds_cover(book_id: int):
 
 
 @router.get("/cover/{book_id}/thumbnail")
-async def opds_cover_thumbnail(book_id: int):
+def opds_cover_thumbnail(book_id: int, lib: Library = Depends(get_request_library)):
     """Get book cover thumbnail (falls back to full cover)."""
     # Just return the full cover for now
     # TODO: Generate actual thumbnails if needed
-    return await opds_cover(book_id)
+    return opds_cover(book_id, lib)
@@ -4,12 +4,17 @@ Web server for book-memex library management.
 Provides a REST API and web interface for managing ebook libraries.
 """
 
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterator, Optional, List
+import logging
 import tempfile
 import shutil
+import threading
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query
+import anyio.to_thread
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.requests import Request
@@ -29,6 +34,8 @@ from .db.models import PersonalMetadata
 from .core.fts import safe_fts_query
 from . import opds
 
+logger = logging.getLogger(__name__)
+
 
 # Pydantic models for API
 class BookResponse(BaseModel):
@@ -84,6 +91,31 @@ class PaginatedBooksResponse(BaseModel):
     limit: int
 
 
+class SimilarBookResponse(BaseModel):
+    book: BookResponse
+    similarity: float
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    file_id: int
+    book_id: Optional[int]
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str]
+    created_at: Optional[str]
+    started_at: Optional[str]
+    finished_at: Optional[str]
+
+
+class JobListResponse(BaseModel):
+    counts: dict
+    jobs: List[JobResponse]
+
+
 class FolderImportRequest(BaseModel):
     folder_path: str
     recursive: bool = True
@@ -287,10 +319,25 @@ class ContentSearchHit(BaseModel):
     rank: float
 
 
+class SuggestionResponse(BaseModel):
+    kind: str
+    label: str
+    ref_id: int
+    weight: int
+
+
 # Global library instance
 _library: Optional[Library] = None
 _library_path: Optional[Path] = None
 
+# Threads available for sync endpoints (set by create_app; None keeps
+# anyio's default). Each in-flight request holds one pooled connection.
+_worker_threads: Optional[int] = None
+
+# Background extraction worker (set by create_app when background jobs are
+# enabled). While it exists, uploads queue their cover/text extraction.
+_job_worker = None
+
 
 def get_library() -> Library:
     """Get the current library instance."""
@@ -299,6 +346,17 @@ def get_library() -> Library:
     return _library
 
 
+def get_request_library() -> Iterator[Library]:
+    """Yield a Library with its own Session for the duration of a request.
+
+    Endpoints declared with plain ``def`` run in Starlette's thread pool,
+    so each request gets a separate session and pooled connection rather
+    than sharing the global library's session across threads.
+    """
+    with get_library().scoped() as lib:
+        yield lib
+
+
 def init_library(library_path: Path):
     """Initialize the library."""
     global _library, _library_path
@@ -313,11 +371,36 @@ def set_library(library: Library):
     _library_path = library.library_path
 
 
-def create_app(library_path: Path) -> FastAPI:
-    """Create FastAPI application with initialized library."""
+def create_app(library_path: Path, worker_threads: Optional[int] = None,
+               background_jobs: Optional[bool] = None) -> FastAPI:
+    """Create FastAPI application with initialized library.
+
+    Args:
+        library_path: Path to the library directory
+        worker_threads: Size of the thread pool that runs blocking
+            endpoints (defaults to ``server.worker_threads`` from config)
+        background_jobs: Run queued extraction jobs in a background thread
+            and defer extraction of uploads to it (defaults to
+            ``server.background_jobs`` from config)
+    """
+    global _worker_threads, _job_worker
+    if worker_threads is None or background_jobs is None:
+        from .config import load_config
+        server_config = load_config().server
+        if worker_threads is None:
+            worker_threads = server_config.worker_threads
+        if background_jobs is None:
+            background_jobs = server_config.background_jobs
+    _worker_threads = worker_threads
+
     # Initialize library
     init_library(library_path)
 
+    _job_worker = None
+    if background_jobs:
+        from .services.job_service import JobWorker
+        _job_worker = JobWorker(_library)
+
     # Initialize OPDS with the same library
     opds.set_library(_library)
 
@@ -325,11 +408,26 @@ def create_app(library_path: Path) -> FastAPI:
     return app
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Bound the thread pool that runs blocking endpoints; run the job worker."""
+    if _worker_threads:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = _worker_threads
+    if _job_worker is not None:
+        _job_worker.start()
+    try:
+        yield
+    finally:
+        if _job_worker is not None:
+            _job_worker.stop(timeout=30)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="book-memex Library Manager",
     description="Web interface for managing ebook libraries",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=_lifespan,
 )
 
 # Enable CORS — restricted to localhost by default for security.
@@ -385,9 +483,8 @@ def _safe_json_for_script(obj) -> str:
 
 
 @app.get("/read/{book_id}")
-async def read_book(request: Request, book_id: int):
+def read_book(request: Request, book_id: int, lib: Library = Depends(get_request_library)):
     """Serve the browser reader for a book."""
-    lib = get_library()
     book = lib.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
@@ -427,9 +524,8 @@ async def read_book(request: Request, book_id: int):
 
 
 @app.get("/read/{book_id}/file")
-async def reader_file(book_id: int):
+def reader_file(book_id: int, lib: Library = Depends(get_request_library)):
     """Stream the book's primary file for the reader."""
-    lib = get_library()
     book = lib.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
@@ -453,7 +549,7 @@ async def root():
 
 
 @app.get("/api/books", response_model=PaginatedBooksResponse)
-async def list_books(
+def list_books(
     limit: int = Query(50, ge=1, le=1000),
     offset: int = Query(0, ge=0),
     search: Optional[str] = None,
@@ -465,11 +561,10 @@ async def list_books(
     format_filter: Optional[str] = None,
     sort_by: Optional[str] = Query(None, alias="sort"),
     sort_order: Optional[str] = Query("asc", alias="order"),
-    min_rating: Optional[float] = Query(None, alias="rating")
+    min_rating: Optional[float] = Query(None, alias="rating"),
+    lib: Library = Depends(get_request_library)
 ):
     """List books with filtering, sorting, and pagination."""
-    lib = get_library()
-
     query = lib.query()
 
     # Apply filters BEFORE pagination
@@ -497,6 +592,9 @@ async def list_books(
     if sort_by:
         desc = (sort_order == "desc")
         query = query.order_by(sort_by, desc=desc)
+    elif search:
+        # Best full-text matches first
+        query = query.order_by("relevance", desc=False)
     else:
         # Default sort by title
         query = query.order_by("title", desc=False)
@@ -515,9 +613,8 @@ async def list_books(
 
 
 @app.get("/api/books/{book_id}", response_model=BookResponse)
-async def get_book(book_id: int):
+def get_book(book_id: int, lib: Library = Depends(get_request_library)):
     """Get a specific book by ID."""
-    lib = get_library()
     book = lib.get_book(book_id)
 
     if not book:
@@ -526,10 +623,41 @@ async def get_book(book_id: int):
     return _book_to_response(book)
 
 
+@app.get("/api/books/{book_id}/similar", response_model=List[SimilarBookResponse])
+def similar_books(
+    book_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    preset: str = "auto",
+    lib: Library = Depends(get_request_library),
+):
+    """Books similar to a book, in the same language.
+
+    Served from the precomputed book_neighbors table when
+    ``book-memex lib build-neighbors`` has run; otherwise computed from the
+    cached similarity model.
+    """
+    from book_memex.services.neighbor_service import preset_config
+
+    if not lib.get_book(book_id):
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    similarity_config = None
+    if preset != "auto":
+        try:
+            similarity_config = preset_config(preset)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    similar = lib.find_similar(book_id, top_k=limit, similarity_config=similarity_config)
+    return [
+        {"book": _book_to_response(book), "similarity": score}
+        for book, score in similar
+    ]
+
+
 @app.patch("/api/books/{book_id}")
-async def update_book(book_id: int, update: BookUpdateRequest):
+def update_book(book_id: int, update: BookUpdateRequest, lib: Library = Depends(get_request_library)):
     """Update book metadata."""
-    lib = get_library()
     book = lib.get_book(book_id)
 
     if not book:
@@ -574,9 +702,8 @@ async def update_book(book_id: int, update: BookUpdateRequest):
 
 
 @app.delete("/api/books/{book_id}")
-async def delete_book(book_id: int, delete_files: bool = Query(False)):
+def delete_book(book_id: int, delete_files: bool = Query(False), lib: Library = Depends(get_request_library)):
     """Delete a book from the library."""
-    lib = get_library()
     book = lib.get_book(book_id)
 
     if not book:
@@ -597,14 +724,13 @@ async def delete_book(book_id: int, delete_files: bool = Query(False)):
 
 
 @app.post("/api/books/import")
-async def import_book(
+def import_book(
     file: UploadFile = File(...),
     extract_text: bool = Form(True),
-    extract_cover: bool = Form(True)
+    extract_cover: bool = Form(True),
+    lib: Library = Depends(get_request_library)
 ):
     """Import a new book file."""
-    lib = get_library()
-
     # Save uploaded file to temp location
     with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp:
         shutil.copyfileobj(file.file, tmp)
@@ -614,16 +740,21 @@ async def import_book(
         # Extract metadata
         metadata = extract_metadata(str(tmp_path))
 
-        # Import to library
+        # Import to library; with a job worker running, cover and text
+        # extraction are queued so the request returns right away
         book = lib.add_book(
             tmp_path,
             metadata=metadata,
             extract_text=extract_text,
-            extract_cover=extract_cover
+            extract_cover=extract_cover,
+            defer=_job_worker is not None,
+            priority=10,
         )
 
         if not book:
             raise HTTPException(status_code=400, detail="Failed to import book")
+        if _job_worker is not None:
+            _job_worker.wake()
 
         return _book_to_response(book)
 
@@ -633,9 +764,8 @@ async def import_book(
 
 
 @app.post("/api/books/import/folder")
-async def import_folder(request: FolderImportRequest):
+def import_folder(request: FolderImportRequest, lib: Library = Depends(get_request_library)):
     """Import books from a folder."""
-    lib = get_library()
     folder_path = Path(request.folder_path)
 
     if not folder_path.exists():
@@ -676,7 +806,8 @@ async def import_folder(request: FolderImportRequest):
                 file_path,
                 metadata=metadata,
                 extract_text=request.extract_text,
-                extract_cover=request.extract_cover
+                extract_cover=request.extract_cover,
+                defer=_job_worker is not None,
             )
             if book:
                 results["imported"] += 1
@@ -688,15 +819,17 @@ async def import_folder(request: FolderImportRequest):
             results["failed"] += 1
             results["errors"].append(f"{file_path.name}: {str(e)}")
 
+    if _job_worker is not None:
+        _job_worker.wake()
+
     return results
 
 
 @app.post("/api/books/import/calibre")
-async def import_calibre(request: CalibreImportRequest):
+def import_calibre(request: CalibreImportRequest, lib: Library = Depends(get_request_library)):
     """Import books from a Calibre library."""
     from .calibre_import import import_calibre_library
 
-    lib = get_library()
     calibre_path = Path(request.calibre_path)
 
     if not calibre_path.exists():
@@ -723,13 +856,25 @@ async def import_calibre(request: CalibreImportRequest):
         raise HTTPException(status_code=500, detail=f"Calibre import failed: {str(e)}")
 
 
+def _import_downloaded_file(lib: Library, tmp_path: Path,
+                            extract_text: bool, extract_cover: bool) -> Optional[dict]:
+    """Import a downloaded temp file and return its response dict (blocking)."""
+    metadata = extract_metadata(str(tmp_path))
+    book = lib.add_book(
+        tmp_path,
+        metadata=metadata,
+        extract_text=extract_text,
+        extract_cover=extract_cover
+    )
+    return _book_to_response(book) if book else None
+
+
 @app.post("/api/books/import/url")
-async def import_from_url(request: URLImportRequest):
+async def import_from_url(request: URLImportRequest, lib: Library = Depends(get_request_library)):
     """Import an ebook from a URL."""
     import httpx
     import re
 
-    lib = get_library()
     url = request.url.strip()
 
     # Validate URL
@@ -783,13 +928,10 @@ async def import_from_url(request: URLImportRequest):
                 tmp.write(response.content)
                 tmp_path = Path(tmp.name)
 
-        # Extract metadata and import
-        metadata = extract_metadata(str(tmp_path))
-        book = lib.add_book(
-            tmp_path,
-            metadata=metadata,
-            extract_text=request.extract_text,
-            extract_cover=request.extract_cover
+        # Extract metadata and import (blocking, so off the event loop)
+        book = await run_in_threadpool(
+            _import_downloaded_file, lib, tmp_path,
+            request.extract_text, request.extract_cover
         )
 
         # Clean up temp file
@@ -798,7 +940,7 @@ async def import_from_url(request: URLImportRequest):
         if not book:
             raise HTTPException(status_code=400, detail="Failed to import book from URL")
 
-        return _book_to_response(book)
+        return book
 
     except httpx.HTTPError as e:
         raise HTTPException(status_code=400, detail=f"Failed to download file: {str(e)}")
@@ -807,12 +949,11 @@ async def import_from_url(request: URLImportRequest):
 
 
 @app.post("/api/books/import/opds")
-async def import_from_opds(request: OPDSImportRequest):
+async def import_from_opds(request: OPDSImportRequest, lib: Library = Depends(get_request_library)):
     """Import books from an OPDS catalog feed."""
     import httpx
     import xml.etree.ElementTree as ET
 
-    lib = get_library()
     opds_url = request.opds_url.strip()
 
     if not opds_url.startswith(('http://', 'https://')):
@@ -901,19 +1042,16 @@ async def import_from_opds(request: OPDSImportRequest):
                         tmp.write(file_response.content)
                         tmp_path = Path(tmp.name)
 
-                    metadata = extract_metadata(str(tmp_path))
-                    book = lib.add_book(
-                        tmp_path,
-                        metadata=metadata,
-                        extract_text=request.extract_text,
-                        extract_cover=request.extract_cover
+                    book = await run_in_threadpool(
+                        _import_downloaded_file, lib, tmp_path,
+                        request.extract_text, request.extract_cover
                     )
 
                     tmp_path.unlink()
 
                     if book:
                         results["imported"] += 1
-                        results["books"].append(_book_to_response(book))
+                        results["books"].append(book)
                     else:
                         results["failed"] += 1
 
@@ -931,13 +1069,61 @@ async def import_from_opds(request: OPDSImportRequest):
         raise HTTPException(status_code=500, detail=f"OPDS import failed: {str(e)}")
 
 
+def _create_book_from_isbn_metadata(lib: Library, isbn: str, metadata: dict) -> dict:
+    """Create a file-less book entry from ISBN lookup metadata (blocking)."""
+    from .db.models import Book, Author, Subject, Identifier
+    from .services.import_service import get_sort_name
+    import hashlib
+
+    # Generate unique_id based on ISBN
+    unique_id = hashlib.md5(f"isbn:{isbn}".encode()).hexdigest()
+
+    book = Book(
+        unique_id=unique_id,
+        title=metadata['title'],
+        subtitle=metadata.get('subtitle'),
+        publisher=metadata.get('publisher'),
+        publication_date=metadata.get('publication_date'),
+        description=metadata.get('description'),
+        page_count=metadata.get('page_count'),
+        language=metadata.get('language'),
+    )
+
+    # Add authors
+    for author_name in metadata.get('authors', []):
+        if author_name:
+            author = lib.session.query(Author).filter_by(name=author_name).first()
+            if not author:
+                author = Author(name=author_name, sort_name=get_sort_name(author_name))
+                lib.session.add(author)
+            book.authors.append(author)
+
+    # Add subjects
+    for subject_name in metadata.get('subjects', []):
+        if subject_name:
+            subject = lib.session.query(Subject).filter_by(name=subject_name).first()
+            if not subject:
+                subject = Subject(name=subject_name)
+                lib.session.add(subject)
+            book.subjects.append(subject)
+
+    # Add identifiers
+    for ident in metadata.get('identifiers', []):
+        identifier = Identifier(scheme=ident['scheme'], value=ident['value'])
+        book.identifiers.append(identifier)
+
+    lib.session.add(book)
+    lib.session.commit()
+
+    return _book_to_response(book)
+
+
 @app.post("/api/books/import/isbn")
-async def import_from_isbn(request: ISBNImportRequest):
+async def import_from_isbn(request: ISBNImportRequest, lib: Library = Depends(get_request_library)):
     """Create a book entry from ISBN lookup (metadata only, no file)."""
     import httpx
     import re
 
-    lib = get_library()
     isbn = re.sub(r'[^0-9X]', '', request.isbn.upper())
 
     if len(isbn) not in (10, 13):
@@ -992,52 +1178,8 @@ async def import_from_isbn(request: ISBNImportRequest):
             if not metadata:
                 raise HTTPException(status_code=404, detail=f"No book found for ISBN: {isbn}")
 
-            # Create book entry without a file
-            from .db.models import Book, Author, Subject, Identifier
-            from .services.import_service import get_sort_name
-            import hashlib
-
-            # Generate unique_id based on ISBN
-            unique_id = hashlib.md5(f"isbn:{isbn}".encode()).hexdigest()
-
-            book = Book(
-                unique_id=unique_id,
-                title=metadata['title'],
-                subtitle=metadata.get('subtitle'),
-                publisher=metadata.get('publisher'),
-                publication_date=metadata.get('publication_date'),
-                description=metadata.get('description'),
-                page_count=metadata.get('page_count'),
-                language=metadata.get('language'),
-            )
-
-            # Add authors
-            for author_name in metadata.get('authors', []):
-                if author_name:
-                    author = lib.session.query(Author).filter_by(name=author_name).first()
-                    if not author:
-                        author = Author(name=author_name, sort_name=get_sort_name(author_name))
-                        lib.session.add(author)
-                    book.authors.append(author)
-
-            # Add subjects
-            for subject_name in metadata.get('subjects', []):
-                if subject_name:
-                    subject = lib.session.query(Subject).filter_by(name=subject_name).first()
-                    if not subject:
-                        subject = Subject(name=subject_name)
-                        lib.session.add(subject)
-                    book.subjects.append(subject)
-
-            # Add identifiers
-            for ident in metadata.get('identifiers', []):
-                identifier = Identifier(scheme=ident['scheme'], value=ident['value'])
-                book.identifiers.append(identifier)
-
-            lib.session.add(book)
-            lib.session.commit()
-
-            return _book_to_response(book)
+            # Create book entry without a file (blocking, so off the event loop)
+            return await run_in_threadpool(_create_book_from_isbn_metadata, lib, isbn, metadata)
 
     except httpx.HTTPError as e:
         raise HTTPException(status_code=400, detail=f"Failed to lookup ISBN: {str(e)}")
@@ -1048,9 +1190,8 @@ async def import_from_isbn(request: ISBNImportRequest):
 
 
 @app.get("/api/books/{book_id}/files/{file_format}")
-async def download_file(book_id: int, file_format: str):
+def download_file(book_id: int, file_format: str, lib: Library = Depends(get_request_library)):
     """Download a book file."""
-    lib = get_library()
     book = lib.get_book(book_id)
 
     if not book:
@@ -1075,9 +1216,8 @@ async def download_file(book_id: int, file_format: str):
 
 
 @app.get("/api/books/{book_id}/cover")
-async def get_cover(book_id: int):
+def get_cover(book_id: int, lib: Library = Depends(get_request_library)):
     """Get the cover image for a book."""
-    lib = get_library()
     book = lib.get_book(book_id)
 
     if not book:
@@ -1104,10 +1244,77 @@ async def get_cover(book_id: int):
     )
 
 
+def _job_to_response(job) -> JobResponse:
+    """Convert a Job row to its API response."""
+    def iso(value):
+        return value.isoformat() if value else None
+
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        file_id=job.file_id,
+        book_id=job.file.book_id if job.file else None,
+        status=job.status,
+        priority=job.priority,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        last_error=job.last_error,
+        created_at=iso(job.created_at),
+        started_at=iso(job.started_at),
+        finished_at=iso(job.finished_at),
+    )
+
+
+@app.get("/api/jobs", response_model=JobListResponse)
+def list_jobs(
+    status: Optional[str] = None,
+    book_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    lib: Library = Depends(get_request_library),
+):
+    """Background extraction jobs, newest first, with counts per status."""
+    from .services.job_service import JobService, JOB_STATUSES
+
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown job status '{status}'")
+
+    service = JobService(lib.session, lib.library_path)
+    return JobListResponse(
+        counts=service.counts(),
+        jobs=[_job_to_response(job) for job in service.list(status=status, book_id=book_id, limit=limit)],
+    )
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: int, lib: Library = Depends(get_request_library)):
+    """Get one background job."""
+    from .services.job_service import JobService
+
+    job = JobService(lib.session, lib.library_path).get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_to_response(job)
+
+
+@app.post("/api/jobs/{job_id}/retry", response_model=JobResponse)
+def retry_job(job_id: int, lib: Library = Depends(get_request_library)):
+    """Queue a failed or finished job to run again."""
+    from .services.job_service import JobService
+
+    try:
+        job = JobService(lib.session, lib.library_path).retry(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if _job_worker is not None:
+        _job_worker.wake()
+    return _job_to_response(job)
+
+
 @app.get("/api/stats", response_model=LibraryStats)
-async def get_stats():
+def get_stats(lib: Library = Depends(get_request_library)):
     """Get library statistics."""
-    lib = get_library()
     stats = lib.stats()
 
     # Calculate total size from all files
@@ -1139,13 +1346,48 @@ async def get_stats():
 
 
 @app.get("/api/search")
-async def search_books(q: str, limit: int = Query(50, ge=1, le=1000)):
+def search_books(q: str, limit: int = Query(50, ge=1, le=1000), lib: Library = Depends(get_request_library)):
     """Full-text search across books."""
-    lib = get_library()
     results = lib.search(q, limit=limit)
     return [_book_to_response(book) for book in results]
 
 
+_suggest_refresh_lock = threading.Lock()
+
+
+def _refresh_suggestions() -> None:
+    """Rebuild stale suggestions after a response; one rebuild at a time."""
+    if not _suggest_refresh_lock.acquire(blocking=False):
+        return
+    try:
+        with _library.scoped() as lib:
+            lib.refresh_suggestions()
+    except Exception:
+        logger.exception("Rebuilding search suggestions failed")
+    finally:
+        _suggest_refresh_lock.release()
+
+
+@app.get("/api/suggest", response_model=List[SuggestionResponse])
+def suggest(
+    q: str,
+    background_tasks: BackgroundTasks,
+    limit: int = Query(10, ge=1, le=50),
+    lib: Library = Depends(get_request_library),
+):
+    """Typeahead completions (titles, authors, subjects, tags) for the search box.
+
+    Always answers from the suggestions as last built. The job worker
+    rebuilds stale ones; without it, a rebuild runs after this response.
+    """
+    from .services.suggest_service import SuggestService
+
+    service = SuggestService(lib.session)
+    if _job_worker is None and service.is_stale():
+        background_tasks.add_task(_refresh_suggestions)
+    return service.suggest(q, limit=limit)
+
+
 # ---------------------------------------------------------------------------
 # Content search helpers + endpoints
 # ---------------------------------------------------------------------------
@@ -1228,7 +1470,8 @@ def _run_content_search(
     NOTE: snippet() is unavailable because the FTS5 external content
     table uses column name ``text`` while the backing ``book_content``
     table stores text in ``content``. We select ``bc.content`` directly
-    and build snippets in Python via ``_make_snippet()``.
+    (through ``bm_decompress()``, as it may be stored compressed) and
+    build snippets in Python via ``_make_snippet()``.
     """
     if book_id is not None:
         sql = _sqltext(
@@ -1241,7 +1484,7 @@ def _run_content_search(
                 bc.segment_index,
                 bc.title,
                 bc.anchor,
-                bc.content AS text_content,
+                bm_decompress(bc.content) AS text_content,
                 bm25(book_content_fts) AS rank
             FROM book_content_fts
             JOIN book_content bc ON bc.id = book_content_fts.rowid
@@ -1266,7 +1509,7 @@ def _run_content_search(
                 bc.segment_index,
                 bc.title,
                 bc.anchor,
-                bc.content AS text_content,
+                bm_decompress(bc.content) AS text_content,
                 bm25(book_content_fts) AS rank
             FROM book_content_fts
             JOIN book_content bc ON bc.id = book_content_fts.rowid
@@ -1309,11 +1552,11 @@ def within_book_search(
     q: str,
     limit: int = 50,
     advanced: bool = False,
+    lib: Library = Depends(get_request_library),
 ):
     """FTS5 content search within a single book."""
     if not q or not q.strip():
         raise HTTPException(400, "q is required")
-    lib = get_library()
     fts_query = safe_fts_query(q, advanced=advanced)
     if not fts_query:
         raise HTTPException(400, "q is required")
@@ -1325,11 +1568,11 @@ def cross_library_search(
     q: str,
     limit: int = 50,
     advanced: bool = False,
+    lib: Library = Depends(get_request_library),
 ):
     """FTS5 content search across all books."""
     if not q or not q.strip():
         raise HTTPException(400, "q is required")
-    lib = get_library()
     fts_query = safe_fts_query(q, advanced=advanced)
     if not fts_query:
         raise HTTPException(400, "q is required")
@@ -1377,10 +1620,9 @@ def _book_to_response(book) -> dict:
 # =========================================================================
 
 @app.get("/api/views", response_model=List[ViewResponse])
-async def list_views():
+def list_views(lib: Library = Depends(get_request_library)):
     """List all views (builtin and user-defined)."""
     from .views import ViewService
-    lib = get_library()
     svc = ViewService(lib.session)
     views = svc.list(include_builtin=True)
 
@@ -1398,11 +1640,10 @@ async def list_views():
 
 
 @app.get("/api/views/{view_name}", response_model=ViewDetailResponse)
-async def get_view(view_name: str):
+def get_view(view_name: str, lib: Library = Depends(get_request_library)):
     """Get view details including definition."""
     from .views import ViewService
     from .views.dsl import is_builtin_view, get_builtin_view
-    lib = get_library()
     svc = ViewService(lib.session)
 
     if is_builtin_view(view_name):
@@ -1430,14 +1671,14 @@ async def get_view(view_name: str):
 
 
 @app.get("/api/views/{view_name}/books", response_model=PaginatedBooksResponse)
-async def get_view_books(
+def get_view_books(
     view_name: str,
     limit: int = Query(50, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    lib: Library = Depends(get_request_library)
 ):
     """Get books in a view with pagination."""
     from .views import ViewService
-    lib = get_library()
     svc = ViewService(lib.session)
 
     try:
@@ -1458,10 +1699,9 @@ async def get_view_books(
 
 
 @app.post("/api/views", response_model=ViewDetailResponse)
-async def create_view(request: ViewCreateRequest):
+def create_view(request: ViewCreateRequest, lib: Library = Depends(get_request_library)):
     """Create a new view."""
     from .views import ViewService
-    lib = get_library()
     svc = ViewService(lib.session)
 
     try:
@@ -1495,11 +1735,10 @@ async def create_view(request: ViewCreateRequest):
 
 
 @app.patch("/api/views/{view_name}", response_model=ViewDetailResponse)
-async def update_view(view_name: str, request: ViewUpdateRequest):
+def update_view(view_name: str, request: ViewUpdateRequest, lib: Library = Depends(get_request_library)):
     """Update a view."""
     from .views import ViewService
     from .views.dsl import is_builtin_view
-    lib = get_library()
     svc = ViewService(lib.session)
 
     if is_builtin_view(view_name):
@@ -1524,11 +1763,10 @@ async def update_view(view_name: str, request: ViewUpdateRequest):
 
 
 @app.delete("/api/views/{view_name}")
-async def delete_view(view_name: str):
+def delete_view(view_name: str, lib: Library = Depends(get_request_library)):
     """Delete a view."""
     from .views import ViewService
     from .views.dsl import is_builtin_view
-    lib = get_library()
     svc = ViewService(lib.session)
 
     if is_builtin_view(view_name):
@@ -1541,11 +1779,10 @@ async def delete_view(view_name: str):
 
 
 @app.post("/api/views/{view_name}/books/{book_id}")
-async def add_book_to_view(view_name: str, book_id: int):
+def add_book_to_view(view_name: str, book_id: int, lib: Library = Depends(get_request_library)):
     """Add a book to a view."""
     from .views import ViewService
     from .views.dsl import is_builtin_view
-    lib = get_library()
     svc = ViewService(lib.session)
 
     if is_builtin_view(view_name):
@@ -1559,11 +1796,10 @@ async def add_book_to_view(view_name: str, book_id: int):
 
 
 @app.delete("/api/views/{view_name}/books/{book_id}")
-async def remove_book_from_view(view_name: str, book_id: int):
+def remove_book_from_view(view_name: str, book_id: int, lib: Library = Depends(get_request_library)):
     """Remove a book from a view."""
     from .views import ViewService
     from .views.dsl import is_builtin_view
-    lib = get_library()
     svc = ViewService(lib.session)
 
     if is_builtin_view(view_name):
@@ -1577,11 +1813,10 @@ async def remove_book_from_view(view_name: str, book_id: int):
 
 
 @app.put("/api/views/{view_name}/overrides/{book_id}")
-async def set_view_override(view_name: str, book_id: int, request: ViewOverrideRequest):
+def set_view_override(view_name: str, book_id: int, request: ViewOverrideRequest, lib: Library = Depends(get_request_library)):
     """Set metadata overrides for a book within a view."""
     from .views import ViewService
     from .views.dsl import is_builtin_view
-    lib = get_library()
     svc = ViewService(lib.session)
 
     if is_builtin_view(view_name):
@@ -1601,11 +1836,10 @@ async def set_view_override(view_name: str, book_id: int, request: ViewOverrideR
 
 
 @app.delete("/api/views/{view_name}/overrides/{book_id}")
-async def remove_view_override(view_name: str, book_id: int, field: Optional[str] = None):
+def remove_view_override(view_name: str, book_id: int, field: Optional[str] = None, lib: Library = Depends(get_request_library)):
     """Remove overrides for a book within a view."""
     from .views import ViewService
     from .views.dsl import is_builtin_view
-    lib = get_library()
     svc = ViewService(lib.session)
 
     if is_builtin_view(view_name):
@@ -1621,10 +1855,9 @@ async def remove_view_override(view_name: str, book_id: int, field: Optional[str
 
 
 @app.get("/api/views/{view_name}/yaml")
-async def export_view_yaml(view_name: str):
+def export_view_yaml(view_name: str, lib: Library = Depends(get_request_library)):
     """Export a view definition as YAML."""
     from .views import ViewService
-    lib = get_library()
     svc = ViewService(lib.session)
 
     try:
@@ -1638,10 +1871,9 @@ async def export_view_yaml(view_name: str):
 
 
 @app.post("/api/views/import")
-async def import_view_yaml(yaml_content: str = Form(...), overwrite: bool = Form(False)):
+def import_view_yaml(yaml_content: str = Form(...), overwrite: bool = Form(False), lib: Library = Depends(get_request_library)):
     """Import a view from YAML."""
     from .views import ViewService
-    lib = get_library()
     svc = ViewService(lib.session)
 
     try:
@@ -1662,9 +1894,8 @@ async def import_view_yaml(yaml_content: str = Form(...), overwrite: bool = Form
 # ---------------------------------------------------------------------------
 
 @app.post("/api/marginalia", response_model=MarginaliaOut, status_code=201)
-def create_marginalia(payload: MarginaliaCreate):
+def create_marginalia(payload: MarginaliaCreate, lib: Library = Depends(get_request_library)):
     """Create a new marginalia entry."""
-    lib = get_library()
     svc = MarginaliaService(lib.session, library_path=lib.library_path)
     try:
         m = svc.create(
@@ -1688,9 +1919,9 @@ def list_marginalia(
     scope: Optional[str] = None,
     include_archived: bool = False,
     limit: int = 100,
+    lib: Library = Depends(get_request_library),
 ):
     """List marginalia. For now, book_id is required (cross-book listing TBD)."""
-    lib = get_library()
     svc = MarginaliaService(lib.session, library_path=lib.library_path)
     if book_id is None:
         raise HTTPException(
@@ -1707,9 +1938,8 @@ def list_marginalia(
 
 
 @app.get("/api/marginalia/{uuid}", response_model=MarginaliaOut)
-def get_marginalia(uuid: str):
+def get_marginalia(uuid: str, lib: Library = Depends(get_request_library)):
     """Get a marginalia entry by uuid."""
-    lib = get_library()
     svc = MarginaliaService(lib.session, library_path=lib.library_path)
     m = svc.get_by_uuid(uuid)
     if m is None:
@@ -1718,9 +1948,8 @@ def get_marginalia(uuid: str):
 
 
 @app.patch("/api/marginalia/{uuid}", response_model=MarginaliaOut)
-def update_marginalia(uuid: str, payload: MarginaliaUpdate):
+def update_marginalia(uuid: str, payload: MarginaliaUpdate, lib: Library = Depends(get_request_library)):
     """Update editable fields of a marginalia entry."""
-    lib = get_library()
     svc = MarginaliaService(lib.session, library_path=lib.library_path)
     m = svc.get_by_uuid(uuid)
     if m is None:
@@ -1740,9 +1969,8 @@ def update_marginalia(uuid: str, payload: MarginaliaUpdate):
 
 
 @app.delete("/api/marginalia/{uuid}", status_code=204)
-def delete_marginalia(uuid: str, hard: bool = False):
+def delete_marginalia(uuid: str, hard: bool = False, lib: Library = Depends(get_request_library)):
     """Soft-delete (default) or hard-delete a marginalia entry."""
-    lib = get_library()
     svc = MarginaliaService(lib.session, library_path=lib.library_path)
     m = svc.get_by_uuid(uuid)
     if m is None:
@@ -1755,9 +1983,8 @@ def delete_marginalia(uuid: str, hard: bool = False):
 
 
 @app.post("/api/marginalia/{uuid}/restore", response_model=MarginaliaOut)
-def restore_marginalia(uuid: str):
+def restore_marginalia(uuid: str, lib: Library = Depends(get_request_library)):
     """Restore a soft-deleted marginalia entry."""
-    lib = get_library()
     svc = MarginaliaService(lib.session, library_path=lib.library_path)
     m = svc.get_by_uuid(uuid)
     if m is None:
@@ -1771,9 +1998,8 @@ def restore_marginalia(uuid: str):
 # ---------------------------------------------------------------------------
 
 @app.post("/api/reading/sessions/start", response_model=ReadingSessionOut, status_code=201)
-def start_reading_session(payload: StartSessionIn):
+def start_reading_session(payload: StartSessionIn, lib: Library = Depends(get_request_library)):
     """Begin a new reading session."""
-    lib = get_library()
     svc = ReadingSessionService(lib.session)
     try:
         rs = svc.start(book_id=payload.book_id, start_anchor=payload.start_anchor)
@@ -1783,9 +2009,8 @@ def start_reading_session(payload: StartSessionIn):
 
 
 @app.post("/api/reading/sessions/{uuid}/end", response_model=ReadingSessionOut)
-def end_reading_session(uuid: str, payload: EndSessionIn):
+def end_reading_session(uuid: str, payload: EndSessionIn, lib: Library = Depends(get_request_library)):
     """Close a reading session (idempotent once ended)."""
-    lib = get_library()
     svc = ReadingSessionService(lib.session)
     try:
         rs = svc.end(uuid, end_anchor=payload.end_anchor)
@@ -1799,18 +2024,17 @@ def list_reading_sessions(
     book_id: int,
     include_archived: bool = False,
     limit: int = 50,
+    lib: Library = Depends(get_request_library),
 ):
     """List reading sessions for a book, newest first."""
-    lib = get_library()
     svc = ReadingSessionService(lib.session)
     rows = svc.list_for_book(book_id, include_archived=include_archived, limit=limit)
     return [ReadingSessionOut.from_orm(r) for r in rows]
 
 
 @app.delete("/api/reading/sessions/{uuid}", status_code=204)
-def delete_reading_session(uuid: str, hard: bool = False):
+def delete_reading_session(uuid: str, hard: bool = False, lib: Library = Depends(get_request_library)):
     """Soft-delete (default) or hard-delete a reading session."""
-    lib = get_library()
     svc = ReadingSessionService(lib.session)
     rs = svc.get_by_uuid(uuid)
     if rs is None:
@@ -1823,9 +2047,8 @@ def delete_reading_session(uuid: str, hard: bool = False):
 
 
 @app.post("/api/reading/sessions/{uuid}/restore", response_model=ReadingSessionOut)
-def restore_reading_session(uuid: str):
+def restore_reading_session(uuid: str, lib: Library = Depends(get_request_library)):
     """Restore a soft-deleted reading session."""
-    lib = get_library()
     svc = ReadingSessionService(lib.session)
     rs = svc.get_by_uuid(uuid)
     if rs is None:
@@ -1849,9 +2072,8 @@ def _get_or_create_personal(session, book_id: int) -> PersonalMetadata:
 
 
 @app.get("/api/reading/progress", response_model=ProgressOut)
-def get_reading_progress(book_id: int):
+def get_reading_progress(book_id: int, lib: Library = Depends(get_request_library)):
     """Return current reading progress for a book. Defaults to nulls if no row exists."""
-    lib = get_library()
     pm = lib.session.query(PersonalMetadata).filter_by(book_id=book_id).first()
     if pm is None:
         return ProgressOut(book_id=book_id, anchor=None, percentage=None, updated_at=None)
@@ -1864,9 +2086,8 @@ def get_reading_progress(book_id: int):
 
 
 @app.post("/api/reading/progress", response_model=ProgressOut)
-def post_reading_progress(payload: ProgressIn):
+def post_reading_progress(payload: ProgressIn, lib: Library = Depends(get_request_library)):
     """Auto-sync endpoint: accept only if new percentage is at or after current."""
-    lib = get_library()
     pm = _get_or_create_personal(lib.session, payload.book_id)
     current_pct = pm.reading_progress or 0
     if payload.percentage is not None and payload.percentage < current_pct:
@@ -1890,9 +2111,8 @@ def post_reading_progress(payload: ProgressIn):
 
 
 @app.patch("/api/reading/progress", response_model=ProgressOut)
-def patch_reading_progress(payload: ProgressIn):
+def patch_reading_progress(payload: ProgressIn, lib: Library = Depends(get_request_library)):
     """Explicit-set endpoint: always wins, bypasses the forward-only check."""
-    lib = get_library()
     pm = _get_or_create_personal(lib.session, payload.book_id)
     pm.progress_anchor = payload.anchor
     if payload.percentage is not None:
@@ -2953,8 +3173,9 @@ def get_web_interface() -> str:
                 <button class="menu-btn" onclick="toggleSidebar()">&#9776;</button>
                 <div class="search-box">
                     <span class="search-icon">&#128269;</span>
-                    <input type="text" class="search-input" id="search-input"
+                    <input type="text" class="search-input" id="search-input" list="search-suggestions"
                            placeholder="Search books by title, author, description..." autocomplete="off">
+                    <datalist id="search-suggestions"></datalist>
                 </div>
                 <div class="header-actions">
                     <button class="icon-btn active" id="view-grid" onclick="setView('grid')" title="Grid View">&#9638;</button>
@@ -3400,11 +3621,36 @@ def get_web_interface() -> str:
             document.querySelector('.sidebar-overlay').classList.toggle('active');
         }
 
+        async function loadSuggestions(query) {
+            const list = document.getElementById('search-suggestions');
+            if (query.trim().length < 2) {
+                list.innerHTML = '';
+                return;
+            }
+            try {
+                const response = await fetch('/api/suggest?q=' + encodeURIComponent(query));
+                if (!response.ok) return;
+                const suggestions = await response.json();
+                list.innerHTML = '';
+                suggestions.forEach(s => {
+                    const option = document.createElement('option');
+                    option.value = s.label;
+                    option.label = s.kind;
+                    list.appendChild(option);
+                });
+            } catch (error) {
+                console.error('Error loading suggestions:', error);
+            }
+        }
+
         function setupEventListeners() {
             // Search debouncing
             let searchTimeout;
+            let suggestTimeout;
             document.getElementById('search-input').addEventListener('input', (e) => {
                 clearTimeout(searchTimeout);
+                clearTimeout(suggestTimeout);
+                suggestTimeout = setTimeout(() => loadSuggestions(e.target.value), 80);
                 searchTimeout = setTimeout(() => {
                     if (e.target.value.length >= 2) {
                         isSearching = true;
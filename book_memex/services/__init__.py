@@ -6,17 +6,28 @@ Provides a unified service layer for all book-memex operations.
 
 from .text_extraction import TextExtractionService
 from .import_service import ImportService
+from .hash_cache import FileHashCache
 from .export_service import ExportService
 from .queue_service import ReadingQueueService
 from .personal_metadata_service import PersonalMetadataService
 from .marginalia_service import MarginaliaService
 from .view_service import ViewService
+from .neighbor_service import NeighborService
+from .suggest_service import SuggestService
+from .reindex_service import ReindexService
+from .job_service import JobService, JobWorker
+from .folder_watch import FolderWatcher
 
 __all__ = [
     # Core services
     'TextExtractionService',
     'ImportService',
     'ExportService',
+    'FileHashCache',
+    'JobService',
+    'JobWorker',
+    'FolderWatcher',
+    'ReindexService',
 
     # Personal/user services
     'ReadingQueueService',
@@ -25,4 +36,6 @@ __all__ = [
 
     # Library organization
     'ViewService',
+    'NeighborService',
+    'SuggestService',
 ]
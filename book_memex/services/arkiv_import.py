@@ -56,7 +56,7 @@ import zipfile
 from collections.abc import Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 # ---------------------------------------------------------------------------
@@ -254,19 +254,63 @@ def _unique_id_from_book_uri(uri: Optional[str]) -> Optional[str]:
     return tail or None
 
 
+def _records_of_kind(path: str | Path, kind: str) -> Iterator[Dict[str, Any]]:
+    for rec in _open_jsonl(path):
+        if isinstance(rec, dict) and rec.get("kind") == kind:
+            yield rec
+
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _ids_by(session, key_column, id_column, keys: Iterable[Any]) -> Dict[Any, int]:
+    """Map *keys* that exist in the DB to their (lowest) id with one IN query."""
+    from sqlalchemy import func, select
+
+    keys = list({key for key in keys if key is not None})
+    if not keys:
+        return {}
+    rows = session.execute(
+        select(key_column, func.min(id_column))
+        .where(key_column.in_(keys))
+        .group_by(key_column)
+    )
+    return {key: id_ for key, id_ in rows}
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
 
+# Records resolved and inserted per round of queries
+BATCH_SIZE = 500
+
+
 def import_arkiv(
     library,
     path: str | Path,
     *,
     merge: bool = False,
+    batch_size: int = BATCH_SIZE,
 ) -> Dict[str, int]:
     """Import an arkiv bundle into *library*.
 
+    Records are read in three streaming passes over the bundle (books,
+    then marginalia, then reading sessions, so links resolve whatever the
+    record order) and handled *batch_size* at a time: existing unique_ids,
+    uuids, author / subject names and tag paths are resolved with one IN
+    query per batch and new rows are written with executemany inserts.
+    Everything is committed once at the end.
+
     Parameters
     ----------
     library:
@@ -278,6 +322,8 @@ def import_arkiv(
         Reserved for CLI parity with the rest of the ``*-memex``
         ecosystem. Currently a no-op because the insert path is already
         duplicate-safe.
+    batch_size:
+        Records per batch.
 
     Returns
     -------
@@ -291,18 +337,6 @@ def import_arkiv(
         book is not present in the local archive (we don't synthesise
         placeholder books for those).
     """
-    from sqlalchemy import select
-
-    from ..db.models import (
-        Author,
-        Book,
-        Identifier,
-        Marginalia,
-        ReadingSession,
-        Subject,
-        Tag,
-    )
-
     stats = {
         "books_seen": 0,
         "books_added": 0,
@@ -316,236 +350,273 @@ def import_arkiv(
         "reading_orphaned": 0,
     }
 
-    records = list(_open_jsonl(path))
     session = library.session
+    session.flush()
+    for kind, import_batch in (
+        ("book", _import_books),
+        ("marginalia", _import_marginalia),
+        ("reading", _import_reading_sessions),
+    ):
+        for batch in _chunks(_records_of_kind(path, kind), batch_size):
+            import_batch(session, batch, stats)
+
+    # Bulk inserts bypass the identity map; reload anything already loaded.
+    session.expire_all()
+    session.commit()
+    return stats
 
-    # Pass 1: books. We buffer unique_id -> Book so subsequent marginalia
-    # and reading records can link to them without a second DB round-trip.
-    uid_to_book: Dict[str, Book] = {}
 
-    for rec in records:
-        if not isinstance(rec, dict):
-            continue
-        if rec.get("kind") != "book":
-            continue
-        stats["books_seen"] += 1
+def _import_books(session, records: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+    """Insert new books and merge metadata into existing ones."""
+    from sqlalchemy import insert
 
-        unique_id = rec.get("unique_id")
-        if not unique_id:
-            continue
+    from ..db.models import Book
 
-        existing = session.execute(
-            select(Book).where(Book.unique_id == unique_id)
-        ).scalar_one_or_none()
+    stats["books_seen"] += len(records)
+    records = [rec for rec in records if rec.get("unique_id")]
+    book_ids = _ids_by(session, Book.unique_id, Book.id, (rec["unique_id"] for rec in records))
 
-        if existing is not None:
-            uid_to_book[unique_id] = existing
-            # Merge any new authors/subjects/tags/identifiers.
-            _merge_book_metadata(session, existing, rec)
+    # Create bare Book rows from metadata only. The arkiv bundle does not
+    # carry the file payload; callers acquire files separately via the
+    # normal import path and reconcile by unique_id.
+    new_rows: Dict[str, Dict[str, Any]] = {}
+    for rec in records:
+        unique_id = rec["unique_id"]
+        if unique_id in book_ids or unique_id in new_rows:
+            # Existing rows are left untouched apart from the metadata merge.
             stats["books_skipped_existing"] += 1
             continue
-
-        # Create a bare Book row from metadata only. The arkiv bundle
-        # does not carry the file payload; callers acquire files
-        # separately via the normal import path and reconcile by
-        # unique_id.
-        book = Book(
-            unique_id=unique_id,
-            title=rec.get("title") or "(untitled)",
-            subtitle=rec.get("subtitle"),
-            language=rec.get("language"),
-            publisher=rec.get("publisher"),
-            publication_date=rec.get("publication_date"),
-            description=rec.get("description"),
-            series=rec.get("series"),
-            series_index=rec.get("series_index"),
-        )
-        session.add(book)
-        session.flush()  # populate book.id
-        _merge_book_metadata(session, book, rec)
-        uid_to_book[unique_id] = book
+        new_rows[unique_id] = {
+            "unique_id": unique_id,
+            "title": rec.get("title") or "(untitled)",
+            "subtitle": rec.get("subtitle"),
+            "language": rec.get("language"),
+            "publisher": rec.get("publisher"),
+            "publication_date": rec.get("publication_date"),
+            "description": rec.get("description"),
+            "series": rec.get("series"),
+            "series_index": rec.get("series_index"),
+        }
         stats["books_added"] += 1
 
-    session.flush()
+    if new_rows:
+        session.execute(insert(Book.__table__), list(new_rows.values()))
+        book_ids.update(_ids_by(session, Book.unique_id, Book.id, new_rows))
 
-    # Pass 2: marginalia.
-    for rec in records:
-        if not isinstance(rec, dict):
-            continue
-        if rec.get("kind") != "marginalia":
-            continue
-        stats["marginalia_seen"] += 1
+    _merge_book_metadata(session, [(book_ids[rec["unique_id"]], rec) for rec in records])
 
-        uuid = rec.get("uuid")
-        if not uuid:
-            continue
 
-        existing_m = session.execute(
-            select(Marginalia).where(Marginalia.uuid == uuid)
-        ).scalar_one_or_none()
-        if existing_m is not None:
+def _import_marginalia(session, records: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+    """Insert marginalia with unseen uuids, linked to the books that exist locally."""
+    from sqlalchemy import insert
+
+    from ..db.models import Book, Marginalia, marginalia_books, utc_now
+
+    stats["marginalia_seen"] += len(records)
+    records = [rec for rec in records if rec.get("uuid")]
+    existing = _ids_by(session, Marginalia.uuid, Marginalia.id, (rec["uuid"] for rec in records))
+    book_uids = {
+        rec["uuid"]: [uid for uid in map(_unique_id_from_book_uri, rec.get("book_uris") or []) if uid]
+        for rec in records
+    }
+    book_ids = _ids_by(session, Book.unique_id, Book.id,
+                       (uid for uids in book_uids.values() for uid in uids))
+
+    new_rows: Dict[str, Dict[str, Any]] = {}
+    for rec in records:
+        uuid = rec["uuid"]
+        if uuid in existing or uuid in new_rows:
             stats["marginalia_skipped_existing"] += 1
             continue
+        row = {
+            "uuid": uuid,
+            "content": rec.get("content"),
+            "highlighted_text": rec.get("highlighted_text"),
+            "page_number": rec.get("page_number"),
+            "position": rec.get("position"),
+            "category": rec.get("category"),
+            "color": rec.get("color"),
+            "pinned": bool(rec.get("pinned", False)),
+        }
+        for field in ("created_at", "updated_at"):
+            row[field] = _parse_timestamp(rec.get(field)) or utc_now()
+        new_rows[uuid] = row
+        stats["marginalia_added"] += 1
 
-        # Link to any books we can resolve locally.
-        book_uris = rec.get("book_uris") or []
-        linked_books = []
-        for uri in book_uris:
-            uid = _unique_id_from_book_uri(uri)
-            if not uid:
-                continue
-            b = uid_to_book.get(uid)
-            if b is None:
-                # Maybe a book we didn't import this round — look up directly.
-                b = session.execute(
-                    select(Book).where(Book.unique_id == uid)
-                ).scalar_one_or_none()
-                if b is not None:
-                    uid_to_book[uid] = b
-            if b is not None:
-                linked_books.append(b)
-
-        m = Marginalia(
-            uuid=uuid,
-            content=rec.get("content"),
-            highlighted_text=rec.get("highlighted_text"),
-            page_number=rec.get("page_number"),
-            position=rec.get("position"),
-            category=rec.get("category"),
-            color=rec.get("color"),
-            pinned=bool(rec.get("pinned", False)),
+    if not new_rows:
+        return
+    session.execute(insert(Marginalia.__table__), list(new_rows.values()))
+    marginalia_ids = _ids_by(session, Marginalia.uuid, Marginalia.id, new_rows)
+    links = {
+        (marginalia_ids[uuid], book_ids[uid])
+        for uuid in new_rows
+        for uid in book_uids[uuid]
+        if uid in book_ids
+    }
+    if links:
+        session.execute(
+            insert(marginalia_books),
+            [{"marginalia_id": m_id, "book_id": b_id} for m_id, b_id in sorted(links)],
         )
-        c = _parse_timestamp(rec.get("created_at"))
-        u = _parse_timestamp(rec.get("updated_at"))
-        if c is not None:
-            m.created_at = c
-        if u is not None:
-            m.updated_at = u
-        session.add(m)
-        session.flush()
-        for b in linked_books:
-            m.books.append(b)
-        stats["marginalia_added"] += 1
 
-    session.flush()
 
-    # Pass 3: reading sessions.
-    for rec in records:
-        if not isinstance(rec, dict):
-            continue
-        if rec.get("kind") != "reading":
-            continue
-        stats["reading_seen"] += 1
+def _import_reading_sessions(session, records: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+    """Insert reading sessions with unseen uuids whose book exists locally."""
+    from sqlalchemy import insert
 
-        uuid = rec.get("uuid")
-        if not uuid:
-            continue
+    from ..db.models import Book, ReadingSession, utc_now
 
-        existing_rs = session.execute(
-            select(ReadingSession).where(ReadingSession.uuid == uuid)
-        ).scalar_one_or_none()
-        if existing_rs is not None:
+    stats["reading_seen"] += len(records)
+    records = [rec for rec in records if rec.get("uuid")]
+    existing = _ids_by(session, ReadingSession.uuid, ReadingSession.id,
+                       (rec["uuid"] for rec in records))
+    book_ids = _ids_by(session, Book.unique_id, Book.id,
+                       (_unique_id_from_book_uri(rec.get("book_uri")) for rec in records))
+
+    new_rows: Dict[str, Dict[str, Any]] = {}
+    for rec in records:
+        uuid = rec["uuid"]
+        if uuid in existing or uuid in new_rows:
             stats["reading_skipped_existing"] += 1
             continue
-
-        book_uri = rec.get("book_uri")
-        uid = _unique_id_from_book_uri(book_uri)
-        book = uid_to_book.get(uid) if uid else None
-        if book is None and uid:
-            book = session.execute(
-                select(Book).where(Book.unique_id == uid)
-            ).scalar_one_or_none()
-            if book is not None:
-                uid_to_book[uid] = book
-        if book is None:
+        book_id = book_ids.get(_unique_id_from_book_uri(rec.get("book_uri")))
+        if book_id is None:
             # Reading session with no resolvable parent book: skip.
             stats["reading_orphaned"] += 1
             continue
-
-        rs = ReadingSession(
-            uuid=uuid,
-            book_id=book.id,
-            start_time=_parse_timestamp(rec.get("start_time")),
-            end_time=_parse_timestamp(rec.get("end_time")),
-            start_anchor=rec.get("start_anchor"),
-            end_anchor=rec.get("end_anchor"),
-            pages_read=rec.get("pages_read"),
-        )
-        session.add(rs)
+        new_rows[uuid] = {
+            "uuid": uuid,
+            "book_id": book_id,
+            "start_time": _parse_timestamp(rec.get("start_time")) or utc_now(),
+            "end_time": _parse_timestamp(rec.get("end_time")),
+            "start_anchor": rec.get("start_anchor"),
+            "end_anchor": rec.get("end_anchor"),
+            "pages_read": rec.get("pages_read"),
+        }
         stats["reading_added"] += 1
 
-    session.commit()
-    return stats
+    if new_rows:
+        session.execute(insert(ReadingSession.__table__), list(new_rows.values()))
 
 
-def _merge_book_metadata(session, book, rec: Dict[str, Any]) -> None:
-    """Merge author / subject / tag / identifier metadata into *book*.
+def _merge_book_metadata(session, books: List[Tuple[int, Dict[str, Any]]]) -> None:
+    """Merge author / subject / tag / identifier metadata into a batch of books.
 
-    Only adds; never removes. Existing local enrichments survive.
+    *books* pairs book ids with their records. Only adds; never removes.
+    Existing local enrichments survive.
     """
-    from sqlalchemy import select
+    from ..db.models import Author, Subject, book_authors, book_subjects, book_tags
 
-    from ..db.models import Author, Identifier, Subject, Tag
+    if not books:
+        return
 
-    # Authors.
-    for name in rec.get("authors") or []:
-        if not name:
-            continue
-        author = session.execute(
-            select(Author).where(Author.name == name)
-        ).scalar_one_or_none()
-        if author is None:
-            author = Author(name=name)
-            session.add(author)
-            session.flush()
-        if author not in book.authors:
-            book.authors.append(author)
-
-    # Subjects.
-    for name in rec.get("subjects") or []:
-        if not name:
-            continue
-        subject = session.execute(
-            select(Subject).where(Subject.name == name)
-        ).scalar_one_or_none()
-        if subject is None:
-            subject = Subject(name=name)
-            session.add(subject)
-            session.flush()
-        if subject not in book.subjects:
-            book.subjects.append(subject)
-
-    # Tags. Tags have full_path semantics; for the import we treat each
-    # entry as a leaf name without re-deriving hierarchy (round-trip
-    # between two book-memex archives preserves the same model in both).
-    for tag_path in rec.get("tags") or []:
-        if not tag_path:
-            continue
-        tag = session.execute(
-            select(Tag).where(Tag.full_path == tag_path)
-        ).scalar_one_or_none()
-        if tag is None:
-            # Split the path and create leaf-only Tag; hierarchy is not
-            # reconstructed here because we don't know the parent_id
-            # from the bundle. The consequence is flat tags for
-            # round-tripped archives; a future pass can rebuild nesting.
-            name = tag_path.rsplit("/", 1)[-1]
-            tag = Tag(name=name)
-            session.add(tag)
-            session.flush()
-        if tag not in book.tags:
-            book.tags.append(tag)
-
-    # Identifiers. Stored as {scheme: value}, not a Python object list.
-    # We upsert by (book_id, scheme).
-    for scheme, value in (rec.get("identifiers") or {}).items():
-        if not scheme or not value:
-            continue
-        existing = session.execute(
-            select(Identifier).where(
-                Identifier.book_id == book.id,
-                Identifier.scheme == scheme,
-            )
-        ).scalar_one_or_none()
-        if existing is None:
-            session.add(Identifier(book_id=book.id, scheme=scheme, value=str(value)))
+    def names(field: str) -> List[Tuple[int, str]]:
+        return [(book_id, name) for book_id, rec in books for name in rec.get(field) or [] if name]
+
+    authors = names("authors")
+    author_ids = _get_or_create_by_name(session, Author, (name for _, name in authors))
+    _add_links(session, book_authors, "author_id",
+               [(book_id, author_ids[name]) for book_id, name in authors])
+
+    subjects = names("subjects")
+    subject_ids = _get_or_create_by_name(session, Subject, (name for _, name in subjects))
+    _add_links(session, book_subjects, "subject_id",
+               [(book_id, subject_ids[name]) for book_id, name in subjects])
+
+    tags = names("tags")
+    tag_ids = _get_or_create_tags(session, (path for _, path in tags))
+    _add_links(session, book_tags, "tag_id", [(book_id, tag_ids[path]) for book_id, path in tags])
+
+    _add_identifiers(session, books)
+
+
+def _get_or_create_by_name(session, model, names: Iterable[str]) -> Dict[str, int]:
+    """Ids of the *model* rows (authors, subjects) with these names, creating missing ones."""
+    from sqlalchemy import insert
+
+    names = set(names)
+    ids = _ids_by(session, model.name, model.id, names)
+    missing = sorted(names - ids.keys())
+    if missing:
+        session.execute(insert(model.__table__), [{"name": name} for name in missing])
+        ids.update(_ids_by(session, model.name, model.id, missing))
+    return ids
+
+
+def _get_or_create_tags(session, paths: Iterable[str]) -> Dict[str, int]:
+    """Ids of the tags with these paths, creating missing tags and their parents."""
+    from sqlalchemy import insert
+
+    from ..db.models import Tag
+
+    paths = set(paths)
+    wanted = set()
+    for path in paths:
+        parts = path.split("/")
+        wanted.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+    ids = _ids_by(session, Tag.path, Tag.id, wanted)
+
+    # Create missing levels root-first so every parent id is known.
+    missing = sorted(wanted - ids.keys(), key=lambda p: (p.count("/"), p))
+    for depth in sorted({path.count("/") for path in missing}):
+        level = [path for path in missing if path.count("/") == depth]
+        session.execute(insert(Tag.__table__), [
+            {
+                "name": path.rsplit("/", 1)[-1],
+                "path": path,
+                "parent_id": ids[path.rsplit("/", 1)[0]] if depth else None,
+            }
+            for path in level
+        ])
+        ids.update(_ids_by(session, Tag.path, Tag.id, level))
+    return {path: ids[path] for path in paths}
+
+
+def _add_links(session, table, column: str, pairs: List[Tuple[int, int]]) -> None:
+    """Insert (book_id, <column>) rows into an association *table* unless present."""
+    from sqlalchemy import insert, select
+
+    if not pairs:
+        return
+    existing = {tuple(row) for row in session.execute(
+        select(table.c.book_id, table.c[column])
+        .where(table.c.book_id.in_({book_id for book_id, _ in pairs}))
+    )}
+    new = []
+    for pair in pairs:
+        if pair not in existing:
+            existing.add(pair)
+            new.append({"book_id": pair[0], column: pair[1]})
+    if new:
+        session.execute(insert(table), new)
+
+
+def _add_identifiers(session, books: List[Tuple[int, Dict[str, Any]]]) -> None:
+    """Add identifiers for schemes a book does not have yet.
+
+    Identifiers are stored in records as {scheme: value}; one per
+    (book_id, scheme) is kept.
+    """
+    from sqlalchemy import insert, select
+
+    from ..db.models import Identifier
+
+    wanted = [
+        (book_id, scheme, str(value))
+        for book_id, rec in books
+        for scheme, value in (rec.get("identifiers") or {}).items()
+        if scheme and value
+    ]
+    if not wanted:
+        return
+    existing = {tuple(row) for row in session.execute(
+        select(Identifier.book_id, Identifier.scheme)
+        .where(Identifier.book_id.in_({book_id for book_id, _, _ in wanted}))
+    )}
+    new = []
+    for book_id, scheme, value in wanted:
+        if (book_id, scheme) not in existing:
+            existing.add((book_id, scheme))
+            new.append({"book_id": book_id, "scheme": scheme, "value": value})
+    if new:
+        session.execute(insert(Identifier.__table__), new)
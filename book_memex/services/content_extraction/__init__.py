@@ -77,7 +77,7 @@ def _install_default_extractors() -> None:
     from book_memex.services.content_extraction.pdf import PdfExtractor
     from book_memex.services.content_extraction.txt import TxtExtractor
     register("epub", EpubExtractor())
-    register("pdf", PdfExtractor())
+    register("pdf", PdfExtractor(workers=1))  # see pdf.enable_process_pool
     register("txt", TxtExtractor())
 
 
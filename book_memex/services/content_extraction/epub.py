@@ -1,76 +1,242 @@
 """EPUB content extractor.
 
 Walks the EPUB spine, emitting one Segment per document item (skipping
-the nav). Title is extracted from the first <h1> when present, falling
-back to the spine item's TOC title. Anchor is a chapter-root CFI derived
-from the spine position (even-index pattern: item N occupies CFI /6/<2N>).
+the nav). Title is extracted from the first <h1> when present. Anchor is
+a chapter-root CFI derived from the spine position (even-index pattern:
+item N occupies CFI /6/<2N>).
+
+The EPUB is read as a plain zip: only META-INF/container.xml, the OPF and
+the spine's XHTML members are opened, and each member is streamed through
+lxml's HTML parser with a target that collects text as it goes. Images,
+fonts and stylesheets are never read or decoded. Text and titles match
+what ebooklib's get_body_content() plus BeautifulSoup's get_text() gave
+(epub-v1), except for a body holding only bare text: ebooklib gave no
+title and no text for it, epub-v2 gives that text and the document's
+<title>.
 """
 
+import posixpath
+import zipfile
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import unquote
 
-from bs4 import BeautifulSoup
-from ebooklib import epub, ITEM_DOCUMENT
+from lxml import etree
 
 from . import Segment
 
 
+_CONTAINER_NS = "urn:oasis:names:tc:opendocument:xmlns:container"
+_OPF_NS = "http://www.idpf.org/2007/opf"
+_XHTML_MEDIA_TYPE = "application/xhtml+xml"
+
+# Strings under these tags are not page text (BeautifulSoup's get_text()
+# skips them too)
+_SKIP_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+
+_READ_CHUNK = 64 * 1024
+
+
 class EpubExtractor:
-    version = "epub-v1"
+    version = "epub-v2"
 
     def supports(self, book_format: str) -> bool:
         return book_format.lower() == "epub"
 
     def extract(self, file_path: Path) -> Iterator[Segment]:
-        book = epub.read_epub(str(file_path))
-
-        # Walk the spine in order. `book.spine` is a list of (item_id, linear)
-        # tuples. The nav item is typically first and is not content; skip it
-        # for text extraction BUT use the real spine position for CFI so
-        # anchors resolve in EPUB.js (which indexes the full spine).
-        segments_yielded = 0
-        for spine_position, spine_entry in enumerate(book.spine):
-            item_id = spine_entry[0] if isinstance(spine_entry, tuple) else spine_entry
-            item = book.get_item_with_id(item_id)
-            if item is None:
-                continue
-            if item.get_type() != ITEM_DOCUMENT:
-                continue
-            # Heuristic: skip common nav filename patterns.
-            href = (item.get_name() or "").lower()
-            if "nav" in href or href.endswith(("toc.xhtml", "toc.html")):
-                continue
-
-            raw = item.get_body_content() or item.get_content()
-            soup = BeautifulSoup(raw, "html.parser")
-
-            title = _extract_title(soup) or getattr(item, "title", None) or None
-            text = _clean_text(soup.get_text(separator=" ", strip=True))
-
-            # CFI spine position uses /6/<2*(spine_position+1)>. We use the
-            # raw spine position (including nav), NOT the filtered segment
-            # index, because EPUB.js resolves CFIs against the full spine.
-            cfi = f"epubcfi(/6/{(spine_position + 1) * 2}[{item.get_id()}]!/4)"
-
-            yield Segment(
-                segment_type="chapter",
-                segment_index=segments_yielded,
-                title=title,
-                anchor={"cfi": cfi},
-                text=text,
-                extraction_status="ok",
-            )
-            segments_yielded += 1
-
-
-def _extract_title(soup: BeautifulSoup) -> Optional[str]:
-    for tag_name in ("h1", "title"):
-        tag = soup.find(tag_name)
-        if tag is not None:
-            txt = tag.get_text(strip=True)
-            if txt:
-                return txt
-    return None
+        with zipfile.ZipFile(str(file_path)) as zf:
+            # Walk the spine in order. The nav item is typically first and is
+            # not content; skip it for text extraction BUT use the real spine
+            # position for CFI so anchors resolve in EPUB.js (which indexes
+            # the full spine).
+            segments_yielded = 0
+            for spine_position, (item_id, href, member) in enumerate(_read_spine(zf)):
+                if member is None:
+                    continue
+                # Heuristic: skip common nav filename patterns.
+                lowered = href.lower()
+                if "nav" in lowered or lowered.endswith(("toc.xhtml", "toc.html")):
+                    continue
+
+                title, text = _read_document(zf, member)
+
+                # CFI spine position uses /6/<2*(spine_position+1)>. We use the
+                # raw spine position (including nav), NOT the filtered segment
+                # index, because EPUB.js resolves CFIs against the full spine.
+                cfi = f"epubcfi(/6/{(spine_position + 1) * 2}[{item_id}]!/4)"
+
+                yield Segment(
+                    segment_type="chapter",
+                    segment_index=segments_yielded,
+                    title=title,
+                    anchor={"cfi": cfi},
+                    text=text,
+                    extraction_status="ok",
+                )
+                segments_yielded += 1
+
+
+def _read_spine(zf: zipfile.ZipFile) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Resolve the OPF spine to (item id, manifest href, zip member) tuples.
+
+    The member is None for spine entries that are not XHTML documents or
+    are missing from the archive; they still take up a spine position.
+    """
+    container = etree.fromstring(zf.read("META-INF/container.xml"))
+    rootfile = container.find(f".//{{{_CONTAINER_NS}}}rootfile[@media-type]")
+    if rootfile is None:
+        raise ValueError("EPUB container.xml names no OPF rootfile")
+    opf_path = rootfile.get("full-path")
+    opf_dir = posixpath.dirname(opf_path)
+    opf = etree.fromstring(zf.read(opf_path))
+
+    manifest = {}
+    for item in opf.iterfind(f"{{{_OPF_NS}}}manifest/{{{_OPF_NS}}}item"):
+        manifest[item.get("id")] = (unquote(item.get("href") or ""), item.get("media-type"))
+
+    names = set(zf.namelist())
+    spine = []
+    for itemref in opf.iterfind(f"{{{_OPF_NS}}}spine/{{{_OPF_NS}}}itemref"):
+        item_id = itemref.get("idref")
+        href, media_type = manifest.get(item_id, ("", None))
+        member = posixpath.normpath(posixpath.join(opf_dir, href)) if href else None
+        if media_type != _XHTML_MEDIA_TYPE or member not in names:
+            member = None
+        spine.append((item_id, href, member))
+    return spine
+
+
+def _read_document(zf: zipfile.ZipFile, member: str) -> Tuple[Optional[str], str]:
+    """Stream one XHTML member through lxml; return (title, text)."""
+    collector = _TextCollector()
+    parser = etree.HTMLParser(target=collector, encoding="utf-8")
+    with zf.open(member) as fh:
+        for chunk in iter(lambda: fh.read(_READ_CHUNK), b""):
+            parser.feed(chunk)
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        pass  # empty member; the collector holds whatever was seen
+    return collector.result()
+
+
+class _TextCollector:
+    """
+    lxml parser target collecting text and title candidates in one pass.
+
+    Text is gathered for the <body> and for the whole document. The body
+    is used when it has child elements, the whole document otherwise
+    (ebooklib fell back to the raw file when the body was empty, and gave
+    nothing when it held only bare text).
+    """
+
+    def __init__(self):
+        self._pending: List[str] = []
+        self._skip_depth = 0
+        self._body_depth = 0
+        self._body_children = 0
+        self._h1_depth = 0
+        self._title_depth = 0
+        self._h1_parts: List[str] = []
+        self._title_parts: List[str] = []
+        self.body_strings: List[str] = []
+        self.all_strings: List[str] = []
+        self.body_h1: Optional[str] = None
+        self.body_title: Optional[str] = None
+        self.doc_h1: Optional[str] = None
+        self.doc_title: Optional[str] = None
+
+    # Parser target interface
+
+    def start(self, tag, attrib):
+        self._flush()
+        tag = _local_name(tag)
+        if self._body_depth:
+            if self._body_depth == 1:
+                self._body_children += 1
+            self._body_depth += 1
+        elif tag == "body":
+            self._body_depth = 1
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "h1":
+            self._h1_depth += 1
+        elif tag == "title":
+            self._title_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        tag = _local_name(tag)
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == "h1" and self._h1_depth:
+            self._h1_depth -= 1
+            if not self._h1_depth:
+                self._close_heading("h1", "".join(self._h1_parts))
+                self._h1_parts = []
+        elif tag == "title" and self._title_depth:
+            self._title_depth -= 1
+            if not self._title_depth:
+                self._close_heading("title", "".join(self._title_parts))
+                self._title_parts = []
+        if self._body_depth:
+            self._body_depth -= 1
+
+    def data(self, data):
+        self._pending.append(data)
+
+    def close(self):
+        self._flush()
+        return self
+
+    # Helpers
+
+    def _flush(self) -> None:
+        """Record the text node accumulated since the last tag."""
+        if not self._pending:
+            return
+        node = "".join(self._pending)
+        self._pending = []
+        if self._skip_depth:
+            return
+        stripped = node.strip()
+        if not stripped:
+            return
+        self.all_strings.append(stripped)
+        if self._body_depth:
+            self.body_strings.append(stripped)
+        if self._h1_depth:
+            self._h1_parts.append(stripped)
+        if self._title_depth:
+            self._title_parts.append(stripped)
+
+    def _close_heading(self, kind: str, text: str) -> None:
+        # Only the first tag of each kind counts, even if it is empty
+        in_body = bool(self._body_depth)
+        if kind == "h1":
+            if self.doc_h1 is None:
+                self.doc_h1 = text
+            if in_body and self.body_h1 is None:
+                self.body_h1 = text
+        else:
+            if self.doc_title is None:
+                self.doc_title = text
+            if in_body and self.body_title is None:
+                self.body_title = text
+
+    def result(self) -> Tuple[Optional[str], str]:
+        if self._body_children:
+            strings, h1, title = self.body_strings, self.body_h1, self.body_title
+        else:
+            strings, h1, title = self.all_strings, self.doc_h1, self.doc_title
+        return (h1 or title or None), _clean_text(" ".join(strings))
+
+
+def _local_name(tag) -> str:
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1].rsplit(":", 1)[-1].lower()
 
 
 def _clean_text(text: str) -> str:
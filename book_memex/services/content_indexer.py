@@ -2,6 +2,10 @@
 
 Atomic per-file reindex: old rows for the file are deleted before new rows
 are inserted. FTS triggers keep book_content_fts in sync automatically.
+
+Each indexed file records a content fingerprint (its file hash plus the
+extractor version) in files.content_fingerprint; files whose fingerprint
+is unchanged are skipped unless the caller forces a reindex.
 """
 
 from __future__ import annotations
@@ -9,7 +13,7 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 from sqlalchemy.orm import Session
 
@@ -25,12 +29,17 @@ logger = logging.getLogger(__name__)
 @dataclass
 class IndexResult:
     file_id: Optional[int]
-    status: str  # "ok" | "unsupported_format" | "extractor_error" | "no_text_layer"
+    status: str  # "ok" | "unchanged" | "unsupported_format" | "extractor_error" | "no_text_layer"
     segments_written: int
     extractor_version: Optional[str]
     detail: Optional[str] = None
 
 
+def content_fingerprint(file_hash: str, extractor_version: str) -> str:
+    """Fingerprint of a file's BookContent rows: file content + extractor."""
+    return f"{file_hash}:{extractor_version}"
+
+
 class ContentIndexer:
     """Extract + persist book segments for a File row."""
 
@@ -38,11 +47,27 @@ class ContentIndexer:
         self.session = session
         self.library_path = library_path
 
-    def index_file(self, file_row: File) -> IndexResult:
+    def index_file(
+        self,
+        file_row: File,
+        segments: Optional[Iterable[Segment]] = None,
+        commit: bool = True,
+        force: bool = False,
+    ) -> IndexResult:
         """Extract content from `file_row` and write BookContent rows.
 
         Deletes any existing BookContent rows for the file first.
         Returns an IndexResult summarizing the outcome.
+
+        `segments`, if given, are this file's segments already produced by
+        its format's extractor (e.g. in a worker process); the file is not
+        read again. With `commit=False` the rows are only flushed, inside a
+        savepoint, so the caller's transaction decides; an extractor error
+        then discards just this file's segments.
+
+        A file whose recorded content fingerprint matches its current hash
+        and extractor version is left alone (status "unchanged") unless
+        `force` is set.
         """
         try:
             extractor = get_extractor(file_row.format)
@@ -59,7 +84,16 @@ class ContentIndexer:
                 detail=str(exc),
             )
 
-        file_path = self._resolve_path(file_row)
+        fingerprint = content_fingerprint(file_row.file_hash, extractor.version)
+        if not force and file_row.content_fingerprint == fingerprint:
+            return IndexResult(
+                file_id=file_row.id,
+                status="unchanged",
+                segments_written=0,
+                extractor_version=extractor.version,
+            )
+
+        savepoint = None if commit else self.session.begin_nested()
 
         # Clear existing rows for this file (idempotent reindex).
         self.session.query(BookContent).filter(
@@ -70,7 +104,9 @@ class ContentIndexer:
         segments_written = 0
         statuses: set[str] = set()
         try:
-            for seg in extractor.extract(file_path):
+            if segments is None:
+                segments = extractor.extract(self._resolve_path(file_row))
+            for seg in segments:
                 row = BookContent(
                     file_id=file_row.id,
                     content=seg.text,
@@ -88,7 +124,10 @@ class ContentIndexer:
                 statuses.add(seg.extraction_status)
         except Exception as exc:
             logger.exception("extractor error for file_id=%s", file_row.id)
-            self.session.rollback()
+            if savepoint is not None:
+                savepoint.rollback()
+            else:
+                self.session.rollback()
             return IndexResult(
                 file_id=file_row.id,
                 status="extractor_error",
@@ -97,7 +136,11 @@ class ContentIndexer:
                 detail=str(exc),
             )
 
-        self.session.commit()
+        file_row.content_fingerprint = fingerprint
+        if savepoint is not None:
+            savepoint.commit()
+        else:
+            self.session.commit()
 
         # Aggregate status: if any segment was ok, treat result as ok; if all
         # segments were no_text_layer, escalate that to the result.
@@ -0,0 +1,306 @@
+"""
+Incremental import of a watched folder.
+
+``book-memex import watch`` keeps a snapshot of every file it has handled
+under a folder, as (path, size, mtime). Each sync is a stat walk compared
+against the snapshot, so only new and changed files are hashed and imported;
+removed files are dropped from the snapshot. With the optional ``watchdog``
+package, filesystem events (inotify on Linux) trigger syncs and idle folders
+are not walked at all between periodic full rescans.
+
+A file is only imported once it has settled: its mtime is at least
+``settle`` seconds old and its size and mtime did not change since the
+previous walk. Files still being written are left for a later sync.
+
+The snapshot lives in ``<library>/cache/watch.db`` next to the hash cache.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional: fall back to polling
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+FileKey = Tuple[int, int]  # (size, mtime_ns)
+
+DEFAULT_EXTENSIONS = (".pdf", ".epub", ".mobi", ".azw3", ".txt")
+
+
+@dataclass
+class WatchDelta:
+    """Differences between a folder and its snapshot."""
+    new: Dict[str, FileKey] = field(default_factory=dict)
+    changed: Dict[str, FileKey] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SyncResult:
+    """Outcome of one sync."""
+    imported: int = 0
+    failed: int = 0
+    waiting: int = 0  # new or changed files that have not settled yet
+    removed: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.imported or self.failed or self.waiting or self.removed)
+
+
+def stat_walk(root: Path, extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+              recursive: bool = True) -> Dict[str, FileKey]:
+    """(size, mtime_ns) of every matching file under ``root``, by absolute path."""
+    extensions = tuple(ext.lower() for ext in extensions)
+    found: Dict[str, FileKey] = {}
+    stack = [str(Path(root).resolve())]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.is_file() and entry.name.lower().endswith(extensions):
+                        st = entry.stat()
+                        found[entry.path] = (st.st_size, st.st_mtime_ns)
+        except OSError as e:
+            logger.warning(f"Cannot scan {e.filename}: {e}")
+    return found
+
+
+class FolderSnapshot:
+    """The (path, size, mtime) of files already handled under a watched folder."""
+
+    def __init__(self, path: Path, root: Path):
+        """
+        Initialize the snapshot; the database is opened on first use.
+
+        Args:
+            path: Snapshot database file (shared by all watched folders)
+            root: Watched folder
+        """
+        self.path = Path(path)
+        self.root = str(Path(root).resolve())
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def for_library(cls, library_path: Path, root: Path) -> 'FolderSnapshot':
+        """The snapshot of ``root`` kept by the library at ``library_path``."""
+        return cls(Path(library_path) / "cache" / "watch.db", root)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watched_files ("
+                " root TEXT NOT NULL,"
+                " path TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " status TEXT NOT NULL,"
+                " PRIMARY KEY (root, path))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def load(self) -> Dict[str, FileKey]:
+        """Recorded (size, mtime_ns) by path."""
+        rows = self._connect().execute(
+            "SELECT path, size, mtime_ns FROM watched_files WHERE root = ?", (self.root,)
+        )
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def record(self, entries: Iterable[Tuple[str, FileKey, str]]) -> None:
+        """Record handled files as (path, key, status) with status imported or failed."""
+        conn = self._connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO watched_files (root, path, size, mtime_ns, status)"
+            " VALUES (?, ?, ?, ?, ?)",
+            [(self.root, path, size, mtime_ns, status) for path, (size, mtime_ns), status in entries],
+        )
+        conn.commit()
+
+    def forget(self, paths: Iterable[str]) -> None:
+        """Drop files that no longer exist."""
+        conn = self._connect()
+        conn.executemany(
+            "DELETE FROM watched_files WHERE root = ? AND path = ?",
+            [(self.root, path) for path in paths],
+        )
+        conn.commit()
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """Flags that the watched folder changed (watchdog event handler)."""
+
+    def __init__(self, changed: threading.Event):
+        self.changed = changed
+
+    def on_any_event(self, event) -> None:
+        self.changed.set()
+
+
+class FolderWatcher:
+    """Import new and changed files from a folder into a library."""
+
+    def __init__(self, library, folder: Path,
+                 extensions: Iterable[str] = DEFAULT_EXTENSIONS, recursive: bool = True,
+                 settle: float = 5.0, batch_size: int = 100, extract_text: bool = True,
+                 extract_cover: bool = True, defer: bool = False, ingest_mode: str = "copy"):
+        """
+        Initialize the watcher.
+
+        Args:
+            library: Open Library to import into
+            folder: Folder to watch
+            extensions: File extensions to import (with the dot)
+            recursive: Include subfolders
+            settle: Seconds a file must be unmodified before it is imported
+            batch_size: Files per transaction
+            extract_text: Whether to extract full text
+            extract_cover: Whether to extract cover images
+            defer: Queue extraction as background jobs
+            ingest_mode: How files are placed in the library
+        """
+        self.library = library
+        self.folder = Path(folder).resolve()
+        self.extensions = tuple(extensions)
+        self.recursive = recursive
+        self.settle = settle
+        self.batch_size = batch_size
+        self.import_options = dict(extract_text=extract_text, extract_cover=extract_cover,
+                                   defer=defer, ingest_mode=ingest_mode)
+        self.snapshot = FolderSnapshot.for_library(library.library_path, self.folder)
+        self._last_seen: Dict[str, FileKey] = {}  # unsettled files at the previous walk
+
+    def scan(self) -> WatchDelta:
+        """Stat-walk the folder and compare it with the snapshot."""
+        current = stat_walk(self.folder, self.extensions, self.recursive)
+        known = self.snapshot.load()
+        delta = WatchDelta(removed=[path for path in known if path not in current])
+        for path, key in current.items():
+            if path not in known:
+                delta.new[path] = key
+            elif known[path] != key:
+                delta.changed[path] = key
+        return delta
+
+    def _settled(self, path: str, key: FileKey, now: float) -> bool:
+        age = now - key[1] / 1e9
+        previous = self._last_seen.get(path)
+        return age >= self.settle and (previous is None or previous == key)
+
+    def sync(self) -> SyncResult:
+        """Import settled new and changed files and forget removed ones."""
+        from ..extract_metadata import extract_metadata
+        from .import_service import ImportBatch
+
+        delta = self.scan()
+        result = SyncResult(removed=len(delta.removed))
+        if delta.removed:
+            self.snapshot.forget(delta.removed)
+
+        now = time.time()
+        candidates = {**delta.new, **delta.changed}
+        ready = []
+        for path, key in sorted(candidates.items()):
+            if self._settled(path, key, now):
+                ready.append((path, key))
+                self._last_seen.pop(path, None)
+            else:
+                self._last_seen[path] = key
+                result.waiting += 1
+        for path in [p for p in self._last_seen if p not in candidates]:
+            del self._last_seen[path]  # deleted before it settled
+
+        recorded = []
+        with ImportBatch(self.library.import_service, self.batch_size) as batch:
+            for path, key in ready:
+                file_path = Path(path)
+                try:
+                    metadata = extract_metadata(str(file_path))
+                    if not metadata.get('title'):
+                        metadata['title'] = file_path.stem
+                    book = batch.import_file(file_path, metadata, **self.import_options)
+                except Exception as e:
+                    logger.warning(f"Failed to import {file_path}: {e}")
+                    book = None
+                if book is not None:
+                    result.imported += 1
+                    recorded.append((path, key, 'imported'))
+                else:
+                    # Not retried until the file changes again
+                    result.failed += 1
+                    recorded.append((path, key, 'failed'))
+        if recorded:
+            self.snapshot.record(recorded)
+        return result
+
+    def run(self, poll_interval: float = 2.0, rescan_interval: float = 300.0,
+            stop: Optional[threading.Event] = None,
+            on_sync: Optional[Callable[[SyncResult], None]] = None) -> None:
+        """
+        Sync until ``stop`` is set (or KeyboardInterrupt).
+
+        Without ``watchdog`` the folder is walked every ``poll_interval``
+        seconds. With it, walks happen only after filesystem events, while
+        files are settling, and every ``rescan_interval`` seconds.
+
+        Args:
+            poll_interval: Seconds between walks (without watchdog) or
+                           between checks for events
+            rescan_interval: Seconds between full walks when using events
+            stop: Event that ends the loop
+            on_sync: Called with each sync's result
+        """
+        stop = stop or threading.Event()
+        changed = threading.Event()
+        observer = None
+        if Observer is not None:
+            observer = Observer()
+            observer.schedule(_ChangeHandler(changed), str(self.folder), recursive=self.recursive)
+            observer.start()
+            logger.info(f"Watching {self.folder} for filesystem events")
+
+        try:
+            last_walk = float('-inf')
+            while not stop.is_set():
+                due = (observer is None or changed.is_set() or self._last_seen
+                       or time.monotonic() - last_walk >= rescan_interval)
+                if due:
+                    changed.clear()
+                    last_walk = time.monotonic()
+                    result = self.sync()
+                    if on_sync is not None:
+                        on_sync(result)
+                stop.wait(poll_interval)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def close(self) -> None:
+        """Close the snapshot database."""
+        self.snapshot.close()
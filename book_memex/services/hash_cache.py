@@ -0,0 +1,207 @@
+"""
+Persistent cache of file content hashes.
+
+Hashing a large archive is the slow part of re-running an import. The cache
+remembers the SHA256 of every file hashed through it, keyed by path and
+validated against the file's (size, mtime, inode); a file whose stat is
+unchanged is not read again. It lives in ``<library>/cache/file_hashes.db``
+and is shared by imports (duplicate and resume checks) and ``lib check``.
+
+:func:`partial_hash` is the cheap first stage of duplicate detection: a file
+whose partial hash matches no stored file cannot be a duplicate, so its full
+hash is computed while it is copied into the library instead of in a separate
+read (:func:`copy_with_sha256`).
+"""
+
+from pathlib import Path
+from typing import Optional, Tuple
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+StatKey = Tuple[int, int, int]  # (size, mtime_ns, inode)
+
+# Buffered writes are committed after this many new entries (and on flush)
+_COMMIT_EVERY = 256
+
+# Bytes read from each end of a file for its partial hash
+PARTIAL_BLOCK = 64 * 1024
+
+
+def file_sha256(file_path: Path) -> str:
+    """Compute the SHA256 hash of a file's content."""
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def partial_hash(file_path: Path) -> str:
+    """
+    SHA256 of a file's size plus its first and last 64 KiB.
+
+    Equal files always have equal partial hashes; files of up to 128 KiB are
+    hashed whole.
+    """
+    size = os.path.getsize(file_path)
+    sha256 = hashlib.sha256(f"{size}:".encode())
+    with open(file_path, 'rb') as f:
+        if size <= 2 * PARTIAL_BLOCK:
+            sha256.update(f.read())
+        else:
+            sha256.update(f.read(PARTIAL_BLOCK))
+            f.seek(-PARTIAL_BLOCK, os.SEEK_END)
+            sha256.update(f.read(PARTIAL_BLOCK))
+    return sha256.hexdigest()
+
+
+def copy_with_sha256(source_path: Path, dest_path: Path) -> str:
+    """Copy a file (with its timestamps) and return the SHA256 of what was copied."""
+    sha256 = hashlib.sha256()
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        for block in iter(lambda: src.read(1 << 20), b''):
+            sha256.update(block)
+            dst.write(block)
+    shutil.copystat(source_path, dest_path)
+    return sha256.hexdigest()
+
+
+def stat_key(file_path: Path) -> StatKey:
+    """The (size, mtime_ns, inode) a cached hash is validated against."""
+    st = os.stat(file_path)
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class FileHashCache:
+    """Stat-validated SHA256 cache backed by a small SQLite file."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize the cache; the database is opened on first use.
+
+        Args:
+            path: Cache database file
+        """
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_library(cls, library_path: Path) -> 'FileHashCache':
+        """The cache of the library at ``library_path``."""
+        return cls(Path(library_path) / "cache" / "file_hashes.db")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # a lost entry only costs a rehash
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_hashes ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " inode INTEGER NOT NULL,"
+                " sha256 TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return str(Path(file_path).resolve())
+
+    def get(self, file_path: Path, key: Optional[StatKey] = None) -> Optional[str]:
+        """
+        Cached hash of a file, if its stat still matches.
+
+        Args:
+            file_path: File to look up
+            key: The file's current :func:`stat_key`; computed if omitted
+
+        Returns:
+            SHA256 hex digest, or None on a miss
+        """
+        if key is None:
+            key = stat_key(file_path)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT size, mtime_ns, inode, sha256 FROM file_hashes WHERE path = ?",
+                (self._key(file_path),),
+            ).fetchone()
+        if row is not None and tuple(row[:3]) == tuple(key):
+            self.hits += 1
+            return row[3]
+        return None
+
+    def put(self, file_path: Path, file_hash: str, key: Optional[StatKey] = None) -> None:
+        """
+        Record a file's hash.
+
+        Args:
+            file_path: Hashed file
+            file_hash: Its SHA256 hex digest
+            key: The :func:`stat_key` the file had when it was hashed;
+                 computed now if omitted
+        """
+        if key is None:
+            key = stat_key(file_path)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, inode, sha256)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self._key(file_path), *key, file_hash),
+            )
+            self._unsaved += 1
+            if self._unsaved >= _COMMIT_EVERY:
+                conn.commit()
+                self._unsaved = 0
+
+    def hash_file(self, file_path: Path, refresh: bool = False) -> str:
+        """
+        SHA256 of a file, read from the cache when its stat is unchanged.
+
+        Args:
+            file_path: File to hash
+            refresh: Always read the file (and update the cache)
+
+        Returns:
+            SHA256 hex digest
+        """
+        key = stat_key(file_path)
+        if not refresh:
+            cached = self.get(file_path, key)
+            if cached is not None:
+                return cached
+        self.misses += 1
+        file_hash = file_sha256(file_path)
+        if stat_key(file_path) == key:  # not modified while we read it
+            self.put(file_path, file_hash, key)
+        return file_hash
+
+    def flush(self) -> None:
+        """Commit buffered entries."""
+        with self._lock:
+            if self._conn is not None and self._unsaved:
+                self._conn.commit()
+                self._unsaved = 0
+
+    def close(self) -> None:
+        """Commit buffered entries and close the database."""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
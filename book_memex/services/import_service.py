@@ -4,19 +4,30 @@ Import service for adding books to the database.
 Handles file copying, deduplication, metadata extraction, and text indexing.
 """
 
-import shutil
 import hashlib
+import io
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple, Union
 from datetime import datetime
 import logging
+import time
 
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from PIL import Image
 
 from ..db.models import Book, Author, Subject, Identifier, File, Cover, PersonalMetadata
 from ..db.session import get_or_create
 from .text_extraction import TextExtractionService
+from .ingest import ingest_file, validate_ingest_mode
+from .hash_cache import (
+    FileHashCache, StatKey, copy_with_sha256, file_sha256, partial_hash, stat_key,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +45,373 @@ def get_sort_name(name: str) -> str:
     return name
 
 
+@dataclass
+class CoverImage:
+    """A rendered cover and its thumbnail, ready to be written to the library."""
+    extension: str  # without the dot
+    data: bytes
+    width: int
+    height: int
+    thumbnail: Optional[bytes] = None  # JPEG, None if thumbnailing failed
+
+
+@dataclass
+class PreparedImport:
+    """The CPU-heavy part of importing one file, done without the database.
+
+    Produced by :func:`prepare_import` (typically in a worker process) and
+    consumed by ``ImportService.import_file(..., prepared=...)``, which only
+    has to write rows and files.
+    """
+    source_path: Path
+    metadata: Dict[str, Any]
+    file_hash: str
+    skipped: bool = False  # hash already in the library; nothing else computed
+    stat_key: Optional[StatKey] = None  # set when file_hash was computed here
+    cover: Optional[CoverImage] = None
+    text: Optional[str] = None  # "" when extraction produced nothing
+    segments: Optional[List[Any]] = None  # content_extraction Segments
+    segments_error: Optional[str] = None
+
+
+# Per-process state for prepare_import workers (see _init_prepare_worker)
+_worker_library_root: Optional[Path] = None
+_worker_skip_hashes: frozenset = frozenset()
+
+
+def _init_prepare_worker(library_root: Path, skip_hashes: frozenset) -> None:
+    global _worker_library_root, _worker_skip_hashes
+    _worker_library_root = Path(library_root)
+    _worker_skip_hashes = skip_hashes
+
+
+def prepare_import(source_path: Path, metadata: Optional[Dict[str, Any]] = None,
+                   extract_text: bool = True, extract_cover: bool = True,
+                   file_hash: Optional[str] = None) -> PreparedImport:
+    """
+    Hash, read metadata, render the cover and extract text for one file.
+
+    Pure CPU/IO work with no database access, so it can run in a process
+    pool. Results are the same as the inline steps of ``import_file``.
+
+    Args:
+        source_path: Path to source ebook file
+        metadata: Metadata dictionary; extracted from the file if None
+        extract_text: Whether to extract full text and content segments
+        extract_cover: Whether to render the cover
+        file_hash: The file's hash if already known (from the hash cache)
+
+    Returns:
+        PreparedImport
+    """
+    source_path = Path(source_path)
+    key = None
+    if file_hash is None:
+        key = stat_key(source_path)
+        file_hash = file_sha256(source_path)
+    if file_hash in _worker_skip_hashes:
+        return PreparedImport(source_path, metadata or {}, file_hash, skipped=True, stat_key=key)
+
+    if metadata is None:
+        from ..extract_metadata import extract_metadata
+        metadata = extract_metadata(str(source_path))
+        if not metadata.get('title'):
+            metadata['title'] = source_path.stem
+
+    prepared = PreparedImport(source_path, metadata, file_hash, stat_key=key)
+
+    if extract_cover:
+        prepared.cover = render_cover(source_path)
+
+    if extract_text:
+        text_service = TextExtractionService(_worker_library_root or source_path.parent)
+        prepared.text, prepared.segments, prepared.segments_error = text_service.extract_content(
+            source_path, source_path.suffix[1:].lower()
+        )
+
+    return prepared
+
+
+def iter_prepared(
+    items: Iterable[Tuple[Path, Optional[Dict[str, Any]]]],
+    library_root: Path,
+    workers: int,
+    extract_text: bool = True,
+    extract_cover: bool = True,
+    skip_hashes: Iterable[str] = (),
+    hash_cache: Optional[FileHashCache] = None,
+) -> Iterator[Tuple[Path, Union[PreparedImport, Exception]]]:
+    """
+    Run :func:`prepare_import` for many files on a process pool.
+
+    Results are yielded in input order, so a single writer applying them
+    produces exactly what a sequential import would. At most a few tasks
+    per worker are in flight, which bounds memory on huge imports.
+
+    With a ``hash_cache``, files with a cached hash are not hashed again
+    (and are skipped without reaching a worker if the hash is in
+    ``skip_hashes``); newly computed hashes are added to the cache.
+
+    Args:
+        items: (source_path, metadata or None) pairs
+        library_root: Library directory
+        workers: Number of worker processes
+        extract_text: Whether to extract text and segments
+        extract_cover: Whether to render covers
+        skip_hashes: File hashes to skip after hashing (resume)
+        hash_cache: Cache consulted and updated in this process
+
+    Yields:
+        (source_path, PreparedImport or the exception preparing it raised)
+    """
+    window = max(1, workers) * 4
+    skip_hashes = frozenset(skip_hashes)
+    pending = deque()
+    items = iter(items)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_prepare_worker,
+        initargs=(Path(library_root), skip_hashes),
+    ) as pool:
+        def submit_next() -> bool:
+            for path, metadata in items:
+                file_hash = None
+                if hash_cache is not None:
+                    try:
+                        file_hash = hash_cache.get(path)
+                    except OSError:
+                        pass  # let the worker report the unreadable file
+                if file_hash is not None and file_hash in skip_hashes:
+                    pending.append((path, PreparedImport(Path(path), metadata or {}, file_hash,
+                                                         skipped=True)))
+                else:
+                    pending.append((path, pool.submit(prepare_import, path, metadata,
+                                                      extract_text, extract_cover, file_hash)))
+                return True
+            return False
+
+        while len(pending) < window and submit_next():
+            pass
+        while pending:
+            path, result = pending.popleft()
+            submit_next()
+            if isinstance(result, PreparedImport):
+                yield path, result
+                continue
+            try:
+                prepared = result.result()
+            except Exception as e:
+                yield path, e
+                continue
+            if hash_cache is not None and prepared.stat_key is not None:
+                hash_cache.put(path, prepared.file_hash, prepared.stat_key)
+            yield path, prepared
+
+
+def _replay_segments(segments: List[Any], error: Optional[str]) -> Iterator[Any]:
+    """Yield extracted segments, then re-raise the extractor's error, if any."""
+    yield from segments
+    if error is not None:
+        raise RuntimeError(error)
+
+
+def render_cover(source_path: Path, thumbnail: bool = True) -> Optional[CoverImage]:
+    """Render the cover of a PDF (first page) or EPUB (cover image) in memory.
+
+    With ``thumbnail=False`` the thumbnail is left to a later step.
+    """
+    try:
+        suffix = source_path.suffix.lower()
+        if suffix == '.pdf':
+            cover = _render_pdf_cover(source_path)
+        elif suffix == '.epub':
+            cover = _read_epub_cover(source_path)
+        else:
+            return None
+        if cover is None:
+            return None
+
+        extension, data = cover
+        img = Image.open(io.BytesIO(data))
+        width, height = img.width, img.height
+        thumb = None
+        if thumbnail:
+            try:
+                img.thumbnail((200, 300))
+                buf = io.BytesIO()
+                img.save(buf, 'JPEG', quality=85)
+                thumb = buf.getvalue()
+            except Exception as e:
+                logger.error(f"Thumbnail creation error: {e}")
+        return CoverImage(extension, data, width, height, thumb)
+
+    except Exception as e:
+        logger.warning(f"Cover extraction failed: {e}")
+        return None
+
+
+def _render_pdf_cover(pdf_path: Path) -> Optional[Tuple[str, bytes]]:
+    """Render the first page of a PDF as PNG bytes."""
+    try:
+        import fitz
+        doc = fitz.open(str(pdf_path))
+        try:
+            if len(doc) > 0:
+                pix = doc[0].get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x scale for quality
+                return 'png', pix.tobytes('png')
+        finally:
+            doc.close()
+    except Exception as e:
+        logger.error(f"PDF cover extraction error: {e}")
+
+    return None
+
+
+def _read_epub_cover(epub_path: Path) -> Optional[Tuple[str, bytes]]:
+    """Find the cover image of an EPUB."""
+    try:
+        from ebooklib import epub
+        book = epub.read_epub(str(epub_path))
+
+        # Try to get cover - handle different ebooklib versions
+        cover_item = None
+
+        # Method 1: Try ITEM_COVER constant (older ebooklib)
+        try:
+            for item in book.get_items():
+                if hasattr(epub, 'ITEM_COVER') and item.get_type() == epub.ITEM_COVER:
+                    cover_item = item
+                    break
+        except AttributeError:
+            pass
+
+        # Method 2: Look for image named 'cover' or check item type == 1 (image)
+        if not cover_item:
+            for item in book.get_items():
+                # Type 1 is ITEM_IMAGE in ebooklib
+                if item.get_type() == 1:  # ITEM_IMAGE
+                    if 'cover' in item.get_name().lower():
+                        cover_item = item
+                        break
+
+        # Method 3: Try ITEM_IMAGE constant fallback
+        if not cover_item:
+            try:
+                for item in book.get_items():
+                    if hasattr(epub, 'ITEM_IMAGE') and item.get_type() == epub.ITEM_IMAGE:
+                        if 'cover' in item.get_name().lower():
+                            cover_item = item
+                            break
+            except AttributeError:
+                pass
+
+        if cover_item:
+            # Determine image format
+            ext = Path(cover_item.get_name()).suffix or '.jpg'
+            return ext[1:], cover_item.get_content()
+
+    except Exception as e:
+        logger.error(f"EPUB cover extraction error: {e}")
+
+    return None
+
+
+@dataclass
+class ImportStats:
+    """Throughput of a batched import (see :class:`ImportBatch`)."""
+    files: int = 0
+    failed: int = 0
+    commits: int = 0
+    commit_seconds: float = 0.0  # time spent in COMMIT (fsync)
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def commits_per_second(self) -> float:
+        return self.commits / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.files} files in {self.commits} commits over {self.seconds:.1f}s "
+                f"({self.commits_per_second:.1f} commits/s, {self.files_per_second:.1f} files/s, "
+                f"{self.commit_seconds:.2f}s committing)")
+
+
+class ImportBatch:
+    """
+    Import files in transactions of ``batch_size`` files.
+
+    Each file is imported inside its own SAVEPOINT, so a file that fails
+    rolls back alone and the rest of the batch still commits. Sources
+    imported with ``ingest_mode="move"`` are removed only after their
+    batch commits. Use as a context manager; the last partial
+    batch commits on a clean exit and is rolled back if an exception
+    (including KeyboardInterrupt) escapes the block.
+    """
+
+    def __init__(self, service: 'ImportService', batch_size: int = 100):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.service = service
+        self.batch_size = batch_size
+        self.stats = ImportStats()
+        self._pending = 0
+
+    def import_file(self, source_path: Path, metadata: Dict[str, Any], **kwargs) -> Optional[Book]:
+        """Import one file (see :meth:`ImportService.import_file`) into the current batch."""
+        book = self.service.import_file(source_path, metadata, commit=False, **kwargs)
+        self.stats.files += 1
+        if book is None:
+            self.stats.failed += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.commit()
+        return book
+
+    def commit(self) -> None:
+        """Commit the files imported since the last commit."""
+        if not self._pending:
+            return
+        start = time.perf_counter()
+        try:
+            self.service.session.commit()
+        except Exception:
+            self.service.discard_moves()
+            raise
+        self.service.complete_moves()
+        self.service.hash_cache.flush()
+        self.stats.commit_seconds += time.perf_counter() - start
+        self.stats.commits += 1
+        self._pending = 0
+
+    def close(self) -> None:
+        """Commit the last partial batch."""
+        self.commit()
+        self.stats.finished = time.perf_counter()
+
+    def __enter__(self) -> 'ImportBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # An interrupt (KeyboardInterrupt etc.) can stop a file halfway,
+        # past import_file's rollback; committing would keep its open
+        # savepoint, so the uncommitted batch is dropped instead
+        self.service.session.rollback()
+        self.service.discard_moves()
+        self._pending = 0
+        self.stats.finished = time.perf_counter()
+
+
 class ImportService:
     """Service for importing books into the library."""
 
@@ -41,6 +419,10 @@ class ImportService:
         self.library_root = Path(library_root)
         self.session = session
         self.text_service = TextExtractionService(library_root)
+        self.hash_cache = FileHashCache.for_library(library_root)
+        self.last_stats: Optional[ImportStats] = None  # of the last batched import
+        # (source, library path) of moves whose source is removed on commit
+        self._pending_moves: List[Tuple[Path, Path]] = []
 
         # Create directory structure
         (self.library_root / 'files').mkdir(parents=True, exist_ok=True)
@@ -48,7 +430,10 @@ class ImportService:
         (self.library_root / 'covers' / 'thumbnails').mkdir(exist_ok=True)
 
     def import_file(self, source_path: Path, metadata: Dict[str, Any],
-                   extract_text: bool = True, extract_cover: bool = True) -> Optional[Book]:
+                   extract_text: bool = True, extract_cover: bool = True,
+                   prepared: Optional[PreparedImport] = None,
+                   commit: bool = True, defer: bool = False,
+                   priority: int = 0, ingest_mode: str = "copy") -> Optional[Book]:
         """
         Import a single ebook file into the library.
 
@@ -57,100 +442,270 @@ class ImportService:
             metadata: Metadata dictionary
             extract_text: Whether to extract full text
             extract_cover: Whether to extract cover image
+            prepared: Hash, cover and text already computed by
+                      :func:`prepare_import`; the file is then only copied
+            commit: If False, do the import inside a savepoint and leave the
+                    commit to the caller (batched writers); a failure only
+                    rolls back this file
+            defer: Queue cover and text extraction as background jobs
+                   (see :class:`~.job_service.JobService`) instead of doing
+                   them now
+            priority: Priority of the queued jobs (higher runs first)
+            ingest_mode: How the file is placed in the library: copy,
+                         hardlink, reflink or move (see :mod:`.ingest`)
 
         Returns:
             Book instance or None if import failed
+
+        Raises:
+            ValueError: If ``ingest_mode`` is unknown
         """
         source_path = Path(source_path)
+        validate_ingest_mode(ingest_mode)
 
         if not source_path.exists():
             logger.error(f"Source file not found: {source_path}")
             return None
 
+        savepoint = None
+        if not commit:
+            self._begin_batch_transaction()
+            savepoint = self.session.begin_nested()
+        moves = len(self._pending_moves)
         try:
-            # Compute file hash
-            file_hash = self._compute_file_hash(source_path)
+            book = self._import_file(source_path, metadata, extract_text, extract_cover,
+                                     prepared, defer, priority, ingest_mode)
+            if savepoint is not None:
+                savepoint.commit()
+            else:
+                self.session.commit()
+                self.complete_moves()
+                self.hash_cache.flush()
+            return book
+
+        except Exception as e:
+            self._drop_moves(moves)
+            if savepoint is not None:
+                savepoint.rollback()
+            else:
+                self.session.rollback()
+            logger.error(f"Error importing {source_path}: {e}")
+            return None
+
+    def _begin_batch_transaction(self) -> None:
+        """Make sure a real transaction is open before a per-file SAVEPOINT.
 
+        pysqlite only emits BEGIN ahead of DML, so a SAVEPOINT issued first
+        starts the transaction itself and its RELEASE commits to disk: the
+        batch would neither share one commit nor roll back as a whole.
+        """
+        conn = self.session.connection()
+        if not conn.connection.driver_connection.in_transaction:
+            conn.exec_driver_sql("BEGIN")
+
+    def _import_file(self, source_path: Path, metadata: Dict[str, Any],
+                     extract_text: bool, extract_cover: bool,
+                     prepared: Optional[PreparedImport],
+                     defer: bool = False, priority: int = 0,
+                     ingest_mode: str = "copy") -> Book:
+        """Body of import_file; raises on failure, never commits."""
+        # Two-stage duplicate check: a file whose partial hash matches no
+        # stored file is new, and (when copying) its full hash is taken
+        # while copying it, so the source is read once
+        file_partial_hash = partial_hash(source_path)
+        file_hash = prepared.file_hash if prepared else self.hash_cache.get(source_path)
+        if file_hash is None and (ingest_mode != "copy"
+                                  or self._partial_hash_matches(file_partial_hash)):
+            file_hash = self.hash_cache.hash_file(source_path)
+
+        if file_hash is not None:
             # Check for duplicate by hash
             existing_file = self.session.query(File).filter_by(file_hash=file_hash).first()
             if existing_file:
                 logger.info(f"Duplicate file detected (hash match): {source_path.name}")
                 return existing_file.book
 
-            # Generate unique ID for book
-            unique_id = self._generate_unique_id(metadata)
+            # Place file in library. A move links (or copies) it now and
+            # removes the source once the rows are committed
+            dest_path = self._get_file_path(file_hash, source_path.suffix)
+            ingest_file(source_path, dest_path,
+                        "hardlink" if ingest_mode == "move" else ingest_mode)
+        else:
+            dest_path, file_hash = self._copy_new_file(source_path)
+            if dest_path is None:
+                existing_file = self.session.query(File).filter_by(file_hash=file_hash).first()
+                logger.info(f"Duplicate file detected (hash match): {source_path.name}")
+                return existing_file.book
 
-            # Check if book already exists by unique_id
-            existing_book = self.session.query(Book).filter_by(unique_id=unique_id).first()
+        # Generate unique ID for book
+        unique_id = self._generate_unique_id(metadata)
 
-            if existing_book:
-                # Add this file format to existing book
-                logger.info(f"Adding format to existing book: {metadata.get('title')}")
-                book = existing_book
-            else:
-                # Create new book
-                book = self._create_book(metadata, unique_id)
+        # Check if book already exists by unique_id
+        existing_book = self.session.query(Book).filter_by(unique_id=unique_id).first()
 
-            # Copy file to library
-            dest_path = self._get_file_path(file_hash, source_path.suffix)
-            shutil.copy2(source_path, dest_path)
+        if existing_book:
+            # Add this file format to existing book
+            logger.info(f"Adding format to existing book: {metadata.get('title')}")
+            book = existing_book
+        else:
+            # Create new book
+            book = self._create_book(metadata, unique_id)
+
+        # Get file metadata from filesystem
+        file_stat = source_path.stat()
+        import mimetypes
+        from datetime import datetime
+        mime_type = mimetypes.guess_type(str(source_path))[0]
+        created_date = datetime.fromtimestamp(file_stat.st_ctime)
+        modified_date = datetime.fromtimestamp(file_stat.st_mtime)
+
+        # Extract creator application from metadata if PDF
+        creator_app = metadata.get('creator_application')
+
+        # Create file record with enhanced metadata
+        file = File(
+            book_id=book.id,
+            path=str(dest_path.relative_to(self.library_root)),
+            format=source_path.suffix[1:].lower(),  # Remove leading dot
+            size_bytes=file_stat.st_size,
+            file_hash=file_hash,
+            partial_hash=file_partial_hash,
+            mime_type=mime_type,
+            created_date=created_date,
+            modified_date=modified_date,
+            creator_application=creator_app
+        )
+        self.session.add(file)
+        self.session.flush()  # Get file.id
+
+        if defer:
+            # Metadata rows commit now; a worker extracts cover and text later
+            from .job_service import JobService
+            JobService(self.session, self.library_root).enqueue_import(
+                file, extract_text=extract_text, extract_cover=extract_cover, priority=priority
+            )
+        else:
+            if extract_cover:
+                if prepared is None:
+                    self._extract_cover(source_path, book, file)
+                elif prepared.cover is not None:
+                    self._store_cover(prepared.cover, book, file)
+            if extract_text:
+                self.index_text(book, file, source_path, prepared)
 
-            # Get file metadata from filesystem
-            file_stat = source_path.stat()
-            import mimetypes
-            from datetime import datetime
-            mime_type = mimetypes.guess_type(str(source_path))[0]
-            created_date = datetime.fromtimestamp(file_stat.st_ctime)
-            modified_date = datetime.fromtimestamp(file_stat.st_mtime)
+        if ingest_mode == "move":
+            self._pending_moves.append((source_path, dest_path))
+        self.hash_cache.put(dest_path, file_hash)  # so `lib check` need not rehash it
 
-            # Extract creator application from metadata if PDF
-            creator_app = metadata.get('creator_application')
+        logger.info(f"Successfully imported: {metadata.get('title')}")
+        return book
 
-            # Create file record with enhanced metadata
-            file = File(
-                book_id=book.id,
-                path=str(dest_path.relative_to(self.library_root)),
-                format=source_path.suffix[1:].lower(),  # Remove leading dot
-                size_bytes=file_stat.st_size,
-                file_hash=file_hash,
-                mime_type=mime_type,
-                created_date=created_date,
-                modified_date=modified_date,
-                creator_application=creator_app
+    def complete_moves(self) -> None:
+        """Remove the sources of committed ``move`` imports.
+
+        Their library copies were placed before the commit, so a source that
+        cannot be removed is only left behind; the library stays complete.
+        """
+        moves, self._pending_moves = self._pending_moves, []
+        for source_path, _ in moves:
+            try:
+                source_path.unlink()
+            except OSError as e:
+                logger.warning(f"Imported {source_path.name} but could not remove the source: {e}")
+
+    def discard_moves(self) -> None:
+        """Undo pending moves whose rows were rolled back; sources stay put."""
+        self._drop_moves(0)
+
+    def _drop_moves(self, start: int) -> None:
+        """Remove the library copies of pending moves from ``start`` on."""
+        for _, dest_path in self._pending_moves[start:]:
+            dest_path.unlink(missing_ok=True)
+        del self._pending_moves[start:]
+
+    def index_text(self, book: Book, file: File, source_path: Optional[Path] = None,
+                   prepared: Optional[PreparedImport] = None) -> None:
+        """
+        Extract a file's text and index it for search; never commits.
+
+        One extraction pass feeds the full text, the ``books_fts`` row and
+        (when the file is the book's primary file) its content segments.
+
+        Args:
+            book: Book the file belongs to
+            file: File row
+            source_path: Where to read the file; defaults to its library copy
+            prepared: Text and segments already extracted by :func:`prepare_import`
+        """
+        if prepared is not None:
+            text, segments, segments_error = prepared.text, prepared.segments, prepared.segments_error
+        else:
+            source_path = Path(source_path) if source_path else self.library_root / file.path
+            text, segments, segments_error = self.text_service.extract_content(source_path, file.format)
+
+        primary = book.primary_file
+        indexed = (primary is not None and primary.id == file.id
+                   and segments is not None and segments_error is None)
+        if indexed:
+            # The indexer replaces this file's BookContent rows with its
+            # segments, so legacy chunks would only be deleted again
+            self.text_service.extract_full_text(file, self.session, text=text)
+        else:
+            self.text_service.extract_and_chunk_all(file, self.session, text=text)
+
+        # Run the segment-level content indexer for the primary file.
+        # Failures are logged but do not abort the import.
+        try:
+            from book_memex.services.content_indexer import ContentIndexer
+            indexer = ContentIndexer(self.session, library_path=self.library_root)
+            if primary is not None:
+                replay = None
+                if primary.id == file.id and segments is not None:
+                    replay = _replay_segments(segments, segments_error)
+                indexer.index_file(primary, segments=replay, commit=False)
+        except Exception:
+            logger.exception(
+                "content indexing failed for book_id=%s; continuing import",
+                book.id,
             )
-            self.session.add(file)
-            self.session.flush()  # Get file.id
 
-            # Extract cover if needed
-            if extract_cover:
-                self._extract_cover(source_path, book, file)
+    def add_cover(self, book: Book, file: File, thumbnail: bool = True) -> Optional[Cover]:
+        """
+        Render and store the cover of a file's library copy; never commits.
 
-            # Extract text if needed
-            if extract_text:
-                self.text_service.extract_and_chunk_all(file, self.session)
-
-                # Run the segment-level content indexer for the newly imported file.
-                # Failures are logged but do not abort the import.
-                try:
-                    from book_memex.services.content_indexer import ContentIndexer
-                    indexer = ContentIndexer(self.session, library_path=self.library_root)
-                    primary = book.primary_file
-                    if primary is not None:
-                        indexer.index_file(primary)
-                except Exception:
-                    logger.exception(
-                        "content indexing failed for book_id=%s; continuing import",
-                        book.id,
-                    )
+        Args:
+            book: Book the file belongs to
+            file: File row
+            thumbnail: Also write the thumbnail (see :meth:`add_thumbnail`)
 
-            self.session.commit()
-            logger.info(f"Successfully imported: {metadata.get('title')}")
-            return book
+        Returns:
+            The new Cover row, or None if the file has no cover
+        """
+        cover = render_cover(self.library_root / file.path, thumbnail=thumbnail)
+        if cover is None:
+            return None
+        return self._store_cover(cover, book, file)
 
-        except Exception as e:
-            self.session.rollback()
-            logger.error(f"Error importing {source_path}: {e}")
+    def add_thumbnail(self, book: Book, file: File) -> Optional[Path]:
+        """
+        Create the thumbnail for the cover extracted from a file.
+
+        Returns:
+            Thumbnail path, or None if the file has no stored cover
+        """
+        cover = self.file_cover(book, file)
+        if cover is None:
             return None
+        return self._create_thumbnail(self.library_root / cover.path, file.file_hash)
+
+    def file_cover(self, book: Book, file: File) -> Optional[Cover]:
+        """The Cover row extracted from a file, if any."""
+        prefix = f"covers/{file.file_hash[:2]}/{file.file_hash}."
+        return (
+            self.session.query(Cover)
+            .filter(Cover.book_id == book.id, Cover.path.startswith(prefix))
+            .first()
+        )
 
     def _create_book(self, metadata: Dict[str, Any], unique_id: str) -> Book:
         """Create book record with metadata."""
@@ -287,54 +842,34 @@ class ImportService:
 
     def _extract_epub_cover(self, epub_path: Path, file_hash: str) -> Optional[Path]:
         """Extract cover image from EPUB."""
-        try:
-            from ebooklib import epub
-            book = epub.read_epub(str(epub_path))
-
-            # Try to get cover - handle different ebooklib versions
-            cover_item = None
-
-            # Method 1: Try ITEM_COVER constant (older ebooklib)
-            try:
-                for item in book.get_items():
-                    if hasattr(epub, 'ITEM_COVER') and item.get_type() == epub.ITEM_COVER:
-                        cover_item = item
-                        break
-            except AttributeError:
-                pass
-
-            # Method 2: Look for image named 'cover' or check item type == 1 (image)
-            if not cover_item:
-                for item in book.get_items():
-                    # Type 1 is ITEM_IMAGE in ebooklib
-                    if item.get_type() == 1:  # ITEM_IMAGE
-                        if 'cover' in item.get_name().lower():
-                            cover_item = item
-                            break
+        cover = _read_epub_cover(epub_path)
+        if cover is None:
+            return None
 
-            # Method 3: Try ITEM_IMAGE constant fallback
-            if not cover_item:
-                try:
-                    for item in book.get_items():
-                        if hasattr(epub, 'ITEM_IMAGE') and item.get_type() == epub.ITEM_IMAGE:
-                            if 'cover' in item.get_name().lower():
-                                cover_item = item
-                                break
-                except AttributeError:
-                    pass
-
-            if cover_item:
-                # Determine image format
-                ext = Path(cover_item.get_name()).suffix or '.jpg'
-                cover_path = self._get_cover_path(file_hash, ext[1:])
-
-                cover_path.write_bytes(cover_item.get_content())
-                return cover_path
+        extension, data = cover
+        cover_path = self._get_cover_path(file_hash, extension)
+        cover_path.write_bytes(data)
+        return cover_path
 
-        except Exception as e:
-            logger.error(f"EPUB cover extraction error: {e}")
+    def _store_cover(self, cover: CoverImage, book: Book, file: File) -> Cover:
+        """Write a cover rendered by :func:`render_cover` and record it."""
+        cover_path = self._get_cover_path(file.file_hash, cover.extension)
+        cover_path.write_bytes(cover.data)
+        if cover.thumbnail is not None:
+            thumb_path = self.library_root / 'covers' / 'thumbnails' / f"{file.file_hash}_thumb.jpg"
+            thumb_path.write_bytes(cover.thumbnail)
 
-        return None
+        row = Cover(
+            book_id=book.id,
+            path=str(cover_path.relative_to(self.library_root)),
+            width=cover.width,
+            height=cover.height,
+            is_primary=True,
+            source='extracted'
+        )
+        self.session.add(row)
+        logger.info(f"Extracted cover for {book.title}")
+        return row
 
     def _create_thumbnail(self, cover_path: Path, file_hash: str) -> Path:
         """Create thumbnail from cover image."""
@@ -349,6 +884,40 @@ class ImportService:
             logger.error(f"Thumbnail creation error: {e}")
             return cover_path
 
+    def _partial_hash_matches(self, file_partial_hash: str) -> bool:
+        """Whether a stored file may have this content (NULL counts as a match)."""
+        return self.session.query(File.id).filter(
+            or_(File.partial_hash == file_partial_hash, File.partial_hash.is_(None))
+        ).first() is not None
+
+    def _copy_new_file(self, source_path: Path) -> Tuple[Optional[Path], str]:
+        """
+        Copy a file into the library, hashing it in the same read.
+
+        Returns:
+            (storage path, SHA256); the path is None if the library already
+            holds a file with that hash, in which case nothing is stored
+        """
+        key = stat_key(source_path)
+        files_dir = self.library_root / 'files'
+        files_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=files_dir, suffix='.part')
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            file_hash = copy_with_sha256(source_path, tmp_path)
+            if stat_key(source_path) == key:  # not modified while we read it
+                self.hash_cache.put(source_path, file_hash, key)
+            if self.session.query(File.id).filter_by(file_hash=file_hash).first() is not None:
+                tmp_path.unlink()
+                return None, file_hash
+            dest_path = self._get_file_path(file_hash, source_path.suffix)
+            os.replace(tmp_path, dest_path)
+            return dest_path, file_hash
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
     def _get_file_path(self, file_hash: str, extension: str) -> Path:
         """Get storage path for file based on hash prefix."""
         prefix = file_hash[:2]
@@ -365,12 +934,8 @@ class ImportService:
 
     @staticmethod
     def _compute_file_hash(file_path: Path) -> str:
-        """Compute SHA256 hash of file."""
-        sha256 = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for block in iter(lambda: f.read(8192), b''):
-                sha256.update(block)
-        return sha256.hexdigest()
+        """Compute SHA256 hash of file (uncached; see ``hash_cache``)."""
+        return file_sha256(file_path)
 
     @staticmethod
     def _generate_unique_id(metadata: Dict[str, Any]) -> str:
@@ -395,12 +960,14 @@ class ImportService:
                 return title[len(article):]
         return title
 
-    def import_calibre_book(self, calibre_metadata_path: Path) -> Optional[Book]:
+    def import_calibre_book(self, calibre_metadata_path: Path,
+                            ingest_mode: str = "copy") -> Optional[Book]:
         """
         Import book from Calibre metadata.opf file.
 
         Args:
             calibre_metadata_path: Path to metadata.opf file
+            ingest_mode: How files are placed in the library (see :meth:`import_file`)
 
         Returns:
             Book instance or None
@@ -420,42 +987,116 @@ class ImportService:
             return None
 
         # Import first file (others will be added as formats)
-        book = self.import_file(ebook_files[0], metadata)
+        book = self.import_file(ebook_files[0], metadata, ingest_mode=ingest_mode)
 
         # Import additional formats
         for ebook_file in ebook_files[1:]:
-            self.import_file(ebook_file, metadata, extract_text=False, extract_cover=False)
+            self.import_file(ebook_file, metadata, extract_text=False, extract_cover=False,
+                             ingest_mode=ingest_mode)
 
         return book
 
+    def import_prepared(
+        self,
+        items: Iterable[Tuple[Path, Optional[Dict[str, Any]]]],
+        workers: int,
+        extract_text: bool = True,
+        extract_cover: bool = True,
+        skip_hashes: Iterable[str] = (),
+        batch_size: int = 100,
+        defer: bool = False,
+        ingest_mode: str = "copy",
+    ) -> Iterator[Tuple[Path, Union[Book, PreparedImport, Exception, None]]]:
+        """
+        Import many files, preparing them on a process pool.
+
+        Hashing, metadata, cover rendering and text/segment extraction run
+        in ``workers`` processes (see :func:`prepare_import`); this session
+        is the single writer and applies results in input order, committing
+        every ``batch_size`` files (see :class:`ImportBatch`; throughput ends
+        up in ``last_stats``). The library ends up exactly as after
+        importing the same files one by one with :meth:`import_file`.
+
+        Args:
+            items: (source_path, metadata) pairs; metadata None means
+                   extract it from the file (title falls back to the file name)
+            workers: Number of worker processes
+            extract_text: Whether to extract full text
+            extract_cover: Whether to extract cover images
+            skip_hashes: File hashes to skip without further work (resume)
+            batch_size: Files per commit
+            defer: Queue cover and text extraction as background jobs; the
+                   workers then only hash and read metadata
+            ingest_mode: How files are placed in the library (see :meth:`import_file`)
+
+        Yields:
+            (source_path, result) in input order, where result is the Book
+            (None if import failed), the skipped PreparedImport, or the
+            exception raised while preparing the file
+        """
+        with ImportBatch(self, batch_size) as batch:
+            self.last_stats = batch.stats
+            for path, prepared in iter_prepared(items, self.library_root, workers,
+                                                extract_text and not defer,
+                                                extract_cover and not defer,
+                                                skip_hashes, self.hash_cache):
+                if isinstance(prepared, Exception) or prepared.skipped:
+                    yield path, prepared
+                    continue
+
+                book = batch.import_file(path, prepared.metadata, extract_text=extract_text,
+                                         extract_cover=extract_cover, prepared=prepared,
+                                         defer=defer, ingest_mode=ingest_mode)
+                yield path, book
+
     def batch_import(self, file_paths: List[Path], metadata_list: List[Dict[str, Any]],
-                    show_progress: bool = False) -> List[Book]:
+                    show_progress: bool = False, workers: int = 1,
+                    ingest_mode: str = "copy", batch_size: int = 100) -> List[Book]:
         """
         Import multiple files with progress tracking.
 
+        Files are committed ``batch_size`` at a time, each in its own
+        savepoint (see :class:`ImportBatch`); ``last_stats`` reports the
+        commit rate afterwards.
+
         Args:
             file_paths: List of file paths to import
             metadata_list: List of metadata dicts (one per file)
             show_progress: Whether to show progress bar
+            workers: Worker processes for hashing and extraction; above 1,
+                     files are prepared in parallel (see :meth:`import_prepared`)
+            ingest_mode: How files are placed in the library (see :meth:`import_file`)
+            batch_size: Files per transaction
 
         Returns:
             List of imported Book instances
         """
+        if workers > 1:
+            results = self.import_prepared(zip(file_paths, metadata_list), workers,
+                                           batch_size=batch_size, ingest_mode=ingest_mode)
+        else:
+            def sequential():
+                with ImportBatch(self, batch_size) as batch:
+                    self.last_stats = batch.stats
+                    for file_path, metadata in zip(file_paths, metadata_list):
+                        yield file_path, batch.import_file(file_path, metadata,
+                                                           ingest_mode=ingest_mode)
+            results = sequential()
+
         books = []
 
         if show_progress:
             from rich.progress import Progress
             with Progress() as progress:
                 task = progress.add_task("[green]Importing...", total=len(file_paths))
-                for file_path, metadata in zip(file_paths, metadata_list):
-                    book = self.import_file(file_path, metadata)
-                    if book:
+                for _, book in results:
+                    if isinstance(book, Book):
                         books.append(book)
                     progress.advance(task)
         else:
-            for file_path, metadata in zip(file_paths, metadata_list):
-                book = self.import_file(file_path, metadata)
-                if book:
+            for _, book in results:
+                if isinstance(book, Book):
                     books.append(book)
 
+        logger.info(f"Batch import: {self.last_stats.summary()}")
         return books
@@ -0,0 +1,126 @@
+"""
+Moving ebook files into the library's hash-prefixed store.
+
+Imports place each file with one of these ingest modes:
+
+- ``copy``: an independent copy (``os.copy_file_range`` where available,
+  so the kernel moves the bytes)
+- ``hardlink``: a second name for the source file; no data is written, but
+  the library copy changes if the source is edited in place
+- ``reflink``: a copy-on-write clone on filesystems that support it (Btrfs,
+  XFS, ...); falls back to ``copy`` elsewhere
+- ``move``: the source is moved into the library (a rename on the same
+  filesystem). The import service instead hard-links (or copies) it in
+  and removes the source once the import's rows are committed
+
+``hardlink`` also falls back to ``copy`` across filesystems.
+"""
+
+from pathlib import Path
+import errno
+import logging
+import os
+import shutil
+
+logger = logging.getLogger(__name__)
+
+INGEST_MODES = ("copy", "hardlink", "reflink", "move")
+
+# ioctl(2) request that clones a whole file (Linux, linux/fs.h)
+_FICLONE = 0x40049409
+
+
+def validate_ingest_mode(mode: str) -> str:
+    """
+    Check an ingest mode name.
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode not in INGEST_MODES:
+        raise ValueError(f"Unknown ingest mode '{mode}'. Choose from: {', '.join(INGEST_MODES)}")
+    return mode
+
+
+def ingest_file(source_path: Path, dest_path: Path, mode: str = "copy") -> str:
+    """
+    Place a file at ``dest_path`` using an ingest mode.
+
+    An existing ``dest_path`` is replaced.
+
+    Args:
+        source_path: File to ingest
+        dest_path: Destination in the library
+        mode: One of :data:`INGEST_MODES`
+
+    Returns:
+        The mode actually used (``copy`` after a fallback)
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    validate_ingest_mode(mode)
+    source_path, dest_path = Path(source_path), Path(dest_path)
+
+    if mode == "move":
+        shutil.move(str(source_path), str(dest_path))
+        return mode
+
+    if mode == "hardlink":
+        dest_path.unlink(missing_ok=True)
+        try:
+            os.link(source_path, dest_path)
+            return mode
+        except OSError as e:
+            logger.debug(f"Hard link failed for {source_path.name} ({e}); copying instead")
+
+    if mode == "reflink" and _reflink(source_path, dest_path):
+        return mode
+
+    copy_file(source_path, dest_path)
+    return "copy"
+
+
+def copy_file(source_path: Path, dest_path: Path) -> None:
+    """Copy a file's data and timestamps, in the kernel where possible."""
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        if not _copy_file_range(src.fileno(), dst.fileno()):
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+            shutil.copyfileobj(src, dst, 1 << 20)
+    shutil.copystat(source_path, dest_path)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int) -> bool:
+    """Copy all of ``src_fd`` to ``dst_fd`` with copy_file_range(2); False if unsupported."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    remaining = os.fstat(src_fd).st_size
+    try:
+        while remaining > 0:
+            copied = os.copy_file_range(src_fd, dst_fd, min(remaining, 1 << 30))
+            if copied == 0:
+                break
+            remaining -= copied
+    except OSError as e:
+        if e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM):
+            return False
+        raise
+    return remaining <= 0
+
+
+def _reflink(source_path: Path, dest_path: Path) -> bool:
+    """Clone a file with the FICLONE ioctl; False if the filesystem can't."""
+    try:
+        import fcntl
+    except ImportError:  # not on POSIX
+        return False
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError as e:
+            logger.debug(f"Reflink not supported for {source_path.name} ({e}); copying instead")
+            return False
+    shutil.copystat(source_path, dest_path)
+    return True
@@ -0,0 +1,340 @@
+"""
+Background extraction jobs.
+
+Imports with deferred extraction commit the book and file rows right away
+and queue jobs in the ``jobs`` table instead of rendering covers and
+extracting text inline. Workers claim jobs in priority order and run them
+against the file's library copy:
+
+- ``text``: full text, FTS row and content segments
+- ``cover``: the full-size cover image (queues a ``thumbnail`` job)
+- ``thumbnail``: the cover's thumbnail
+
+A failed job is retried with exponential backoff until it has used
+``max_attempts``. Claiming is a conditional UPDATE, so several workers
+(``book-memex worker`` processes, or the thread inside ``serve``) can share
+one queue.
+"""
+
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+import os
+import socket
+import threading
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..db.models import File, Job, utc_now
+from .suggest_service import SuggestService
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ("text", "cover", "thumbnail")
+JOB_STATUSES = ("pending", "running", "done", "failed")
+
+# Seconds before the first retry; doubles with every further attempt
+RETRY_DELAY = 30
+
+
+def default_worker_id() -> str:
+    """Identify this worker in claimed jobs (host:pid:thread)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class JobService:
+    """Service for queueing and running background extraction jobs."""
+
+    def __init__(self, session: Session, library_root: Path):
+        """
+        Initialize the job service.
+
+        Args:
+            session: SQLAlchemy database session
+            library_root: Library directory (for the import service)
+        """
+        self.session = session
+        self.library_root = Path(library_root)
+
+    # ----------------------------------------------------------------- queue
+
+    def enqueue(self, file: File, kind: str, priority: int = 0, max_attempts: int = 3) -> Job:
+        """
+        Queue a job for a file, unless the same job is already queued.
+
+        Does not commit, so a job is queued in the same transaction as the
+        rows it works on.
+
+        Raises:
+            ValueError: If ``kind`` is unknown
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'. Choose from: {', '.join(JOB_KINDS)}")
+
+        existing = (
+            self.session.query(Job)
+            .filter(Job.file_id == file.id, Job.kind == kind, Job.status == 'pending')
+            .first()
+        )
+        if existing is not None:
+            existing.priority = max(existing.priority, priority)
+            return existing
+
+        job = Job(kind=kind, file_id=file.id, status='pending', priority=priority,
+                  attempts=0, max_attempts=max_attempts)
+        self.session.add(job)
+        self.session.flush()
+        return job
+
+    def enqueue_import(self, file: File, extract_text: bool = True, extract_cover: bool = True,
+                       priority: int = 0) -> List[Job]:
+        """Queue the extraction an inline import would have done for a file."""
+        jobs = []
+        if extract_cover:
+            jobs.append(self.enqueue(file, 'cover', priority))
+        if extract_text:
+            jobs.append(self.enqueue(file, 'text', priority))
+        return jobs
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Get a job by ID."""
+        return self.session.get(Job, job_id)
+
+    def list(self, status: Optional[str] = None, book_id: Optional[int] = None,
+             limit: int = 50) -> List[Job]:
+        """
+        List jobs, newest first.
+
+        Args:
+            status: Only jobs with this status
+            book_id: Only jobs for this book's files
+            limit: Maximum number of jobs
+        """
+        query = self.session.query(Job)
+        if status:
+            query = query.filter(Job.status == status)
+        if book_id is not None:
+            query = query.join(File, File.id == Job.file_id).filter(File.book_id == book_id)
+        return query.order_by(Job.id.desc()).limit(limit).all()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        counts = {status: 0 for status in JOB_STATUSES}
+        for status, n in self.session.query(Job.status, func.count(Job.id)).group_by(Job.status):
+            counts[status] = n
+        return counts
+
+    def retry(self, job_id: int) -> Optional[Job]:
+        """
+        Queue a failed (or finished) job to run again with fresh attempts.
+
+        Returns:
+            The job, or None if it does not exist
+
+        Raises:
+            ValueError: If the job is currently running
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status == 'running':
+            raise ValueError(f"Job {job_id} is running")
+        job.status = 'pending'
+        job.attempts = 0
+        job.run_after = None
+        job.last_error = None
+        self.session.commit()
+        return job
+
+    def recover(self, stale_after: timedelta = timedelta(hours=1)) -> int:
+        """
+        Requeue jobs left running by a worker that died.
+
+        Returns:
+            Number of jobs requeued
+        """
+        result = self.session.execute(
+            update(Job)
+            .where(Job.status == 'running', Job.started_at < utc_now() - stale_after)
+            .values(status='pending', worker=None)
+        )
+        self.session.commit()
+        if result.rowcount:
+            logger.warning(f"Requeued {result.rowcount} stale running job(s)")
+        return result.rowcount
+
+    # ------------------------------------------------------------------- run
+
+    def claim(self, worker_id: Optional[str] = None) -> Optional[Job]:
+        """
+        Atomically take the next due job (highest priority, oldest first).
+
+        Returns:
+            The job, now ``running``, or None if nothing is due
+        """
+        worker_id = worker_id or default_worker_id()
+        while True:
+            now = utc_now()
+            job_id = self.session.execute(
+                select(Job.id)
+                .where(Job.status == 'pending', or_(Job.run_after.is_(None), Job.run_after <= now))
+                .order_by(Job.priority.desc(), Job.id)
+                .limit(1)
+            ).scalar()
+            if job_id is None:
+                self.session.commit()
+                return None
+
+            claimed = self.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == 'pending')
+                .values(status='running', worker=worker_id, started_at=now,
+                        attempts=Job.attempts + 1)
+            ).rowcount
+            self.session.commit()
+            if claimed:
+                job = self.session.get(Job, job_id)
+                self.session.refresh(job)
+                return job
+            # Another worker took it first; try the next one
+
+    def run(self, job: Job) -> bool:
+        """
+        Run a claimed job and record the outcome.
+
+        Returns:
+            True if the job succeeded
+        """
+        from .import_service import ImportService
+
+        try:
+            file = job.file
+            if file is None:
+                raise LookupError(f"File {job.file_id} no longer exists")
+            if not (self.library_root / file.path).exists():
+                raise FileNotFoundError(f"Library file missing: {file.path}")
+
+            service = ImportService(self.library_root, self.session)
+            if job.kind == 'text':
+                if file.extracted_text is not None:  # re-run: replace it
+                    self.session.delete(file.extracted_text)
+                    self.session.flush()
+                service.index_text(file.book, file)
+            elif job.kind == 'cover':
+                cover = service.file_cover(file.book, file)
+                if cover is None:
+                    cover = service.add_cover(file.book, file, thumbnail=False)
+                if cover is not None:
+                    self.enqueue(file, 'thumbnail', job.priority)
+            elif job.kind == 'thumbnail':
+                service.add_thumbnail(file.book, file)
+            else:
+                raise ValueError(f"Unknown job kind '{job.kind}'")
+
+            job.status = 'done'
+            job.last_error = None
+            job.finished_at = utc_now()
+            self.session.commit()
+            return True
+
+        except Exception as e:
+            self.session.rollback()
+            job = self.session.get(Job, job.id)
+            if job is None:
+                return False
+            job.last_error = f"{type(e).__name__}: {e}"
+            if job.attempts < job.max_attempts:
+                job.status = 'pending'
+                job.run_after = utc_now() + timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+                logger.warning(f"Job {job.id} ({job.kind}) failed, will retry: {e}")
+            else:
+                job.status = 'failed'
+                job.finished_at = utc_now()
+                logger.error(f"Job {job.id} ({job.kind}) failed permanently: {e}")
+            self.session.commit()
+            return False
+
+    def run_pending(self, worker_id: Optional[str] = None,
+                    max_jobs: Optional[int] = None) -> Dict[str, int]:
+        """
+        Run due jobs until the queue is empty (or ``max_jobs`` ran).
+
+        Returns:
+            Dict with ``done`` and ``failed`` counts for this run
+        """
+        results = {"done": 0, "failed": 0}
+        while max_jobs is None or results["done"] + results["failed"] < max_jobs:
+            job = self.claim(worker_id)
+            if job is None:
+                break
+            results["done" if self.run(job) else "failed"] += 1
+        return results
+
+
+class JobWorker:
+    """Run queued jobs in a background thread (used by ``serve``).
+
+    When the queue is empty the worker also rebuilds stale typeahead
+    suggestions.
+    """
+
+    def __init__(self, library, poll_interval: float = 2.0):
+        """
+        Initialize the worker.
+
+        Args:
+            library: Library whose queue to work on; each pass uses its own
+                     session from ``library.scoped()``
+            poll_interval: Seconds to wait between queue checks when idle
+        """
+        self.library = library
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="book-memex-jobs", daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Check the queue now instead of at the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the current job finishes."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        worker_id = default_worker_id()
+        recovered = False
+        while not self._stop.is_set():
+            try:
+                with self.library.scoped() as lib:
+                    service = JobService(lib.session, lib.library_path)
+                    if not recovered:
+                        service.recover()
+                        recovered = True
+                    while not self._stop.is_set():
+                        job = service.claim(worker_id)
+                        if job is None:
+                            break
+                        service.run(job)
+                    # Queue drained: catch the typeahead suggestions up with
+                    # the writes, so lookups never rebuild them
+                    if not self._stop.is_set():
+                        SuggestService(lib.session).ensure_fresh()
+            except Exception:
+                logger.exception("Background job worker error")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
@@ -0,0 +1,233 @@
+"""
+Precomputed "similar books" lists.
+
+Stores each book's top-k most similar books per BookSimilarity preset in
+the book_neighbors table, so looking them up is a single indexed query.
+Builds are incremental: only books whose similarity inputs changed (or
+whose lists those changes affect) are recomputed.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from ..db.models import Book, BookNeighbor, BookNeighborState, utc_now
+from ..similarity import BookSimilarity
+from ..similarity.index import SimilarityIndex, book_token
+
+logger = logging.getLogger(__name__)
+
+# BookSimilarity presets that can be precomputed, by method name
+PRESETS = ("balanced", "metadata_only", "sparse_friendly", "content_only")
+
+# Keep IN (...) lists well under SQLite's bound-variable limit
+_CHUNK = 500
+
+
+def preset_config(preset: str) -> BookSimilarity:
+    """
+    Build the BookSimilarity configuration for a preset name.
+
+    Raises:
+        ValueError: If the preset is unknown
+    """
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown similarity preset '{preset}'. Choose from: {', '.join(PRESETS)}")
+    return getattr(BookSimilarity(), preset)()
+
+
+_preset_signatures: Dict[str, str] = {}
+
+
+def preset_name(config: BookSimilarity) -> Optional[str]:
+    """Name of the preset ``config`` is equivalent to, or None for custom configs."""
+    if not _preset_signatures:
+        _preset_signatures.update({preset_config(p).signature(): p for p in PRESETS})
+    return _preset_signatures.get(config.signature())
+
+
+class NeighborService:
+    """Service for building and reading precomputed neighbour lists."""
+
+    def __init__(self, session: Session):
+        """
+        Initialize the neighbour service.
+
+        Args:
+            session: SQLAlchemy database session
+        """
+        self.session = session
+
+    def get(self, book_id: int, preset: str, limit: int = 10) -> Optional[List[Tuple[Book, float]]]:
+        """
+        Read a book's precomputed similar books.
+
+        Lists follow ``find_similar``'s default language filtering: only
+        books in the query book's language (any language if it has none).
+
+        Args:
+            book_id: Query book ID
+            preset: Preset name
+            limit: Number of results wanted
+
+        Returns:
+            List of (book, similarity) tuples, or None if no list covering
+            ``limit`` results exists for the book's current data
+        """
+        state = self.session.get(BookNeighborState, (book_id, preset))
+        if state is None or state.top_k < limit or state.token != book_token(self.session, book_id):
+            return None
+
+        rows = (
+            self.session.query(Book, BookNeighbor.score)
+            .join(BookNeighbor, BookNeighbor.neighbor_id == Book.id)
+            .filter(BookNeighbor.book_id == book_id, BookNeighbor.preset == preset)
+            .order_by(BookNeighbor.rank)
+            .limit(limit)
+            .all()
+        )
+        return [(book, score) for book, score in rows]
+
+    def build(self, preset: str, index: SimilarityIndex, top_k: int = 20,
+              full: bool = False) -> Dict[str, int]:
+        """
+        Bring the neighbour lists for a preset up to date.
+
+        A book's list is recomputed when the book is new or changed, when
+        the similarity model was refitted, when ``top_k`` changed, or when
+        its list mentions a changed or deleted book. Other lists only get
+        changed books merged in where they now rank in the top k.
+
+        Args:
+            preset: Preset name the lists are stored under
+            index: Up-to-date SimilarityIndex for that preset
+            top_k: Neighbours to keep per book
+            full: Recompute every list
+
+        Returns:
+            Dict with ``books``, ``recomputed`` and ``updated`` counts
+        """
+        tokens = index.tokens
+        languages = dict(zip(index.book_ids, index.languages, strict=True))
+        state = {
+            s.book_id: s
+            for s in self.session.query(BookNeighborState).filter(BookNeighborState.preset == preset)
+        }
+
+        def is_current(book_id: int) -> bool:
+            s = state.get(book_id)
+            return (not full and s is not None and s.token == tokens.get(book_id)
+                    and s.fit_id == index.fit_id and s.top_k == top_k)
+
+        changed = {bid for bid in index.book_ids if not is_current(bid)}
+        recompute = set(changed)
+
+        lists: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        rows = (
+            self.session.query(BookNeighbor.book_id, BookNeighbor.neighbor_id, BookNeighbor.score)
+            .filter(BookNeighbor.preset == preset)
+            .order_by(BookNeighbor.book_id, BookNeighbor.rank)
+        )
+        for book_id, neighbor_id, score in rows:
+            if book_id in recompute:
+                continue
+            if neighbor_id in changed or neighbor_id not in tokens:
+                # A changed or deleted neighbour invalidates the whole list
+                recompute.add(book_id)
+                lists.pop(book_id, None)
+                continue
+            lists[book_id].append((neighbor_id, score))
+
+        updated = self._merge_changed(index, changed, recompute, lists, languages, top_k)
+
+        for book_id in recompute:
+            lists[book_id] = index.top_k_ids(book_id, top_k, languages.get(book_id) or None)
+
+        self._write(preset, index, top_k, recompute, updated, lists, tokens)
+        logger.info(
+            f"Neighbors '{preset}': {len(index.book_ids)} books, "
+            f"{len(recompute)} recomputed, {len(updated)} updated"
+        )
+        return {"books": len(index.book_ids), "recomputed": len(recompute), "updated": len(updated)}
+
+    @staticmethod
+    def _merge_changed(index: SimilarityIndex, changed: set, recompute: set,
+                       lists: Dict[int, List[Tuple[int, float]]],
+                       languages: Dict[int, Optional[str]], top_k: int) -> set:
+        """Merge changed books into the lists of books that are kept.
+
+        Similarity is symmetric, so one score row per changed book gives its
+        score against every kept book.
+        """
+        kept = np.array([bid for bid in index.book_ids if bid not in recompute], dtype=np.int64)
+        if not changed or len(kept) == 0:
+            return set()
+
+        positions = {bid: i for i, bid in enumerate(index.book_ids)}
+        kept_pos = np.array([positions[bid] for bid in kept], dtype=np.int64)
+        threshold = np.array([
+            min(score for _, score in lists[bid]) if len(lists.get(bid, ())) >= top_k else -np.inf
+            for bid in kept
+        ])
+        # Language codes; books without a language (code 0) accept any neighbour
+        codes = {None: 0}
+        kept_langs = np.array(
+            [codes.setdefault(languages.get(bid) or None, len(codes)) for bid in kept], dtype=np.int64
+        )
+
+        updated = set()
+        for c in changed:
+            c_code = codes.get(languages.get(c) or None, -1)
+            eligible = (kept_langs == 0) | (kept_langs == c_code)
+            scores = index.scores(c)[kept_pos]
+            for i in np.flatnonzero(eligible & (scores > threshold)):
+                book_id = int(kept[i])
+                lists[book_id].append((c, float(scores[i])))
+                updated.add(book_id)
+
+        for book_id in updated:
+            lists[book_id] = sorted(lists[book_id], key=lambda e: (-e[1], e[0]))[:top_k]
+        return updated
+
+    def _write(self, preset: str, index: SimilarityIndex, top_k: int, recompute: set,
+               updated: set, lists: Dict[int, List[Tuple[int, float]]],
+               tokens: Dict[int, str]) -> None:
+        """Replace the stored lists (and state) of recomputed and updated books."""
+        rewrite = sorted(recompute | updated)
+        recompute_ids = sorted(recompute)
+
+        for lo in range(0, len(rewrite), _CHUNK):
+            chunk = rewrite[lo:lo + _CHUNK]
+            self.session.execute(
+                delete(BookNeighbor).where(BookNeighbor.preset == preset, BookNeighbor.book_id.in_(chunk))
+            )
+        for lo in range(0, len(recompute_ids), _CHUNK):
+            chunk = recompute_ids[lo:lo + _CHUNK]
+            self.session.execute(
+                delete(BookNeighborState).where(
+                    BookNeighborState.preset == preset, BookNeighborState.book_id.in_(chunk)
+                )
+            )
+
+        neighbor_rows = [
+            {"book_id": book_id, "preset": preset, "rank": rank, "neighbor_id": neighbor_id, "score": score}
+            for book_id in rewrite
+            for rank, (neighbor_id, score) in enumerate(lists.get(book_id, []), start=1)
+        ]
+        if neighbor_rows:
+            self.session.execute(insert(BookNeighbor), neighbor_rows)
+
+        now = utc_now()
+        state_rows = [
+            {"book_id": book_id, "preset": preset, "token": tokens[book_id],
+             "fit_id": index.fit_id, "top_k": top_k, "computed_at": now}
+            for book_id in recompute_ids
+        ]
+        if state_rows:
+            self.session.execute(insert(BookNeighborState), state_rows)
+
+        self.session.commit()
@@ -0,0 +1,304 @@
+"""
+Library-wide content reindexing.
+
+Re-runs the segment extractors over every book's primary file and writes
+the results through :class:`ContentIndexer`. Built for large libraries:
+
+- Files are read in keyset pages ordered by id, so memory stays bounded
+  however many books there are.
+- With ``workers > 1`` a process pool extracts segments while this process
+  writes them, in file order, one transaction per batch.
+- Each batch commit also updates the ``reindex_checkpoints`` row, so an
+  interrupted run can be resumed after the last committed file.
+- Files whose content fingerprint is unchanged are skipped without being
+  read (see ``ContentIndexer.index_file``), unless ``force`` is set.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+import logging
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..db.models import File, PRIMARY_FORMAT_PRIORITY, ReindexCheckpoint, utc_now
+from .content_extraction import Segment, get_extractor
+from .content_indexer import ContentIndexer, content_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = 'content'
+
+# Files fetched per keyset page
+PAGE_SIZE = 500
+
+
+@dataclass
+class ReindexStats:
+    """Counters for a reindex run, passed to the progress callback."""
+    total: int = 0  # books with files (including those done before a resume)
+    processed: int = 0  # primary files visited so far, skipped ones included
+    indexed: int = 0
+    unchanged: int = 0
+    unsupported: int = 0
+    failed: int = 0
+    segments_written: int = 0
+    resumed_from: int = 0  # last_file_id of the checkpoint resumed, 0 if none
+    elapsed: float = 0.0
+    start_processed: int = field(default=0, repr=False)  # processed when this run started
+
+    @property
+    def files_per_second(self) -> float:
+        """Throughput of this run (files done before a resume do not count)."""
+        done = self.processed - self.start_processed
+        return done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds left, None until the throughput is known."""
+        rate = self.files_per_second
+        if rate <= 0:
+            return None
+        return max(self.total - self.processed, 0) / rate
+
+
+def _extract_segments(path: str, book_format: str) -> List[Segment]:
+    """Run a format's extractor over one file (in pool workers)."""
+    return list(get_extractor(book_format).extract(Path(path)))
+
+
+def _raising(exc: Exception) -> Iterator[Segment]:
+    """Segments of a file whose extraction failed in a worker."""
+    raise exc
+    yield  # pragma: no cover - makes this a generator
+
+
+class ReindexService:
+    """Service for reindexing book content across the whole library."""
+
+    def __init__(self, session: Session, library_root: Path):
+        """
+        Initialize the reindex service.
+
+        Args:
+            session: SQLAlchemy database session
+            library_root: Library directory
+        """
+        self.session = session
+        self.library_root = Path(library_root)
+        self.indexer = ContentIndexer(session, library_path=self.library_root)
+
+    def checkpoint(self) -> Optional[ReindexCheckpoint]:
+        """The checkpoint of the last library-wide run, if any."""
+        return self.session.get(ReindexCheckpoint, CHECKPOINT_NAME)
+
+    def run(
+        self,
+        workers: int = 1,
+        force: bool = False,
+        resume: bool = False,
+        batch_size: int = 50,
+        book_id: Optional[int] = None,
+        on_progress: Optional[Callable[[ReindexStats], None]] = None,
+    ) -> ReindexStats:
+        """
+        Reindex the primary file of every book (or of one book).
+
+        Args:
+            workers: Extraction processes; 1 extracts in this process
+            force: Re-extract files whose content fingerprint is unchanged
+            resume: Continue an interrupted library-wide run from its
+                    checkpoint (ignored with ``book_id``)
+            batch_size: Files per transaction and checkpoint update
+            book_id: Only reindex this book; no checkpoint is kept
+            on_progress: Called with the running stats after every file
+
+        Returns:
+            ReindexStats for the run
+        """
+        batch_size = max(1, batch_size)
+        stats = ReindexStats()
+        checkpoint = None
+        if book_id is None:
+            checkpoint = self._start_checkpoint(force, resume)
+            force = force or checkpoint.force
+            stats.resumed_from = checkpoint.last_file_id
+            stats.processed = stats.start_processed = checkpoint.files_done
+        stats.total = self._count_books(book_id)
+
+        start = time.monotonic()
+        pending_in_batch = 0
+        files = self._primary_files(checkpoint.last_file_id if checkpoint else 0, book_id)
+        for row, segments in self._extracted(files, workers, force):
+            file_row = self.session.get(File, row.id)
+            if segments is _SKIP or file_row is None:
+                if _extractor_version(row.format) is None:
+                    stats.unsupported += 1
+                else:
+                    stats.unchanged += 1
+            else:
+                result = self.indexer.index_file(file_row, segments=segments,
+                                                 commit=False, force=True)
+                stats.segments_written += result.segments_written
+                if result.status == 'extractor_error':
+                    stats.failed += 1
+                else:
+                    stats.indexed += 1
+
+            stats.processed += 1
+            pending_in_batch += 1
+            if checkpoint is not None:
+                checkpoint.last_file_id = row.id
+                checkpoint.files_done = stats.processed
+            if pending_in_batch >= batch_size:
+                self._commit_batch(checkpoint)
+                pending_in_batch = 0
+
+            stats.elapsed = time.monotonic() - start
+            if on_progress is not None:
+                on_progress(stats)
+
+        if checkpoint is not None:
+            checkpoint.status = 'done'
+        self._commit_batch(checkpoint)
+        stats.elapsed = time.monotonic() - start
+        return stats
+
+    # ------------------------------------------------------------ checkpoint
+
+    def _start_checkpoint(self, force: bool, resume: bool) -> ReindexCheckpoint:
+        checkpoint = self.checkpoint()
+        if checkpoint is None:
+            checkpoint = ReindexCheckpoint(name=CHECKPOINT_NAME)
+            self.session.add(checkpoint)
+        elif resume and checkpoint.status == 'running':
+            logger.info(f"Resuming reindex after file {checkpoint.last_file_id} "
+                        f"({checkpoint.files_done} files done)")
+            return checkpoint
+        elif resume:
+            logger.info("No interrupted reindex to resume; starting from the first file")
+
+        checkpoint.last_file_id = 0
+        checkpoint.status = 'running'
+        checkpoint.force = force
+        checkpoint.files_done = 0
+        checkpoint.started_at = utc_now()
+        self.session.commit()
+        return checkpoint
+
+    def _commit_batch(self, checkpoint: Optional[ReindexCheckpoint]) -> None:
+        if checkpoint is not None:
+            checkpoint.updated_at = utc_now()
+        self.session.commit()
+
+    # ---------------------------------------------------------------- files
+
+    def _count_books(self, book_id: Optional[int]) -> int:
+        query = select(func.count(func.distinct(File.book_id)))
+        if book_id is not None:
+            query = query.where(File.book_id == book_id)
+        return self.session.execute(query).scalar() or 0
+
+    def _primary_files(self, after_id: int, book_id: Optional[int]) -> Iterator:
+        """
+        Yield (id, book_id, path, format, file_hash, content_fingerprint)
+        rows of primary files with id > ``after_id``, in id order.
+
+        Reads one keyset page of files at a time plus their books' sibling
+        files, and keeps the file each book would pick as ``primary_file``.
+        Each page is fully fetched before anything is written, so commits
+        between pages never disturb an open cursor.
+        """
+        columns = (File.id, File.book_id, File.path, File.format,
+                   File.file_hash, File.content_fingerprint)
+        last_id = after_id
+        while True:
+            query = select(*columns).where(File.id > last_id)
+            if book_id is not None:
+                query = query.where(File.book_id == book_id)
+            page = self.session.execute(query.order_by(File.id).limit(PAGE_SIZE)).all()
+            if not page:
+                return
+            last_id = page[-1].id
+
+            siblings = self.session.execute(
+                select(File.id, File.book_id, File.format)
+                .where(File.book_id.in_({row.book_id for row in page}))
+            ).all()
+            primary = {}
+            for sib in sorted(siblings, key=lambda s: (
+                    PRIMARY_FORMAT_PRIORITY.get(s.format.lower(), 99), s.id)):
+                primary.setdefault(sib.book_id, sib.id)
+
+            for row in page:
+                if primary.get(row.book_id) == row.id:
+                    yield row
+
+    def _needs_extraction(self, row, force: bool) -> bool:
+        version = _extractor_version(row.format)
+        if version is None:
+            return False
+        return force or row.content_fingerprint != content_fingerprint(row.file_hash, version)
+
+    def _path(self, row) -> Path:
+        path = Path(row.path)
+        return path if path.is_absolute() else self.library_root / path
+
+    def _extracted(self, files: Iterator, workers: int,
+                   force: bool) -> Iterator[Tuple[object, object]]:
+        """
+        Pair each file row with its segments, in input order.
+
+        Segments are ``_SKIP`` for files that need no work (unchanged or
+        without an extractor), ``None``
+        when the indexer should extract in this process (one worker), and
+        otherwise what a pool worker extracted (an iterator that raises the
+        worker's error, if it failed). At most a few files per worker are in
+        flight, which bounds memory.
+        """
+        if workers <= 1:
+            for row in files:
+                yield row, (None if self._needs_extraction(row, force) else _SKIP)
+            return
+
+        window = workers * 4
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            def submit_next() -> bool:
+                for row in files:
+                    if self._needs_extraction(row, force):
+                        pending.append((row, pool.submit(_extract_segments,
+                                                         str(self._path(row)), row.format)))
+                    else:
+                        pending.append((row, _SKIP))
+                    return True
+                return False
+
+            while len(pending) < window and submit_next():
+                pass
+            while pending:
+                row, result = pending.popleft()
+                submit_next()
+                if result is _SKIP:
+                    yield row, result
+                    continue
+                try:
+                    segments = iter(result.result())
+                except Exception as e:
+                    segments = _raising(e)
+                yield row, segments
+
+
+# Marker for files that need no extraction
+_SKIP = object()
+
+
+def _extractor_version(book_format: str) -> Optional[str]:
+    try:
+        return get_extractor(book_format).version
+    except ValueError:
+        return None
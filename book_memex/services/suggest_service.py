@@ -0,0 +1,171 @@
+"""
+Typeahead suggestions for the search box.
+
+Book titles, author names, subjects and tag paths are collected into the
+suggestions table, one row each, ordered by how many (non-archived) books
+they lead to. Since the table is rebuilt in that order, a row's id is its
+rank, and ``suggestions_fts`` (prefix-indexed, see migration 20) can answer
+"first N matches by rank" by walking its doclist in rowid order and stopping
+after N hits, with no sort over all matches.
+
+Triggers mark the table stale whenever its inputs change. Lookups never
+rebuild stale suggestions (that takes about a second for 100k books and
+the write lock); they serve the existing rows while
+:meth:`SuggestService.ensure_fresh` runs off the request path: in the job
+worker once its queue is empty, or in a background task of the ``serve``
+app when it runs without a worker. ``Library.suggest`` builds them once
+for a library that never had them.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..db.models import utc_now
+
+logger = logging.getLogger(__name__)
+
+SUGGESTION_KINDS = ("author", "subject", "tag", "title")
+
+_TOKEN = re.compile(r"\w+")
+
+# One row per suggestion, best first; ties go to authors, then subjects,
+# tags and titles
+_REBUILD_SQL = text("""
+    INSERT INTO suggestions (kind, label, ref_id, weight)
+    SELECT kind, label, ref_id, weight FROM (
+        SELECT 'author' AS kind, 0 AS kind_order, a.name AS label, a.id AS ref_id,
+               COUNT(*) AS weight
+        FROM authors a
+        JOIN book_authors ba ON ba.author_id = a.id
+        JOIN books b ON b.id = ba.book_id AND b.archived_at IS NULL
+        WHERE a.archived_at IS NULL
+        GROUP BY a.id
+        UNION ALL
+        SELECT 'subject', 1, s.name, s.id, COUNT(*)
+        FROM subjects s
+        JOIN book_subjects bs ON bs.subject_id = s.id
+        JOIN books b ON b.id = bs.book_id AND b.archived_at IS NULL
+        WHERE s.archived_at IS NULL
+        GROUP BY s.id
+        UNION ALL
+        SELECT 'tag', 2, t.path, t.id, COUNT(*)
+        FROM tags t
+        JOIN book_tags bt ON bt.tag_id = t.id
+        JOIN books b ON b.id = bt.book_id AND b.archived_at IS NULL
+        WHERE t.archived_at IS NULL
+        GROUP BY t.id
+        UNION ALL
+        SELECT 'title', 3, b.title, MIN(b.id), COUNT(*)
+        FROM books b
+        WHERE b.archived_at IS NULL AND b.title != ''
+        GROUP BY b.title
+    )
+    ORDER BY weight DESC, kind_order, label
+""")
+
+
+def match_expression(query: str) -> str:
+    """
+    Turn typed text into an FTS5 query matching every word as a prefix.
+
+    ``"knu art"`` becomes ``'"knu"* "art"*'``. Returns an empty string if
+    the query has no word characters.
+    """
+    return " ".join(f'"{token}"*' for token in _TOKEN.findall(query.lower()))
+
+
+class SuggestService:
+    """Service for building and querying typeahead suggestions."""
+
+    def __init__(self, session: Session):
+        """
+        Initialize the suggestion service.
+
+        Args:
+            session: SQLAlchemy database session
+        """
+        self.session = session
+
+    def is_stale(self) -> bool:
+        """Whether the suggestions need rebuilding before the next lookup."""
+        stale = self.session.execute(
+            text("SELECT stale FROM suggestion_state WHERE id = 1")
+        ).scalar()
+        return stale is None or bool(stale)
+
+    def is_built(self) -> bool:
+        """Whether the suggestions have been built at least once."""
+        built_at = self.session.execute(
+            text("SELECT built_at FROM suggestion_state WHERE id = 1")
+        ).scalar()
+        return built_at is not None
+
+    def rebuild(self) -> int:
+        """
+        Rebuild the suggestions table and its FTS index.
+
+        Returns:
+            Number of suggestions
+        """
+        self.session.execute(text("DELETE FROM suggestions"))
+        count = self.session.execute(_REBUILD_SQL).rowcount
+        self.session.execute(text("INSERT INTO suggestions_fts (suggestions_fts) VALUES ('rebuild')"))
+        # Same transaction as the rebuild: SQLite serialises writers, so no
+        # edit can land between reading the inputs and clearing the flag
+        self.session.execute(
+            text("INSERT OR REPLACE INTO suggestion_state (id, stale, built_at) VALUES (1, 0, :now)"),
+            {"now": utc_now()},
+        )
+        self.session.commit()
+        logger.debug(f"Rebuilt {count} suggestions")
+        return count
+
+    def ensure_fresh(self) -> bool:
+        """
+        Rebuild the suggestions if they are stale.
+
+        Returns:
+            True if a rebuild happened
+        """
+        if not self.is_stale():
+            return False
+        self.rebuild()
+        return True
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Complete a partly typed search.
+
+        Every word of ``query`` must start a word of the label, so "lor ri"
+        completes "The Lord of the Rings" but not "Lorna Doone". Read-only:
+        stale suggestions are served as they are (see :meth:`ensure_fresh`).
+
+        Args:
+            query: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of dicts with kind, label, ref_id and weight, best first
+        """
+        expression = match_expression(query)
+        if not expression or limit < 1:
+            return []
+        rows = self.session.execute(text("""
+            SELECT s.kind, s.label, s.ref_id, s.weight
+            FROM suggestions s
+            WHERE s.id IN (
+                SELECT rowid FROM suggestions_fts
+                WHERE suggestions_fts MATCH :match
+                ORDER BY rowid
+                LIMIT :limit
+            )
+            ORDER BY s.id
+        """), {"match": expression, "limit": limit})
+        return [
+            {"kind": kind, "label": label, "ref_id": ref_id, "weight": weight}
+            for kind, label, ref_id, weight in rows
+        ]
@@ -1,7 +1,8 @@
 """
 Text extraction service for ebook files.
 
-Handles extraction from PDF, EPUB, TXT, MD and stores in database with FTS indexing.
+Handles extraction from PDF, EPUB, TXT, MD and stores in database. The
+books_fts index follows extracted_texts through triggers (migration 19).
 """
 
 import re
@@ -15,8 +16,8 @@ from ebooklib import epub
 from bs4 import BeautifulSoup
 
 from ..db.models import File, ExtractedText, BookContent
+from .content_extraction import Segment, get_extractor
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
 
@@ -27,34 +28,32 @@ class TextExtractionService:
     def __init__(self, library_root: Path):
         self.library_root = Path(library_root)
 
-    def extract_full_text(self, file: File, session: Session) -> Optional[ExtractedText]:
+    def extract_full_text(self, file: File, session: Session,
+                          text: Optional[str] = None) -> Optional[ExtractedText]:
         """
         Extract complete text from ebook file and store in database.
 
         Args:
             file: File model instance
             session: Database session
+            text: Text already extracted from this file (see
+                  :meth:`extract_text`); skips reading the file
 
         Returns:
             ExtractedText instance or None if extraction failed
         """
-        file_path = self.library_root / file.path
+        if text is None:
+            file_path = self.library_root / file.path
 
-        if not file_path.exists():
-            logger.error(f"File not found: {file_path}")
-            return None
+            if not file_path.exists():
+                logger.error(f"File not found: {file_path}")
+                return None
 
         try:
-            # Extract based on format
-            if file.format.lower() in ['txt', 'md', 'text']:
-                text = self._extract_plaintext(file_path)
-            elif file.format.lower() == 'pdf':
-                text = self._extract_pdf_text(file_path)
-            elif file.format.lower() == 'epub':
-                text = self._extract_epub_text(file_path)
-            else:
-                logger.warning(f"Unsupported format for text extraction: {file.format}")
-                return None
+            if text is None:
+                text = self.extract_text(file_path, file.format)
+                if text is None:
+                    return None
 
             if not text or len(text.strip()) < 100:
                 logger.warning(f"Extracted text too short for {file.path}")
@@ -72,9 +71,6 @@ class TextExtractionService:
             file.text_extracted = True
             file.extraction_date = extracted.extracted_at
 
-            # Update FTS index
-            self._update_fts_index(session, file.book_id, text)
-
             logger.info(f"Extracted {len(text)} chars from {file.path}")
             return extracted
 
@@ -82,6 +78,77 @@ class TextExtractionService:
             logger.error(f"Error extracting text from {file.path}: {e}")
             return None
 
+    def extract_text(self, file_path: Path, file_format: str) -> Optional[str]:
+        """
+        Extract cleaned full text from an ebook file without touching the database.
+
+        Args:
+            file_path: Path to the ebook file
+            file_format: Format name (pdf, epub, txt, ...)
+
+        Returns:
+            Extracted text, or None if the format is unsupported
+        """
+        if file_format.lower() in ['txt', 'md', 'text']:
+            return self._extract_plaintext(file_path)
+        elif file_format.lower() == 'pdf':
+            return self._extract_pdf_text(file_path)
+        elif file_format.lower() == 'epub':
+            return self._extract_epub_text(file_path)
+
+        logger.warning(f"Unsupported format for text extraction: {file_format}")
+        return None
+
+    def extract_content(self, file_path: Path,
+                        file_format: str) -> Tuple[str, Optional[List[Segment]], Optional[str]]:
+        """
+        Extract a file's content segments and its full text in one pass.
+
+        The file is parsed once by its format's segment extractor (see
+        ``services.content_extraction``); the full text used for
+        ExtractedText, legacy chunks and ``books_fts`` is derived from those
+        segments. Formats without an extractor, or whose extractor fails,
+        fall back to :meth:`extract_text`.
+
+        Args:
+            file_path: Path to the ebook file
+            file_format: Format name (pdf, epub, txt, ...)
+
+        Returns:
+            Tuple of (full text, "" if none; segments, None if the format
+            has no extractor; extractor error message or None). On an
+            extractor error the segments produced before it are kept.
+        """
+        try:
+            extractor = get_extractor(file_format)
+        except ValueError:
+            extractor = None
+
+        segments = None
+        error = None
+        if extractor is not None:
+            segments = []
+            try:
+                for seg in extractor.extract(file_path):
+                    segments.append(seg)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Segment extraction failed for {file_path}: {error}")
+
+        if segments is not None and error is None:
+            return self.text_from_segments(segments), segments, None
+
+        try:
+            text = self.extract_text(file_path, file_format) or ""
+        except Exception as e:
+            logger.error(f"Error extracting text from {file_path}: {e}")
+            text = ""
+        return text, segments, error
+
+    def text_from_segments(self, segments: List[Segment]) -> str:
+        """Join content segments into a file's cleaned full text."""
+        return self._clean_text('\n\n'.join(seg.text for seg in segments if seg.text))
+
     def create_chunks(self, extracted: ExtractedText, file: File,
                      session: Session, chunk_size: int = 500,
                      overlap: int = 100) -> List[BookContent]:
@@ -224,48 +291,6 @@ class TextExtractionService:
         import hashlib
         return hashlib.sha256(text.encode()).hexdigest()
 
-    def _update_fts_index(self, session: Session, book_id: int, extracted_text: str):
-        """
-        Update full-text search index.
-
-        Args:
-            session: Database session
-            book_id: Book ID
-            extracted_text: Extracted text content
-        """
-        try:
-            # Get book title and description for FTS
-            from ..db.models import Book
-            book = session.get(Book, book_id)
-
-            if not book:
-                return
-
-            # Delete existing FTS entry if exists
-            session.execute(
-                text("DELETE FROM books_fts WHERE book_id = :book_id"),
-                {"book_id": book_id}
-            )
-
-            # Insert into FTS table
-            session.execute(
-                text("""
-                INSERT INTO books_fts (book_id, title, description, extracted_text)
-                VALUES (:book_id, :title, :description, :extracted_text)
-                """),
-                {
-                    "book_id": book_id,
-                    "title": book.title or '',
-                    "description": book.description or '',
-                    "extracted_text": extracted_text[:50000]  # Limit FTS content to first 50k chars
-                }
-            )
-
-            logger.info(f"Updated FTS index for book {book_id}")
-
-        except Exception as e:
-            logger.error(f"Error updating FTS index: {e}")
-
     def extract_page_content(self, file_path: Path, page_number: int) -> Optional[str]:
         """
         Extract text from a specific page (PDF only).
@@ -295,7 +320,8 @@ class TextExtractionService:
         return len(text.split())
 
     def extract_and_chunk_all(self, file: File, session: Session,
-                              chunk_size: int = 500) -> Tuple[Optional[ExtractedText], List[BookContent]]:
+                              chunk_size: int = 500,
+                              text: Optional[str] = None) -> Tuple[Optional[ExtractedText], List[BookContent]]:
         """
         Extract full text and create chunks in one operation.
 
@@ -303,11 +329,12 @@ class TextExtractionService:
             file: File instance
             session: Database session
             chunk_size: Words per chunk
+            text: Text already extracted from this file, if any
 
         Returns:
             Tuple of (ExtractedText, List[BookContent])
         """
-        extracted = self.extract_full_text(file, session)
+        extracted = self.extract_full_text(file, session, text=text)
 
         if not extracted:
             return None, []
@@ -50,10 +50,12 @@ from book_memex.similarity.metrics import (
     TemporalDecayMetric,
     TfidfMetric,
 )
+from book_memex.similarity.index import SimilarityIndex
 
 __all__ = [
     # Core
     "BookSimilarity",
+    "SimilarityIndex",
     # Base classes
     "Extractor",
     "Metric",
@@ -8,7 +8,9 @@ This module defines the core abstractions:
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Generic, TypeVar
+from typing import Any, Dict, Generic, List, TypeVar
+
+import numpy as np
 
 from book_memex.db.models import Book
 
@@ -80,6 +82,46 @@ class Metric(ABC, Generic[T]):
         """
         pass  # No-op by default
 
+    def similarity_matrix(self, values: List[T]) -> np.ndarray:
+        """Compute similarity for every pair of values at once (optional).
+
+        Entry [i, j] above the diagonal must equal
+        ``similarity(values[i], values[j])``; the diagonal is ignored by
+        callers. Override this with a vectorized implementation for metrics
+        that can compute a whole block in one pass.
+
+        Default implementation loops over the pairs.
+
+        Args:
+            values: Extracted values, one per book
+
+        Returns:
+            NxN numpy array of similarities
+        """
+        n = len(values)
+        matrix = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i + 1, n):
+                matrix[i, j] = matrix[j, i] = self.similarity(values[i], values[j])
+        return matrix
+
+    def similarity_row(self, value: T, values: List[T]) -> np.ndarray:
+        """Compute similarity of one value against many (optional).
+
+        Entry [j] must equal ``similarity(value, values[j])``. Override this
+        with a vectorized implementation where one exists.
+
+        Default implementation loops over the values.
+
+        Args:
+            value: Query value
+            values: Values to compare against
+
+        Returns:
+            Numpy array of similarities, one per entry in ``values``
+        """
+        return np.array([self.similarity(value, other) for other in values], dtype=np.float64)
+
     def save(self, path: Path) -> None:
         """Save fitted state to disk (optional).
 
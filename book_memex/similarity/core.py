@@ -1,5 +1,7 @@
 """Core BookSimilarity class with fluent API."""
 
+import hashlib
+import json
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -386,7 +388,12 @@ class BookSimilarity:
 
         Returns NxN matrix where matrix[i][j] = similarity(books[i], books[j])
 
-        This is much faster than computing similarities one by one.
+        Each feature extracts its values once per book and computes its
+        whole block with the metric's vectorized ``similarity_matrix``
+        (sparse TF-IDF products, set-overlap via incidence matrices,
+        broadcast numeric kernels). Blocks are combined with the same
+        weights, in the same order, as :meth:`similarity`, so results match
+        the per-pair path exactly.
 
         Args:
             books: List of books
@@ -395,20 +402,67 @@ class BookSimilarity:
             NxN numpy array of similarities
         """
         n = len(books)
+        if n > 1 and not self.features:
+            raise ValueError("No features configured. Use .content(), .authors(), etc.")
+
+        total_weighted_sim = np.zeros((n, n))
+        total_weight = np.zeros((n, n))
+
+        for feature in self.features:
+            block, valid = self._feature_block(feature, books)
+            total_weighted_sim += np.where(valid, block * feature.weight, 0.0)
+            total_weight += np.where(valid, feature.weight, 0.0)
+
         matrix = np.zeros((n, n))
+        np.divide(total_weighted_sim, total_weight, out=matrix, where=total_weight != 0)
+
+        # Use the upper triangle (as the per-pair path does) and mirror it
+        matrix = np.triu(matrix, k=1)
+        matrix += matrix.T
 
         # Diagonal is always 1.0 (book is identical to itself)
         np.fill_diagonal(matrix, 1.0)
 
-        # Compute upper triangle (matrix is symmetric)
-        for i in range(n):
-            for j in range(i + 1, n):
-                sim = self.similarity(books[i], books[j])
-                matrix[i][j] = sim
-                matrix[j][i] = sim  # Symmetric
-
         return matrix
 
+    @staticmethod
+    def _feature_block(feature: Feature, books: List[Book]) -> Tuple[np.ndarray, np.ndarray]:
+        """Compute one feature's unweighted similarity for every pair.
+
+        Mirrors the per-pair error handling: a pair whose extraction or
+        metric fails is marked invalid, so the feature is skipped for that
+        pair only.
+
+        Returns:
+            Tuple of (similarities, valid mask), both NxN
+        """
+        n = len(books)
+        values = []
+        extracted = np.ones(n, dtype=bool)
+        for i, book in enumerate(books):
+            try:
+                values.append(feature.extractor.extract(book))
+            except Exception:
+                values.append(None)
+                extracted[i] = False
+
+        block = np.zeros((n, n))
+        valid = np.outer(extracted, extracted)
+        idx = np.flatnonzero(extracted)
+
+        try:
+            block[np.ix_(idx, idx)] = feature.metric.similarity_matrix([values[i] for i in idx])
+        except Exception:
+            # Metric can't vectorize these values; fall back to pairs
+            for a, i in enumerate(idx):
+                for j in idx[a + 1:]:
+                    try:
+                        block[i, j] = block[j, i] = feature.metric.similarity(values[i], values[j])
+                    except Exception:
+                        valid[i, j] = valid[j, i] = False
+
+        return block, valid
+
     def find_similar(
         self, book: Book, candidates: List[Book], top_k: int = 10
     ) -> List[Tuple[Book, float]]:
@@ -469,3 +523,30 @@ class BookSimilarity:
                 feature.metric.load(metric_path)
 
         self._fitted = True
+
+    def signature(self) -> str:
+        """Stable identifier for this configuration.
+
+        Two configurations with the same features, metric classes,
+        parameters and weights share a signature, so a model fitted for
+        one can be reused for the other (see SimilarityIndex).
+
+        Returns:
+            16-character hex digest
+        """
+        parts = []
+        for feature in self.features:
+            params = {
+                key: value
+                for key, value in sorted(vars(feature.metric).items())
+                if not key.startswith("_")
+                and isinstance(value, (str, int, float, bool, type(None)))
+            }
+            parts.append([
+                feature.name,
+                type(feature.extractor).__qualname__,
+                type(feature.metric).__qualname__,
+                feature.weight,
+                params,
+            ])
+        return hashlib.sha1(json.dumps(parts).encode()).hexdigest()[:16]
@@ -0,0 +1,498 @@
+"""Persistent, incrementally updated similarity model for a library.
+
+A SimilarityIndex holds a fitted BookSimilarity together with every
+book's pre-extracted feature values (TF-IDF features keep normalized
+sparse vectors rather than text). A query is then one row lookup plus a
+vectorized scan and top-k selection, with no refitting and no text
+extraction.
+
+Indexes are stored under ``<library>/cache/similarity/`` keyed by the
+configuration's signature, and carry the library content generation
+they were built from. Each is one ``.npz`` archive read with
+``allow_pickle=False``: a JSON header (ids, fingerprints, vocabularies,
+extracted values) plus numpy arrays for the sparse text vectors and
+masks, so a planted cache file cannot run code. When the library changes, new and modified books
+are folded in with the already-fitted vectorizers; a full refit only
+happens once the folded-in share grows past ``REFIT_RATIO``.
+"""
+
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from sklearn.base import clone
+from sklearn.preprocessing import normalize
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from book_memex.db.models import Book
+from book_memex.similarity.base import Feature
+from book_memex.similarity.core import BookSimilarity
+from book_memex.similarity.metrics import CosineMetric, TfidfMetric
+
+logger = logging.getLogger(__name__)
+
+# Link changes don't touch books.updated_at, so the link tables are
+# fingerprinted by a sum of per-pair hashes: replacing one author or subject
+# with another changes it. Each term is bounded so the SUM can't overflow.
+_GENERATION_SQL = text("""
+    SELECT
+        (SELECT COUNT(*) || ':' || IFNULL(MAX(id), 0) || ':' || IFNULL(MAX(updated_at), '') FROM books),
+        (SELECT COUNT(*) || ':' || IFNULL(MAX(id), 0) FROM extracted_texts),
+        (SELECT COUNT(*) || ':' || IFNULL(SUM((book_id * 1000003 + author_id * 7919) % 1000000007), 0)
+         FROM book_authors),
+        (SELECT COUNT(*) || ':' || IFNULL(SUM((book_id * 1000003 + subject_id * 7919) % 1000000007), 0)
+         FROM book_subjects)
+""")
+
+_BOOK_TOKENS_SELECT = """
+    SELECT b.id, b.updated_at,
+        (SELECT GROUP_CONCAT(et.content_hash) FROM files f
+         JOIN extracted_texts et ON et.file_id = f.id WHERE f.book_id = b.id),
+        (SELECT GROUP_CONCAT(author_id) FROM book_authors WHERE book_id = b.id),
+        (SELECT GROUP_CONCAT(subject_id) FROM book_subjects WHERE book_id = b.id)
+    FROM books b
+"""
+_BOOK_TOKENS_SQL = text(_BOOK_TOKENS_SELECT)
+_ONE_BOOK_TOKEN_SQL = text(_BOOK_TOKENS_SELECT + " WHERE b.id = :book_id")
+
+# Keep IN (...) lists well under SQLite's bound-variable limit
+_LOAD_CHUNK = 500
+
+
+def content_generation(session: Session) -> str:
+    """Cheap fingerprint of the library content that feeds similarity.
+
+    Changes whenever books, extracted texts, or author/subject links are
+    added, removed or replaced, or (for books) updated.
+    """
+    return "/".join(str(part) for part in session.execute(_GENERATION_SQL).one())
+
+
+def _token(row) -> str:
+    return "|".join(str(part) for part in row[1:])
+
+
+def _book_tokens(session: Session) -> Dict[int, str]:
+    """Per-book fingerprint used to find new, changed and deleted books."""
+    return {row[0]: _token(row) for row in session.execute(_BOOK_TOKENS_SQL)}
+
+
+def book_token(session: Session, book_id: int) -> Optional[str]:
+    """Fingerprint of one book's similarity inputs (None if it doesn't exist)."""
+    row = session.execute(_ONE_BOOK_TOKEN_SQL, {"book_id": book_id}).first()
+    return _token(row) if row else None
+
+
+def _encode_value(value: Any) -> Any:
+    """json.dumps hook for extracted values: sets become tagged sorted lists."""
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": sorted(value)}
+    raise TypeError(f"Cannot store a {type(value).__name__} in a similarity index")
+
+
+def _decode_value(obj: Dict[str, Any]) -> Any:
+    """json.loads hook undoing :func:`_encode_value`."""
+    if obj.keys() == {"__set__"}:
+        return set(obj["__set__"])
+    return obj
+
+
+def _extract_all(feature: Feature, books: List[Book]) -> Tuple[List[Any], np.ndarray]:
+    """Extract one feature for every book; returns (values, ok mask)."""
+    values = []
+    ok = np.ones(len(books), dtype=bool)
+    for i, book in enumerate(books):
+        try:
+            values.append(feature.extractor.extract(book))
+        except Exception:
+            values.append(None)
+            ok[i] = False
+    return values, ok
+
+
+class _TextColumn:
+    """A text feature stored as L2-normalized vectors from the fitted metric."""
+
+    def __init__(self, metric):
+        self.metric = metric
+        self.matrix = csr_matrix((0, 0))
+        self.present = np.zeros(0, dtype=bool)
+        self.ok = np.zeros(0, dtype=bool)
+
+    def fit(self, values: List[Any], ok: np.ndarray) -> None:
+        data = {i: v for i, v in enumerate(values) if ok[i] and v}
+        try:
+            self.metric.fit(data)
+        except ValueError:
+            # Empty vocabulary (tiny or text-less library): every text scores 0
+            logger.debug("Text feature could not be fitted")
+        # The metric caches a vector per fitted book; keep only our matrix.
+        self.metric._vectors = {}
+        self.matrix = csr_matrix((0, 0))
+        self.present = np.zeros(0, dtype=bool)
+        self.ok = np.zeros(0, dtype=bool)
+        self.append(values, ok)
+
+    def append(self, values: List[Any], ok: np.ndarray) -> None:
+        present = np.array([bool(ok[i] and v) for i, v in enumerate(values)], dtype=bool)
+        if getattr(self.metric, "_fitted", False):
+            rows = normalize(self.metric.vectorizer.transform([v if p else "" for v, p in zip(values, present, strict=True)]))
+            self.matrix = rows.tocsr() if self.matrix.shape[0] == 0 else vstack([self.matrix, rows]).tocsr()
+        else:
+            present[:] = False
+            self.matrix = csr_matrix((self.matrix.shape[0] + len(values), max(self.matrix.shape[1], 1)))
+        self.present = np.concatenate([self.present, present])
+        self.ok = np.concatenate([self.ok, ok])
+
+    def keep(self, mask: np.ndarray) -> None:
+        self.matrix = self.matrix[mask]
+        self.present = self.present[mask]
+        self.ok = self.ok[mask]
+
+    def state(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """JSON header and arrays to save; the vocabulary goes in the header."""
+        fitted = bool(getattr(self.metric, "_fitted", False))
+        header: Dict[str, Any] = {"fitted": fitted, "shape": list(self.matrix.shape)}
+        arrays = {"data": self.matrix.data, "indices": self.matrix.indices,
+                  "indptr": self.matrix.indptr, "present": self.present, "ok": self.ok}
+        if fitted:
+            vocabulary = self.metric.vectorizer.vocabulary_
+            header["terms"] = sorted(vocabulary, key=vocabulary.get)
+            idf = getattr(self.metric.vectorizer, "idf_", None)  # TF-IDF only
+            if idf is not None:
+                arrays["idf"] = idf
+        return header, arrays
+
+    def restore(self, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        self.matrix = csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                                 shape=tuple(header["shape"]))
+        self.present, self.ok = arrays["present"], arrays["ok"]
+        if header["fitted"]:
+            # A fresh vectorizer: one fitted before keeps its old feature count
+            vectorizer = clone(self.metric.vectorizer)
+            vectorizer.vocabulary_ = {term: i for i, term in enumerate(header["terms"])}
+            if "idf" in arrays:
+                vectorizer.idf_ = arrays["idf"]
+            self.metric.vectorizer = vectorizer
+        self.metric._fitted = header["fitted"]
+        self.metric._vectors = {}
+
+    def row(self, pos: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = np.clip((self.matrix @ self.matrix[pos].T).toarray().ravel(), 0.0, 1.0)
+        if not self.present[pos]:
+            scores[:] = 0.0
+        scores[~self.present] = 0.0
+        return scores, self.ok & self.ok[pos]
+
+
+class _ValueColumn:
+    """A feature stored as its extracted values (sets, years, codes...)."""
+
+    def __init__(self, metric):
+        self.metric = metric
+        self.values: List[Any] = []
+        self.ok = np.zeros(0, dtype=bool)
+
+    def fit(self, values: List[Any], ok: np.ndarray) -> None:
+        self.metric.fit({i: v for i, v in enumerate(values) if ok[i]})
+        self.values, self.ok = [], np.zeros(0, dtype=bool)
+        self.append(values, ok)
+
+    def append(self, values: List[Any], ok: np.ndarray) -> None:
+        self.values.extend(values)
+        self.ok = np.concatenate([self.ok, ok])
+
+    def keep(self, mask: np.ndarray) -> None:
+        self.values = [v for v, k in zip(self.values, mask, strict=True) if k]
+        self.ok = self.ok[mask]
+
+    def state(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """JSON header and arrays to save; the values go in the header."""
+        return {"values": self.values}, {"ok": self.ok}
+
+    def restore(self, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        self.values, self.ok = header["values"], arrays["ok"]
+        # The built-in value metrics need no fitting; others refit here
+        self.metric.fit({i: v for i, v in enumerate(self.values) if self.ok[i]})
+
+    def row(self, pos: int) -> Tuple[np.ndarray, np.ndarray]:
+        valid = self.ok & self.ok[pos]
+        if not self.ok[pos]:
+            return np.zeros(len(self.values)), valid
+        query = self.values[pos]
+        try:
+            return self.metric.similarity_row(query, self.values), valid
+        except Exception:
+            scores = np.zeros(len(self.values))
+            for j, value in enumerate(self.values):
+                if not valid[j]:
+                    continue
+                try:
+                    scores[j] = self.metric.similarity(query, value)
+                except Exception:
+                    valid[j] = False
+            return scores, valid
+
+
+class SimilarityIndex:
+    """Fitted similarity model over a whole library, saved between runs.
+
+    Example:
+        >>> index = SimilarityIndex.open(lib.session, lib.library_path,
+        ...                              BookSimilarity().balanced())
+        >>> for book, score in index.top_k(lib.session, 42, k=5):
+        ...     print(book.title, score)
+    """
+
+    FORMAT_VERSION = 2
+    # Refit from scratch once more than this share of rows was folded in
+    REFIT_RATIO = 0.5
+
+    def __init__(self, config: BookSimilarity):
+        self.config = config
+        self.signature = config.signature()
+        self.generation: Optional[str] = None
+        self.book_ids: List[int] = []
+        self.languages: List[Optional[str]] = []
+        self.tokens: Dict[int, str] = {}
+        self.fitted_rows = 0
+        self.folded_rows = 0
+        # Changes on every full refit; scores from different fits don't mix
+        self.fit_id: Optional[str] = None
+        self._columns = [
+            _TextColumn(f.metric) if isinstance(f.metric, (TfidfMetric, CosineMetric))
+            else _ValueColumn(f.metric)
+            for f in config.features
+        ]
+        self._positions: Dict[int, int] = {}
+
+    # ===== Persistence =====
+
+    @staticmethod
+    def path_for(library_path: Path, config: BookSimilarity) -> Path:
+        """Where the index for ``config`` lives inside a library."""
+        return Path(library_path) / "cache" / "similarity" / f"{config.signature()}.npz"
+
+    @classmethod
+    def open(cls, session: Session, library_path: Path,
+             config: BookSimilarity) -> "SimilarityIndex":
+        """Load the saved index for ``config``, bring it up to date, and save it.
+
+        Builds a new index when none is saved or the saved one is unusable.
+        """
+        path = cls.path_for(library_path, config)
+        index = cls.load(path, config)
+        if index is None:
+            index = cls(config)
+        if index.refresh(session):
+            index.save(path)
+        return index
+
+    @classmethod
+    def load(cls, path: Path, config: BookSimilarity) -> Optional["SimilarityIndex"]:
+        """Load a saved index, or None if missing, stale in format, or corrupt."""
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                header = json.loads(archive["header"].tobytes(), object_hook=_decode_value)
+                if (header.get("format_version") != cls.FORMAT_VERSION
+                        or header.get("signature") != config.signature()):
+                    return None
+                arrays = {name: archive[name] for name in archive.files}
+            index = cls(config)
+            index._restore(header, arrays)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable similarity index {path}: {e}")
+            return None
+        return index
+
+    def save(self, path: Path) -> None:
+        """Write the index atomically; failures only cost a rebuild later."""
+        header: Dict[str, Any] = {
+            "format_version": self.FORMAT_VERSION,
+            "signature": self.signature,
+            "generation": self.generation,
+            "languages": self.languages,
+            "tokens": self.tokens,
+            "fitted_rows": self.fitted_rows,
+            "folded_rows": self.folded_rows,
+            "fit_id": self.fit_id,
+            "columns": [],
+        }
+        arrays = {"book_ids": np.array(self.book_ids, dtype=np.int64)}
+        for i, column in enumerate(self._columns):
+            column_header, column_arrays = column.state()
+            header["columns"].append(column_header)
+            arrays.update({f"column{i}_{name}": array for name, array in column_arrays.items()})
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        try:
+            encoded = json.dumps(header, default=_encode_value).encode()
+            arrays["header"] = np.frombuffer(encoded, dtype=np.uint8)
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+            # Pickled indexes from earlier versions are never loaded
+            path.with_suffix(".pkl").unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Could not save similarity index to {path}: {e}")
+            tmp.unlink(missing_ok=True)
+
+    def _restore(self, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        """Fill a new index from a saved header and arrays (see :meth:`save`)."""
+        self.generation = header["generation"]
+        self.book_ids = arrays["book_ids"].tolist()
+        self.languages = header["languages"]
+        self.tokens = {int(bid): token for bid, token in header["tokens"].items()}
+        self.fitted_rows = header["fitted_rows"]
+        self.folded_rows = header["folded_rows"]
+        self.fit_id = header["fit_id"]
+        for i, (column, column_header) in enumerate(zip(self._columns, header["columns"], strict=True)):
+            prefix = f"column{i}_"
+            column.restore(column_header, {name[len(prefix):]: array for name, array in arrays.items()
+                                           if name.startswith(prefix)})
+        self._positions = {bid: i for i, bid in enumerate(self.book_ids)}
+
+    # ===== Maintenance =====
+
+    def refresh(self, session: Session) -> bool:
+        """Bring the index up to date with the library.
+
+        Returns:
+            True if the index changed (and should be saved)
+        """
+        generation = content_generation(session)
+        if generation == self.generation:
+            return False
+
+        tokens = _book_tokens(session)
+        stale = [bid for bid, token in self.tokens.items() if tokens.get(bid) != token]
+        fresh = [bid for bid, token in tokens.items() if self.tokens.get(bid) != token]
+
+        if not self.book_ids or self.folded_rows + len(fresh) > self.REFIT_RATIO * max(self.fitted_rows, 1):
+            self.rebuild(session)
+        else:
+            self._drop(stale)
+            self._append(self._load_books(session, fresh))
+            self.folded_rows += len(fresh)
+            logger.debug(f"Folded {len(fresh)} books into similarity index, dropped {len(stale)}")
+
+        self.tokens = tokens
+        self.generation = generation
+        return True
+
+    def rebuild(self, session: Session) -> None:
+        """Refit every feature on the whole library."""
+        books = session.query(Book).order_by(Book.id).all()
+        self.book_ids = [b.id for b in books]
+        self.languages = [b.language for b in books]
+        self._positions = {bid: i for i, bid in enumerate(self.book_ids)}
+        for feature, column in zip(self.config.features, self._columns, strict=True):
+            column.fit(*_extract_all(feature, books))
+        self.fitted_rows = len(books)
+        self.folded_rows = 0
+        self.fit_id = uuid.uuid4().hex
+        logger.debug(f"Fitted similarity index on {len(books)} books")
+
+    def _drop(self, book_ids: List[int]) -> None:
+        if not book_ids:
+            return
+        gone = set(book_ids)
+        keep = np.array([bid not in gone for bid in self.book_ids], dtype=bool)
+        self.book_ids = [bid for bid, k in zip(self.book_ids, keep, strict=True) if k]
+        self.languages = [lang for lang, k in zip(self.languages, keep, strict=True) if k]
+        for column in self._columns:
+            column.keep(keep)
+        self._positions = {bid: i for i, bid in enumerate(self.book_ids)}
+
+    def _append(self, books: List[Book]) -> None:
+        if not books:
+            return
+        for feature, column in zip(self.config.features, self._columns, strict=True):
+            column.append(*_extract_all(feature, books))
+        start = len(self.book_ids)
+        self.book_ids.extend(b.id for b in books)
+        self.languages.extend(b.language for b in books)
+        self._positions.update({b.id: start + i for i, b in enumerate(books)})
+
+    @staticmethod
+    def _load_books(session: Session, book_ids: List[int]) -> List[Book]:
+        books = []
+        for lo in range(0, len(book_ids), _LOAD_CHUNK):
+            chunk = book_ids[lo:lo + _LOAD_CHUNK]
+            books.extend(session.query(Book).filter(Book.id.in_(chunk)).order_by(Book.id).all())
+        return books
+
+    # ===== Queries =====
+
+    def scores(self, book_id: int) -> np.ndarray:
+        """Weighted similarity of ``book_id`` against every indexed book.
+
+        Raises:
+            KeyError: If the book is not in the index
+        """
+        pos = self._positions[book_id]
+        n = len(self.book_ids)
+        total_weighted_sim = np.zeros(n)
+        total_weight = np.zeros(n)
+        for feature, column in zip(self.config.features, self._columns, strict=True):
+            sims, valid = column.row(pos)
+            total_weighted_sim += np.where(valid, sims * feature.weight, 0.0)
+            total_weight += np.where(valid, feature.weight, 0.0)
+        result = np.zeros(n)
+        np.divide(total_weighted_sim, total_weight, out=result, where=total_weight != 0)
+        return result
+
+    def top_k(self, session: Session, book_id: int, k: int = 10,
+              language: Optional[str] = None) -> List[Tuple[Book, float]]:
+        """Find the k most similar books to ``book_id``.
+
+        Args:
+            session: Session used to load the result books
+            book_id: Query book ID
+            k: Number of results
+            language: If set, only books with exactly this language qualify
+
+        Returns:
+            List of (book, similarity) tuples, sorted by similarity descending
+        """
+        top = self.top_k_ids(book_id, k, language)
+        books = {b.id: b for b in self._load_books(session, [bid for bid, _ in top])}
+        return [(books[bid], score) for bid, score in top if bid in books]
+
+    def top_k_ids(self, book_id: int, k: int = 10,
+                  language: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Like :meth:`top_k`, but returns (book_id, similarity) without loading books.
+
+        Ties are broken by ascending book ID.
+        """
+        if book_id not in self._positions or k <= 0:
+            return []
+        scores = self.scores(book_id)
+
+        candidates = self.language_mask(language)
+        candidates[self._positions[book_id]] = False
+        idx = np.flatnonzero(candidates)
+        if len(idx) > k:
+            # Keep every book tied with the k-th score, so the id tie-break
+            # below decides which of them make the cut
+            kth = -np.partition(-scores[idx], k - 1)[k - 1]
+            idx = idx[scores[idx] >= kth]
+        ids = np.array(self.book_ids, dtype=np.int64)[idx]
+        top_scores = scores[idx]
+        order = np.lexsort((ids, -top_scores))[:k]
+        return [(int(ids[i]), float(top_scores[i])) for i in order]
+
+    def language_mask(self, language: Optional[str]) -> np.ndarray:
+        """Boolean mask of indexed books in ``language`` (all books if None)."""
+        if language is None:
+            return np.ones(len(self.book_ids), dtype=bool)
+        return np.array([lang == language for lang in self.languages], dtype=bool)
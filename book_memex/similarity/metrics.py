@@ -3,15 +3,48 @@
 import math
 import pickle
 from pathlib import Path
-from typing import Dict, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 import numpy as np
+from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
 from book_memex.similarity.base import Metric
 
 
+def _numeric_values(values: List[Optional[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert optional numbers to (float array, known mask).
+
+    Raises:
+        TypeError: If a value is not a number or None
+    """
+    known = np.array([v is not None for v in values], dtype=bool)
+    for v in values:
+        if v is not None and (isinstance(v, bool) or not isinstance(v, (int, float))):
+            raise TypeError(f"Expected a number, got {type(v).__name__}")
+    array = np.array([v if v is not None else 0 for v in values], dtype=np.float64)
+    return array, known
+
+
+def _pairwise_abs_diff(array: np.ndarray) -> np.ndarray:
+    """NxN matrix of |a[i] - a[j]|."""
+    return np.abs(array[:, None] - array[None, :])
+
+
+def _cached_cosine_matrix(vectorizer, values: List[str]) -> np.ndarray:
+    """Cosine similarity of every pair of texts under a fitted vectorizer.
+
+    Matches the per-pair path: empty texts score 0 and scores are clipped
+    to [0, 1].
+    """
+    present = np.array([bool(v) for v in values], dtype=bool)
+    vectors = vectorizer.transform([v if v else "" for v in values])
+    matrix = np.clip(cosine_similarity(vectors), 0.0, 1.0)
+    matrix[~np.outer(present, present)] = 0.0
+    return matrix
+
+
 class JaccardMetric(Metric[Set[str]]):
     """Jaccard similarity for sets.
 
@@ -46,6 +79,40 @@ class JaccardMetric(Metric[Set[str]]):
 
         return intersection / union
 
+    def similarity_matrix(self, values: List[Set[str]]) -> np.ndarray:
+        """Jaccard similarity of every pair via a sparse incidence matrix.
+
+        Intersections come from one sparse product X @ X.T; unions follow
+        from the set sizes.
+
+        Args:
+            values: One set per book
+
+        Returns:
+            NxN numpy array of similarities
+        """
+        vocab: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        for value in values:
+            if not isinstance(value, (set, frozenset)):
+                raise TypeError(f"Expected a set, got {type(value).__name__}")
+            indices.extend(vocab.setdefault(item, len(vocab)) for item in value)
+            indptr.append(len(indices))
+
+        n = len(values)
+        incidence = csr_matrix(
+            (np.ones(len(indices)), indices, indptr), shape=(n, max(len(vocab), 1))
+        )
+        intersection = (incidence @ incidence.T).toarray()
+        sizes = np.diff(indptr).astype(np.float64)
+        union = sizes[:, None] + sizes[None, :] - intersection
+
+        # Both empty = identical (union of 0); one empty = no overlap.
+        matrix = np.ones((n, n))
+        np.divide(intersection, union, out=matrix, where=union > 0)
+        return matrix
+
 
 class ExactMatchMetric(Metric):
     """Exact match metric for any comparable values.
@@ -70,6 +137,37 @@ class ExactMatchMetric(Metric):
 
         return 1.0 if value1 == value2 else 0.0
 
+    def similarity_matrix(self, values: List) -> np.ndarray:
+        """Exact-match similarity of every pair by comparing value codes.
+
+        Args:
+            values: One hashable value (or None) per book
+
+        Returns:
+            NxN numpy array of similarities
+        """
+        lookup: Dict = {}
+        codes = np.array(
+            [-1 if v is None else lookup.setdefault(v, len(lookup)) for v in values],
+            dtype=np.int64,
+        )
+        same = (codes[:, None] == codes[None, :]) & (codes[:, None] >= 0)
+        return same.astype(np.float64)
+
+    def similarity_row(self, value, values: List) -> np.ndarray:
+        """Exact-match similarity of one value against many.
+
+        Args:
+            value: Query value
+            values: Values to compare against
+
+        Returns:
+            Numpy array of similarities
+        """
+        if value is None:
+            return np.zeros(len(values))
+        return np.array([v is not None and v == value for v in values], dtype=np.float64)
+
 
 class TemporalDecayMetric(Metric[Optional[int]]):
     """Gaussian decay based on time difference.
@@ -105,6 +203,46 @@ class TemporalDecayMetric(Metric[Optional[int]]):
         diff = abs(value1 - value2)
         return math.exp(-((diff / self.sigma) ** 2))
 
+    def similarity_matrix(self, values: List[Optional[int]]) -> np.ndarray:
+        """Gaussian decay for every pair of years.
+
+        Year gaps take few distinct values, so the kernel is evaluated once
+        per distinct gap (with math.exp, as in the per-pair path) and then
+        broadcast back.
+
+        Args:
+            values: One year (or None) per book
+
+        Returns:
+            NxN numpy array of similarities
+        """
+        years, known = _numeric_values(values)
+        n = len(values)
+        gaps, inverse = np.unique(_pairwise_abs_diff(years).ravel(), return_inverse=True)
+        kernel = np.array([math.exp(-((float(gap) / self.sigma) ** 2)) for gap in gaps])
+        matrix = kernel[inverse].reshape(n, n)
+        matrix[~np.outer(known, known)] = 0.0
+        return matrix
+
+    def similarity_row(self, value: Optional[int], values: List[Optional[int]]) -> np.ndarray:
+        """Gaussian decay of one year against many.
+
+        Args:
+            value: Query year
+            values: Years to compare against
+
+        Returns:
+            Numpy array of similarities
+        """
+        if value is None:
+            return np.zeros(len(values))
+        years, known = _numeric_values(values)
+        gaps, inverse = np.unique(np.abs(years - value), return_inverse=True)
+        kernel = np.array([math.exp(-((float(gap) / self.sigma) ** 2)) for gap in gaps])
+        row = kernel[inverse].reshape(len(values))
+        row[~known] = 0.0
+        return row
+
 
 class NumericProximityMetric(Metric[Optional[int]]):
     """Similarity based on numeric proximity with normalization.
@@ -142,6 +280,38 @@ class NumericProximityMetric(Metric[Optional[int]]):
         normalized = min(diff / self.max_diff, 1.0)
         return 1.0 - normalized
 
+    def similarity_matrix(self, values: List[Optional[int]]) -> np.ndarray:
+        """Numeric proximity for every pair, broadcast over an NxN grid.
+
+        Args:
+            values: One number (or None) per book
+
+        Returns:
+            NxN numpy array of similarities
+        """
+        numbers, known = _numeric_values(values)
+        normalized = np.minimum(_pairwise_abs_diff(numbers) / self.max_diff, 1.0)
+        matrix = 1.0 - normalized
+        matrix[~np.outer(known, known)] = 0.0
+        return matrix
+
+    def similarity_row(self, value: Optional[int], values: List[Optional[int]]) -> np.ndarray:
+        """Numeric proximity of one value against many.
+
+        Args:
+            value: Query value
+            values: Values to compare against
+
+        Returns:
+            Numpy array of similarities
+        """
+        if value is None:
+            return np.zeros(len(values))
+        numbers, known = _numeric_values(values)
+        row = 1.0 - np.minimum(np.abs(numbers - value) / self.max_diff, 1.0)
+        row[~known] = 0.0
+        return row
+
 
 class TfidfMetric(Metric[str]):
     """TF-IDF cosine similarity for text.
@@ -245,6 +415,23 @@ class TfidfMetric(Metric[str]):
         # Ensure [0, 1] range (cosine can be negative for sparse vectors)
         return max(0.0, min(1.0, sim))
 
+    def similarity_matrix(self, values: List[str]) -> np.ndarray:
+        """TF-IDF cosine similarity for every pair of texts.
+
+        When fitted, each text is transformed once and all pairs come from
+        a single sparse product. Unfitted metrics fit a vocabulary per pair,
+        so they fall back to the pairwise loop.
+
+        Args:
+            values: One text per book
+
+        Returns:
+            NxN numpy array of similarities
+        """
+        if not self._fitted:
+            return super().similarity_matrix(values)
+        return _cached_cosine_matrix(self.vectorizer, values)
+
     def similarity_from_cache(self, book1_id: int, book2_id: int) -> float:
         """Fast similarity using pre-computed vectors.
 
@@ -374,3 +561,16 @@ class CosineMetric(Metric[str]):
 
         sim = cosine_similarity(v1, v2)[0, 0]
         return max(0.0, min(1.0, sim))
+
+    def similarity_matrix(self, values: List[str]) -> np.ndarray:
+        """Cosine similarity for every pair of texts.
+
+        Args:
+            values: One text per book
+
+        Returns:
+            NxN numpy array of similarities
+        """
+        if not self._fitted:
+            return super().similarity_matrix(values)
+        return _cached_cosine_matrix(self.vectorizer, values)
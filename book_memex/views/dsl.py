@@ -42,6 +42,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from ..db.models import Book, Author, Subject, Tag, File, PersonalMetadata, View
+from ..db.compression import register_functions
 
 logger = logging.getLogger(__name__)
 
@@ -323,6 +324,7 @@ class ViewEvaluator:
         try:
             # Layer 2: Open connection in read-only mode
             conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            register_functions(conn)  # books_fts_source reads through bm_decompress()
             # Layer 3: Set authorizer to only allow SELECT/READ operations
             conn.set_authorizer(self._sqlite_authorizer)
             try:
@@ -387,3 +387,93 @@ class TestImportRoundTrip:
         stats = fresh_lib.import_arkiv(out)
         assert stats["books_added"] == 1
         assert stats["marginalia_added"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Batched import
+# ---------------------------------------------------------------------------
+
+
+def _book_record(i, **extra):
+    rec = {
+        "kind": "book",
+        "uri": f"book-memex://book/uid{i:03d}",
+        "unique_id": f"uid{i:03d}",
+        "title": f"Book {i}",
+        "authors": ["Shared Author", f"Author {i}"],
+        "subjects": ["Shared Subject"],
+        "tags": ["Reading/Queue"],
+        "identifiers": {"isbn": f"978{i:010d}"},
+    }
+    rec.update(extra)
+    return rec
+
+
+def _write_bundle(path, records):
+    path.write_text("".join(json.dumps(rec) + "\n" for rec in records))
+    return path
+
+
+class TestBatchedImport:
+    def test_batches_keep_duplicate_semantics(self, fresh_lib, tmp_path):
+        """Records split over several batches resolve against each other."""
+        records = [
+            {
+                "kind": "marginalia",
+                "uuid": "m1",
+                "content": "spans two books",
+                "book_uris": ["book-memex://book/uid000", "book-memex://book/uid004"],
+            },
+            *[_book_record(i) for i in range(5)],
+            _book_record(2, authors=["Late Author"], identifiers={"isbn": "other", "doi": "10.1/x"}),
+            {"kind": "reading", "uuid": "r1", "book_uri": "book-memex://book/uid003",
+             "start_time": "2026-01-01T12:00:00"},
+            {"kind": "reading", "uuid": "r1", "book_uri": "book-memex://book/uid003"},
+        ]
+        bundle = _write_bundle(tmp_path / "records.jsonl", records)
+
+        stats = import_arkiv(fresh_lib, bundle, batch_size=2)
+        assert stats["books_seen"] == 6
+        assert stats["books_added"] == 5
+        assert stats["books_skipped_existing"] == 1
+        assert stats["marginalia_added"] == 1
+        assert stats["reading_added"] == 1
+        assert stats["reading_skipped_existing"] == 1
+
+        book = fresh_lib.get_book_by_unique_id("uid002")
+        assert {a.name for a in book.authors} == {"Shared Author", "Author 2", "Late Author"}
+        assert {(i.scheme, i.value) for i in book.identifiers} == {
+            ("isbn", "9780000000002"), ("doi", "10.1/x")
+        }
+        assert [t.path for t in book.tags] == ["Reading/Queue"]
+        assert book.tags[0].parent.path == "Reading"
+
+        from book_memex.db.models import Author, Subject
+        assert fresh_lib.session.query(Author).filter_by(name="Shared Author").count() == 1
+        assert fresh_lib.session.query(Subject).count() == 1
+
+        m = fresh_lib.session.execute(select(Marginalia)).scalar_one()
+        assert {b.unique_id for b in m.books} == {"uid000", "uid004"}
+
+        again = import_arkiv(fresh_lib, bundle, batch_size=2)
+        assert again["books_added"] == again["marginalia_added"] == again["reading_added"] == 0
+
+    def test_queries_per_batch_do_not_grow_with_records(self, tmp_path):
+        """A batch costs the same number of statements for 3 or 30 books."""
+        from sqlalchemy import event
+
+        def statements(n):
+            lib = Library.open(tmp_path / f"lib{n}")
+            bundle = _write_bundle(tmp_path / f"b{n}.jsonl", [_book_record(i) for i in range(n)])
+            count = []
+            listener = lambda *args: count.append(1)
+            engine = lib.session.get_bind()
+            event.listen(engine, "before_cursor_execute", listener)
+            try:
+                import_arkiv(lib, bundle, batch_size=100)
+            finally:
+                event.remove(engine, "before_cursor_execute", listener)
+                lib.close()
+            return len(count)
+
+        assert statements(30) == statements(3)
@@ -610,6 +610,33 @@ class TestBookSimilar:
         assert result.stdout
 
 
+class TestBuildNeighbors:
+    """Tests for lib build-neighbors command."""
+
+    def test_build_neighbors(self, populated_library):
+        """Builds lists and reports per-preset counts."""
+        result = runner.invoke(app, [
+            "lib", "build-neighbors", str(populated_library), "--presets", "metadata_only"
+        ])
+        assert result.exit_code == 0
+        assert "metadata_only" in result.stdout
+        assert "3 recomputed" in result.stdout
+
+        # Nothing changed: the second run recomputes nothing
+        result = runner.invoke(app, [
+            "lib", "build-neighbors", str(populated_library), "--presets", "metadata_only"
+        ])
+        assert "0 recomputed" in result.stdout
+
+    def test_build_neighbors_unknown_preset(self, populated_library):
+        """Unknown presets fail with a message."""
+        result = runner.invoke(app, [
+            "lib", "build-neighbors", str(populated_library), "--presets", "bogus"
+        ])
+        assert result.exit_code == 1
+        assert "Unknown similarity preset" in result.stdout
+
+
 class TestReadCommand:
     """Tests for the renamed read command (formerly view)."""
 
@@ -683,6 +710,39 @@ class TestCheckCommand:
         # Verbose mode shows all files
         assert "Checking for missing files" in result.stdout
 
+    def test_check_hash_mismatch(self, populated_library):
+        """Test that check reports modified files, and --rehash catches stat-preserving edits."""
+        import os
+        from book_memex.library_db import Library
+        from book_memex.db.models import File
+
+        lib = Library.open(populated_library)
+        paths = [populated_library / f.path for f in lib.session.query(File).order_by(File.id)]
+        lib.close()
+
+        result = runner.invoke(app, ["lib", "check", str(populated_library)])
+        assert "Hash mismatch" not in result.stdout
+
+        # Same size and mtime (and inode): only --rehash can notice
+        st = paths[0].stat()
+        data = paths[0].read_bytes()
+        with open(paths[0], "r+b") as f:
+            f.write(b"X" + data[1:])
+        os.utime(paths[0], ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        result = runner.invoke(app, ["lib", "check", str(populated_library)])
+        assert "Hash mismatch" not in result.stdout
+
+        result = runner.invoke(app, ["lib", "check", str(populated_library), "--rehash"])
+        assert result.exit_code == 1
+        assert "Hash mismatch" in result.stdout
+
+        # A visible modification is detected without --rehash
+        paths[1].write_text("Tampered content")
+        result = runner.invoke(app, ["lib", "check", str(populated_library)])
+        assert result.exit_code == 1
+        assert "Hash mismatches: 2" in result.stdout
+
 
 class TestListWithViewOption:
     """Tests for the list --view option."""
@@ -904,6 +964,144 @@ class TestImportFolderImprovements:
         # Should have skipped duplicates
         assert "Skipped" in result.stdout or "Imported" in result.stdout
 
+    def test_import_folder_batch_size(self, tmp_path):
+        """Folder import commits in batches and reports the commit rate."""
+        lib_path = tmp_path / "library"
+        Library.open(lib_path).close()
+        source = tmp_path / "source"
+        source.mkdir()
+        for i in range(5):
+            (source / f"book{i}.txt").write_text(f"Batched book content {i}")
+
+        result = runner.invoke(app, [
+            "import", "folder", str(source), str(lib_path),
+            "--extensions", "txt", "--batch-size", "2", "--no-resume"
+        ])
+        assert result.exit_code == 0
+        assert "Commits: 3 of up to 2 files" in result.stdout
+        assert "commits/s" in result.stdout
+
+    def test_import_folder_workers(self, tmp_path):
+        """Test import folder with worker processes and resume."""
+        from book_memex.library_db import Library
+        lib_path = tmp_path / "library"
+        lib = Library.open(lib_path)
+        lib.close()
+
+        source = tmp_path / "source"
+        source.mkdir()
+        for i in range(3):
+            (source / f"book{i}.txt").write_text(f"Parallel book content {i}")
+
+        result = runner.invoke(app, [
+            "import", "folder", str(source), str(lib_path),
+            "--extensions", "txt", "--workers", "2"
+        ])
+        assert result.exit_code == 0
+        assert "Imported: 3" in result.stdout
+
+        (source / "book3.txt").write_text("Parallel book content 3")
+        result = runner.invoke(app, [
+            "import", "folder", str(source), str(lib_path),
+            "--extensions", "txt", "--workers", "2", "--resume"
+        ])
+        assert result.exit_code == 0
+        assert "Imported: 1" in result.stdout
+
+        from book_memex.db.models import File
+        lib = Library.open(lib_path)
+        try:
+            assert lib.session.query(File).count() == 4
+        finally:
+            lib.close()
+
+
+class TestIngestModeOption:
+    """Tests for --ingest-mode on import commands."""
+
+    def test_import_folder_hardlink(self, tmp_path):
+        """Folder import can hard-link files instead of copying them."""
+        lib_path = tmp_path / "library"
+        Library.open(lib_path).close()
+        source = tmp_path / "source"
+        source.mkdir()
+        (source / "book.txt").write_text("Hard linked book")
+
+        result = runner.invoke(app, [
+            "import", "folder", str(source), str(lib_path),
+            "--extensions", "txt", "--ingest-mode", "hardlink"
+        ])
+        assert result.exit_code == 0
+        assert (source / "book.txt").stat().st_nlink == 2
+
+    def test_unknown_ingest_mode(self, tmp_path):
+        """Unknown modes fail before anything is imported."""
+        lib_path = tmp_path / "library"
+        Library.open(lib_path).close()
+        book_file = tmp_path / "book.txt"
+        book_file.write_text("Content")
+
+        result = runner.invoke(app, [
+            "import", "add", str(book_file), str(lib_path), "--ingest-mode", "symlink"
+        ])
+        assert result.exit_code == 1
+        assert "Unknown ingest mode" in result.stdout
+
+
+class TestImportWatchCommand:
+    """Tests for import watch."""
+
+    def test_watch_once_imports_delta(self, tmp_path):
+        """--once syncs settled files; a second run has nothing to do."""
+        lib_path = tmp_path / "library"
+        Library.open(lib_path).close()
+        inbox = tmp_path / "inbox"
+        inbox.mkdir()
+        (inbox / "book.txt").write_text("Watched inbox book about gnomons. " * 10)
+
+        args = ["import", "watch", str(inbox), str(lib_path), "--extensions", "txt",
+                "--settle", "0", "--once", "--no-cover"]
+        result = runner.invoke(app, args)
+        assert result.exit_code == 0
+        assert "Imported 1" in result.stdout
+
+        result = runner.invoke(app, args)
+        assert result.exit_code == 0
+        assert "Imported" not in result.stdout
+
+    def test_watch_not_a_directory(self, tmp_path):
+        result = runner.invoke(app, ["import", "watch", str(tmp_path / "missing"), "--once"])
+        assert result.exit_code == 1
+        assert "Not a directory" in result.stdout
+
+
+class TestWorkerCommand:
+    """Tests for background imports and the worker command."""
+
+    def test_background_import_then_worker(self, tmp_path):
+        """--background queues extraction; worker --once runs it."""
+        lib_path = tmp_path / "library"
+        Library.open(lib_path).close()
+        book_file = tmp_path / "notes.txt"
+        book_file.write_text("Background worker extraction of zymurgy notes. " * 10)
+
+        result = runner.invoke(app, [
+            "import", "add", str(book_file), str(lib_path), "--title", "Notes", "--background"
+        ])
+        assert result.exit_code == 0
+        assert "Extraction queued" in result.stdout
+
+        result = runner.invoke(app, ["worker", str(lib_path), "--once"])
+        assert result.exit_code == 0
+        assert "2 done, 0 failed" in result.stdout
+        assert "0 pending" in result.stdout
+
+        lib = Library.open(lib_path)
+        try:
+            assert len(lib.search("zymurgy")) == 1
+        finally:
+            lib.close()
+
 
 class TestGoodreadsExport:
     """Tests for Goodreads CSV export."""
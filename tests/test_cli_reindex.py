@@ -47,6 +47,39 @@ def test_reindex_all(tmp_lib_with_book):
     assert "segments_written=3" in result.output
 
 
+def test_reindex_all_skips_unchanged_unless_forced(tmp_lib_with_book):
+    from book_memex.cli import app
+
+    temp_dir, _ = tmp_lib_with_book
+    runner = CliRunner()
+    args = ["reindex-content", "--all", "--library-path", str(temp_dir)]
+    runner.invoke(app, args)
+
+    again = runner.invoke(app, args)
+    assert again.exit_code == 0
+    assert "books_unchanged=1" in again.output
+    assert "segments_written=0" in again.output
+
+    forced = runner.invoke(app, [*args, "--force"])
+    assert forced.exit_code == 0
+    assert "books_unchanged=0" in forced.output
+    assert "segments_written=3" in forced.output
+
+
+def test_reindex_all_with_workers_and_resume(tmp_lib_with_book):
+    from book_memex.cli import app
+
+    temp_dir, _ = tmp_lib_with_book
+    runner = CliRunner()
+    result = runner.invoke(
+        app, ["reindex-content", "--all", "--workers", "2", "--resume",
+              "--library-path", str(temp_dir)]
+    )
+    assert result.exit_code == 0, result.output
+    assert "books_processed=1" in result.output
+    assert "segments_written=3" in result.output
+
+
 def test_reindex_single_book(tmp_lib_with_book):
     from book_memex.cli import app
 
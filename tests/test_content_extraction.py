@@ -83,6 +83,83 @@ def test_epub_extractor_status_ok(sample_epub):
         assert s.extraction_status == "ok"
 
 
+def test_epub_extractor_matches_ebooklib_reader(tmp_path):
+    """Zip streaming yields the text, titles and CFIs ebooklib+bs4 gave."""
+    from ebooklib import epub
+    from book_memex.services.content_extraction import get_extractor
+
+    book = epub.EpubBook()
+    book.set_identifier("test-epub-streaming")
+    book.set_title("Streaming Sample")
+    book.set_language("en")
+    chapters = []
+    for i, (title, body) in enumerate([
+        ("Inline", "<h1>Bay<em>es</em> &amp; Co</h1><p>Pri<b>ors</b> meet&nbsp;data.</p>"
+                   "<script>var x = 1;</script><img src='plate.png'/>"),
+        ("Untitled", "<p>Just text</p> tail <div><span>a</span>b</div>"),
+    ]):
+        c = epub.EpubHtml(title=title, file_name=f"text/ch {i + 1}.xhtml", lang="en")
+        c.set_content(
+            f'<html xmlns="http://www.w3.org/1999/xhtml">'
+            f"<head><title>{title}</title></head><body>{body}</body></html>"
+        )
+        c.id = f"ch{i + 1}"
+        book.add_item(c)
+        chapters.append(c)
+    book.add_item(epub.EpubImage(uid="plate", file_name="plate.png",
+                                 media_type="image/png", content=b"\x89PNG" * 1000))
+    book.toc = tuple(chapters)
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = ["nav", *chapters]
+    path = tmp_path / "streaming.epub"
+    epub.write_epub(str(path), book)
+
+    segments = list(get_extractor("epub").extract(path))
+
+    assert [s.title for s in segments] == ["Bayes& Co", None]
+    assert segments[0].text == "Bay es & Co Pri ors meet data."
+    assert segments[1].text == "Just text tail a b"
+    assert [s.anchor["cfi"] for s in segments] == [
+        "epubcfi(/6/4[ch1]!/4)",
+        "epubcfi(/6/6[ch2]!/4)",
+    ]
+
+
+def test_epub_extractor_reads_bare_text_body(tmp_path):
+    """A body with only bare text yields that text and the <title> (epub-v2)."""
+    import zipfile
+    from book_memex.services.content_extraction.epub import _read_document
+
+    path = tmp_path / "bare.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("bare.xhtml", "<html><head><title>Bare</title></head>"
+                                  "<body>only bare text</body></html>")
+    with zipfile.ZipFile(path) as zf:
+        assert _read_document(zf, "bare.xhtml") == ("Bare", "Bare only bare text")
+
+
+def test_epub_extractor_reads_only_spine_documents(sample_epub, monkeypatch):
+    """Images, styles and other non-spine members are never opened."""
+    import zipfile
+    from book_memex.services.content_extraction import get_extractor
+
+    opened = []
+    real_open = zipfile.ZipFile.open
+
+    def recording_open(self, name, *args, **kwargs):
+        opened.append(getattr(name, "filename", name))
+        return real_open(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, "open", recording_open)
+    list(get_extractor("epub").extract(sample_epub))
+
+    assert all(
+        n == "META-INF/container.xml" or n.endswith((".opf", "chap1.xhtml", "chap2.xhtml", "chap3.xhtml"))
+        for n in opened
+    ), opened
+
+
 # --- PDF extractor tests (Task 7) ---
 
 
@@ -135,6 +212,61 @@ def test_pdf_extractor_flags_no_text_layer(tmp_path):
     assert all(s.text == "" for s in segments)
 
 
+def _numbered_pdf(path, pages):
+    from book_memex.services.content_extraction.pdf import pymupdf
+
+    with pymupdf.open() as doc:
+        for i in range(pages):
+            page = doc.new_page()
+            if i % 5 != 4:  # every fifth page blank
+                page.insert_text((72, 72), f"Numbered page {i + 1} of the sample")
+        doc.save(str(path))
+    return path
+
+
+def test_pdf_extractor_pypdf_fallback_matches(sample_pdf, monkeypatch):
+    """Without PyMuPDF the pypdf path yields the same segments."""
+    from book_memex.services.content_extraction import pdf
+
+    fast = list(pdf.PdfExtractor().extract(sample_pdf))
+    monkeypatch.setattr(pdf, "pymupdf", None)
+    slow = list(pdf.PdfExtractor().extract(sample_pdf))
+
+    assert [(s.segment_index, s.anchor, s.extraction_status) for s in fast] == \
+        [(s.segment_index, s.anchor, s.extraction_status) for s in slow]
+    assert "quick brown fox" in " ".join(s.text for s in slow)
+
+
+def test_pdf_extractor_parallel_keeps_page_order(tmp_path, monkeypatch):
+    """Page ranges extracted in a process pool come back in page order."""
+    from book_memex.services.content_extraction import pdf
+
+    path = _numbered_pdf(tmp_path / "numbered.pdf", 23)
+    sequential = list(pdf.PdfExtractor(workers=1).extract(path))
+
+    monkeypatch.setattr(pdf, "PARALLEL_MIN_PAGES", 10)
+    monkeypatch.setattr(pdf, "PAGES_PER_TASK", 4)
+    parallel = list(pdf.PdfExtractor(workers=3).extract(path))
+
+    assert parallel == sequential
+    assert [s.anchor for s in parallel] == [{"page": i + 1} for i in range(23)]
+    assert parallel[0].text == "Numbered page 1 of the sample"
+    assert parallel[22].text == "Numbered page 23 of the sample"
+    assert [s.extraction_status for s in parallel[:5]] == ["ok"] * 4 + ["no_text_layer"]
+
+
+def test_registered_pdf_extractor_has_no_process_pool():
+    """Server threads must not fork: the pool is opt-in for CLI commands."""
+    from book_memex.services.content_extraction import get_extractor, pdf, register
+
+    assert get_extractor("pdf").workers == 1
+    try:
+        pdf.enable_process_pool(workers=4)
+        assert get_extractor("pdf").workers == 4
+    finally:
+        register("pdf", pdf.PdfExtractor(workers=1))
+
+
 # --- TXT extractor tests (Task 8) ---
 
 
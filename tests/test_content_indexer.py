@@ -38,7 +38,7 @@ def test_index_file_writes_segments(lib_with_epub):
     assert isinstance(result, IndexResult)
     assert result.segments_written == 3
     assert result.status == "ok"
-    assert result.extractor_version == "epub-v1"
+    assert result.extractor_version == "epub-v2"
 
     rows = (
         lib.session.query(BookContent)
@@ -72,7 +72,7 @@ def test_reindex_replaces_prior_rows(lib_with_epub):
     assert len(second_rows) == 3, "reindex should replace rows, not accumulate"
 
     # Verify content is fresh (same extractor version, correct segment types).
-    assert all(r.extractor_version == "epub-v1" for r in second_rows)
+    assert all(r.extractor_version == "epub-v2" for r in second_rows)
     assert all(r.segment_type == "chapter" for r in second_rows)
 
 
@@ -94,3 +94,40 @@ def test_index_unsupported_format_records_failure(lib_with_epub):
 
     assert result.status == "unsupported_format"
     assert result.segments_written == 0
+
+
+def test_reindex_skips_unchanged_file(lib_with_epub):
+    lib, book = lib_with_epub
+    file_row = book.primary_file
+    indexer = ContentIndexer(lib.session, lib.library_path)
+
+    indexer.index_file(file_row)
+    assert file_row.content_fingerprint == f"{file_row.file_hash}:epub-v2"
+    first_ids = {r.id for r in lib.session.query(BookContent).filter_by(file_id=file_row.id)}
+
+    result = indexer.index_file(file_row)
+    assert result.status == "unchanged"
+    assert result.segments_written == 0
+    assert {r.id for r in lib.session.query(BookContent).filter_by(file_id=file_row.id)} == first_ids
+
+    forced = indexer.index_file(file_row, force=True)
+    assert forced.status == "ok"
+    assert forced.segments_written == 3
+
+
+def test_reindex_after_extractor_version_change(lib_with_epub, monkeypatch):
+    from book_memex.services.content_extraction import get_extractor
+
+    lib, book = lib_with_epub
+    file_row = book.primary_file
+    indexer = ContentIndexer(lib.session, lib.library_path)
+    indexer.index_file(file_row)
+
+    monkeypatch.setattr(get_extractor("epub"), "version", "epub-v99")
+    result = indexer.index_file(file_row)
+
+    assert result.status == "ok"
+    assert result.segments_written == 3
+    assert file_row.content_fingerprint == f"{file_row.file_hash}:epub-v99"
+    rows = lib.session.query(BookContent).filter_by(file_id=file_row.id).all()
+    assert {r.extractor_version for r in rows} == {"epub-v99"}
@@ -33,7 +33,7 @@ def test_importing_epub_writes_book_content(tmp_lib, sample_epub):
         .all()
     )
     assert len(rows) == 3
-    assert all(r.extractor_version == "epub-v1" for r in rows)
+    assert all(r.extractor_version == "epub-v2" for r in rows)
 
 
 def test_importing_unsupported_format_still_succeeds(tmp_lib, tmp_path):
@@ -52,3 +52,33 @@ def test_importing_unsupported_format_still_succeeds(tmp_lib, tmp_path):
         .all()
     )
     assert rows == []
+
+
+def test_import_parses_file_once_for_text_chunks_and_segments(tmp_lib, monkeypatch):
+    """Full text, FTS and segments all come from one extractor pass."""
+    from book_memex.db.models import ExtractedText
+    from book_memex.services.content_extraction import get_extractor
+    from book_memex.services.text_extraction import TextExtractionService
+
+    body = " ".join(f"word{i}" for i in range(800)) + " heliotrope"
+    src = tmp_lib.library_path / "long.txt"
+    src.write_text(body)
+
+    extractor = get_extractor("txt")
+    calls = []
+    original = extractor.extract
+    monkeypatch.setattr(extractor, "extract", lambda path: calls.append(path) or original(path))
+
+    def no_second_pass(*args, **kwargs):
+        raise AssertionError("file parsed a second time")
+    monkeypatch.setattr(TextExtractionService, "extract_text", no_second_pass)
+
+    book = tmp_lib.add_book(src, metadata={"title": "Long", "creators": ["C"]}, extract_text=True)
+
+    assert len(calls) == 1
+    file_id = book.primary_file.id
+    extracted = tmp_lib.session.query(ExtractedText).filter_by(file_id=file_id).one()
+    assert extracted.content == body
+    rows = tmp_lib.session.query(BookContent).filter(BookContent.file_id == file_id).all()
+    assert [(r.segment_type, r.content) for r in rows] == [("text", body)]
+    assert [b.id for b in tmp_lib.search("heliotrope")] == [book.id]
@@ -299,6 +299,54 @@ class TestSearchFunctionality:
         results = temp_library.search("anything")
         assert len(results) == 0
 
+    @staticmethod
+    def _add_text(lib, book, body):
+        """Attach extracted text to a book; triggers index it in books_fts."""
+        from book_memex.db.models import ExtractedText, File
+        f = File(book_id=book.id, path=f"{book.unique_id}.txt", format="txt",
+                 file_hash=f"hash-{book.unique_id}")
+        lib.session.add(f)
+        lib.session.flush()
+        lib.session.add(ExtractedText(file_id=f.id, content=body, content_hash="h"))
+
+    @classmethod
+    def _index_many(cls, lib, n=120):
+        """Add n books with extracted text (indexed in books_fts)."""
+        for i in range(n):
+            book = Book(unique_id=f"fts{i}", title=f"Kestrel field notes {i}",
+                        language="en" if i % 3 == 0 else "de")
+            lib.session.add(book)
+            lib.session.flush()
+            cls._add_text(lib, book, "kestrel " * (i % 5 + 1))
+        lib.session.commit()
+
+    def test_search_deep_page_with_filter(self, temp_library):
+        """Filtered matches past the first pages are not dropped."""
+        self._index_many(temp_library)
+        everything = temp_library.search("kestrel language:en", limit=1000)
+        assert len(everything) == 40
+        assert all(b.language == "en" for b in everything)
+
+        page = temp_library.search("kestrel language:en", limit=10, offset=30)
+        assert [b.id for b in page] == [b.id for b in everything[30:40]]
+
+    def test_search_page_cursor_matches_offset_order(self, temp_library):
+        """Keyset pages concatenate to the same order as one big query."""
+        self._index_many(temp_library)
+        for query in ("kestrel language:en", "language:de"):
+            expected = [b.id for b in temp_library.search(query, limit=1000)]
+            seen, cursor = [], None
+            while True:
+                books, cursor = temp_library.search_page(query, limit=7, cursor=cursor)
+                seen.extend(b.id for b in books)
+                if cursor is None:
+                    break
+            assert seen == expected
+
+    def test_search_page_rejects_bad_cursor(self, temp_library):
+        with pytest.raises(ValueError, match="Invalid search cursor"):
+            temp_library.search_page("kestrel", cursor="not-a-cursor")
+
 
 class TestReadingStatus:
     """Test reading status management."""
@@ -545,6 +593,32 @@ class TestQueryBuilderAdvanced:
         results_empty = temp_library.query().filter_by_text("NonExistentWord12345").all()
         assert isinstance(results_empty, list)
 
+    def test_filter_by_text_orders_by_relevance(self, temp_library):
+        """The FTS match composes with other filters and sorts by rank."""
+        for i, (lang, body) in enumerate([
+            ("en", "heron"), ("en", "heron heron heron"), ("de", "heron heron"), ("en", "swift"),
+        ]):
+            book = Book(unique_id=f"rel{i}", title=f"Bird {i}", language=lang)
+            temp_library.session.add(book)
+            temp_library.session.flush()
+            TestSearchFunctionality._add_text(temp_library, book, body)
+        temp_library.session.commit()
+
+        query = temp_library.query().filter_by_text("heron").filter_by_language("en")
+        assert query.count() == 2
+        results = query.order_by("relevance").all()
+        assert [b.title for b in results] == ["Bird 1", "Bird 0"]
+
+    def test_chained_text_filters_intersect(self, temp_library):
+        """Each filter_by_text call keeps its own term; the matches are ANDed."""
+        for i, title in enumerate(["Python Basics", "Python for Rustaceans", "Rust in Action"]):
+            temp_library.session.add(Book(unique_id=f"chain{i}", title=title))
+        temp_library.session.commit()
+
+        assert temp_library.query().filter_by_text("rust").filter_by_text("python").all() == []
+        results = temp_library.query().filter_by_text("python").filter_by_text("rustaceans").all()
+        assert [b.title for b in results] == ["Python for Rustaceans"]
+
 
 class TestLibraryHelperMethods:
     """Test library helper methods."""
@@ -617,6 +691,38 @@ class TestBatchImport:
         books = temp_library.batch_import(files_and_metadata, show_progress=True)
         assert len(books) == 2
 
+    def test_batch_import_parallel_matches_sequential(self, temp_library, sample_epub, tmp_path):
+        """Importing with worker processes gives the same library as sequentially."""
+        from book_memex.db.models import BookContent, ExtractedText, File
+        from book_memex.extract_metadata import extract_metadata
+
+        sources = [(sample_epub, extract_metadata(str(sample_epub)))]
+        for i in range(4):
+            test_file = tmp_path / f"parallel_{i}.txt"
+            test_file.write_text(f"Parallel content {i} about bayesian priors")
+            sources.append((test_file, {"title": f"Parallel Book {i}", "creators": ["Parallel Author"]}))
+        # Duplicate content is merged into the first book either way
+        sources.append((tmp_path / "parallel_0.txt", {"title": "Parallel Book 0", "creators": ["Parallel Author"]}))
+
+        def snapshot(lib):
+            return (
+                sorted((b.title, tuple(a.name for a in b.authors)) for b in lib.get_all_books()),
+                sorted((f.file_hash, f.format, f.path) for f in lib.session.query(File)),
+                sorted(t.content for t in lib.session.query(ExtractedText)),
+                sorted((c.segment_type, c.segment_index, c.content) for c in lib.session.query(BookContent)),
+            )
+
+        sequential = temp_library.batch_import(sources, show_progress=False)
+
+        other = Library.open(tmp_path / "parallel-lib")
+        try:
+            parallel = other.batch_import(sources, show_progress=False, workers=2)
+            assert [b.id for b in parallel] == [b.id for b in sequential]
+            assert snapshot(other) == snapshot(temp_library)
+            assert other.search("bayesian")
+        finally:
+            other.close()
+
 
 class TestErrorHandling:
     """Test error handling and edge cases."""
@@ -1001,6 +1107,258 @@ class TestEdgeCases:
         # Then: Should handle gracefully (no exception)
 
 
+class _PlantedPayload:
+    """Pickle payload that records whether it was ever unpickled."""
+
+    ran = False
+
+    def __reduce__(self):
+        return _run_planted_payload, ()
+
+
+def _run_planted_payload():
+    _PlantedPayload.ran = True
+
+
+class TestFindSimilar:
+    """Test find_similar and its persisted similarity index."""
+
+    def _add(self, lib, title, creators, subjects, language="en"):
+        test_file = lib.library_path / f"{title}.txt"
+        test_file.write_text(f"Test content for {title}")
+        return lib.add_book(
+            test_file,
+            metadata={"title": title, "creators": creators, "subjects": subjects,
+                      "language": language, "publication_date": "2021"},
+            extract_text=False,
+            extract_cover=False,
+        )
+
+    def test_find_similar_saves_index(self, populated_library):
+        """The fitted model is written under cache/similarity."""
+        results = populated_library.find_similar(1, top_k=5)
+
+        assert [book.id for book, _ in results][0] == 2  # shares the Python subject
+        assert 1 not in [book.id for book, _ in results]
+        assert list((populated_library.library_path / "cache" / "similarity").glob("*.npz"))
+
+    def test_find_similar_reuses_saved_index(self, populated_library, monkeypatch):
+        """A fresh Library on an unchanged library loads instead of refitting."""
+        from book_memex.similarity.index import SimilarityIndex
+
+        expected = populated_library.find_similar(1, top_k=5)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("similarity index was refitted")
+
+        monkeypatch.setattr(SimilarityIndex, "rebuild", fail)
+        reopened = Library(populated_library.library_path, populated_library.session)
+        results = reopened.find_similar(1, top_k=5)
+
+        assert [(b.id, s) for b, s in results] == [(b.id, s) for b, s in expected]
+
+    def test_find_similar_folds_in_new_books(self, populated_library, monkeypatch):
+        """Books added after fitting are folded in without a refit."""
+        from book_memex.similarity.index import SimilarityIndex
+
+        populated_library.find_similar(1, top_k=5)
+        monkeypatch.setattr(SimilarityIndex, "rebuild", lambda *a, **k: pytest.fail("refitted"))
+
+        new = self._add(populated_library, "Python Cookbook", ["John Doe"], ["Programming", "Python"])
+        results = populated_library.find_similar(1, top_k=5)
+
+        assert results[0][0].id == new.id
+
+    def test_saved_index_round_trips_without_pickle(self, populated_library):
+        """A loaded index scores like the fitted one and can fold in new books."""
+        import numpy as np
+        from book_memex.similarity import BookSimilarity, TfidfMetric
+        from book_memex.similarity.index import SimilarityIndex
+
+        lib = populated_library
+        for book, blurb in zip(lib.session.query(Book).order_by(Book.id), [
+            "python code and programming idioms",
+            "python code for data analysis and statistics",
+            "neural networks learn from data",
+        ], strict=True):
+            book.description = blurb
+        lib.session.commit()
+
+        def config():
+            return (BookSimilarity().description(metric=TfidfMetric(min_df=1))
+                    .authors().subjects().temporal())
+
+        fitted = SimilarityIndex.open(lib.session, lib.library_path, config())
+        path = SimilarityIndex.path_for(lib.library_path, config())
+        with np.load(path, allow_pickle=False) as archive:
+            assert "header" in archive.files
+
+        loaded = SimilarityIndex.load(path, config())
+        assert loaded is not None
+        assert loaded.fit_id == fitted.fit_id
+        for book_id in fitted.book_ids:
+            assert np.allclose(loaded.scores(book_id), fitted.scores(book_id))
+
+        new = self._add(lib, "Python Recipes", ["John Doe"], ["Programming", "Python"])
+        new.description = "python code recipes"
+        lib.session.commit()
+        assert loaded.refresh(lib.session)
+        assert loaded.fit_id == fitted.fit_id  # folded in, not refitted
+        assert loaded.top_k_ids(new.id, k=1)[0][0] == 1
+
+    def test_pickled_index_is_never_unpickled(self, populated_library):
+        """A pickle planted in the cache is ignored, not executed."""
+        import pickle
+        from book_memex.services.neighbor_service import preset_config
+        from book_memex.similarity.index import SimilarityIndex
+
+        config = preset_config("metadata_only")
+        path = SimilarityIndex.path_for(populated_library.library_path, config)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(pickle.dumps(_PlantedPayload()))
+
+        assert SimilarityIndex.load(path, config) is None
+        assert not _PlantedPayload.ran
+
+    def test_replacing_a_subject_changes_generation(self, populated_library):
+        """Swapping a link (same count, books untouched) invalidates the index."""
+        from book_memex.similarity.index import content_generation
+
+        lib = populated_library
+        before = content_generation(lib.session)
+        book = lib.get_book(3)
+        ai = next(s for s in book.subjects if s.name == "AI")
+        book.subjects.remove(ai)
+        book.subjects.append(lib.session.query(Subject).filter_by(name="Python").one())
+        lib.session.commit()
+
+        assert content_generation(lib.session) != before
+        assert lib.find_similar(3, top_k=1)[0][0].id in (1, 2)
+
+    def test_top_k_breaks_ties_by_id(self, monkeypatch):
+        """Books tied at the cut-off are taken in ascending id order."""
+        import numpy as np
+        from book_memex.services.neighbor_service import preset_config
+        from book_memex.similarity.index import SimilarityIndex
+
+        # 20 candidates scoring 0.5, 0.9, 0.2, 0.5, 0.9, 0.2, ... plus the query book
+        scores = np.array([(0.5, 0.9, 0.2)[i % 3] for i in range(20)] + [1.0])
+        index = SimilarityIndex(preset_config("metadata_only"))
+        index.book_ids = list(range(1, 22))
+        index.languages = [None] * 21
+        index._positions = {bid: pos for pos, bid in enumerate(index.book_ids)}
+        monkeypatch.setattr(index, "scores", lambda book_id: scores)
+
+        top = [bid for bid, _ in index.top_k_ids(21, 8)]
+
+        assert top == [2, 5, 8, 11, 14, 17, 20, 1]
+
+    def test_find_similar_drops_deleted_books(self, populated_library):
+        """Deleted books disappear from results."""
+        populated_library.find_similar(1, top_k=5)
+        populated_library.delete_book(2)
+
+        results = populated_library.find_similar(1, top_k=5)
+
+        assert 2 not in [book.id for book, _ in results]
+        assert len(results) == 1
+
+    def test_find_similar_filters_language(self, populated_library):
+        """Only books in the query book's language are returned by default."""
+        german = self._add(populated_library, "Python Programmierung", ["John Doe"], ["Python"], "de")
+
+        filtered = populated_library.find_similar(1, top_k=5)
+        unfiltered = populated_library.find_similar(1, top_k=5, filter_language=False)
+
+        assert german.id not in [book.id for book, _ in filtered]
+        assert german.id in [book.id for book, _ in unfiltered]
+
+
+class TestBuildNeighbors:
+    """Test precomputed neighbour lists (book_neighbors)."""
+
+    def _add(self, lib, title, creators, subjects):
+        test_file = lib.library_path / f"{title}.txt"
+        test_file.write_text(f"Test content for {title}")
+        return lib.add_book(
+            test_file,
+            metadata={"title": title, "creators": creators, "subjects": subjects,
+                      "language": "en", "publication_date": "2021"},
+            extract_text=False,
+            extract_cover=False,
+        )
+
+    def _stored(self, lib, book_id, preset="sparse_friendly"):
+        from book_memex.db.models import BookNeighbor
+        rows = (lib.session.query(BookNeighbor)
+                .filter_by(book_id=book_id, preset=preset)
+                .order_by(BookNeighbor.rank).all())
+        return [r.neighbor_id for r in rows]
+
+    def test_build_stores_top_k_per_book(self, populated_library):
+        """Each book gets its ranked neighbours, matching find_similar."""
+        lib = populated_library
+        expected = [b.id for b, _ in lib.find_similar(1, top_k=5)]
+
+        stats = lib.build_neighbors(["sparse_friendly"], top_k=5)
+
+        assert stats["sparse_friendly"] == {"books": 3, "recomputed": 3, "updated": 0}
+        assert self._stored(lib, 1) == expected
+
+    def test_find_similar_reads_precomputed_lists(self, populated_library, monkeypatch):
+        """With current lists, find_similar doesn't touch the similarity model."""
+        lib = populated_library
+        lib.build_neighbors(["sparse_friendly"], top_k=5)
+        expected = self._stored(lib, 1)
+
+        monkeypatch.setattr(Library, "similarity_index",
+                            lambda *a, **k: pytest.fail("similarity model was used"))
+        results = lib.find_similar(1, top_k=2)
+
+        assert [b.id for b, _ in results] == expected[:2]
+
+    def test_rebuild_without_changes_is_noop(self, populated_library):
+        """A second build with nothing changed recomputes nothing."""
+        lib = populated_library
+        lib.build_neighbors(["sparse_friendly"], top_k=5)
+
+        stats = lib.build_neighbors(["sparse_friendly"], top_k=5)
+
+        assert stats["sparse_friendly"]["recomputed"] == 0
+        assert stats["sparse_friendly"]["updated"] == 0
+
+    def test_incremental_build_merges_new_books(self, populated_library):
+        """A new book gets its own list and is merged into others' lists."""
+        lib = populated_library
+        lib.build_neighbors(["sparse_friendly"], top_k=5)
+        new = self._add(lib, "Python Cookbook", ["John Doe"], ["Programming", "Python"])
+
+        stats = lib.build_neighbors(["sparse_friendly"], top_k=5)
+
+        assert stats["sparse_friendly"]["recomputed"] == 1
+        assert self._stored(lib, 1)[0] == new.id
+        assert self._stored(lib, new.id)[0] == 1
+        from book_memex.services.neighbor_service import preset_config
+        index = lib.similarity_index(preset_config("sparse_friendly"))
+        assert self._stored(lib, 1) == [bid for bid, _ in index.top_k_ids(1, 5, "en")]
+
+    def test_deleted_neighbours_are_dropped(self, populated_library):
+        """Lists mentioning a deleted book are recomputed without it."""
+        lib = populated_library
+        lib.build_neighbors(["sparse_friendly"], top_k=5)
+        lib.delete_book(2)
+
+        lib.build_neighbors(["sparse_friendly"], top_k=5)
+
+        assert 2 not in self._stored(lib, 1)
+        assert self._stored(lib, 2) == []
+
+    def test_unknown_preset_rejected(self, populated_library):
+        """Unknown preset names raise ValueError."""
+        with pytest.raises(ValueError, match="Unknown similarity preset"):
+            populated_library.build_neighbors(["nope"])
+
+
 class TestReviewMethods:
     """Test book review functionality."""
 
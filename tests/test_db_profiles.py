@@ -0,0 +1,82 @@
+"""Tests for SQLite performance profiles applied in db/session.py."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from book_memex import config
+from book_memex.db.session import PERFORMANCE_PROFILES, checkpoint_db, get_profile
+from book_memex.library_db import Library
+
+
+@pytest.fixture
+def temp_dir():
+    d = Path(tempfile.mkdtemp())
+    yield d
+    shutil.rmtree(d, ignore_errors=True)
+
+
+def _pragma(lib, name):
+    return lib.session.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_balanced_profile_enables_wal(temp_dir):
+    lib = Library.open(temp_dir, profile="balanced")
+    try:
+        assert _pragma(lib, "journal_mode").lower() == "wal"
+        assert _pragma(lib, "synchronous") == 1  # NORMAL
+        assert _pragma(lib, "cache_size") == PERFORMANCE_PROFILES["balanced"]["cache_size"]
+        assert _pragma(lib, "temp_store") == 2  # MEMORY
+        assert _pragma(lib, "busy_timeout") == 5000
+        assert _pragma(lib, "foreign_keys") == 1
+    finally:
+        lib.close()
+
+
+def test_safe_profile_keeps_rollback_journal(temp_dir):
+    lib = Library.open(temp_dir, profile="safe")
+    try:
+        assert _pragma(lib, "journal_mode").lower() == "delete"
+        assert _pragma(lib, "synchronous") == 2  # FULL
+        assert _pragma(lib, "mmap_size") == 0
+    finally:
+        lib.close()
+
+
+def test_unknown_profile_raises(temp_dir):
+    with pytest.raises(ValueError, match="Unknown database profile"):
+        Library.open(temp_dir, profile="ludicrous")
+
+
+def test_profile_defaults_from_config(monkeypatch):
+    cfg = config.EBKConfig()
+    cfg.database.profile = "fast"
+    monkeypatch.setattr(config, "load_config", lambda: cfg)
+    assert get_profile() is PERFORMANCE_PROFILES["fast"]
+
+
+def test_database_config_round_trip():
+    cfg = config.EBKConfig()
+    cfg.database.profile = "safe"
+    restored = config.EBKConfig.from_dict(cfg.to_dict())
+    assert restored.database.profile == "safe"
+    # Config files written before the database section existed still load.
+    assert config.EBKConfig.from_dict({}).database.profile == "balanced"
+
+
+def test_checkpoint_folds_wal_into_main_file(temp_dir):
+    lib = Library.open(temp_dir, profile="balanced")
+    try:
+        lib.session.execute(text(
+            "INSERT INTO books (unique_id, title, created_at, updated_at) "
+            "VALUES ('ckpt', 'Checkpointed', '2024-01-01', '2024-01-01')"
+        ))
+        lib.session.commit()
+        checkpoint_db(temp_dir)
+        wal = temp_dir / "library.db-wal"
+        assert not wal.exists() or wal.stat().st_size == 0
+    finally:
+        lib.close()
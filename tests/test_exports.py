@@ -1104,6 +1104,37 @@ class TestArkivExport:
         finally:
             shutil.rmtree(tmp, ignore_errors=True)
 
+    def test_arkiv_streams_in_batches(self, lib_with_data):
+        """Small batches give the same records and leave the caller's session alone."""
+        import json as _json
+        import zipfile
+        from book_memex.exports.arkiv import ArkivExporter
+
+        lib, _, _, _ = lib_with_data
+        for i in range(3):
+            p = lib.library_path / f"extra{i}.txt"
+            p.write_text(f"extra {i}")
+            lib.add_book(p, metadata={"title": f"Extra {i}", "creators": [f"Author {i}"],
+                                      "identifiers": {"isbn": f"97800000000{i}"}},
+                         extract_text=False, extract_cover=False)
+
+        tmp = Path(tempfile.mkdtemp())
+        try:
+            result = ArkivExporter(lib).run(tmp / "whole")
+            loaded = len(lib.session.identity_map)
+            batched = ArkivExporter(lib, batch_size=1).run(tmp / "batched.zip")
+            assert len(lib.session.identity_map) == loaded
+
+            assert result["counts"] == batched["counts"] == {"book": 4, "marginalia": 1, "reading": 1}
+            with zipfile.ZipFile(tmp / "batched.zip") as zf:
+                batched_recs = zf.read("records.jsonl").decode()
+            assert batched_recs == (tmp / "whole" / "records.jsonl").read_text()
+            books = [_json.loads(ln) for ln in batched_recs.splitlines()][:4]
+            assert books[3]["authors"] == ["Author 2"]
+            assert books[3]["identifiers"] == {"isbn": "978000000002"}
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
 
 class TestArkivDetectCompression:
     """Bundle-format extension detection."""
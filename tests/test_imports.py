@@ -668,6 +668,148 @@ class TestCalibreImport:
         assert results["total"] == 2
 
 
+def create_calibre_db(calibre_dir: Path, epub: Path) -> None:
+    """A minimal Calibre library: metadata.db with its schema subset and book folders."""
+    import sqlite3
+
+    calibre_dir.mkdir()
+    conn = sqlite3.connect(calibre_dir / "metadata.db")
+    conn.executescript("""
+        CREATE TABLE books (id INTEGER PRIMARY KEY, title TEXT, sort TEXT, path TEXT,
+                            pubdate TEXT, series_index REAL, uuid TEXT, isbn TEXT, has_cover BOOL);
+        CREATE TABLE authors (id INTEGER PRIMARY KEY, name TEXT, sort TEXT);
+        CREATE TABLE books_authors_link (id INTEGER PRIMARY KEY, book INTEGER, author INTEGER);
+        CREATE TABLE tags (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE books_tags_link (id INTEGER PRIMARY KEY, book INTEGER, tag INTEGER);
+        CREATE TABLE identifiers (id INTEGER PRIMARY KEY, book INTEGER, type TEXT, val TEXT);
+        CREATE TABLE comments (id INTEGER PRIMARY KEY, book INTEGER, text TEXT);
+        CREATE TABLE publishers (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE books_publishers_link (id INTEGER PRIMARY KEY, book INTEGER, publisher INTEGER);
+        CREATE TABLE languages (id INTEGER PRIMARY KEY, lang_code TEXT);
+        CREATE TABLE books_languages_link (id INTEGER PRIMARY KEY, book INTEGER, lang_code INTEGER,
+                                           item_order INTEGER);
+        CREATE TABLE series (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE books_series_link (id INTEGER PRIMARY KEY, book INTEGER, series INTEGER);
+        CREATE TABLE data (id INTEGER PRIMARY KEY, book INTEGER, format TEXT,
+                           uncompressed_size INTEGER, name TEXT);
+
+        INSERT INTO books VALUES
+            (1, 'Dune', 'Dune', 'Frank Herbert/Dune (1)', '1965-08-01 00:00:00+00:00', 1.0, 'u-1', '', 1),
+            (2, 'Emma', 'Emma', 'Jane Austen/Emma (2)', '0101-01-01 00:00:00+00:00', 1.0, 'u-2', '', 0),
+            (3, 'Ghost', 'Ghost', 'Nobody/Ghost (3)', NULL, 1.0, 'u-3', '', 0);
+        INSERT INTO authors VALUES (1, 'Frank Herbert', 'Herbert, Frank'), (2, 'Jane Austen', 'Austen, Jane');
+        INSERT INTO books_authors_link VALUES (1, 1, 1), (2, 2, 2);
+        INSERT INTO tags VALUES (1, 'Science Fiction'), (2, 'Classics');
+        INSERT INTO books_tags_link VALUES (1, 1, 1), (2, 1, 2), (3, 2, 2);
+        INSERT INTO identifiers VALUES (1, 1, 'isbn', '9780441013593');
+        INSERT INTO comments VALUES (1, 1, '<p>Desert planet.</p>');
+        INSERT INTO publishers VALUES (1, 'Chilton');
+        INSERT INTO books_publishers_link VALUES (1, 1, 1);
+        INSERT INTO languages VALUES (1, 'eng');
+        INSERT INTO books_languages_link VALUES (1, 1, 1, 0), (2, 2, 1, 0);
+        INSERT INTO series VALUES (1, 'Dune Chronicles');
+        INSERT INTO books_series_link VALUES (1, 1, 1);
+        INSERT INTO data VALUES (1, 1, 'TXT', 10, 'Dune - Frank Herbert'),
+                                (2, 1, 'EPUB', 10, 'Dune - Frank Herbert'),
+                                (3, 2, 'TXT', 10, 'Emma - Jane Austen'),
+                                (4, 3, 'PDF', 10, 'Ghost - Nobody');
+    """)
+    conn.commit()
+    conn.close()
+
+    for folder, name, formats in [
+        ("Frank Herbert/Dune (1)", "Dune - Frank Herbert", ["txt", "epub"]),
+        ("Jane Austen/Emma (2)", "Emma - Jane Austen", ["txt"]),
+    ]:
+        book_dir = calibre_dir / folder
+        book_dir.mkdir(parents=True)
+        for fmt in formats:
+            if fmt == "epub":
+                shutil.copy(epub, book_dir / f"{name}.{fmt}")
+            else:
+                (book_dir / f"{name}.{fmt}").write_text(f"{name} as {fmt}. " * 20)
+
+
+class TestCalibreDatabaseImport:
+    """Test importing from Calibre's metadata.db."""
+
+    def test_read_calibre_db(self, tmp_path, sample_epub):
+        from book_memex.calibre_import import read_calibre_db, count_calibre_books
+
+        calibre_dir = tmp_path / "calibre"
+        create_calibre_db(calibre_dir, sample_epub)
+        books = list(read_calibre_db(calibre_dir))
+
+        assert count_calibre_books(calibre_dir) == 3
+        assert [b.calibre_id for b in books] == [1, 2, 3]
+        dune = books[0].metadata
+        assert dune["title"] == "Dune"
+        assert dune["creators"] == ["Frank Herbert"]
+        assert dune["subjects"] == ["Classics", "Science Fiction"]
+        assert dune["identifiers"]["isbn"] == "9780441013593"
+        assert dune["series"] == "Dune Chronicles"
+        assert dune["publisher"] == "Chilton"
+        assert dune["language"] == "eng"
+        assert dune["date"].startswith("1965-08-01")
+        # Preferred format first; only files that exist
+        assert [f.suffix for f in books[0].files] == [".epub", ".txt"]
+        assert books[1].metadata["date"] is None
+        assert books[2].files == []
+
+    def test_import_uses_metadata_db_not_opf(self, temp_library, tmp_path, sample_epub):
+        from book_memex.calibre_import import import_calibre_library
+
+        calibre_dir = tmp_path / "calibre"
+        create_calibre_db(calibre_dir, sample_epub)
+        seen = []
+        with patch("book_memex.extract_metadata.extract_metadata_from_opf") as mock_opf:
+            results = import_calibre_library(calibre_dir, temp_library, on_book=lambda: seen.append(1))
+            mock_opf.assert_not_called()
+
+        assert (results["total"], results["imported"], results["failed"]) == (3, 2, 1)
+        assert "Ghost" in results["errors"][0]
+        assert len(seen) == 3
+
+        dune = temp_library.search("Dune")[0]
+        assert sorted(f.format for f in dune.files) == ["epub", "txt"]
+        assert dune.series == "Dune Chronicles"
+        assert sorted(s.name for s in dune.subjects) == ["Classics", "Science Fiction"]
+
+    def test_import_limit(self, temp_library, tmp_path, sample_epub):
+        from book_memex.calibre_import import import_calibre_library
+
+        calibre_dir = tmp_path / "calibre"
+        create_calibre_db(calibre_dir, sample_epub)
+        results = import_calibre_library(calibre_dir, temp_library, limit=1)
+        assert (results["total"], results["imported"]) == (1, 1)
+
+    def test_cli_batch_size_defaults_from_config(self, tmp_path, sample_epub):
+        from typer.testing import CliRunner
+        from book_memex import calibre_import
+        from book_memex.cli import app as cli_app
+        from book_memex.config import EBKConfig
+
+        calibre_dir = tmp_path / "calibre"
+        create_calibre_db(calibre_dir, sample_epub)
+        lib_path = tmp_path / "library"
+        Library.open(lib_path).close()
+        cfg = EBKConfig()
+        cfg.library.import_batch_size = 7
+
+        runner = CliRunner()
+        with patch("book_memex.config.load_config", return_value=cfg), \
+                patch.object(calibre_import, "import_calibre_library",
+                             wraps=calibre_import.import_calibre_library) as spy:
+            result = runner.invoke(cli_app, ["import", "calibre", str(calibre_dir), str(lib_path)])
+            assert result.exit_code == 0, result.output
+            assert spy.call_args.kwargs["batch_size"] == 7
+
+            result = runner.invoke(cli_app, ["import", "calibre", str(calibre_dir), str(lib_path),
+                                             "--batch-size", "0"])
+            assert result.exit_code == 1
+            assert "--batch-size must be at least 1" in result.output
+
+
 # ============================================================================
 # Error Handling Tests
 # ============================================================================
@@ -0,0 +1,63 @@
+"""Test migration 13: book_neighbors and book_neighbor_state tables."""
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from book_memex.db.migrations import CURRENT_SCHEMA_VERSION, migrate_add_book_neighbors
+from book_memex.library_db import Library
+
+
+@pytest.fixture
+def fresh_library():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib, temp_dir
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_schema_version_at_least_13(fresh_library):
+    assert CURRENT_SCHEMA_VERSION >= 13
+
+
+def test_neighbor_tables_exist(fresh_library):
+    _, temp_dir = fresh_library
+    engine = create_engine(f"sqlite:///{temp_dir}/library.db")
+    tables = set(inspect(engine).get_table_names())
+    assert {"book_neighbors", "book_neighbor_state"} <= tables
+
+
+def test_migration_creates_missing_tables(fresh_library):
+    lib, temp_dir = fresh_library
+    lib.close()
+    engine = create_engine(f"sqlite:///{temp_dir}/library.db")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE book_neighbors"))
+        conn.execute(text("DROP TABLE book_neighbor_state"))
+
+    assert migrate_add_book_neighbors(temp_dir, dry_run=True) is True
+    assert migrate_add_book_neighbors(temp_dir) is True
+    assert migrate_add_book_neighbors(temp_dir) is False
+
+    columns = {c["name"] for c in inspect(engine).get_columns("book_neighbors")}
+    assert columns == {"book_id", "preset", "rank", "neighbor_id", "score"}
+
+
+def test_neighbor_rows_cascade_with_book(fresh_library):
+    lib, _ = fresh_library
+    test_file = lib.library_path / "a.txt"
+    test_file.write_text("a")
+    book = lib.add_book(test_file, metadata={"title": "A"}, extract_text=False)
+    lib.session.execute(text(
+        "INSERT INTO book_neighbors (book_id, preset, rank, neighbor_id, score) "
+        "VALUES (:id, 'balanced', 1, 999, 0.5)"
+    ), {"id": book.id})
+    lib.session.commit()
+
+    lib.delete_book(book.id)
+
+    count = lib.session.execute(text("SELECT COUNT(*) FROM book_neighbors")).scalar()
+    assert count == 0
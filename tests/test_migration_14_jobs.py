@@ -0,0 +1,59 @@
+"""Test migration 14: jobs table for background extraction."""
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from book_memex.db.migrations import CURRENT_SCHEMA_VERSION, migrate_add_jobs
+from book_memex.library_db import Library
+
+
+@pytest.fixture
+def fresh_library():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib, temp_dir
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_schema_version_at_least_14(fresh_library):
+    assert CURRENT_SCHEMA_VERSION >= 14
+
+
+def test_jobs_table_exists(fresh_library):
+    _, temp_dir = fresh_library
+    engine = create_engine(f"sqlite:///{temp_dir}/library.db")
+    assert "jobs" in set(inspect(engine).get_table_names())
+
+
+def test_migration_creates_missing_table(fresh_library):
+    lib, temp_dir = fresh_library
+    lib.close()
+    engine = create_engine(f"sqlite:///{temp_dir}/library.db")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE jobs"))
+
+    assert migrate_add_jobs(temp_dir, dry_run=True) is True
+    assert migrate_add_jobs(temp_dir) is True
+    assert migrate_add_jobs(temp_dir) is False
+
+    inspector = inspect(engine)
+    columns = {c["name"] for c in inspector.get_columns("jobs")}
+    assert {"kind", "file_id", "status", "priority", "attempts", "run_after", "last_error"} <= columns
+    assert "idx_jobs_queue" in {i["name"] for i in inspector.get_indexes("jobs")}
+
+
+def test_jobs_cascade_with_book(fresh_library):
+    lib, _ = fresh_library
+    test_file = lib.library_path / "a.txt"
+    test_file.write_text("a")
+    book = lib.add_book(test_file, metadata={"title": "A"}, extract_cover=False, defer=True)
+
+    assert lib.session.execute(text("SELECT COUNT(*) FROM jobs")).scalar() == 1
+
+    lib.delete_book(book.id)
+
+    assert lib.session.execute(text("SELECT COUNT(*) FROM jobs")).scalar() == 0
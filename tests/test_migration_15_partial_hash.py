@@ -0,0 +1,54 @@
+"""Test migration 15: files.partial_hash duplicate-detection prefilter."""
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from book_memex.db.migrations import CURRENT_SCHEMA_VERSION, get_engine, migrate_add_partial_hash
+from book_memex.library_db import Library
+from book_memex.services.hash_cache import partial_hash
+
+
+@pytest.fixture
+def fresh_library():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib, temp_dir
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_schema_version_at_least_15(fresh_library):
+    assert CURRENT_SCHEMA_VERSION >= 15
+
+
+def test_partial_hash_column_exists(fresh_library):
+    _, temp_dir = fresh_library
+    engine = create_engine(f"sqlite:///{temp_dir}/library.db")
+    inspector = inspect(engine)
+    assert "partial_hash" in {c["name"] for c in inspector.get_columns("files")}
+    assert "ix_files_partial_hash" in {i["name"] for i in inspector.get_indexes("files")}
+
+
+def test_migration_adds_column_and_backfills(fresh_library):
+    lib, temp_dir = fresh_library
+    test_file = lib.library_path / "a.txt"
+    test_file.write_text("Backfill me")
+    book = lib.add_book(test_file, metadata={"title": "A"}, extract_text=False, extract_cover=False)
+    stored = temp_dir / book.files[0].path
+    lib.close()
+
+    engine = get_engine(temp_dir)  # ALTER TABLE re-checks triggers that call bm_decompress()
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_files_partial_hash"))
+        conn.execute(text("ALTER TABLE files DROP COLUMN partial_hash"))
+
+    assert migrate_add_partial_hash(temp_dir, dry_run=True) is True
+    assert migrate_add_partial_hash(temp_dir) is True
+    assert migrate_add_partial_hash(temp_dir) is False
+
+    with engine.connect() as conn:
+        value = conn.execute(text("SELECT partial_hash FROM files")).scalar()
+    assert value == partial_hash(stored)
@@ -0,0 +1,67 @@
+"""Test migration 16: files.content_fingerprint for skipping unchanged reindexes."""
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from book_memex.db.migrations import (
+    CURRENT_SCHEMA_VERSION, get_engine, migrate_add_content_fingerprint,
+)
+from book_memex.library_db import Library
+from book_memex.services.content_indexer import ContentIndexer
+
+
+@pytest.fixture
+def fresh_library():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib, temp_dir
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_schema_version_at_least_16(fresh_library):
+    assert CURRENT_SCHEMA_VERSION >= 16
+
+
+def test_content_fingerprint_column_exists(fresh_library):
+    _, temp_dir = fresh_library
+    engine = create_engine(f"sqlite:///{temp_dir}/library.db")
+    inspector = inspect(engine)
+    assert "content_fingerprint" in {c["name"] for c in inspector.get_columns("files")}
+
+
+def test_migration_adds_column_and_backfills(fresh_library, sample_epub):
+    lib, temp_dir = fresh_library
+    dest = lib.library_path / "sample.epub"
+    shutil.copy(sample_epub, dest)
+    book = lib.add_book(dest, metadata={"title": "A"}, extract_text=False, extract_cover=False)
+    indexed = book.primary_file
+    ContentIndexer(lib.session, lib.library_path).index_file(indexed)
+    indexed_id, expected = indexed.id, f"{indexed.file_hash}:epub-v2"
+
+    legacy_file = lib.library_path / "b.txt"
+    legacy_file.write_text("Legacy chunks only")
+    legacy = lib.add_book(legacy_file, metadata={"title": "B"}, extract_text=False, extract_cover=False)
+    legacy_id = legacy.files[0].id
+    lib.close()
+
+    engine = get_engine(temp_dir)  # book_content triggers need bm_decompress()
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE files DROP COLUMN content_fingerprint"))
+        conn.execute(text(
+            "INSERT INTO book_content (file_id, segment_index, content, segment_type, "
+            "anchor, extractor_version, extraction_status) "
+            "VALUES (:id, 0, 'old', 'chunk-legacy', '{}', 'legacy', 'ok')"
+        ), {"id": legacy_id})
+
+    assert migrate_add_content_fingerprint(temp_dir, dry_run=True) is True
+    assert migrate_add_content_fingerprint(temp_dir) is True
+    assert migrate_add_content_fingerprint(temp_dir) is False
+
+    with engine.connect() as conn:
+        values = dict(conn.execute(text("SELECT id, content_fingerprint FROM files")).fetchall())
+    assert values[indexed_id] == expected
+    assert values[legacy_id] is None
@@ -0,0 +1,42 @@
+"""Test migration 17: reindex_checkpoints table for resumable reindex-content."""
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from book_memex.db.migrations import CURRENT_SCHEMA_VERSION, migrate_add_reindex_checkpoints
+from book_memex.library_db import Library
+
+
+@pytest.fixture
+def fresh_library():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib, temp_dir
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_schema_version_at_least_17(fresh_library):
+    assert CURRENT_SCHEMA_VERSION >= 17
+
+
+def test_reindex_checkpoints_table_exists(fresh_library):
+    _, temp_dir = fresh_library
+    engine = create_engine(f"sqlite:///{temp_dir}/library.db")
+    assert "reindex_checkpoints" in set(inspect(engine).get_table_names())
+
+
+def test_migration_creates_missing_table(fresh_library):
+    lib, temp_dir = fresh_library
+    lib.close()
+    engine = create_engine(f"sqlite:///{temp_dir}/library.db")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE reindex_checkpoints"))
+
+    assert migrate_add_reindex_checkpoints(temp_dir, dry_run=True) is True
+    assert migrate_add_reindex_checkpoints(temp_dir) is True
+    assert migrate_add_reindex_checkpoints(temp_dir) is False
+    assert "reindex_checkpoints" in set(inspect(engine).get_table_names())
@@ -0,0 +1,94 @@
+"""Test migration 18: book_content FTS triggers index decompressed text."""
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from book_memex.db.compression import compress_text
+from book_memex.db.migrations import (
+    CURRENT_SCHEMA_VERSION, get_engine, migrate_decompress_book_content_fts,
+)
+from book_memex.db.models import Book, File
+from book_memex.library_db import Library
+
+
+@pytest.fixture
+def fresh_library():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib, temp_dir
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _trigger_sql(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type='trigger' AND name=:name"
+        ), {"name": name}).scalar()
+
+
+def test_schema_version_at_least_18(fresh_library):
+    assert CURRENT_SCHEMA_VERSION >= 18
+
+
+def test_fresh_library_triggers_use_no_custom_functions(fresh_library):
+    _, temp_dir = fresh_library
+    engine = get_engine(temp_dir)
+    for name in ("book_content_ai", "book_content_au", "book_content_ad"):
+        assert "bm_decompress" not in _trigger_sql(engine, name)
+
+
+def test_compressing_library_triggers_decompress(fresh_library):
+    lib, temp_dir = fresh_library
+    lib.close()
+    Library.open(temp_dir, text_compression="zlib").close()
+    engine = get_engine(temp_dir)
+    for name in ("book_content_ai", "book_content_au", "book_content_ad"):
+        assert "bm_decompress" in _trigger_sql(engine, name)
+
+
+def test_migration_replaces_raw_content_triggers(fresh_library):
+    lib, temp_dir = fresh_library
+    book = Book(title="M", unique_id="m-001")
+    lib.session.add(book)
+    lib.session.flush()
+    f = File(book_id=book.id, path="m.txt", format="txt", file_hash="m")
+    lib.session.add(f)
+    lib.session.commit()
+    file_id = f.id
+    lib.close()
+    engine = get_engine(temp_dir)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER book_content_au"))
+        conn.execute(text("""
+            CREATE TRIGGER book_content_au AFTER UPDATE ON book_content BEGIN
+                INSERT INTO book_content_fts (book_content_fts, rowid, text, title, book_id, content_id)
+                VALUES ('delete', old.id, old.content, COALESCE(old.title, ''),
+                        (SELECT book_id FROM files WHERE id = old.file_id), old.id);
+                INSERT INTO book_content_fts (rowid, text, title, book_id, content_id)
+                VALUES (new.id, new.content, COALESCE(new.title, ''),
+                        (SELECT book_id FROM files WHERE id = new.file_id), new.id);
+            END
+        """))
+
+    assert migrate_decompress_book_content_fts(temp_dir, dry_run=True) is True
+    assert migrate_decompress_book_content_fts(temp_dir) is True
+    assert migrate_decompress_book_content_fts(temp_dir) is False
+    assert "WHEN" in _trigger_sql(engine, "book_content_au")
+
+    # Opening with a codec switches the recreated triggers to bm_decompress()
+    Library.open(temp_dir, text_compression="zlib").close()
+    body = "Markov chain Monte Carlo explores the posterior. " * 20
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO book_content (file_id, segment_index, content, segment_type, "
+            "anchor, extractor_version, extraction_status) "
+            "VALUES (:file_id, 0, :content, 'text', '{}', 'txt-v1', 'ok')"
+        ), {"file_id": file_id, "content": compress_text(body, "zlib")})
+        hits = conn.execute(text(
+            "SELECT count(*) FROM book_content_fts WHERE book_content_fts MATCH 'markov'"
+        )).scalar()
+    assert hits == 1
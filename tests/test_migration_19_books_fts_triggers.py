@@ -0,0 +1,205 @@
+"""Test migration 19: external-content books_fts kept in sync by triggers."""
+import sqlite3
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from book_memex.db.migrations import (
+    CURRENT_SCHEMA_VERSION, get_engine, migrate_books_fts_external_content,
+)
+from book_memex.db.models import Book, ExtractedText, File
+from book_memex.library_db import Library
+
+BODY = "Kestrels hover over the meadow before they stoop on voles. " * 10
+
+
+@pytest.fixture
+def fresh_library():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib, temp_dir
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _book(lib, title, uid, body=None):
+    book = Book(title=title, unique_id=uid)
+    lib.session.add(book)
+    lib.session.flush()
+    if body is not None:
+        f = File(book_id=book.id, path=f"{uid}.txt", format="txt", file_hash=uid)
+        lib.session.add(f)
+        lib.session.flush()
+        lib.session.add(ExtractedText(file_id=f.id, content=body, content_hash=uid))
+    lib.session.commit()
+    return book
+
+
+def _match(lib, query):
+    return sorted(r[0] for r in lib.session.execute(
+        text("SELECT rowid FROM books_fts WHERE books_fts MATCH :q"), {"q": query}
+    ))
+
+
+def _view_sql(temp_dir):
+    with get_engine(temp_dir).connect() as conn:
+        return conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type='view' AND name='books_fts_source'"
+        )).scalar()
+
+
+def _assert_in_sync(lib):
+    # With rank = 1, integrity-check also compares the index to books_fts_source
+    lib.session.execute(text("INSERT INTO books_fts (books_fts, rank) VALUES ('integrity-check', 1)"))
+    indexed = lib.session.execute(text("SELECT count(*) FROM books_fts_docsize")).scalar()
+    assert indexed == lib.session.query(Book).count()
+
+
+def test_schema_version_at_least_19(fresh_library):
+    assert CURRENT_SCHEMA_VERSION >= 19
+
+
+def test_books_without_text_are_indexed(fresh_library):
+    lib, _ = fresh_library
+    book = _book(lib, "Field Guide to Falcons", "fg-1")
+    assert _match(lib, "falcons") == [book.id]
+    assert [b.id for b in lib.search("falcons")] == [book.id]
+    _assert_in_sync(lib)
+
+
+def test_title_and_description_edits_reindex(fresh_library):
+    lib, _ = fresh_library
+    book = _book(lib, "Old Title", "edit-1", body=BODY)
+
+    book.title = "Renamed Volume"
+    book.description = "All about ospreys"
+    lib.session.commit()
+
+    assert _match(lib, "old") == []
+    assert _match(lib, "renamed") == [book.id]
+    assert _match(lib, "ospreys") == [book.id]
+    assert _match(lib, "kestrels") == [book.id]
+    _assert_in_sync(lib)
+
+
+def test_extracted_text_follows_files(fresh_library):
+    lib, _ = fresh_library
+    book = _book(lib, "Raptors", "files-1", body=BODY)
+    other = _book(lib, "Songbirds", "files-2")
+    assert _match(lib, "voles") == [book.id]
+
+    # Merging moves files (and their text) to another book
+    f = lib.session.query(File).filter_by(book_id=book.id).one()
+    f.book_id = other.id
+    lib.session.commit()
+    assert _match(lib, "voles") == [other.id]
+    _assert_in_sync(lib)
+
+    lib.session.delete(f)
+    lib.session.commit()
+    assert _match(lib, "voles") == []
+    assert _match(lib, "songbirds") == [other.id]
+    _assert_in_sync(lib)
+
+
+def test_deleting_books_removes_rows(fresh_library):
+    lib, _ = fresh_library
+    kept = _book(lib, "Kept", "del-1", body=BODY)
+    gone = _book(lib, "Gone", "del-2", body="Herons wade in the shallows. " * 10)
+
+    lib.session.execute(text("DELETE FROM books WHERE id = :id"), {"id": gone.id})
+    lib.session.commit()
+
+    assert _match(lib, "herons") == []
+    assert _match(lib, "kestrels") == [kept.id]
+    _assert_in_sync(lib)
+
+    lib.delete_book(kept.id)
+    assert _match(lib, "kestrels") == []
+    _assert_in_sync(lib)
+
+
+def test_compacting_text_keeps_index(fresh_library):
+    lib, _ = fresh_library
+    book = _book(lib, "Compressible", "zip-1", body=BODY)
+
+    lib.compact("zlib", vacuum=False)
+    assert _match(lib, "meadow") == [book.id]
+    _assert_in_sync(lib)
+
+
+def test_plain_sqlite_can_write_uncompressed_library(fresh_library):
+    """Without compression, books_fts stays in sync for writers lacking bm_decompress()."""
+    lib, temp_dir = fresh_library
+    book_id = _book(lib, "Plain Falcons", "raw-1", body=BODY).id
+    lib.close()
+
+    conn = sqlite3.connect(temp_dir / "library.db")
+    try:
+        conn.execute("UPDATE books SET title = 'Plain Harriers' WHERE id = ?", (book_id,))
+        conn.execute("UPDATE extracted_texts SET content = 'Harriers quarter the marsh.'")
+        conn.commit()
+    finally:
+        conn.close()
+
+    lib = Library.open(temp_dir)
+    assert _match(lib, "harriers AND marsh") == [book_id]
+    assert _match(lib, "falcons") == []
+    _assert_in_sync(lib)
+    lib.close()
+
+
+def test_decompression_follows_stored_text(fresh_library):
+    lib, temp_dir = fresh_library
+    book_id = _book(lib, "Compressible", "zip-2", body=BODY).id
+    lib.close()
+
+    lib = Library.open(temp_dir, text_compression="zlib")
+    lib.compact("zlib", vacuum=False)
+    lib.close()
+    conn = sqlite3.connect(temp_dir / "library.db")
+    with pytest.raises(sqlite3.OperationalError, match="bm_decompress"):
+        conn.execute("UPDATE books SET title = 'Other' WHERE id = ?", (book_id,))
+    conn.close()
+
+    # Compressed text is still stored, so plain SQL is not enough yet
+    Library.open(temp_dir).close()
+    assert "bm_decompress" in _view_sql(temp_dir)
+
+    lib = Library.open(temp_dir)
+    lib.compact("none", vacuum=False)
+    lib.close()
+    lib = Library.open(temp_dir)
+    assert "bm_decompress" not in _view_sql(temp_dir)
+    assert _match(lib, "meadow") == [book_id]
+    _assert_in_sync(lib)
+    lib.close()
+
+
+def test_migration_replaces_standalone_table(fresh_library):
+    lib, temp_dir = fresh_library
+    book_id = _book(lib, "Owls of the Night", "mig-1", body=BODY).id
+    lib.close()
+
+    engine = get_engine(temp_dir)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE books_fts"))
+        conn.execute(text("""
+            CREATE VIRTUAL TABLE books_fts USING fts5(
+                book_id UNINDEXED, title, description, extracted_text,
+                tokenize='porter unicode61'
+            )
+        """))
+
+    assert migrate_books_fts_external_content(temp_dir, dry_run=True) is True
+    assert migrate_books_fts_external_content(temp_dir) is True
+    assert migrate_books_fts_external_content(temp_dir) is False
+
+    with engine.connect() as conn:
+        hits = conn.execute(text(
+            "SELECT rowid FROM books_fts WHERE books_fts MATCH 'owls AND kestrels'"
+        )).fetchall()
+    assert [r[0] for r in hits] == [book_id]
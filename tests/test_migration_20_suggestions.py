@@ -0,0 +1,90 @@
+"""Test migration 20: FTS5 prefix indexes and the suggestion index."""
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from book_memex.db.migrations import (
+    CURRENT_SCHEMA_VERSION, get_engine, migrate_add_suggestions,
+)
+from book_memex.db.models import Book
+from book_memex.library_db import Library
+
+
+@pytest.fixture
+def fresh_library():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib, temp_dir
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _sql(conn, name):
+    return conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE name = :name"
+    ), {"name": name}).scalar()
+
+
+def test_schema_version_at_least_20(fresh_library):
+    assert CURRENT_SCHEMA_VERSION >= 20
+
+
+def test_fts_tables_have_prefix_indexes(fresh_library):
+    lib, _ = fresh_library
+    conn = lib.session.connection()
+    for name in ("books_fts", "book_content_fts", "suggestions_fts"):
+        assert "prefix='2 3 4'" in _sql(conn, name)
+    assert "porter" not in _sql(conn, "suggestions_fts")
+
+
+def test_stale_flag_set_by_triggers(fresh_library):
+    lib, _ = fresh_library
+    state = "SELECT stale FROM suggestion_state WHERE id = 1"
+    assert lib.session.execute(text(state)).scalar() == 1
+
+    lib.session.execute(text("UPDATE suggestion_state SET stale = 0"))
+    lib.session.commit()
+    book = Book(title="Prefix Trees", unique_id="pt-1")
+    lib.session.add(book)
+    lib.session.commit()
+    assert lib.session.execute(text(state)).scalar() == 1
+
+    lib.session.execute(text("UPDATE suggestion_state SET stale = 0"))
+    lib.session.commit()
+    book.description = "Not shown in suggestions"
+    lib.session.commit()
+    assert lib.session.execute(text(state)).scalar() == 0
+
+
+def test_migration_adds_prefixes_to_existing_tables(fresh_library):
+    lib, temp_dir = fresh_library
+    lib.session.add(Book(title="Tries and Radix Trees", unique_id="tr-1"))
+    lib.session.commit()
+    lib.close()
+
+    engine = get_engine(temp_dir)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE suggestions_fts"))
+        conn.execute(text("DROP TABLE books_fts"))
+        conn.execute(text("""
+            CREATE VIRTUAL TABLE books_fts USING fts5(
+                title, description, extracted_text,
+                content='books_fts_source', content_rowid='book_id',
+                tokenize='porter unicode61'
+            )
+        """))
+        conn.execute(text("INSERT INTO books_fts (books_fts) VALUES ('rebuild')"))
+
+    assert migrate_add_suggestions(temp_dir, dry_run=True) is True
+    assert migrate_add_suggestions(temp_dir) is True
+    assert migrate_add_suggestions(temp_dir) is False
+
+    with engine.connect() as conn:
+        assert "prefix='2 3 4'" in _sql(conn, "books_fts")
+        hits = conn.execute(text(
+            "SELECT count(*) FROM books_fts WHERE books_fts MATCH 'radi*'"
+        )).scalar()
+    assert hits == 1
@@ -16,6 +16,7 @@ from book_memex.services import (
     MarginaliaService,
     ExportService,
     ViewService,
+    JobService,
 )
 from book_memex.db.models import Book, PersonalMetadata, Author, Tag
 
@@ -624,3 +625,95 @@ class TestViewServiceIntegration:
         # Delete it
         result = svc.delete('test-view')
         assert result is True
+
+
+# =============================================================================
+# JobService Tests
+# =============================================================================
+
+class TestJobService:
+    """Tests for the background extraction job queue."""
+
+    @pytest.fixture
+    def deferred_book(self, temp_library):
+        """A text book imported with extraction deferred."""
+        test_file = temp_library.library_path / "source.txt"
+        test_file.write_text("Deferred extraction of quantum chromodynamics notes. " * 10)
+        book = temp_library.add_book(test_file, metadata={"title": "Deferred"}, defer=True)
+        return temp_library, book
+
+    def test_deferred_import_queues_jobs(self, deferred_book):
+        lib, book = deferred_book
+        svc = JobService(lib.session, lib.library_path)
+
+        jobs = svc.list()
+        assert {job.kind for job in jobs} == {"text", "cover"}
+        assert all(job.status == "pending" for job in jobs)
+        assert book.files[0].extracted_text is None
+
+    def test_enqueue_dedupes_pending_and_raises_priority(self, deferred_book):
+        lib, book = deferred_book
+        svc = JobService(lib.session, lib.library_path)
+
+        job = svc.enqueue(book.files[0], "text", priority=5)
+        lib.session.commit()
+
+        assert svc.counts()["pending"] == 2
+        assert job.priority == 5
+
+    def test_enqueue_unknown_kind_raises(self, deferred_book):
+        lib, book = deferred_book
+        with pytest.raises(ValueError, match="Unknown job kind"):
+            JobService(lib.session, lib.library_path).enqueue(book.files[0], "ocr")
+
+    def test_claim_takes_highest_priority_first(self, deferred_book):
+        lib, book = deferred_book
+        svc = JobService(lib.session, lib.library_path)
+        svc.enqueue(book.files[0], "text", priority=10)
+        lib.session.commit()
+
+        job = svc.claim("test-worker")
+        assert job.kind == "text"
+        assert job.status == "running"
+        assert job.worker == "test-worker"
+        assert job.attempts == 1
+
+    def test_run_pending_extracts_text(self, deferred_book):
+        lib, book = deferred_book
+        svc = JobService(lib.session, lib.library_path)
+
+        results = svc.run_pending()
+
+        # A plaintext file has no cover, so the cover job finds nothing to do
+        assert results == {"done": 2, "failed": 0}
+        lib.session.refresh(book.files[0])
+        assert "quantum" in book.files[0].extracted_text.content
+        assert [b.id for b in lib.search("chromodynamics")] == [book.id]
+
+    def test_failed_job_retries_with_backoff_then_fails(self, deferred_book):
+        lib, book = deferred_book
+        svc = JobService(lib.session, lib.library_path)
+        (lib.library_path / book.files[0].path).unlink()
+
+        text_job = next(j for j in svc.list() if j.kind == "text")
+        text_job.max_attempts = 2
+        lib.session.commit()
+
+        svc.run_pending()
+        lib.session.refresh(text_job)
+        assert text_job.status == "pending"
+        assert text_job.run_after is not None
+        assert "missing" in text_job.last_error
+
+        # Not due yet
+        assert svc.run_pending() == {"done": 0, "failed": 0}
+
+        text_job.run_after = None
+        lib.session.commit()
+        assert svc.run_pending() == {"done": 0, "failed": 1}
+        lib.session.refresh(text_job)
+        assert text_job.status == "failed"
+
+        svc.retry(text_job.id)
+        assert text_job.status == "pending"
+        assert text_job.attempts == 0
@@ -0,0 +1,105 @@
+"""Tests for ReindexService: batched, parallel, resumable reindex-content."""
+import tempfile
+import shutil
+from pathlib import Path
+
+import pytest
+
+from book_memex.db.models import BookContent, File, ReindexCheckpoint
+from book_memex.library_db import Library
+from book_memex.services.reindex_service import ReindexService
+
+
+@pytest.fixture
+def lib_with_books(sample_epub):
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    books = []
+    for i in range(4):
+        path = lib.library_path / f"book{i}.txt"
+        path.write_text(f"Book number {i}. " * 20)
+        books.append(lib.add_book(path, metadata={"title": f"Book {i}"},
+                                  extract_text=False, extract_cover=False))
+    dest = lib.library_path / "sample.epub"
+    shutil.copy(sample_epub, dest)
+    books.append(lib.add_book(dest, metadata={"title": "Sample"},
+                              extract_text=False, extract_cover=False))
+    yield lib, books
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _content(lib):
+    return sorted(
+        (r.file_id, r.segment_index, r.content)
+        for r in lib.session.query(BookContent).all()
+    )
+
+
+def test_run_indexes_every_primary_file(lib_with_books):
+    lib, books = lib_with_books
+    stats = ReindexService(lib.session, lib.library_path).run(batch_size=2)
+
+    assert stats.total == 5
+    assert stats.processed == 5
+    assert stats.indexed == 5
+    assert stats.segments_written == 4 + 3  # one per txt, three EPUB chapters
+    checkpoint = lib.session.get(ReindexCheckpoint, "content")
+    assert checkpoint.status == "done"
+    assert checkpoint.last_file_id == max(b.files[0].id for b in books)
+
+    again = ReindexService(lib.session, lib.library_path).run()
+    assert again.unchanged == 5
+    assert again.segments_written == 0
+
+
+def test_parallel_run_matches_sequential(lib_with_books):
+    lib, _ = lib_with_books
+    service = ReindexService(lib.session, lib.library_path)
+    service.run(workers=1)
+    sequential = _content(lib)
+
+    stats = service.run(workers=2, force=True)
+
+    assert stats.indexed == 5
+    assert _content(lib) == sequential
+
+
+def test_resume_continues_after_last_committed_batch(lib_with_books):
+    lib, books = lib_with_books
+    service = ReindexService(lib.session, lib.library_path)
+
+    def interrupt(stats):
+        if stats.processed == 3:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        service.run(batch_size=2, on_progress=interrupt)
+    lib.session.rollback()
+
+    checkpoint = service.checkpoint()
+    assert checkpoint.status == "running"
+    assert checkpoint.files_done == 2
+    assert checkpoint.last_file_id == books[1].files[0].id
+
+    resumed = service.run(resume=True, force=True)
+
+    assert resumed.resumed_from == books[1].files[0].id
+    assert resumed.processed == 5
+    assert resumed.indexed == 3  # only the files after the checkpoint
+    assert service.checkpoint().status == "done"
+
+
+def test_run_uses_each_books_primary_file(lib_with_books):
+    lib, books = lib_with_books
+    epub_book = books[-1]
+    (lib.library_path / "sample.txt").write_text("Plain text edition of the sample")
+    lib.session.add(File(book_id=epub_book.id, path="sample.txt", format="txt",
+                         file_hash="f" * 64, size_bytes=32))
+    lib.session.commit()
+
+    stats = ReindexService(lib.session, lib.library_path).run(book_id=epub_book.id)
+
+    assert stats.processed == 1
+    assert stats.segments_written == 3  # the EPUB, not the later txt file
+    assert lib.session.get(ReindexCheckpoint, "content") is None
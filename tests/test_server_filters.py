@@ -4,6 +4,7 @@ Tests for server API filter and stats features.
 Tests cover:
 - Reading status filter: filtering books by 'reading', 'completed', 'unread'
 - Extended stats API: favorites_count, reading_count, completed_count
+- Full-text search: /api/books?search= sorted by FTS relevance
 - JavaScript syntax validation: proper HTML entity escaping in onclick handlers
 """
 
@@ -584,6 +585,78 @@ class TestReadingStatusFilterWithStats:
         assert reading_count + read_count + unread_count == total_books
 
 
+# ============================================================================
+# Full-Text Search Tests
+# ============================================================================
+
+class TestTextSearchSorting:
+    """Test /api/books?search= ordering by FTS relevance."""
+
+    @pytest.fixture
+    def client_with_text(self, temp_library):
+        lib = temp_library
+        for i, (title, body) in enumerate([
+            ("Passing Mention", "A single note on lichens among many other topics. " * 5),
+            ("Lichen Field Guide", "lichen lichen lichen " * 30),
+            ("Unrelated", "Nothing about that subject here. " * 5),
+        ]):
+            test_file = lib.library_path / f"text{i}.txt"
+            test_file.write_text(body)
+            lib.add_book(test_file, metadata={"title": title, "language": "en"},
+                         extract_text=True, extract_cover=False)
+        set_library(lib)
+        return TestClient(app)
+
+    def test_search_defaults_to_relevance_order(self, client_with_text):
+        response = client_with_text.get("/api/books", params={"search": "lichen"})
+        assert response.status_code == 200
+        data = response.json()
+        # Porter stemming matches "lichens" too; the dense match ranks first.
+        assert data["total"] == 2
+        assert [b["title"] for b in data["items"]] == ["Lichen Field Guide", "Passing Mention"]
+
+    def test_search_explicit_sort_overrides_relevance(self, client_with_text):
+        response = client_with_text.get(
+            "/api/books", params={"search": "lichen*", "sort": "title"}
+        )
+        titles = [b["title"] for b in response.json()["items"]]
+        assert titles == sorted(titles)
+        assert "Unrelated" not in titles
+
+
+class TestSimilarBooksEndpoint:
+    """Test /api/books/{id}/similar."""
+
+    def test_similar_books_from_neighbor_table(self, client_with_books):
+        client, lib = client_with_books
+        lib.build_neighbors(["sparse_friendly"], top_k=5)
+
+        response = client.get("/api/books/1/similar", params={"limit": 3})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 3
+        assert all(item["book"]["id"] != 1 for item in data)
+        scores = [item["similarity"] for item in data]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_similar_books_with_preset(self, client_with_books):
+        client, _ = client_with_books
+        response = client.get("/api/books/1/similar", params={"preset": "metadata_only"})
+        assert response.status_code == 200
+        assert len(response.json()) == 4
+
+    def test_similar_books_unknown_preset(self, client_with_books):
+        client, _ = client_with_books
+        response = client.get("/api/books/1/similar", params={"preset": "bogus"})
+        assert response.status_code == 400
+
+    def test_similar_books_not_found(self, client_with_books):
+        client, _ = client_with_books
+        response = client.get("/api/books/9999/similar")
+        assert response.status_code == 404
+
+
 # ============================================================================
 # Edge Cases and Error Handling
 # ============================================================================
@@ -784,3 +857,49 @@ class TestViewsAPIEndpoints:
         data = response.json()
         assert 'yaml' in data
         assert 'yaml_test' in data['yaml']
+
+
+# ============================================================================
+# Background Jobs API Tests
+# ============================================================================
+
+class TestJobsAPI:
+    """Tests for /api/jobs."""
+
+    @pytest.fixture
+    def client_with_jobs(self, temp_library):
+        test_file = temp_library.library_path / "queued.txt"
+        test_file.write_text("Queued content")
+        book = temp_library.add_book(test_file, metadata={"title": "Queued"}, defer=True)
+        set_library(temp_library)
+        return TestClient(app), book
+
+    def test_list_jobs_with_counts(self, client_with_jobs):
+        client, book = client_with_jobs
+        response = client.get(f"/api/jobs?book_id={book.id}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["counts"]["pending"] == 2
+        assert {job["kind"] for job in data["jobs"]} == {"text", "cover"}
+        assert all(job["book_id"] == book.id for job in data["jobs"])
+
+    def test_list_jobs_unknown_status(self, client_with_jobs):
+        client, _ = client_with_jobs
+        assert client.get("/api/jobs?status=bogus").status_code == 400
+
+    def test_get_and_retry_job(self, client_with_jobs):
+        client, _ = client_with_jobs
+        job_id = client.get("/api/jobs").json()["jobs"][0]["id"]
+
+        response = client.get(f"/api/jobs/{job_id}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "pending"
+
+        response = client.post(f"/api/jobs/{job_id}/retry")
+        assert response.status_code == 200
+        assert response.json()["attempts"] == 0
+
+    def test_missing_job_returns_404(self, client_with_jobs):
+        client, _ = client_with_jobs
+        assert client.get("/api/jobs/9999").status_code == 404
+        assert client.post("/api/jobs/9999/retry").status_code == 404
@@ -0,0 +1,104 @@
+"""
+Tests for per-request database sessions in the web server.
+
+Tests cover:
+- Library.scoped(): fresh session on the shared engine, closed on exit
+- Requests do not use (or leave state in) the global library's session
+- Concurrent requests each get their own session and all succeed
+- The worker thread limit is applied on startup
+"""
+
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import anyio.to_thread
+import pytest
+from fastapi.testclient import TestClient
+
+from book_memex import server
+from book_memex.db.models import Book
+from book_memex.library_db import Library
+from book_memex.server import app, set_library
+
+
+@pytest.fixture
+def temp_library():
+    """Create a temporary library with a few committed books."""
+    temp_dir = tempfile.mkdtemp()
+    lib = Library.open(Path(temp_dir))
+    for i in range(5):
+        lib.session.add(Book(unique_id=f"sess{i}", title=f"Book {i}", language="en"))
+    lib.session.commit()
+
+    yield lib
+
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def client(temp_library):
+    set_library(temp_library)
+    return TestClient(app)
+
+
+def test_scoped_library_uses_fresh_session(temp_library):
+    with temp_library.scoped() as lib:
+        assert lib.session is not temp_library.session
+        assert lib.session.get_bind() is temp_library.session.get_bind()
+        assert lib.library_path == temp_library.library_path
+        assert lib.stats()["total_books"] == 5
+        scoped_session = lib.session
+    # Closing the scoped session leaves the engine usable.
+    assert scoped_session.get_bind() is not None
+    assert temp_library.stats()["total_books"] == 5
+
+
+def test_scoped_libraries_share_similarity_indexes(temp_library):
+    from book_memex.services.neighbor_service import preset_config
+
+    config = preset_config("metadata_only")
+    with temp_library.scoped() as lib:
+        index = lib.similarity_index(config)
+    with temp_library.scoped() as lib:
+        assert lib.similarity_index(config) is index
+    assert temp_library.similarity_index(config) is index
+
+
+def test_scoped_library_rolls_back_on_error(temp_library):
+    with pytest.raises(RuntimeError):
+        with temp_library.scoped() as lib:
+            lib.session.add(Book(unique_id="uncommitted", title="Never Saved"))
+            lib.session.flush()
+            raise RuntimeError("boom")
+    assert temp_library.session.query(Book).filter_by(unique_id="uncommitted").count() == 0
+
+
+def test_requests_do_not_touch_global_session(client, temp_library):
+    temp_library.session.expunge_all()
+    response = client.get("/api/books")
+    assert response.status_code == 200
+    assert response.json()["total"] == 5
+    # The endpoint loaded books through its own session.
+    assert len(temp_library.session.identity_map) == 0
+
+
+def test_concurrent_requests(client):
+    def fetch(i):
+        path = "/api/books" if i % 2 else "/api/stats"
+        return client.get(path).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(fetch, range(32)))
+    assert statuses == [200] * 32
+
+
+def test_worker_threads_applied_on_startup(temp_library, monkeypatch):
+    set_library(temp_library)
+    monkeypatch.setattr(server, "_worker_threads", 3)
+    with TestClient(app) as c:
+        limiter = c.portal.call(anyio.to_thread.current_default_thread_limiter)
+        assert limiter.total_tokens == 3
+        assert c.get("/api/stats").status_code == 200
@@ -246,6 +246,30 @@ class TestTextExtractionService:
         extracted = service._extract_plaintext(test_file)
         assert extracted == content
 
+    def test_extract_content_derives_text_from_segments(self, temp_library, sample_epub):
+        """Test that extract_content's full text is the joined segment text."""
+        service = temp_library.text_service
+
+        text, segments, error = service.extract_content(sample_epub, "epub")
+
+        assert error is None
+        assert [seg.segment_type for seg in segments] == ["chapter"] * 3
+        assert text == "\n\n".join(seg.text for seg in segments)
+        assert "Priors meet likelihoods." in text
+
+    def test_extract_content_falls_back_without_extractor(self, temp_library):
+        """Test that formats without a segment extractor use plain text extraction."""
+        service = temp_library.text_service
+
+        test_file = temp_library.library_path / "notes.md"
+        test_file.write_text("# Notes\n\nSome markdown content.")
+
+        text, segments, error = service.extract_content(test_file, "md")
+
+        assert segments is None
+        assert error is None
+        assert text == "# Notes\n\nSome markdown content."
+
     def test_extract_plaintext_encoding_fallback(self, temp_library):
         """Test plaintext extraction with encoding fallback."""
         service = temp_library.text_service
@@ -556,6 +580,448 @@ class TestBatchImportWithErrors:
         # Should import only the valid files
         assert len(books) == 2
 
+    def test_batch_import_failure_rolls_back_only_its_savepoint(self, temp_library):
+        """A file that fails mid-import does not lose the rest of its batch."""
+        files_and_metadata = []
+        for i in range(5):
+            test_file = temp_library.library_path / f"batched_{i}.txt"
+            test_file.write_text(f"Batched content {i}")
+            files_and_metadata.append((test_file, {"title": f"Batched {i}", "creators": ["Author"]}))
+
+        service = temp_library.import_service
+        original = service._create_book
+
+        def create_book(metadata, unique_id):
+            if metadata["title"] == "Batched 2":
+                raise RuntimeError("bad metadata")
+            return original(metadata, unique_id)
+
+        with patch.object(service, "_create_book", side_effect=create_book):
+            books = temp_library.batch_import(files_and_metadata, show_progress=False, batch_size=2)
+
+        temp_library.session.expire_all()
+        assert sorted(b.title for b in temp_library.get_all_books()) == [
+            "Batched 0", "Batched 1", "Batched 3", "Batched 4"
+        ]
+        assert len(books) == 4
+        stats = service.last_stats
+        assert (stats.files, stats.failed, stats.commits) == (5, 1, 3)
+        assert stats.commits_per_second > 0
+        assert "commits/s" in stats.summary()
+
+    def test_import_batch_commits_once(self, temp_library):
+        """Files in a batch stay invisible to other connections until it commits."""
+        import sqlite3
+        from book_memex.services.import_service import ImportBatch
+
+        def stored_files():
+            with sqlite3.connect(temp_library.db_path) as conn:
+                return conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+        batch = ImportBatch(temp_library.import_service, batch_size=10)
+        for i in range(3):
+            test_file = temp_library.library_path / f"atomic_{i}.txt"
+            test_file.write_text(f"Atomic batch content {i}")
+            batch.import_file(test_file, {"title": f"Atomic {i}"},
+                              extract_text=False, extract_cover=False)
+        assert stored_files() == 0
+
+        batch.close()
+        assert stored_files() == 3
+        assert batch.stats.commits == 1
+
+    def test_interrupt_mid_file_rolls_back_open_batch(self, temp_library):
+        """An interrupt inside a file drops the uncommitted batch, half-done file included."""
+        from book_memex.services.import_service import ImportBatch
+
+        service = temp_library.import_service
+        original = service.index_text
+        calls = []
+
+        def index_text(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return original(*args, **kwargs)
+
+        files = []
+        for i in range(3):
+            test_file = temp_library.library_path / f"interrupted_{i}.txt"
+            test_file.write_text(f"Interrupted batch content {i} " * 20)
+            files.append(test_file)
+
+        with patch.object(service, "index_text", side_effect=index_text):
+            with pytest.raises(KeyboardInterrupt):
+                with ImportBatch(service, batch_size=10) as batch:
+                    for i, test_file in enumerate(files):
+                        batch.import_file(test_file, {"title": f"Book {i}"}, extract_cover=False)
+
+        assert temp_library.session.query(File).count() == 0
+        assert temp_library.session.query(Book).count() == 0
+
+        # Nothing was left behind as a hash duplicate, so a re-run imports all three
+        with ImportBatch(service, batch_size=10) as batch:
+            for i, test_file in enumerate(files):
+                batch.import_file(test_file, {"title": f"Book {i}"}, extract_cover=False)
+        assert temp_library.session.query(ExtractedText).count() == 3
+
+    def test_import_batch_rejects_empty_batches(self, temp_library):
+        from book_memex.services.import_service import ImportBatch
+        with pytest.raises(ValueError):
+            ImportBatch(temp_library.import_service, batch_size=0)
+
+
+class TestFileHashCache:
+    """Test the persistent stat-keyed file hash cache."""
+
+    def test_unchanged_file_is_not_reread(self, tmp_path):
+        """A second lookup of an unchanged file comes from the cache."""
+        from book_memex.services.hash_cache import FileHashCache
+
+        test_file = tmp_path / "book.txt"
+        test_file.write_text("Cached content")
+        expected = hashlib.sha256(b"Cached content").hexdigest()
+
+        cache = FileHashCache(tmp_path / "hashes.db")
+        assert cache.hash_file(test_file) == expected
+        cache.close()
+
+        # A new instance (e.g. the next run) reads the persisted entry
+        cache = FileHashCache(tmp_path / "hashes.db")
+        with patch("book_memex.services.hash_cache.file_sha256") as mock_hash:
+            assert cache.hash_file(test_file) == expected
+            mock_hash.assert_not_called()
+        assert cache.hits == 1
+        cache.close()
+
+    def test_changed_file_is_rehashed(self, tmp_path):
+        """Changing size or mtime invalidates the cached hash."""
+        import os
+        from book_memex.services.hash_cache import FileHashCache
+
+        test_file = tmp_path / "book.txt"
+        test_file.write_text("Version one")
+        cache = FileHashCache(tmp_path / "hashes.db")
+        cache.hash_file(test_file)
+
+        test_file.write_text("Version two, longer")
+        assert cache.hash_file(test_file) == hashlib.sha256(b"Version two, longer").hexdigest()
+
+        # Same size, different mtime
+        test_file.write_text("Version three, longr")
+        st = test_file.stat()
+        os.utime(test_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert cache.hash_file(test_file) == hashlib.sha256(b"Version three, longr").hexdigest()
+        assert cache.misses == 3
+        cache.close()
+
+    def test_import_records_source_and_library_copy(self, temp_library):
+        """Importing caches the source file's and the library copy's hashes."""
+        test_file = temp_library.library_path / "source.txt"
+        test_file.write_text("Content to import")
+
+        book = temp_library.add_book(test_file, {"title": "Cached Book", "creators": ["Author"]},
+                                     extract_text=False, extract_cover=False)
+        cache = temp_library.import_service.hash_cache
+        stored = temp_library.library_path / book.files[0].path
+
+        with patch("book_memex.services.hash_cache.file_sha256") as mock_hash:
+            assert cache.hash_file(test_file) == book.files[0].file_hash
+            assert cache.hash_file(stored) == book.files[0].file_hash
+            mock_hash.assert_not_called()
+
+
+class TestPartialHashPrefilter:
+    """Test two-stage duplicate detection on import."""
+
+    def test_partial_hash_reads_both_ends(self, tmp_path):
+        """Files differing only in the middle share a partial hash."""
+        from book_memex.services.hash_cache import partial_hash, PARTIAL_BLOCK
+
+        a = tmp_path / "a.bin"
+        b = tmp_path / "b.bin"
+        c = tmp_path / "c.bin"
+        a.write_bytes(b"x" * PARTIAL_BLOCK + b"A" + b"y" * PARTIAL_BLOCK)
+        b.write_bytes(b"x" * PARTIAL_BLOCK + b"B" + b"y" * PARTIAL_BLOCK)
+        c.write_bytes(b"x" * PARTIAL_BLOCK + b"A" + b"y" * (PARTIAL_BLOCK - 1) + b"z")
+
+        assert partial_hash(a) == partial_hash(b)
+        assert partial_hash(a) != partial_hash(c)
+
+    def test_new_file_is_hashed_while_copying(self, temp_library):
+        """A file with an unseen partial hash is read once, by the copy."""
+        test_file = temp_library.library_path / "new.txt"
+        test_file.write_text("Brand new content")
+
+        with patch("book_memex.services.hash_cache.file_sha256") as mock_hash:
+            book = temp_library.add_book(test_file, {"title": "New"},
+                                         extract_text=False, extract_cover=False)
+            mock_hash.assert_not_called()
+
+        file = book.files[0]
+        assert file.file_hash == hashlib.sha256(b"Brand new content").hexdigest()
+        assert file.partial_hash is not None
+        assert (temp_library.library_path / file.path).read_text() == "Brand new content"
+        assert not list((temp_library.library_path / "files").glob("*.part"))
+
+    def test_partial_hash_collision_falls_back_to_full_hash(self, temp_library):
+        """Duplicates (and rows without a partial hash) are confirmed by full hash."""
+        first = temp_library.library_path / "first.txt"
+        first.write_text("Duplicate content")
+        book = temp_library.add_book(first, {"title": "First"},
+                                     extract_text=False, extract_cover=False)
+
+        copy = temp_library.library_path / "copy.txt"
+        copy.write_text("Duplicate content")
+        assert temp_library.add_book(copy, {"title": "Copy"},
+                                     extract_text=False, extract_cover=False).id == book.id
+
+        # A pre-migration row has no partial hash and must still be matched
+        book.files[0].partial_hash = None
+        temp_library.session.commit()
+        other = temp_library.library_path / "other.txt"
+        other.write_text("Duplicate content")
+        assert temp_library.add_book(other, {"title": "Other"},
+                                     extract_text=False, extract_cover=False).id == book.id
+        assert temp_library.session.query(File).count() == 1
+
+
+class TestIngestModes:
+    """Test how imported files are placed in the library."""
+
+    def _source(self, temp_library, name="source.txt"):
+        source_dir = temp_library.library_path.parent / (temp_library.library_path.name + "-src")
+        source_dir.mkdir(exist_ok=True)
+        test_file = source_dir / name
+        test_file.write_text("Ingest mode test content about heliography. " * 10)
+        return test_file
+
+    def test_copy_file_preserves_content_and_mtime(self, tmp_path):
+        """copy_file copies data and timestamps."""
+        import os
+        from book_memex.services.ingest import copy_file
+
+        source = tmp_path / "a.bin"
+        source.write_bytes(os.urandom(300_000))
+        os.utime(source, (1_000_000_000, 1_000_000_000))
+        dest = tmp_path / "b.bin"
+        copy_file(source, dest)
+
+        assert dest.read_bytes() == source.read_bytes()
+        assert dest.stat().st_mtime == 1_000_000_000
+
+    def test_hardlink_shares_the_source_inode(self, temp_library):
+        """hardlink stores no second copy of the data."""
+        source = self._source(temp_library)
+        book = temp_library.add_book(source, {"title": "Linked"}, extract_text=False,
+                                     extract_cover=False, ingest_mode="hardlink")
+
+        stored = temp_library.library_path / book.files[0].path
+        assert stored.stat().st_ino == source.stat().st_ino
+        assert book.files[0].file_hash == hashlib.sha256(source.read_bytes()).hexdigest()
+
+    def test_reflink_stores_identical_content(self, temp_library):
+        """reflink clones where supported and copies otherwise."""
+        source = self._source(temp_library)
+        book = temp_library.add_book(source, {"title": "Cloned"}, extract_text=False,
+                                     extract_cover=False, ingest_mode="reflink")
+
+        stored = temp_library.library_path / book.files[0].path
+        assert stored.read_bytes() == source.read_bytes()
+        assert stored.stat().st_ino != source.stat().st_ino
+
+    def test_move_extracts_then_moves_source(self, temp_library):
+        """move removes the source after text is extracted from it."""
+        source = self._source(temp_library)
+        content = source.read_bytes()
+        book = temp_library.add_book(source, {"title": "Moved"}, extract_cover=False,
+                                     ingest_mode="move")
+
+        assert not source.exists()
+        assert (temp_library.library_path / book.files[0].path).read_bytes() == content
+        assert [b.id for b in temp_library.search("heliography")] == [book.id]
+
+    def test_batched_move_waits_for_commit(self, temp_library):
+        """In a batch the source is only removed once its rows are committed."""
+        from book_memex.services.import_service import ImportBatch
+
+        source = self._source(temp_library)
+        content = source.read_bytes()
+        with ImportBatch(temp_library.import_service, batch_size=10) as batch:
+            book = batch.import_file(source, {"title": "Batched Move"}, extract_text=False,
+                                     extract_cover=False, ingest_mode="move")
+            stored = temp_library.library_path / book.files[0].path
+            assert source.exists()
+            assert stored.read_bytes() == content
+
+        assert not source.exists()
+        assert stored.read_bytes() == content
+
+    def test_move_failing_after_commit_keeps_library_complete(self, temp_library):
+        """If the source can't be removed, it stays and the stored copy is intact."""
+        source = self._source(temp_library)
+        content = source.read_bytes()
+        real_unlink = Path.unlink
+
+        def unlink(path, *args, **kwargs):
+            if path == source:
+                raise OSError(30, "Read-only file system")
+            return real_unlink(path, *args, **kwargs)
+
+        with patch.object(Path, "unlink", unlink):
+            book = temp_library.add_book(source, {"title": "Stuck"}, extract_text=False,
+                                         extract_cover=False, ingest_mode="move")
+
+        stored = temp_library.library_path / book.files[0].path
+        assert source.exists()
+        assert stored.read_bytes() == content
+        assert temp_library.session.query(File).count() == 1
+
+    def test_move_rolled_back_leaves_source(self, temp_library):
+        """A failed batch commit keeps the source and stores nothing."""
+        from book_memex.services.import_service import ImportBatch
+
+        source = self._source(temp_library)
+        batch = ImportBatch(temp_library.import_service, batch_size=10)
+        book = batch.import_file(source, {"title": "Rolled Back"}, extract_text=False,
+                                 extract_cover=False, ingest_mode="move")
+        stored = temp_library.library_path / book.files[0].path
+
+        with patch.object(temp_library.session, "commit", side_effect=RuntimeError("disk full")):
+            with pytest.raises(RuntimeError):
+                batch.commit()
+        temp_library.session.rollback()
+
+        assert source.exists()
+        assert not stored.exists()
+        assert temp_library.session.query(File).count() == 0
+        batch.close()
+        assert source.exists()
+
+    def test_move_leaves_duplicates_in_place(self, temp_library):
+        """A duplicate is not moved (nothing is stored for it)."""
+        first = self._source(temp_library, "first.txt")
+        temp_library.add_book(first, {"title": "First"}, extract_text=False, extract_cover=False)
+        second = self._source(temp_library, "second.txt")
+        temp_library.add_book(second, {"title": "Second"}, extract_text=False,
+                              extract_cover=False, ingest_mode="move")
+
+        assert second.exists()
+        assert temp_library.session.query(File).count() == 1
+
+    def test_unknown_mode_raises(self, temp_library):
+        source = self._source(temp_library)
+        with pytest.raises(ValueError, match="Unknown ingest mode"):
+            temp_library.add_book(source, {"title": "Bad"}, ingest_mode="symlink")
+
+
+class TestFolderWatch:
+    """Test incremental sync of a watched folder."""
+
+    def _write(self, folder, name, text, age=60):
+        import os
+        import time
+
+        path = folder / name
+        path.write_text(text * 20)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def _watcher(self, temp_library, folder, **kwargs):
+        from book_memex.services.folder_watch import FolderWatcher
+
+        kwargs.setdefault("extract_cover", False)
+        return FolderWatcher(temp_library, folder, extensions=[".txt"], **kwargs)
+
+    def test_only_delta_is_imported(self, temp_library, tmp_path):
+        """A second sync imports nothing; new and changed files are picked up."""
+        inbox = tmp_path / "inbox"
+        inbox.mkdir()
+        first = self._write(inbox, "first.txt", "Watched folder content about orreries. ")
+        self._write(inbox, "skip.md", "Not an ebook. ")
+
+        watcher = self._watcher(temp_library, inbox)
+        result = watcher.sync()
+        assert (result.imported, result.failed, result.waiting) == (1, 0, 0)
+
+        with patch.object(temp_library.import_service, "import_file") as mock_import:
+            assert not watcher.sync()
+            mock_import.assert_not_called()
+
+        self._write(inbox, "second.txt", "Second file about astrolabes. ")
+        self._write(inbox, "first.txt", "Rewritten first file about sextants. ")
+        delta = watcher.scan()
+        assert list(delta.new) == [str(inbox / "second.txt")]
+        assert list(delta.changed) == [str(first)]
+
+        assert watcher.sync().imported == 2
+        assert temp_library.session.query(File).count() == 3
+        watcher.close()
+
+    def test_snapshot_persists_across_watchers(self, temp_library, tmp_path):
+        from book_memex.services.folder_watch import WatchDelta
+
+        inbox = tmp_path / "inbox"
+        inbox.mkdir()
+        self._write(inbox, "book.txt", "Persistent snapshot content. ")
+        watcher = self._watcher(temp_library, inbox)
+        watcher.sync()
+        watcher.close()
+
+        assert (temp_library.library_path / "cache" / "watch.db").exists()
+        watcher = self._watcher(temp_library, inbox)
+        assert watcher.scan() == WatchDelta()
+        watcher.close()
+
+    def test_recent_files_wait_until_settled(self, temp_library, tmp_path):
+        """A file modified less than ``settle`` seconds ago is left for later."""
+        inbox = tmp_path / "inbox"
+        inbox.mkdir()
+        path = self._write(inbox, "partial.txt", "Half-written download. ", age=0)
+
+        watcher = self._watcher(temp_library, inbox, settle=30)
+        result = watcher.sync()
+        assert (result.imported, result.waiting) == (0, 1)
+        assert temp_library.session.query(File).count() == 0
+
+        # Still growing at the next walk: keeps waiting even once it is old
+        self._write(inbox, "partial.txt", "Half-written download, more of it. ", age=60)
+        assert watcher.sync().waiting == 1
+
+        # Unchanged since the last walk: imported
+        assert watcher.sync().imported == 1
+        assert path.exists()
+        watcher.close()
+
+    def test_removed_files_are_forgotten(self, temp_library, tmp_path):
+        """Removing a source drops it from the snapshot but keeps the book."""
+        inbox = tmp_path / "inbox"
+        inbox.mkdir()
+        path = self._write(inbox, "gone.txt", "Soon to be removed. ")
+        watcher = self._watcher(temp_library, inbox)
+        watcher.sync()
+
+        path.unlink()
+        assert watcher.sync().removed == 1
+        assert watcher.snapshot.load() == {}
+        assert temp_library.session.query(Book).count() == 1
+        watcher.close()
+
+    def test_failed_files_are_not_retried_until_changed(self, temp_library, tmp_path):
+        inbox = tmp_path / "inbox"
+        inbox.mkdir()
+        self._write(inbox, "broken.txt", "Fails the first time. ")
+        watcher = self._watcher(temp_library, inbox)
+
+        with patch.object(temp_library.import_service, "import_file", return_value=None):
+            assert watcher.sync().failed == 1
+        assert not watcher.sync()
+
+        self._write(inbox, "broken.txt", "Fixed now. ")
+        assert watcher.sync().imported == 1
+        watcher.close()
+
 
 class TestPDFTextExtraction:
     """Test PDF text extraction with fallback."""
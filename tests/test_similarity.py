@@ -5,6 +5,8 @@ from pathlib import Path
 import tempfile
 import shutil
 
+import numpy as np
+
 from book_memex.db.models import Book, Author, Subject, ExtractedText, File
 from book_memex.similarity import (
     BookSimilarity,
@@ -16,6 +18,7 @@ from book_memex.similarity import (
     JaccardMetric,
     ExactMatchMetric,
     TemporalDecayMetric,
+    NumericProximityMetric,
     Feature,
 )
 
@@ -516,6 +519,62 @@ def test_book_similarity_matrix(sample_books):
     assert matrix[0][3] < 0.3  # Python vs Cooking
 
 
+def _pairwise_matrix(sim, books):
+    """Reference matrix built from the per-pair similarity() path."""
+    n = len(books)
+    matrix = np.zeros((n, n))
+    np.fill_diagonal(matrix, 1.0)
+    for i in range(n):
+        for j in range(i + 1, n):
+            matrix[i][j] = matrix[j][i] = sim.similarity(books[i], books[j])
+    return matrix
+
+
+@pytest.mark.parametrize("preset", ["balanced", "metadata_only", "sparse_friendly"])
+@pytest.mark.parametrize("fitted", [True, False])
+def test_similarity_matrix_matches_pairwise_exactly(sample_books, preset, fitted):
+    """Vectorized blocks reproduce the per-pair scores bit for bit."""
+    sample_books[3].publication_date = None
+    sample_books[4].authors = []
+    sample_books[4].subjects = []
+    sample_books[0].page_count = 320
+    sample_books[1].page_count = 410
+    sim = getattr(BookSimilarity(), preset)().page_count(weight=0.5)
+    if fitted:
+        sim.fit(sample_books)
+
+    assert np.array_equal(sim.similarity_matrix(sample_books), _pairwise_matrix(sim, sample_books))
+
+
+@pytest.mark.parametrize("metric, values", [
+    (JaccardMetric(), [set(), {"a"}, {"a", "b"}, set(), {"c"}]),
+    (ExactMatchMetric(), ["en", None, "en", "fr", None]),
+    (TemporalDecayMetric(sigma=7.0), [1999, None, 2004, 1850, 1999]),
+    (NumericProximityMetric(max_diff=1000.0), [100, None, 350, 2400, 100]),
+])
+def test_metric_similarity_matrix_matches_similarity(metric, values):
+    matrix = metric.similarity_matrix(values)
+    for i in range(len(values)):
+        for j in range(i + 1, len(values)):
+            assert matrix[i][j] == metric.similarity(values[i], values[j])
+            assert matrix[j][i] == matrix[i][j]
+
+
+def test_similarity_matrix_skips_failing_extraction_per_pair(sample_books):
+    """A feature that fails for one book is dropped only for its pairs."""
+
+    class FlakyExtractor(AuthorsExtractor):
+        def extract(self, book):
+            if book.id == 3:
+                raise RuntimeError("no authors for you")
+            return super().extract(book)
+
+    sim = BookSimilarity().subjects(weight=1.0).custom(
+        Feature(FlakyExtractor(), JaccardMetric(), weight=2.0), name="flaky"
+    )
+    assert np.array_equal(sim.similarity_matrix(sample_books), _pairwise_matrix(sim, sample_books))
+
+
 def test_book_similarity_empty_features():
     """Test BookSimilarity with no features configured."""
     sim = BookSimilarity()
@@ -592,6 +651,16 @@ def test_end_to_end_similarity_workflow(sample_books):
         assert cooking_result[1] < 0.3  # Low similarity
 
 
+def test_book_similarity_signature():
+    """Signature identifies features, metric parameters and weights."""
+    assert BookSimilarity().balanced().signature() == BookSimilarity().balanced().signature()
+    assert BookSimilarity().balanced().signature() != BookSimilarity().sparse_friendly().signature()
+    assert (BookSimilarity().authors(weight=1.0).signature()
+            != BookSimilarity().authors(weight=2.0).signature())
+    assert (BookSimilarity().temporal(sigma=5.0).signature()
+            != BookSimilarity().temporal(sigma=10.0).signature())
+
+
 def test_different_languages_filtered(sample_books):
     """Test that different language books are dissimilar."""
     sim = BookSimilarity().balanced()
@@ -0,0 +1,158 @@
+"""Tests for typeahead suggestions (services/suggest_service.py, /api/suggest)."""
+
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from book_memex.db.models import Author, Book, Subject, Tag, utc_now
+from book_memex.library_db import Library
+from book_memex import server
+from book_memex.server import app, set_library
+from book_memex.services.job_service import JobWorker
+from book_memex.services.suggest_service import SuggestService, match_expression
+
+
+@pytest.fixture
+def lib():
+    temp_dir = Path(tempfile.mkdtemp())
+    lib = Library.open(temp_dir)
+    yield lib
+    lib.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _book(lib, title, authors=(), subjects=(), tags=()):
+    book = Book(title=title, unique_id=f"{title}-{len(lib.session.query(Book).all())}")
+    book.authors = list(authors)
+    book.subjects = list(subjects)
+    book.tags = list(tags)
+    lib.session.add(book)
+    lib.session.commit()
+    return book
+
+
+@pytest.fixture
+def catalog(lib):
+    knuth = Author(name="Donald Knuth")
+    knox = Author(name="Ronald Knox")
+    algorithms = Subject(name="Algorithms")
+    tag = Tag(name="Python", path="Programming/Python")
+    _book(lib, "The Art of Computer Programming", [knuth], [algorithms], [tag])
+    _book(lib, "Concrete Mathematics", [knuth], [algorithms])
+    _book(lib, "Literate Programming", [knuth])
+    _book(lib, "Knots and Spirals", [knox])
+    lib.refresh_suggestions()
+    return {"knuth": knuth, "knox": knox, "tag": tag}
+
+
+def test_match_expression():
+    assert match_expression("Knu  art!") == '"knu"* "art"*'
+    assert match_expression("  --  ") == ""
+
+
+def test_ranked_by_weight(lib, catalog):
+    hits = lib.suggest("kn")
+    assert [(h["kind"], h["label"], h["weight"]) for h in hits] == [
+        ("author", "Donald Knuth", 3),
+        ("author", "Ronald Knox", 1),
+        ("title", "Knots and Spirals", 1),
+    ]
+    assert hits[0]["ref_id"] == catalog["knuth"].id
+    assert [h["label"] for h in lib.suggest("kn", limit=1)] == ["Donald Knuth"]
+
+
+def test_every_word_is_a_prefix(lib, catalog):
+    assert [h["label"] for h in lib.suggest("art comp")] == ["The Art of Computer Programming"]
+    assert [h["label"] for h in lib.suggest("pro")] == [
+        "Programming/Python", "Literate Programming", "The Art of Computer Programming",
+    ]
+    assert lib.suggest("pyt")[0] == {
+        "kind": "tag", "label": "Programming/Python", "ref_id": catalog["tag"].id, "weight": 1,
+    }
+    assert lib.suggest("zzz") == []
+    assert lib.suggest("") == []
+
+
+def test_first_lookup_builds_suggestions_once(lib):
+    service = SuggestService(lib.session)
+    _book(lib, "Concrete Mathematics", [Author(name="Donald Knuth")])
+    assert not service.is_built()
+
+    assert [h["label"] for h in lib.suggest("knu")] == ["Donald Knuth"]
+    assert service.is_built()
+
+    # Built once: later edits wait for a refresh
+    _book(lib, "Knuth Reading Notes")
+    assert [h["label"] for h in lib.suggest("knu")] == ["Donald Knuth"]
+
+
+def test_edits_mark_stale_and_rebuild(lib, catalog):
+    service = SuggestService(lib.session)
+    assert lib.suggest("alg")[0]["weight"] == 2
+    assert not service.is_stale()
+    assert lib.refresh_suggestions() is False
+
+    _book(lib, "Algorithms Unlocked", subjects=[lib.session.query(Subject).one()])
+    assert service.is_stale()
+    # Lookups serve the last build until something refreshes it
+    assert [(h["label"], h["weight"]) for h in lib.suggest("alg")] == [("Algorithms", 2)]
+    assert lib.refresh_suggestions() is True
+    assert [(h["label"], h["weight"]) for h in lib.suggest("alg")] == [
+        ("Algorithms", 3), ("Algorithms Unlocked", 1),
+    ]
+
+    catalog["knox"].archived_at = utc_now()
+    lib.session.commit()
+    assert service.is_stale()
+    lib.refresh_suggestions()
+    assert [h["label"] for h in lib.suggest("kn")] == ["Donald Knuth", "Knots and Spirals"]
+
+
+def test_job_worker_rebuilds_stale_suggestions(lib, catalog):
+    _book(lib, "Knuth's Selected Papers", [catalog["knuth"]])
+    worker = JobWorker(lib, poll_interval=0.05)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 10
+        while SuggestService(lib.session).is_stale() and time.monotonic() < deadline:
+            lib.session.rollback()  # end the read transaction to see the worker's commit
+            time.sleep(0.05)
+    finally:
+        worker.stop(timeout=10)
+    assert lib.suggest("knuth")[0]["weight"] == 4
+
+
+def test_archived_books_are_not_counted(lib, catalog):
+    book = lib.session.query(Book).filter_by(title="Literate Programming").one()
+    book.archived_at = utc_now()
+    lib.session.commit()
+    lib.refresh_suggestions()
+    assert lib.suggest("knuth")[0]["weight"] == 2
+    assert lib.suggest("literate") == []
+
+
+def test_api_suggest(lib, catalog):
+    set_library(lib)
+    client = TestClient(app)
+    response = client.get("/api/suggest", params={"q": "knu"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"kind": "author", "label": "Donald Knuth", "ref_id": catalog["knuth"].id, "weight": 3},
+    ]
+    assert client.get("/api/suggest", params={"q": "kn", "limit": 0}).status_code == 422
+
+
+def test_api_suggest_serves_stale_rows_and_rebuilds_after(lib, catalog, monkeypatch):
+    monkeypatch.setattr(server, "_job_worker", None)
+    set_library(lib)
+    client = TestClient(app)
+    _book(lib, "Knuth's Selected Papers", [catalog["knuth"]])
+
+    # Answered from the last build; the rebuild runs after the response
+    assert client.get("/api/suggest", params={"q": "knu"}).json()[0]["weight"] == 3
+    assert not SuggestService(lib.session).is_stale()
+    assert client.get("/api/suggest", params={"q": "knu"}).json()[0]["weight"] == 4
@@ -0,0 +1,191 @@
+"""Tests for compressed storage of extracted text (db/compression.py)."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from typer.testing import CliRunner
+
+from book_memex import config
+from book_memex.db import compression
+from book_memex.db.compression import (
+    compress_text, decompress_text, get_text_codec, validate_codec,
+)
+from book_memex.db.models import Book, BookContent, ExtractedText, File
+from book_memex.library_db import Library
+
+CHAPTER = "The posterior is proportional to the likelihood times the prior. " * 40
+
+
+@pytest.fixture
+def temp_dir():
+    d = Path(tempfile.mkdtemp())
+    yield d
+    shutil.rmtree(d, ignore_errors=True)
+
+
+def _add_content(lib, body=CHAPTER):
+    book = Book(title="Compressed", unique_id="compressed-001")
+    lib.session.add(book)
+    lib.session.flush()
+    f = File(book_id=book.id, path="c.txt", format="txt", file_hash="cafef00d")
+    lib.session.add(f)
+    lib.session.flush()
+    lib.session.add(ExtractedText(file_id=f.id, content=body, content_hash="h"))
+    lib.session.add(BookContent(
+        file_id=f.id, content=body, segment_type="text", segment_index=0,
+        anchor={}, extractor_version="txt-v1", extraction_status="ok",
+    ))
+    lib.session.commit()
+    return f
+
+
+def _stored_types(lib):
+    return {
+        table: lib.session.execute(text(f"SELECT typeof(content) FROM {table}")).scalar()
+        for table in ("extracted_texts", "book_content")
+    }
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_round_trip(codec):
+    stored = compress_text(CHAPTER, codec)
+    assert isinstance(stored, bytes)
+    assert len(stored) < len(CHAPTER)
+    assert decompress_text(stored) == CHAPTER
+
+
+def test_short_and_plain_values_stay_text():
+    assert compress_text("tiny", "zlib") == "tiny"
+    assert compress_text(CHAPTER, "none") == CHAPTER
+    assert decompress_text(CHAPTER) == CHAPTER
+    assert decompress_text(None) is None
+
+
+def test_unknown_codec_raises():
+    with pytest.raises(ValueError, match="Unknown text compression"):
+        validate_codec("lzma")
+
+
+def test_zstd_without_zstandard_raises(monkeypatch):
+    monkeypatch.setattr(compression, "zstandard", None)
+    with pytest.raises(ValueError, match="zstandard"):
+        validate_codec("zstd")
+
+
+def test_codec_defaults_from_config(monkeypatch):
+    cfg = config.EBKConfig()
+    cfg.database.text_compression = "zlib"
+    monkeypatch.setattr(config, "load_config", lambda: cfg)
+    assert get_text_codec() == "zlib"
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_orm_stores_blob_and_loads_str(temp_dir, codec):
+    lib = Library.open(temp_dir, text_compression=codec)
+    try:
+        _add_content(lib)
+        assert _stored_types(lib) == {"extracted_texts": "blob", "book_content": "blob"}
+
+        lib.session.expire_all()
+        content = lib.session.query(BookContent).one().content
+        assert isinstance(content, str)
+        assert content == CHAPTER
+        assert lib.session.query(ExtractedText).one().content == CHAPTER
+    finally:
+        lib.close()
+
+
+def test_fts_finds_compressed_segments(temp_dir):
+    lib = Library.open(temp_dir, text_compression="zlib")
+    try:
+        _add_content(lib)
+        segment = lib.session.query(BookContent).one()
+        hits = lib.session.execute(text(
+            "SELECT rowid FROM book_content_fts WHERE book_content_fts MATCH 'posterior likelihood'"
+        )).fetchall()
+        assert [r[0] for r in hits] == [segment.id]
+
+        segment.content = "An entirely different chapter about conjugate priors. " * 20
+        lib.session.commit()
+        assert lib.session.execute(text(
+            "SELECT count(*) FROM book_content_fts WHERE book_content_fts MATCH 'posterior'"
+        )).scalar() == 0
+        assert lib.session.execute(text(
+            "SELECT count(*) FROM book_content_fts WHERE book_content_fts MATCH 'conjugate'"
+        )).scalar() == 1
+
+        lib.session.delete(segment)
+        lib.session.commit()
+        assert lib.session.execute(text(
+            "SELECT count(*) FROM book_content_fts WHERE book_content_fts MATCH 'conjugate'"
+        )).scalar() == 0
+    finally:
+        lib.close()
+
+
+def test_compact_rewrites_existing_rows(temp_dir):
+    lib = Library.open(temp_dir, text_compression="none")
+    try:
+        _add_content(lib)
+        assert _stored_types(lib) == {"extracted_texts": "text", "book_content": "text"}
+
+        result = lib.compact("zstd")
+        assert result["codec"] == "zstd"
+        assert _stored_types(lib) == {"extracted_texts": "blob", "book_content": "blob"}
+        for stats in result["tables"].values():
+            assert stats["rows"] == 1
+            assert stats["bytes_after"] < stats["bytes_before"]
+
+        lib.session.expire_all()
+        assert lib.session.query(BookContent).one().content == CHAPTER
+        assert lib.session.execute(text(
+            "SELECT count(*) FROM book_content_fts WHERE book_content_fts MATCH 'posterior'"
+        )).scalar() == 1
+
+        lib.compact("none", vacuum=False)
+        assert _stored_types(lib) == {"extracted_texts": "text", "book_content": "text"}
+    finally:
+        lib.close()
+
+
+def test_content_search_reads_compressed_text(temp_dir):
+    from book_memex.server import _run_content_search
+
+    lib = Library.open(temp_dir, text_compression="zlib")
+    try:
+        _add_content(lib)
+        hits = _run_content_search(lib.session, "posterior", None, 10)
+        assert len(hits) == 1
+        assert "posterior" in hits[0]["snippet"]
+    finally:
+        lib.close()
+
+
+def test_cli_lib_compact(temp_dir):
+    from book_memex.cli import app
+
+    lib = Library.open(temp_dir, text_compression="none")
+    _add_content(lib)
+    lib.close()
+
+    result = CliRunner().invoke(app, ["lib", "compact", str(temp_dir), "--codec", "zlib"])
+    assert result.exit_code == 0, result.output
+    assert "book_content" in result.output
+
+    lib = Library.open(temp_dir)
+    try:
+        assert _stored_types(lib) == {"extracted_texts": "blob", "book_content": "blob"}
+    finally:
+        lib.close()
+
+
+def test_cli_lib_compact_rejects_unknown_codec(temp_dir):
+    from book_memex.cli import app
+
+    Library.open(temp_dir).close()
+    result = CliRunner().invoke(app, ["lib", "compact", str(temp_dir), "--codec", "lzma"])
+    assert result.exit_code == 1
+    assert "Unknown text compression" in result.output